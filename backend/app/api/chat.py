@@ -1,11 +1,16 @@
 from fastapi import APIRouter, HTTPException, Body, Depends, Request, Cookie
+from fastapi.responses import StreamingResponse
 from ..models.schemas import ChatRequest, ChatResponse
 from ..services.chat_service import ChatService
+from ..services.llm_gateway import get_llm_gateway
+from ..services.stats_rollup import get_stats_rollup
+from ..db.sqlite_pool import get_db_manager
 from ..services.user_service import UserService
 from ..services import get_category_service
 from ..models.user_models import user_db
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 import time
+import json
 import sqlite3
 import os
 from ..core.logger import get_user_logger, get_console_logger
@@ -25,18 +30,9 @@ def log_chat_history(request: ChatRequest, response: ChatResponse, user_id: Opti
     """
     db_path = os.path.join(settings.DATA_DIR, "db", "users.db")
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
         # category_ids 리스트를 문자열로 변환
         category_str = ",".join(request.category_ids) if request.category_ids else None
         
-        # 테이블 구조 확인을 위한 디버깅
-        cursor.execute("PRAGMA table_info(chat_history)")
-        columns = cursor.fetchall()
-        print(f"chat_history 테이블 컬럼 구조: {columns}")
-        
-        # INSERT할 데이터 확인
         insert_data = (
             session_id,
             request.message,
@@ -48,20 +44,18 @@ def log_chat_history(request: ChatRequest, response: ChatResponse, user_id: Opti
             request.flow_id,
             response.processing_time
         )
-        print(f"INSERT할 데이터 개수: {len(insert_data)}")
-        print(f"INSERT 데이터: {insert_data}")
 
-        cursor.execute("""
-            INSERT INTO chat_history (session_id, query, response, category, relevance_score, feedback, user_id, flow_id, response_time)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, insert_data)
-        conn.commit()
+        with get_db_manager().connection(db_path) as conn:
+            conn.execute("""
+                INSERT INTO chat_history (session_id, query, response, category, relevance_score, feedback, user_id, flow_id, response_time)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, insert_data)
         print("채팅 기록이 성공적으로 저장되었습니다.")
+        
+        # 대시보드 롤업에 새 기록 반영 (high-water mark 이후 행만 집계)
+        get_stats_rollup().compact()
     except sqlite3.Error as e:
         print(f"채팅 기록 저장 실패: {e}")
-    finally:
-        if conn:
-            conn.close()
 
 # Authentication dependency (same as users.py)
 async def get_current_user(session_id: Optional[str] = Cookie(None)):
@@ -128,8 +122,8 @@ async def chat_endpoint(req_body: ChatRequest, http_request: Request, current_us
         
         response = await chat_service.process_chat(req_body)
         
-        # 채팅 기록 로깅
-        log_chat_history(req_body, response, user_id, session_id)
+        # 채팅 기록 로깅 (DB 전용 실행기에서 실행)
+        await get_db_manager().run_sync(log_chat_history, req_body, response, user_id, session_id)
         _ulog.info(
             "채팅 처리 완료",
             extra={
@@ -172,6 +166,78 @@ async def chat_endpoint(req_body: ChatRequest, http_request: Request, current_us
             }
         )
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events 프레임 생성"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/stream")
+async def chat_stream_endpoint(req_body: ChatRequest, http_request: Request, current_user = Depends(get_current_user_optional)):
+    """사용자 질문에 대한 RAG 응답을 SSE로 스트리밍 (선택적 인증)
+    
+    이벤트 순서: sources → token (여러 번) → done / error
+    """
+    user_id = current_user['user_id'] if current_user else None
+    session_id = http_request.cookies.get("session_id")
+    req_body.user_id = user_id
+    
+    _clog.debug(
+        "스트리밍 채팅 API 요청",
+        extra={
+            "event": "chat_stream_request",
+            "user_id": user_id,
+            "session_id": session_id,
+            "flow_id": req_body.flow_id,
+        },
+    )
+    
+    async def event_generator():
+        try:
+            async for event, data in chat_service.process_chat_stream(req_body):
+                if await http_request.is_disconnected():
+                    _clog.debug("클라이언트 연결 종료로 스트리밍 중단", extra={"event": "chat_stream_disconnected"})
+                    break
+                
+                if event == "done":
+                    response = ChatResponse(
+                        response=data.get("response", ""),
+                        sources=data.get("sources", []),
+                        confidence=data.get("confidence", 0.0),
+                        processing_time=data.get("processing_time"),
+                        categories=data.get("categories"),
+                        flow_id=data.get("flow_id"),
+                        user_id=user_id,
+                        related_images=data.get("related_images", [])
+                    )
+                    # 채팅 기록 로깅 (스트림 완료 후)
+                    await get_db_manager().run_sync(log_chat_history, req_body, response, user_id, session_id)
+                    _ulog.info(
+                        "스트리밍 채팅 처리 완료",
+                        extra={
+                            "event": "chat_stream_processed",
+                            "user_id": user_id,
+                            "session_id": session_id,
+                            "flow_id": req_body.flow_id,
+                        },
+                    )
+                
+                yield _sse_event(event, data)
+        except Exception as e:
+            _clog.exception("스트리밍 채팅 API 오류", extra={"event": "chat_stream_error"})
+            yield _sse_event("error", {
+                "error": "채팅 처리 중 오류가 발생했습니다",
+                "detail": f"{e.__class__.__name__}: {str(e)}",
+                "timestamp": time.time()
+            })
+    
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
 @router.post("/simple")
 async def simple_chat(
     message: str = Body(..., embed=True),
@@ -266,7 +332,8 @@ async def get_chat_status():
             "openai_configured": openai_configured,
             "vectorized_files": vectorized_files_count,
             "total_files": total_files_count,
-            "vectorization_rate": round(vectorized_files_count / total_files_count * 100, 1) if total_files_count > 0 else 0
+            "vectorization_rate": round(vectorized_files_count / total_files_count * 100, 1) if total_files_count > 0 else 0,
+            "llm_gateway": get_llm_gateway().get_stats()
         }
         
     except Exception as e:
@@ -305,9 +372,13 @@ async def test_chat():
 async def get_chat_history(
     user_id: Optional[str] = None, 
     limit: int = 50,
+    before: Optional[str] = None,
     current_user = Depends(get_current_user)  # 히스토리는 로그인 필수
 ):
-    """사용자별 채팅 히스토리 조회 (로그인 필수)"""
+    """사용자별 채팅 히스토리 조회 (로그인 필수)
+    
+    before에 이전 응답의 next_cursor를 넘기면 그보다 오래된 메시지를 조회합니다.
+    """
     try:
         # 로그인 확인
         if not current_user:
@@ -316,12 +387,13 @@ async def get_chat_history(
         # 로그인한 사용자의 히스토리만 조회
         user_id = current_user['user_id']
         
-        history = await chat_service.get_chat_history(user_id, limit)
+        history, next_cursor = await chat_service.get_chat_history_page(user_id, limit, before)
         
         return {
             "history": history,
             "user_id": user_id,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor
         }
         
     except Exception as e:
@@ -378,7 +450,8 @@ async def get_admin_chat_history(
         
         db_path = os.path.join(settings.DATA_DIR, "db", "users.db")
         
-        with sqlite3.connect(db_path) as conn:
+        # 쿼리는 DB 전용 실행기에서 실행 (이벤트 루프 비차단)
+        def query_history(conn):
             cursor = conn.cursor()
             
             # 기본 쿼리
@@ -472,6 +545,8 @@ async def get_admin_chat_history(
                     "search": search
                 }
             }
+        
+        return await get_db_manager().run(db_path, query_history)
     
     except HTTPException:
         raise
@@ -489,7 +564,7 @@ async def get_chat_history_stats(
         
         db_path = os.path.join(settings.DATA_DIR, "db", "users.db")
         
-        with sqlite3.connect(db_path) as conn:
+        def query_stats(conn):
             cursor = conn.cursor()
             
             # 전체 채팅 수
@@ -549,6 +624,8 @@ async def get_chat_history_stats(
                 "category_stats": category_stats,
                 "daily_stats": daily_stats
             }
+        
+        return await get_db_manager().run(db_path, query_stats)
     
     except HTTPException:
         raise
@@ -566,7 +643,7 @@ async def delete_all_chat_history(
         
         db_path = os.path.join(settings.DATA_DIR, "db", "users.db")
         
-        with sqlite3.connect(db_path) as conn:
+        with get_db_manager().connection(db_path) as conn:
             cursor = conn.cursor()
             
             # 삭제 전 총 개수 확인
@@ -577,6 +654,9 @@ async def delete_all_chat_history(
             cursor.execute("DELETE FROM chat_history")
             conn.commit()
             
+            # 대시보드 롤업도 초기화
+            get_stats_rollup().reset()
+            
             return {
                 "message": "모든 채팅 기록이 삭제되었습니다",
                 "deleted_count": total_count
@@ -599,7 +679,7 @@ async def delete_chat_history(
         
         db_path = os.path.join(settings.DATA_DIR, "db", "users.db")
         
-        with sqlite3.connect(db_path) as conn:
+        with get_db_manager().connection(db_path) as conn:
             cursor = conn.cursor()
             
             # 기록 존재 확인
@@ -607,7 +687,8 @@ async def delete_chat_history(
             if not cursor.fetchone():
                 raise HTTPException(status_code=404, detail="채팅 기록을 찾을 수 없습니다")
             
-            # 삭제
+            # 대시보드 롤업에서 해당 기록의 기여분 차감 후 삭제
+            get_stats_rollup().remove_rows([history_id])
             cursor.execute("DELETE FROM chat_history WHERE id = ?", (history_id,))
             conn.commit()
             
@@ -12,6 +12,7 @@ from ..core.logger import get_console_logger
 from ..services.vector_service import VectorService
 from ..models.vector_models import VectorMetadataService
 from ..api.chat import get_admin_user
+from ..db.sqlite_pool import get_db_manager
 
 router = APIRouter(prefix="/admin/database", tags=["database-management"])
 
@@ -90,6 +91,7 @@ def force_close_chromadb_connections():
         if hasattr(vector_service, '_client') and vector_service._client:
             try:
                 # ChromaDB 클라이언트 해제 시도
+                vector_service.invalidate_collection_session("ChromaDB 연결 해제")
                 vector_service._client = None
                 _clog.info("ChromaDB 클라이언트 연결 해제 완료")
             except Exception as e:
@@ -106,6 +108,14 @@ def force_close_chromadb_connections():
         _clog.error(f"ChromaDB 연결 강제 해제 오류: {e}")
         return False
 
+def _checkpoint_wal(db_path: str):
+    """WAL 모드 DB를 파일 복사로 백업하기 전에 WAL 내용을 본 파일에 반영"""
+    try:
+        with get_db_manager().connection(db_path) as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    except Exception as e:
+        _clog.warning(f"WAL 체크포인트 실패 (백업은 계속 진행): {e}")
+
 def force_remove_directory(path: str, max_retries: int = 5) -> bool:
     """파일이 사용 중일 때 강제로 디렉토리 삭제"""
     for attempt in range(max_retries):
@@ -185,7 +195,7 @@ async def get_all_database_status(admin_user = Depends(get_admin_user)):
             
             elif db_name == "metadata" and exists:
                 try:
-                    with sqlite3.connect(path) as conn:
+                    with get_db_manager().connection(path) as conn:
                         cursor = conn.cursor()
                         cursor.execute("SELECT COUNT(*) FROM vector_metadata")
                         status_report[db_name]["record_count"] = cursor.fetchone()[0]
@@ -194,7 +204,7 @@ async def get_all_database_status(admin_user = Depends(get_admin_user)):
             
             elif db_name == "users" and exists:
                 try:
-                    with sqlite3.connect(path) as conn:
+                    with get_db_manager().connection(path) as conn:
                         cursor = conn.cursor()
                         cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
                         tables = [row[0] for row in cursor.fetchall()]
@@ -365,6 +375,7 @@ async def reset_chromadb(admin_user = Depends(get_admin_user)):
             
             # VectorService 클라이언트 재초기화
             try:
+                vector_service.invalidate_collection_session("ChromaDB 초기화")
                 vector_service._client = None
                 _clog.info("VectorService 클라이언트 재초기화 완료")
             except Exception as e:
@@ -477,7 +488,7 @@ async def get_metadata_db_status(admin_user = Depends(get_admin_user)):
                 "message": "메타데이터 데이터베이스가 존재하지 않습니다"
             }
         
-        with sqlite3.connect(metadata_path) as conn:
+        with get_db_manager().connection(metadata_path) as conn:
             cursor = conn.cursor()
             
             # 테이블 정보
@@ -522,6 +533,7 @@ async def backup_metadata_db(admin_user = Depends(get_admin_user)):
         backup_filename = f"metadata_backup_{timestamp}.db"
         backup_path = os.path.join(backup_dir, backup_filename)
         
+        _checkpoint_wal(metadata_path)
         shutil.copy2(metadata_path, backup_path)
         
         return {
@@ -588,7 +600,7 @@ async def get_file_metadata_db_status(admin_user = Depends(get_admin_user)):
                 "message": "파일 메타데이터 데이터베이스가 존재하지 않습니다"
             }
         
-        with sqlite3.connect(file_metadata_path) as conn:
+        with get_db_manager().connection(file_metadata_path) as conn:
             cursor = conn.cursor()
             
             # 테이블 정보
@@ -641,6 +653,7 @@ async def backup_file_metadata_db(admin_user = Depends(get_admin_user)):
         backup_filename = f"file_metadata_backup_{timestamp}.db"
         backup_path = os.path.join(backup_dir, backup_filename)
         
+        _checkpoint_wal(file_metadata_path)
         shutil.copy2(file_metadata_path, backup_path)
         
         return {
@@ -720,7 +733,7 @@ async def get_users_db_status(admin_user = Depends(get_admin_user)):
                 "message": "사용자 데이터베이스가 존재하지 않습니다"
             }
         
-        with sqlite3.connect(users_path) as conn:
+        with get_db_manager().connection(users_path) as conn:
             cursor = conn.cursor()
             
             # 테이블 정보
@@ -765,6 +778,7 @@ async def backup_users_db(admin_user = Depends(get_admin_user)):
         backup_filename = f"users_backup_{timestamp}.db"
         backup_path = os.path.join(backup_dir, backup_filename)
         
+        _checkpoint_wal(users_path)
         shutil.copy2(users_path, backup_path)
         
         return {
@@ -804,13 +818,20 @@ async def reset_users_db(admin_user = Depends(get_admin_user)):
         db_paths = get_database_paths()
         users_path = db_paths["users"]["path"]
         
-        if os.path.exists(users_path):
-            os.remove(users_path)
+        # 풀에 남은 연결을 닫은 뒤 WAL/SHM 사이드카까지 삭제
+        get_db_manager().close(users_path)
+        for path in (users_path, f"{users_path}-wal", f"{users_path}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
         
         # 데이터베이스 재초기화
         from ..db.init_db import initialize_database
         initialize_database()
         
+        # 삭제된 세션이 캐시에서 계속 인증되지 않도록 비움
+        from ..models.user_models import user_db
+        user_db.session_cache.clear()
+        
         return {
             "status": "success",
             "message": "사용자 데이터베이스가 백업 후 초기화되었습니다",
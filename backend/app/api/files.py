@@ -5,6 +5,9 @@ from ..core.logger import get_user_logger, get_console_logger
 from ..models.schemas import FileUploadResponse, FileInfo, DoclingOptions
 from ..services import get_file_service
 from ..services.settings_service import settings_service
+from ..services.vectorization_queue import (
+    get_vectorization_queue, JOB_KIND_FILE, JOB_KIND_DOCLING, PRIORITY_HIGH, PRIORITY_LOW
+)
 import os
 import json
 
@@ -166,12 +169,14 @@ async def process_complete_pipeline(file_id: str, method: str = "basic"):
         if not file_info:
             raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
         
-        # 백그라운드에서 전체 파이프라인 시작 (즉시 응답 반환)
-        import asyncio
-        asyncio.create_task(get_file_service_instance().start_vectorization(file_id))
+        # 벡터화 작업 큐에 등록 (즉시 응답 반환)
+        job = await get_vectorization_queue().enqueue(JOB_KIND_FILE, file_id)
         
         _ulog.info("파일 전체 처리 시작", extra={"event": "file_complete_processing_started", "file_id": file_id})
-        return {"message": f"'{file_info.filename}' 파일의 전체 처리가 시작되었습니다. (전처리 방법: {method})"}
+        return {
+            "message": f"'{file_info.filename}' 파일의 전체 처리가 시작되었습니다. (전처리 방법: {method})",
+            "job_id": job["job_id"]
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -222,15 +227,15 @@ async def force_reprocess_file(file_id: str):
             chunk_count=None
         )
         
-        # 백그라운드에서 벡터화 시작
-        import asyncio
-        asyncio.create_task(file_service.start_vectorization(file_id))
+        # 벡터화 작업 큐에 등록
+        job = await get_vectorization_queue().enqueue(JOB_KIND_FILE, file_id)
         
         _ulog.info("파일 강제 재처리 시작", extra={"event": "file_force_reprocess_started", "file_id": file_id})
         return {
             "message": f"'{file_info.filename}' 파일의 강제 재처리가 시작되었습니다. 기존 데이터가 삭제되고 처음부터 다시 처리됩니다.",
             "previous_status": str(file_info.status),
-            "new_status": "UPLOADED"
+            "new_status": "UPLOADED",
+            "job_id": job["job_id"]
         }
         
     except HTTPException:
@@ -307,24 +312,19 @@ async def vectorize_file(
         
         _clog.info(f"Docling 통합 벡터화 시작: {file_info.filename}")
         
-        # 통합 벡터화 파이프라인 실행
-        result = await file_service.vector_service.vectorize_with_docling_pipeline(
-            file_path=file_info.file_path,
-            file_id=file_id,
-            metadata=vector_metadata,
-            enable_docling=enable_docling,
-            docling_options=docling_options
+        # 통합 벡터화 파이프라인 실행 (작업 큐에서 실행하고 결과를 기다림, 파일 상태도 작업에서 반영)
+        result = await get_vectorization_queue().submit_and_wait(
+            JOB_KIND_DOCLING,
+            file_id,
+            {
+                "metadata": vector_metadata,
+                "enable_docling": enable_docling,
+                "docling_options": docling_options.dict() if docling_options else None
+            },
+            priority=PRIORITY_HIGH
         )
         
         if result["success"]:
-            # 파일 상태 업데이트
-            await file_service.update_file_vectorization_status(
-                file_id=file_id,
-                vectorized=True,
-                error_message=None,
-                chunk_count=result["chunks_count"]
-            )
-            
             _ulog.info(
                 "Docling 통합 벡터화 완료",
                 extra={
@@ -345,14 +345,6 @@ async def vectorize_file(
                 "docling_used": enable_docling
             }
         else:
-            # 벡터화 실패 상태 업데이트
-            await file_service.update_file_vectorization_status(
-                file_id=file_id,
-                vectorized=False,
-                error_message=result.get("error", "벡터화 실패"),
-                chunk_count=0
-            )
-            
             _clog.error(f"Docling 통합 벡터화 실패: {result.get('error')}")
             
             return {
@@ -417,24 +409,19 @@ async def revectorize_file(
             "file_size": file_info.file_size
         }
         
-        # 통합 벡터화 파이프라인 실행
-        result = await file_service.vector_service.vectorize_with_docling_pipeline(
-            file_path=file_info.file_path,
-            file_id=file_id,
-            metadata=vector_metadata,
-            enable_docling=enable_docling,
-            docling_options=docling_options
+        # 통합 벡터화 파이프라인 실행 (작업 큐에서 실행하고 결과를 기다림, 파일 상태도 작업에서 반영)
+        result = await get_vectorization_queue().submit_and_wait(
+            JOB_KIND_DOCLING,
+            file_id,
+            {
+                "metadata": vector_metadata,
+                "enable_docling": enable_docling,
+                "docling_options": docling_options.dict() if docling_options else None
+            },
+            priority=PRIORITY_HIGH
         )
         
         if result["success"]:
-            # 파일 상태 업데이트
-            await file_service.update_file_vectorization_status(
-                file_id=file_id,
-                vectorized=True,
-                error_message=None,
-                chunk_count=result["chunks_count"]
-            )
-            
             _ulog.info(
                 "파일 재벡터화 완료",
                 extra={
@@ -455,14 +442,6 @@ async def revectorize_file(
                 "docling_used": enable_docling
             }
         else:
-            # 벡터화 실패 상태 업데이트
-            await file_service.update_file_vectorization_status(
-                file_id=file_id,
-                vectorized=False,
-                error_message=result.get("error", "재벡터화 실패"),
-                chunk_count=0
-            )
-            
             _clog.error(f"파일 재벡터화 실패: {result.get('error')}")
             
             return {
@@ -902,7 +881,14 @@ async def retry_vectorization(file_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/search/")
-async def search_documents(query: str, top_k: int = 5, category_ids: str = None):
+async def search_documents(
+    query: str,
+    top_k: int = 5,
+    category_ids: str = None,
+    search_mode: Optional[str] = None,
+    vector_weight: Optional[float] = None,
+    lexical_weight: Optional[float] = None
+):
     """문서 검색"""
     try:
         # 카테고리 ID 파싱
@@ -916,7 +902,12 @@ async def search_documents(query: str, top_k: int = 5, category_ids: str = None)
             raise HTTPException(status_code=500, detail="벡터 검색 서비스를 초기화할 수 없습니다.")
         
         results = await file_service.vector_service.search_similar_chunks(
-            query, top_k, category_list
+            query,
+            top_k,
+            category_list,
+            search_mode=search_mode,
+            vector_weight=vector_weight,
+            lexical_weight=lexical_weight
         )
         
         return {
@@ -1047,10 +1038,12 @@ async def execute_vectorization(
             _clog.debug("벡터화 대상 없음")
             return {"message": "벡터화할 파일이 없습니다."}
         
-        # 백그라운드에서 벡터화 실행
-        import asyncio
-        for file_info in target_files:
-            asyncio.create_task(get_file_service_instance().start_vectorization(file_info.file_id))
+        # 벡터화 작업 큐에 등록 (설정된 워커 수만큼 동시에 처리)
+        job_queue = get_vectorization_queue()
+        jobs = [
+            await job_queue.enqueue(JOB_KIND_FILE, file_info.file_id, priority=PRIORITY_LOW)
+            for file_info in target_files
+        ]
         _ulog.info(
             "벡터화 배치 시작",
             extra={"event": "vectorization_batch_started", "count": len(target_files)},
@@ -1058,13 +1051,32 @@ async def execute_vectorization(
         
         return {
             "message": f"{len(target_files)}개 파일의 벡터화가 시작되었습니다.",
-            "target_files": [f.filename for f in target_files]
+            "target_files": [f.filename for f in target_files],
+            "job_ids": [job["job_id"] for job in jobs]
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/vectorization/queue")
+async def get_vectorization_queue_status():
+    """벡터화 작업 큐 상태 (대기열 길이, 단계별 소요 시간, 처리량, 실행 중 작업)"""
+    try:
+        return await get_vectorization_queue().get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/vectorization/jobs/{job_id}")
+async def get_vectorization_job(job_id: str):
+    """벡터화 작업 상태 조회 (체크포인트 진행 상황 포함)"""
+    job = await get_vectorization_queue().get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="벡터화 작업을 찾을 수 없습니다.")
+    return job
+
+
 @router.get("/chromadb/status/")
 async def get_chromadb_status():
     """ChromaDB 연결 및 상태 조회 (파일 API 통합 엔드포인트)"""
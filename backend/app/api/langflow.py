@@ -23,6 +23,8 @@ class SearchRequest(BaseModel):
     query: str
     search_flow_id: str
     category_ids: Optional[List[str]] = None
+    rerank: Optional[bool] = None  # 없으면 Flow 설정 → 성능 설정 순으로 결정
+    rerank_candidates: Optional[int] = None
 
 @router.post("/vectorize")
 async def vectorize_file(request: VectorizeRequest):
@@ -73,7 +75,9 @@ async def search_with_langflow(request: SearchRequest):
         result = await langflow_service.search_with_flow(
             request.query,
             request.search_flow_id,
-            request.category_ids
+            request.category_ids,
+            rerank=request.rerank,
+            rerank_candidates=request.rerank_candidates
         )
         return result
     except Exception as e:
@@ -28,6 +28,7 @@ from ..services.file_service import FileService
 from .users import get_admin_user
 from ..core.config import settings
 from ..core.logger import get_console_logger
+from ..db.sqlite_pool import get_db_manager
 
 logger = get_console_logger()
 router = APIRouter()
@@ -504,7 +505,8 @@ async def propose_chunks(
             proposed_chunks = chunking_service.propose_chunks(
                 full_text, 
                 rules, 
-                use_hierarchical=rules_request.use_hierarchical
+                use_hierarchical=rules_request.use_hierarchical,
+                file_id=file_id
             )
             logger.info(f"청킹 제안 완료 - {len(proposed_chunks)}개 청크 생성 (계층적: {rules_request.use_hierarchical})")
         except Exception as e:
@@ -907,7 +909,7 @@ async def reset_preprocessing_status(
         
         db_path = os.path.join(settings.DATA_DIR, "db", "users.db")
         
-        with sqlite3.connect(db_path) as conn:
+        with get_db_manager().connection(db_path) as conn:
             cursor = conn.cursor()
             
             # 진행중 상태를 미시작으로 변경
@@ -298,6 +298,8 @@ async def get_docling_status():
     """Docling 서비스 상태 확인"""
     try:
         status = settings_service.get_docling_status()
+        from ..services.docling_converter_pool import get_docling_converter_pool
+        status["converter_pool"] = get_docling_converter_pool().get_stats()
         _clog.info("Docling 상태 확인 완료")
         return status
     except Exception as e:
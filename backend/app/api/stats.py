@@ -1,11 +1,13 @@
 from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 import sqlite3
 import os
 from ..core.config import settings
 from ..services.category_service import CategoryService
-import pandas as pd
+from ..services.stats_rollup import StatsRollupService, get_stats_rollup
+from ..services.semantic_answer_cache import get_semantic_answer_cache
+from ..db.sqlite_pool import get_db_manager
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 DB_PATH = os.path.join(settings.DATA_DIR, "db", "users.db")
@@ -14,10 +16,8 @@ VECTOR_METADATA_DB_PATH = os.path.join(settings.DATA_DIR, "db", "chromadb", "met
 CHROMA_DB_PATH = os.path.join(settings.DATA_DIR, "db", "chromadb", "chroma.sqlite3")
 
 def get_db_connection():
-    """데이터베이스 연결을 반환합니다."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """users.db 풀 연결 컨텍스트를 반환합니다. (종료 시 풀로 반납)"""
+    return get_db_manager().connection(DB_PATH)
 
 def _get_sqlite_db_status() -> Dict[str, Any]:
     """users.db의 상태를 확인합니다."""
@@ -33,19 +33,18 @@ def _get_sqlite_db_status() -> Dict[str, Any]:
         return status
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        status["db_available"] = True
-        
-        # chat_history 테이블이 없어도 정상으로 처리
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='chat_history'")
-        if cursor.fetchone():
-            status["table_found"] = True
-            status["message"] = "SQLite DB가 정상적으로 연결되었습니다."
-        else:
-            status["message"] = "SQLite DB가 정상적으로 연결되었습니다. (chat_history 테이블 없음)"
-            status["error"] = None  # 오류가 아님
-        conn.close()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            status["db_available"] = True
+            
+            # chat_history 테이블이 없어도 정상으로 처리
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='chat_history'")
+            if cursor.fetchone():
+                status["table_found"] = True
+                status["message"] = "SQLite DB가 정상적으로 연결되었습니다."
+            else:
+                status["message"] = "SQLite DB가 정상적으로 연결되었습니다. (chat_history 테이블 없음)"
+                status["error"] = None  # 오류가 아님
     except sqlite3.Error as e:
         status["message"] = "SQLite DB 연결에 실패했습니다."
         status["error"] = str(e)
@@ -67,23 +66,22 @@ def _get_file_metadata_db_status() -> Dict[str, Any]:
         return status
 
     try:
-        conn = sqlite3.connect(FILE_METADATA_DB_PATH)
-        cursor = conn.cursor()
-        status["db_available"] = True
-        
-        # file_metadata 테이블 확인
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='file_metadata'")
-        if cursor.fetchone():
-            status["table_found"] = True
-            # 레코드 수 확인
-            cursor.execute("SELECT COUNT(*) FROM file_metadata WHERE status != 'deleted'")
-            count = cursor.fetchone()[0]
-            status["record_count"] = count
-            status["message"] = f"파일 메타데이터 DB 정상 연결 ({count}개 파일)"
-        else:
-            status["message"] = "파일 메타데이터 DB 연결됨 (file_metadata 테이블 없음)"
-            status["error"] = None
-        conn.close()
+        with get_db_manager().connection(FILE_METADATA_DB_PATH) as conn:
+            cursor = conn.cursor()
+            status["db_available"] = True
+            
+            # file_metadata 테이블 확인
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='file_metadata'")
+            if cursor.fetchone():
+                status["table_found"] = True
+                # 레코드 수 확인
+                cursor.execute("SELECT COUNT(*) FROM file_metadata WHERE status != 'deleted'")
+                count = cursor.fetchone()[0]
+                status["record_count"] = count
+                status["message"] = f"파일 메타데이터 DB 정상 연결 ({count}개 파일)"
+            else:
+                status["message"] = "파일 메타데이터 DB 연결됨 (file_metadata 테이블 없음)"
+                status["error"] = None
     except sqlite3.Error as e:
         status["message"] = "파일 메타데이터 DB 연결 실패"
         status["error"] = str(e)
@@ -127,11 +125,10 @@ def _get_vector_metadata_db_status() -> Dict[str, Any]:
         conn_chroma.close()
         
         # 벡터 메타데이터 파일 확인
-        conn_meta = sqlite3.connect(VECTOR_METADATA_DB_PATH)
-        cursor_meta = conn_meta.cursor()
+        with get_db_manager().connection(VECTOR_METADATA_DB_PATH) as conn_meta:
+            conn_meta.execute("SELECT 1")
         status["db_available"] = True
         status["message"] = f"벡터 DB 정상 연결 ({status['collection_count']}개 컬렉션)"
-        conn_meta.close()
         
     except sqlite3.Error as e:
         status["message"] = "벡터 메타데이터 DB 연결 실패"
@@ -140,33 +137,25 @@ def _get_vector_metadata_db_status() -> Dict[str, Any]:
 
 @router.get("/dashboard/")
 async def get_dashboard_stats() -> Dict[str, Any]:
-    """관리자 대시보드 통계 데이터"""
+    """관리자 대시보드 통계 데이터 (chat_history 대신 증분 롤업만 조회)"""
     try:
-        # 데이터베이스에서 모든 채팅 기록을 한 번에 로드
-        df = pd.DataFrame()  # 빈 DataFrame으로 초기화
-        
+        rollup = get_stats_rollup()
         try:
-            conn = get_db_connection()
-            # chat_history 테이블이 존재하는지 확인
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='chat_history'")
-            if cursor.fetchone():
-                df = pd.read_sql_query("SELECT * FROM chat_history", conn)
-                # timestamp를 datetime 객체로 변환
-                if not df.empty:
-                    df['timestamp'] = pd.to_datetime(df['timestamp'])
-            conn.close()
+            # 마지막 집계 이후 추가된 행만 반영
+            await get_db_manager().run_sync(rollup.compact)
         except Exception as db_error:
-            print(f"데이터베이스 연결 오류 (무시됨): {str(db_error)}")
-            # 데이터베이스 오류가 있어도 계속 진행
+            print(f"통계 롤업 갱신 오류 (무시됨): {str(db_error)}")
 
         # 파일 및 카테고리 통계
         file_stats = await _get_file_stats()
         category_service = CategoryService()
         categories = await category_service.list_categories()
-        sqlite_status = _get_sqlite_db_status()
-        file_metadata_status = _get_file_metadata_db_status()
-        vector_metadata_status = _get_vector_metadata_db_status()
+        db_manager = get_db_manager()
+        sqlite_status = await db_manager.run_sync(_get_sqlite_db_status)
+        file_metadata_status = await db_manager.run_sync(_get_file_metadata_db_status)
+        vector_metadata_status = await db_manager.run_sync(_get_vector_metadata_db_status)
+
+        usage_stats, category_totals = await db_manager.run_sync(_get_usage_stats, rollup)
 
         stats = {
             "system": {
@@ -177,10 +166,10 @@ async def get_dashboard_stats() -> Dict[str, Any]:
                 "file_metadata_status": file_metadata_status,
                 "vector_metadata_status": vector_metadata_status,
             },
-            "usage": _get_usage_stats(df),
-            "performance": _get_performance_stats(df, file_stats['total_vectors']),
-            "categories": _get_category_stats(df, categories),
-            "recent_activity": _get_recent_activity(df, file_stats['recent_uploads'])
+            "usage": usage_stats,
+            "performance": await db_manager.run_sync(_get_performance_stats, rollup, file_stats['total_vectors']),
+            "categories": _get_category_stats(category_totals, categories),
+            "recent_activity": await db_manager.run_sync(_get_recent_activity, rollup, file_stats['recent_uploads'])
         }
         
         return {
@@ -207,19 +196,16 @@ async def _get_file_stats() -> Dict[str, Any]:
         chroma_status = await vector_service.get_status()
         total_vectors = chroma_status.get('total_vectors', 0)
 
-        # 파일 메타데이터에서 파일 수 및 최근 업로드 가져오기
-        from ..services.file_service import FileService
-        file_service = FileService()
-        files = await file_service.list_files()
-        
-        total_files = len(files)
-        vectorized_files = sum(1 for f in files if f.vectorized)
+        # 파일 메타데이터 DB의 집계 쿼리로 파일 수 및 최근 업로드 가져오기
+        from ..models.vector_models import file_metadata_service
+        file_db_stats = file_metadata_service.get_stats()
+        total_files = file_db_stats['total_files']
+        vectorized_files = file_db_stats['vectorized_files']
         
         # 최근 업로드된 파일 5개
-        sorted_files = sorted(files, key=lambda x: x.upload_time, reverse=True)[:5]
         recent_uploads = [
             {"filename": f.filename, "upload_time": f.upload_time.isoformat()}
-            for f in sorted_files
+            for f in file_metadata_service.list_recent_uploads(5)
         ]
     except Exception as e:
         print(f"파일 통계 로드 오류: {str(e)}")
@@ -231,15 +217,8 @@ async def _get_file_stats() -> Dict[str, Any]:
         "recent_uploads": recent_uploads
     }
 
-def _get_usage_stats(df: pd.DataFrame) -> Dict[str, Any]:
-    """DataFrame을 기반으로 사용량 통계를 계산합니다."""
-    if df.empty:
-        return {
-            "daily_questions": {"today": 0, "yesterday": 0, "this_week": 0, "last_week": 0, "this_month": 0, "last_month": 0},
-            "category_searches": {}, "avg_relevance": 0,
-            "feedback_stats": {"likes": 0, "dislikes": 0, "like_ratio": 0}
-        }
-
+def _get_usage_stats(rollup: StatsRollupService) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """롤업을 기반으로 사용량 통계를 계산합니다. (사용량 통계, 카테고리별 누적값)을 반환"""
     now = datetime.now()
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
     yesterday_start = today_start - timedelta(days=1)
@@ -248,66 +227,70 @@ def _get_usage_stats(df: pd.DataFrame) -> Dict[str, Any]:
     this_month_start = today_start.replace(day=1)
     last_month_start = (this_month_start - timedelta(days=1)).replace(day=1)
 
+    def day(value: datetime) -> str:
+        return value.strftime("%Y-%m-%d")
+
     daily_questions = {
-        "today": len(df[df['timestamp'] >= today_start]),
-        "yesterday": len(df[(df['timestamp'] >= yesterday_start) & (df['timestamp'] < today_start)]),
-        "this_week": len(df[df['timestamp'] >= this_week_start]),
-        "last_week": len(df[(df['timestamp'] >= last_week_start) & (df['timestamp'] < this_week_start)]),
-        "this_month": len(df[df['timestamp'] >= this_month_start]),
-        "last_month": len(df[(df['timestamp'] >= last_month_start) & (df['timestamp'] < this_month_start)])
+        "today": rollup.count_questions(day(today_start)),
+        "yesterday": rollup.count_questions(day(yesterday_start), day(today_start)),
+        "this_week": rollup.count_questions(day(this_week_start)),
+        "last_week": rollup.count_questions(day(last_week_start), day(this_week_start)),
+        "this_month": rollup.count_questions(day(this_month_start)),
+        "last_month": rollup.count_questions(day(last_month_start), day(this_month_start))
     }
 
-    # 카테고리별 검색 (쉼표로 구분된 문자열 처리)
-    df_categories = df.dropna(subset=['category'])
-    all_categories = df_categories['category'].str.split(',').explode()
-    category_searches = all_categories.value_counts().to_dict()
+    category_totals = rollup.get_totals("category")
+    category_searches = {key: totals["questions"] for key, totals in category_totals.items()}
+    flow_searches = {key: totals["questions"] for key, totals in rollup.get_totals("flow").items()}
 
-    avg_relevance = round(df['relevance_score'].mean() * 100, 2) if not df['relevance_score'].isnull().all() else 0
+    overall = rollup.get_totals("all").get("", {})
+    relevance_count = overall.get("relevance_count") or 0
+    avg_relevance = round(overall["relevance_sum"] / relevance_count * 100, 2) if relevance_count else 0
     
-    likes = len(df[df['feedback'] == 'like'])
-    dislikes = len(df[df['feedback'] == 'dislike'])
+    likes = overall.get("likes") or 0
+    dislikes = overall.get("dislikes") or 0
     like_ratio = round((likes / (likes + dislikes)) * 100, 2) if (likes + dislikes) > 0 else 0
 
     return {
         "daily_questions": daily_questions,
         "category_searches": category_searches,
+        "flow_searches": flow_searches,
+        "active_users": len(rollup.get_totals("user")),
         "avg_relevance": avg_relevance,
         "feedback_stats": {"likes": likes, "dislikes": dislikes, "like_ratio": like_ratio}
-    }
+    }, category_totals
 
-def _get_performance_stats(df: pd.DataFrame, total_vectors: int) -> Dict[str, Any]:
+def _get_performance_stats(rollup: StatsRollupService, total_vectors: int) -> Dict[str, Any]:
     """성능 통계를 계산합니다."""
-    avg_response_time = round(df['response_time'].mean(), 2) if not df.empty and not df['response_time'].isnull().all() else 0
+    overall = rollup.get_totals("all").get("", {})
+    response_time_count = overall.get("response_time_count") or 0
+    avg_response_time = round(overall["response_time_sum"] / response_time_count, 2) if response_time_count else 0
     
     return {
         "avg_response_time": avg_response_time,
+        "response_time_histogram": rollup.get_response_time_histogram(),
         "system_usage": {"cpu_avg": 0, "memory_avg": 0}, # psutil 등으로 실제 구현 필요
-        "vector_performance": {"total_vectors": total_vectors}
+        "vector_performance": {"total_vectors": total_vectors},
+        "answer_cache": get_semantic_answer_cache().get_stats()
     }
 
-def _get_category_stats(df: pd.DataFrame, categories: List[Any]) -> Dict[str, Any]:
+def _get_category_stats(category_totals: Dict[str, Dict[str, Any]], categories: List[Any]) -> Dict[str, Any]:
     """카테고리별 통계를 계산합니다."""
     
-    # 검색 통계 계산
-    category_search_counts = {}
-    if not df.empty:
-        df_categories = df.dropna(subset=['category'])
-        all_categories = df_categories['category'].str.split(',').explode()
-        category_search_counts = all_categories.value_counts().to_dict()
+    # 검색 통계 (롤업 누적값)
+    category_search_counts = {key: totals["questions"] for key, totals in category_totals.items()}
 
     # 각 카테고리의 파일 수 계산
     category_stats = []
     categories_with_files = 0
     
     try:
-        # SQLite에서 파일 메타데이터 읽기
+        # SQLite 집계 쿼리로 카테고리별 파일 수 조회
         from ..models.vector_models import file_metadata_service
-        all_files = file_metadata_service.list_files(include_deleted=False)
+        file_counts = file_metadata_service.count_by_category()
         
-        # 카테고리별 파일 수 계산
         for category in categories:
-            # 해당 카테고리에 속한 파일 수 계산
-            file_count = sum(1 for f in all_files if f.category_id == category.category_id)
+            file_count = file_counts.get(category.category_id, 0)
             search_count = category_search_counts.get(category.name, 0)
             
             if file_count > 0:
@@ -343,19 +326,14 @@ def _get_category_stats(df: pd.DataFrame, categories: List[Any]) -> Dict[str, An
         "most_used_category": most_used
     }
 
-def _get_recent_activity(df: pd.DataFrame, recent_uploads: List[Dict]) -> Dict[str, Any]:
+def _get_recent_activity(rollup: StatsRollupService, recent_uploads: List[Dict]) -> Dict[str, Any]:
     """최근 활동을 가져옵니다."""
-    recent_searches = []
-    if not df.empty:
-        recent_df = df.sort_values(by='timestamp', ascending=False).head(5)
-        recent_searches = [
-            {"query": row['query'], "time": row['timestamp'].isoformat()}
-            for index, row in recent_df.iterrows()
-        ]
+    recent_searches = [
+        {"query": row["query"], "time": str(row["timestamp"]).replace(" ", "T")}
+        for row in rollup.get_recent_queries(5)
+    ]
         
     return {
         "recent_uploads": recent_uploads,
         "recent_searches": recent_searches,
     }
-
- 
\ No newline at end of file
@@ -537,6 +537,12 @@ async def get_pending_users(admin_user = Depends(get_admin_user)):
         )
 
 
+@router.get("/session-cache")
+async def get_session_cache_stats(admin_user = Depends(get_admin_user)):
+    """Session cache statistics (hit rate, entries) (admin endpoint)"""
+    return user_db.session_cache.get_stats()
+
+
 @router.get("/{user_id}", response_model=User)
 async def get_user_by_id(user_id: str, admin_user = Depends(get_admin_user)):
     """Get user by ID (admin endpoint)"""
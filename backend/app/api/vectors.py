@@ -4,6 +4,7 @@ import sqlite3
 import os
 from ..core.config import settings
 from ..core.logger import get_console_logger
+from ..db.sqlite_pool import get_db_manager
 from ..services.vector_service import VectorService
 from ..models.vector_models import VectorMetadataService
 from ..api.chat import get_admin_user
@@ -42,7 +43,7 @@ async def get_vector_metadata(
                 }
             }
         
-        with sqlite3.connect(db_path) as conn:
+        with get_db_manager().connection(db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -137,7 +138,7 @@ async def get_vector_metadata_stats(admin_user = Depends(get_admin_user)):
                 "recent_files": 0
             }
         
-        with sqlite3.connect(db_path) as conn:
+        with get_db_manager().connection(db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -296,7 +297,7 @@ async def get_chromadb_collection_data(
         # 통합 파일 메타데이터 DB에서 파일명과 카테고리명 매핑 조회
         metadata_db_path = os.path.join(settings.DATA_DIR, 'db', 'file_metadata.db')
         if os.path.exists(metadata_db_path):
-            with sqlite3.connect(metadata_db_path) as conn:
+            with get_db_manager().connection(metadata_db_path) as conn:
                 cursor = conn.cursor()
                 # 파일 매핑
                 cursor.execute("SELECT file_id, filename FROM file_metadata WHERE status != 'deleted'")
@@ -620,7 +621,7 @@ async def search_vectors(
         
         metadata_db_path = os.path.join(settings.DATA_DIR, 'db', 'chromadb', 'metadata.db')
         if os.path.exists(metadata_db_path):
-            with sqlite3.connect(metadata_db_path) as conn:
+            with get_db_manager().connection(metadata_db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT file_id, filename FROM vector_metadata")
                 for row in cursor.fetchall():
@@ -705,7 +706,7 @@ async def sync_metadata_with_chromadb(admin_user = Depends(get_admin_user)):
         if not os.path.exists(metadata_db_path):
             raise HTTPException(status_code=404, detail="메타데이터 데이터베이스를 찾을 수 없습니다")
         
-        with sqlite3.connect(metadata_db_path) as conn:
+        with get_db_manager().connection(metadata_db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -824,7 +825,7 @@ async def get_sync_status(admin_user = Depends(get_admin_user)):
             }
         
         # 빠른 상태 체크
-        with sqlite3.connect(metadata_db_path) as conn:
+        with get_db_manager().connection(metadata_db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT COUNT(*), SUM(chunk_count) FROM vector_metadata")
             metadata_files, metadata_chunks = cursor.fetchone()
@@ -871,7 +872,7 @@ async def get_orphaned_metadata(admin_user = Depends(get_admin_user)):
             raise HTTPException(status_code=404, detail="메타데이터 데이터베이스를 찾을 수 없습니다")
         
         orphaned_files = []
-        with sqlite3.connect(metadata_db_path) as conn:
+        with get_db_manager().connection(metadata_db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -919,7 +920,7 @@ async def cleanup_orphaned_metadata(admin_user = Depends(get_admin_user)):
             raise HTTPException(status_code=404, detail="메타데이터 데이터베이스를 찾을 수 없습니다")
         
         deleted_files = []
-        with sqlite3.connect(metadata_db_path) as conn:
+        with get_db_manager().connection(metadata_db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -981,6 +982,8 @@ async def delete_all_collections(admin_user = Depends(get_admin_user)):
         except Exception as e:
             _clog.error(f"ChromaDB 컬렉션 목록 조회 오류: {e}")
             raise HTTPException(status_code=500, detail=f"컬렉션 목록 조회 실패: {str(e)}")
+        finally:
+            vector_service.invalidate_collection_session("전체 컬렉션 삭제")
         
         return {
             "status": "success",
@@ -1027,6 +1030,9 @@ async def delete_selected_collections(
                 failed_collections.append({"name": collection_name, "error": str(e)})
                 _clog.warning(f"컬렉션 {collection_name} 삭제 실패: {e}")
         
+        if deleted_collections:
+            vector_service.invalidate_collection_session("선택 컬렉션 삭제")
+        
         result = {
             "status": "success" if len(deleted_collections) > 0 else "failed",
             "message": f"{len(deleted_collections)}개의 컬렉션이 삭제되었습니다",
@@ -1221,7 +1227,7 @@ async def get_database_stats(admin_user = Depends(get_admin_user)):
         metadata_db_path = os.path.join(settings.DATA_DIR, 'db', 'chromadb', 'metadata.db')
         if os.path.exists(metadata_db_path):
             try:
-                with sqlite3.connect(metadata_db_path) as conn:
+                with get_db_manager().connection(metadata_db_path) as conn:
                     cursor = conn.cursor()
                     cursor.execute("SELECT COUNT(*) FROM vector_metadata")
                     stats["total_documents"] = cursor.fetchone()[0]
@@ -1304,7 +1310,7 @@ async def optimize_database(admin_user = Depends(get_admin_user)):
         # 메타데이터 SQLite DB 최적화
         metadata_db_path = os.path.join(settings.DATA_DIR, 'db', 'chromadb', 'metadata.db')
         if os.path.exists(metadata_db_path):
-            with sqlite3.connect(metadata_db_path) as conn:
+            with get_db_manager().connection(metadata_db_path) as conn:
                 conn.execute("VACUUM")
                 conn.execute("REINDEX")
         
@@ -1338,6 +1344,7 @@ async def delete_all_vectors(admin_user = Depends(get_admin_user)):
                         _clog.warning(f"컬렉션 {collection.name} 삭제 실패: {e}")
             except Exception as e:
                 _clog.error(f"ChromaDB 컬렉션 삭제 오류: {e}")
+            vector_service.invalidate_collection_session("전체 벡터 삭제")
         
         # 메타데이터 DB 초기화
         success = metadata_service.reset_database()
@@ -1529,6 +1536,131 @@ async def delete_selected_documents(
         _clog.error(f"선택된 문서 삭제 오류: {e}")
         raise HTTPException(status_code=500, detail=f"문서 삭제 중 오류가 발생했습니다: {str(e)}")
 
+@router.get("/embedding-models")
+async def get_embedding_model_stats(admin_user = Depends(get_admin_user)):
+    """임베딩 모델 레지스트리 상태 (모델별 로딩 시간 / 메모리)"""
+    try:
+        from ..services.embedding_registry import embedding_registry
+        return embedding_registry.get_stats()
+    except Exception as e:
+        _clog.error(f"임베딩 모델 상태 조회 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"임베딩 모델 상태 조회 중 오류가 발생했습니다: {str(e)}")
+
+@router.get("/embedding-cache")
+async def get_embedding_cache_stats(admin_user = Depends(get_admin_user)):
+    """영구 임베딩 캐시 통계 (적중/미스, 크기)"""
+    try:
+        from ..services.embedding_cache import get_embedding_cache
+        return get_embedding_cache().get_stats()
+    except Exception as e:
+        _clog.error(f"임베딩 캐시 통계 조회 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"임베딩 캐시 통계 조회 중 오류가 발생했습니다: {str(e)}")
+
+@router.post("/embedding-cache/prefill")
+async def prefill_embedding_cache(admin_user = Depends(get_admin_user)):
+    """기존 ChromaDB 임베딩으로 임베딩 캐시 사전 채우기"""
+    try:
+        prefilled = await vector_service.prefill_embedding_cache()
+        return {
+            "status": "success",
+            "message": f"{prefilled}개 임베딩을 캐시에 저장했습니다",
+            "prefilled": prefilled
+        }
+    except Exception as e:
+        _clog.error(f"임베딩 캐시 사전 채우기 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"임베딩 캐시 사전 채우기 중 오류가 발생했습니다: {str(e)}")
+
+@router.delete("/embedding-cache")
+async def clear_embedding_cache(admin_user = Depends(get_admin_user)):
+    """영구 임베딩 캐시 삭제"""
+    try:
+        from ..services.embedding_cache import get_embedding_cache
+        get_embedding_cache().clear()
+        return {"status": "success", "message": "임베딩 캐시가 삭제되었습니다"}
+    except Exception as e:
+        _clog.error(f"임베딩 캐시 삭제 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"임베딩 캐시 삭제 중 오류가 발생했습니다: {str(e)}")
+
+@router.get("/retrieval-cache")
+async def get_retrieval_cache_stats(admin_user = Depends(get_admin_user)):
+    """검색 캐시 통계 (쿼리 벡터 / 검색 결과 적중률, 컬렉션 버전)"""
+    try:
+        from ..services.retrieval_cache import get_retrieval_cache
+        return get_retrieval_cache().get_stats()
+    except Exception as e:
+        _clog.error(f"검색 캐시 통계 조회 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"검색 캐시 통계 조회 중 오류가 발생했습니다: {str(e)}")
+
+@router.delete("/retrieval-cache")
+async def clear_retrieval_cache(admin_user = Depends(get_admin_user)):
+    """검색 캐시 삭제"""
+    try:
+        from ..services.retrieval_cache import get_retrieval_cache
+        get_retrieval_cache().clear()
+        return {"status": "success", "message": "검색 캐시가 삭제되었습니다"}
+    except Exception as e:
+        _clog.error(f"검색 캐시 삭제 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"검색 캐시 삭제 중 오류가 발생했습니다: {str(e)}")
+
+@router.get("/lexical-index")
+async def get_lexical_index_stats(admin_user = Depends(get_admin_user)):
+    """어휘(BM25) 인덱스 상태"""
+    try:
+        from ..services.lexical_index import get_lexical_index
+        return get_lexical_index().get_stats()
+    except Exception as e:
+        _clog.error(f"어휘 인덱스 상태 조회 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"어휘 인덱스 상태 조회 중 오류가 발생했습니다: {str(e)}")
+
+@router.post("/lexical-index/rebuild")
+async def rebuild_lexical_index(admin_user = Depends(get_admin_user)):
+    """기존 벡터 저장소의 청크로 어휘(BM25) 인덱스 재구축"""
+    try:
+        indexed = await vector_service.rebuild_lexical_index()
+        return {
+            "status": "success",
+            "message": f"{indexed}개 청크를 어휘 인덱스에 색인했습니다",
+            "indexed": indexed
+        }
+    except Exception as e:
+        _clog.error(f"어휘 인덱스 재구축 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"어휘 인덱스 재구축 중 오류가 발생했습니다: {str(e)}")
+
+@router.get("/near-duplicates")
+async def get_near_duplicate_index_stats(admin_user = Depends(get_admin_user)):
+    """근접 중복(MinHash LSH) 인덱스 상태"""
+    try:
+        from ..services.near_duplicate_index import get_near_duplicate_index
+        return get_near_duplicate_index().get_stats()
+    except Exception as e:
+        _clog.error(f"근접 중복 인덱스 상태 조회 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"근접 중복 인덱스 상태 조회 중 오류가 발생했습니다: {str(e)}")
+
+@router.get("/near-duplicates/{file_id}")
+async def get_file_near_duplicates(file_id: str, admin_user = Depends(get_admin_user)):
+    """파일 청크 중 다른 문서의 대표 청크와 연결된 근접 중복 목록"""
+    try:
+        from ..services.near_duplicate_index import get_near_duplicate_index
+        links = get_near_duplicate_index().get_file_links(file_id)
+        return {"file_id": file_id, "count": len(links), "duplicates": links}
+    except Exception as e:
+        _clog.error(f"근접 중복 목록 조회 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"근접 중복 목록 조회 중 오류가 발생했습니다: {str(e)}")
+
+@router.post("/near-duplicates/rebuild")
+async def rebuild_near_duplicate_index(admin_user = Depends(get_admin_user)):
+    """기존 벡터 저장소의 청크로 근접 중복 인덱스 재구축"""
+    try:
+        indexed = await vector_service.rebuild_near_duplicate_index()
+        return {
+            "status": "success",
+            "message": f"{indexed}개 청크의 MinHash 서명을 색인했습니다",
+            "indexed": indexed
+        }
+    except Exception as e:
+        _clog.error(f"근접 중복 인덱스 재구축 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"근접 중복 인덱스 재구축 중 오류가 발생했습니다: {str(e)}")
+
 @router.get("/status")
 async def get_vector_status():
     """벡터 서비스 상태 조회 (통합 엔드포인트)"""
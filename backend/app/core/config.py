@@ -40,7 +40,8 @@ class Settings(BaseSettings):
     SUPABASE_KEY: Optional[str] = None
     
     # 벡터 DB 설정
-    VECTOR_DB_TYPE: str = "faiss"
+    # "chromadb": ChromaDB 컬렉션, "faiss"/"local": 프로세스 내장 ANN 저장소 (VECTOR_DB_PATH)
+    VECTOR_DB_TYPE: str = "chromadb"
     VECTOR_DB_PATH: str = "./vector_db"
     
     # 벡터화 설정
@@ -0,0 +1,217 @@
+"""
+SQLite 연결 풀
+
+users.db / file_metadata.db / metadata.db 등 DB 파일별로 연결을 재사용합니다.
+- 새 연결마다 WAL, synchronous=NORMAL, busy_timeout 설정
+- 연결을 재사용하므로 sqlite3의 prepared statement 캐시(cached_statements)가 계속 유지됨
+- `with db_manager.connection(path) as conn:` 은 `with sqlite3.connect(path) as conn:` 과 동일하게
+  정상 종료 시 commit, 예외 시 rollback 하고 연결을 풀로 돌려줍니다
+- run()/execute()는 전용 스레드 풀에서 쿼리를 실행해 이벤트 루프를 막지 않습니다
+"""
+
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+from ..core.logger import get_console_logger
+
+_clog = get_console_logger()
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE_SIZE = 256
+# 풀이 모두 사용 중일 때 대기할 시간. 넘으면 임시(overflow) 연결을 만들어 교착을 피함
+ACQUIRE_TIMEOUT_SECONDS = 2.0
+
+
+class SQLitePool:
+    """단일 DB 파일에 대한 연결 풀"""
+
+    def __init__(self, db_path: str, pool_size: int = DEFAULT_POOL_SIZE, busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.busy_timeout_ms = busy_timeout_ms
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+        self.stats = {"acquired": 0, "created": 0, "overflow": 0}
+
+    def _create_connection(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        self.stats["created"] += 1
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        self.stats["acquired"] += 1
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.pool_size:
+                self._created += 1
+                try:
+                    return self._create_connection()
+                except Exception:
+                    self._created -= 1
+                    raise
+
+        try:
+            return self._idle.get(timeout=ACQUIRE_TIMEOUT_SECONDS)
+        except queue.Empty:
+            # 같은 스레드에서 중첩 사용 등으로 풀이 고갈된 경우 임시 연결 사용 (반납 시 닫힘)
+            self.stats["overflow"] += 1
+            conn = self._create_connection()
+            conn._pool_overflow = True  # type: ignore[attr-defined]
+            return conn
+
+    def release(self, conn: sqlite3.Connection):
+        # 호출자가 바꾼 연결 상태 초기화
+        conn.row_factory = None
+        if self._closed or getattr(conn, "_pool_overflow", False):
+            conn.close()
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close(self):
+        """유휴 연결을 모두 닫습니다. (사용 중인 연결은 반납 시 닫힘)"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "db_path": self.db_path,
+            "pool_size": self.pool_size,
+            "open_connections": self._created,
+            "idle_connections": self._idle.qsize(),
+        }
+
+
+class SQLiteConnectionManager:
+    """DB 파일별 연결 풀과 DB 전용 실행기를 관리합니다."""
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, executor_workers: int = 8):
+        self.pool_size = pool_size
+        self._pools: Dict[str, SQLitePool] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix="sqlite-db")
+
+    def get_pool(self, db_path: str) -> SQLitePool:
+        key = os.path.abspath(db_path)
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    pool = SQLitePool(key, pool_size=self.pool_size)
+                    self._pools[key] = pool
+        return pool
+
+    @contextmanager
+    def connection(self, db_path: str) -> Iterator[sqlite3.Connection]:
+        """풀에서 연결을 빌려 사용합니다. 정상 종료 시 commit, 예외 시 rollback"""
+        pool = self.get_pool(db_path)
+        conn = pool.acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            pool.release(conn)
+
+    def close(self, db_path: str):
+        """DB 파일 삭제/교체 전에 해당 파일의 풀을 닫습니다."""
+        key = os.path.abspath(db_path)
+        with self._lock:
+            pool = self._pools.pop(key, None)
+        if pool is not None:
+            pool.close()
+
+    def close_all(self):
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
+
+    # ------------------------------------------------------------------
+    # 비동기 래퍼
+    # ------------------------------------------------------------------
+
+    async def run_sync(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """동기 DB 함수를 DB 전용 실행기에서 실행합니다."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: fn(*args))
+
+    async def run(self, db_path: str, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """풀 연결로 fn(conn)을 DB 전용 실행기에서 실행합니다."""
+        def task():
+            with self.connection(db_path) as conn:
+                return fn(conn)
+        return await self.run_sync(task)
+
+    async def execute(self, db_path: str, sql: str, params: Sequence[Any] = (), fetch: Optional[str] = "all", row_factory: Any = None) -> Any:
+        """단일 쿼리 실행. fetch: "all" | "one" | None(변경 쿼리, 영향받은 행 수 반환)"""
+        def task(conn: sqlite3.Connection):
+            if row_factory is not None:
+                conn.row_factory = row_factory
+            cursor = conn.execute(sql, params)
+            if fetch == "all":
+                return cursor.fetchall()
+            if fetch == "one":
+                return cursor.fetchone()
+            return cursor.rowcount
+        return await self.run(db_path, task)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pools = list(self._pools.values())
+        return {"pools": [pool.get_stats() for pool in pools]}
+
+
+# 싱글톤 인스턴스
+_db_manager = None
+_db_manager_lock = threading.Lock()
+
+
+def get_db_manager() -> SQLiteConnectionManager:
+    """SQLiteConnectionManager 싱글톤 인스턴스 반환"""
+    global _db_manager
+
+    if _db_manager is None:
+        with _db_manager_lock:
+            if _db_manager is None:
+                _db_manager = SQLiteConnectionManager()
+
+    return _db_manager
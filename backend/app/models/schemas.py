@@ -24,6 +24,9 @@ class ChatRequest(BaseModel):
     categories: Optional[List[str]] = Field(None, description="카테고리 이름 목록 (품질, 인사, 제조 등)")
     flow_id: Optional[str] = Field(None, description="사용할 Langflow Flow ID")
     top_k: int = 10  # 검색 결과 수 (기본값: 10개)
+    search_mode: Optional[str] = Field(None, description="검색 모드 (vector, lexical, hybrid)")
+    vector_weight: Optional[float] = Field(None, description="hybrid 모드의 벡터 순위 가중치")
+    lexical_weight: Optional[float] = Field(None, description="hybrid 모드의 BM25 순위 가중치")
     images: Optional[List[str]] = Field(None, description="첨부된 이미지 Base64 데이터 목록")
     output_format: Optional[str] = Field(None, description="출력 형식 (text, markdown, html, json, code)")
 
@@ -36,6 +39,8 @@ class ChatResponse(BaseModel):
     flow_id: Optional[str] = Field(None, description="사용된 Flow ID")
     user_id: Optional[str] = Field(None, description="사용자 ID")
     related_images: Optional[List[str]] = Field(default=[], description="관련 이미지 경로 목록")
+    context_packing: Optional[Dict[str, Any]] = Field(None, description="LLM 컨텍스트 패킹 결과 (원본/패킹 후 토큰 수)")
+    timings: Optional[Dict[str, float]] = Field(None, description="단계별 소요 시간 (초, 디버그 모드에서만)")
 
 # 카테고리 관련 스키마
 class Category(BaseModel):
@@ -464,6 +469,7 @@ class ModelProfile(BaseModel):
     temperature: float = Field(0.7, description="창의성 수준")
     max_tokens: int = Field(2000, description="최대 토큰 수")
     top_p: float = Field(1.0, description="토큰 확률 임계값")
+    context_token_budget: Optional[int] = Field(None, description="채팅 컨텍스트 토큰 예산 (없으면 성능 설정값)")
     ai_chunking_system_message: Optional[str] = Field(None, description="AI 청킹용 시스템 메시지")
     is_active: bool = Field(False, description="현재 활성 모델 여부")
     created_at: datetime = Field(default_factory=datetime.now, description="생성일시")
@@ -479,6 +485,7 @@ class ModelProfileCreateRequest(BaseModel):
     temperature: float = Field(0.7, description="창의성 수준")
     max_tokens: int = Field(2000, description="최대 토큰 수")
     top_p: float = Field(1.0, description="토큰 확률 임계값")
+    context_token_budget: Optional[int] = Field(None, ge=256, le=200000, description="채팅 컨텍스트 토큰 예산 (없으면 성능 설정값)")
     ai_chunking_system_message: Optional[str] = Field(None, description="AI 청킹용 시스템 메시지")
 
 class ModelProfileUpdateRequest(BaseModel):
@@ -489,6 +496,7 @@ class ModelProfileUpdateRequest(BaseModel):
     temperature: Optional[float] = Field(None, description="창의성 수준")
     max_tokens: Optional[int] = Field(None, description="최대 토큰 수")
     top_p: Optional[float] = Field(None, description="토큰 확률 임계값")
+    context_token_budget: Optional[int] = Field(None, ge=256, le=200000, description="채팅 컨텍스트 토큰 예산")
     ai_chunking_system_message: Optional[str] = Field(None, description="AI 청킹용 시스템 메시지")
 
 class ModelProfileListResponse(BaseModel):
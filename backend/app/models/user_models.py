@@ -5,8 +5,12 @@ import os
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import json
+import threading
+import time
+from collections import OrderedDict
 from pydantic import BaseModel, Field
 from app.core.config import settings
+from app.db.sqlite_pool import get_db_manager
 
 # Pydantic User 모델 추가
 class User(BaseModel):
@@ -26,11 +30,140 @@ class User(BaseModel):
         from_attributes = True
 
 
+# Session cache limits
+SESSION_CACHE_MAX_ENTRIES = 10000
+# Upper bound on how long a session is trusted without re-checking the DB
+SESSION_CACHE_MAX_TTL = 300
+# How long an unknown/expired session ID is remembered as missing
+SESSION_CACHE_NEGATIVE_TTL = 30
+
+
+class SessionCache:
+    """In-process cache for get_session() results.
+
+    Entries expire at the session's expires_at (capped by SESSION_CACHE_MAX_TTL).
+    Unknown session IDs are cached as None for SESSION_CACHE_NEGATIVE_TTL seconds.
+    Every invalidation bumps a generation counter; a put() whose load started
+    before an invalidation is dropped so a revoked session is never re-cached.
+    """
+
+    def __init__(self, max_entries: int = SESSION_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # session_id -> (deadline, session or None)
+        self._by_user: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "invalidations": 0, "stale_puts": 0}
+
+    @staticmethod
+    def _copy(session: Dict[str, Any]) -> Dict[str, Any]:
+        copied = dict(session)
+        copied['interest_areas'] = list(session.get('interest_areas') or [])
+        return copied
+
+    def get(self, session_id: str):
+        """Return (found, session). found is False on a miss or an expired entry."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                self.stats["misses"] += 1
+                return False, None
+            deadline, session = entry
+            if deadline <= time.monotonic():
+                self._remove_locked(session_id)
+                self.stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(session_id)
+            if session is None:
+                self.stats["negative_hits"] += 1
+                return True, None
+            self.stats["hits"] += 1
+            return True, self._copy(session)
+
+    @property
+    def generation(self) -> int:
+        """Read before loading a session from the DB and pass it to put()"""
+        with self._lock:
+            return self._generation
+
+    def put(self, session_id: str, session: Optional[Dict[str, Any]], generation: Optional[int] = None):
+        now = time.monotonic()
+        if session is None:
+            deadline = now + SESSION_CACHE_NEGATIVE_TTL
+        else:
+            ttl = SESSION_CACHE_MAX_TTL
+            try:
+                remaining = (datetime.fromisoformat(session['expires_at']) - datetime.now()).total_seconds()
+                ttl = min(ttl, remaining)
+            except (KeyError, TypeError, ValueError):
+                pass
+            if ttl <= 0:
+                return
+            deadline = now + ttl
+            session = self._copy(session)
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                # Invalidated while the caller was loading; the loaded value may be stale
+                self.stats["stale_puts"] += 1
+                return
+            self._remove_locked(session_id)
+            self._entries[session_id] = (deadline, session)
+            if session is not None:
+                self._by_user.setdefault(session['user_id'], set()).add(session_id)
+            while len(self._entries) > self.max_entries:
+                self._remove_locked(next(iter(self._entries)))
+
+    def _remove_locked(self, session_id: str) -> bool:
+        entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return False
+        session = entry[1]
+        if session is not None:
+            user_sessions = self._by_user.get(session['user_id'])
+            if user_sessions is not None:
+                user_sessions.discard(session_id)
+                if not user_sessions:
+                    del self._by_user[session['user_id']]
+        return True
+
+    def invalidate(self, session_id: str):
+        with self._lock:
+            self._generation += 1
+            if self._remove_locked(session_id):
+                self.stats["invalidations"] += 1
+
+    def invalidate_user(self, user_id: str):
+        """Drop every cached session of a user (profile, role or status changed)"""
+        with self._lock:
+            self._generation += 1
+            for session_id in list(self._by_user.get(user_id, ())):
+                if self._remove_locked(session_id):
+                    self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_user.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["negative_hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "users": len(self._by_user),
+                "hit_rate": (self.stats["hits"] + self.stats["negative_hits"]) / lookups if lookups else 0.0,
+            }
+
+
 class UserDatabase:
     def __init__(self, db_path: str = None):
         if db_path is None:
             db_path = os.path.join(settings.DATA_DIR, "db", "users.db")
         self.db_path = db_path
+        self.session_cache = SessionCache()
         # Ensure the directory exists
         data_dir = os.path.dirname(self.db_path)
         if not os.path.exists(data_dir):
@@ -40,7 +173,7 @@ class UserDatabase:
     
     def init_database(self):
         """Initialize the users database with required tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             cursor = conn.cursor()
             
             # Users table
@@ -103,7 +236,7 @@ class UserDatabase:
     
     def _migrate_database(self):
         """Migrate existing database to add new columns"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             cursor = conn.cursor()
             
             # Check which columns exist
@@ -143,7 +276,7 @@ class UserDatabase:
     
     def _populate_default_data(self):
         """Populate default personas and interest areas"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             cursor = conn.cursor()
             
             # Check if default data already exists
@@ -218,7 +351,7 @@ class UserDatabase:
     
     def _create_default_admin(self):
         """Create default admin user if not exists"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             cursor = conn.cursor()
             
             # Check if admin user already exists
@@ -248,7 +381,7 @@ class UserDatabase:
         password_hash = self._hash_password(password)
         interest_areas_json = json.dumps(interest_areas or [])
         
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO users (user_id, username, email, password_hash, full_name, persona, interest_areas, role, status)
@@ -260,7 +393,7 @@ class UserDatabase:
     
     def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user by ID"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM users WHERE user_id = ? AND is_active = TRUE', (user_id,))
@@ -274,7 +407,7 @@ class UserDatabase:
     
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM users WHERE username = ? AND is_active = TRUE', (username,))
@@ -288,7 +421,7 @@ class UserDatabase:
     
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM users WHERE email = ? AND is_active = TRUE', (email,))
@@ -302,7 +435,7 @@ class UserDatabase:
     
     def get_all_users(self) -> List[Dict[str, Any]]:
         """Get all users"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM users ORDER BY created_at DESC')
@@ -337,20 +470,22 @@ class UserDatabase:
         set_clause = ', '.join([f"{key} = ?" for key in kwargs.keys()])
         values = list(kwargs.values()) + [user_id]
         
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute(f'UPDATE users SET {set_clause} WHERE user_id = ?', values)
             conn.commit()
-            return cursor.rowcount > 0
+        self.session_cache.invalidate_user(user_id)
+        return cursor.rowcount > 0
     
     def delete_user(self, user_id: str) -> bool:
         """Soft delete user (set is_active to False)"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('UPDATE users SET is_active = FALSE, updated_at = ? WHERE user_id = ?', 
                          (datetime.now().isoformat(), user_id))
             conn.commit()
-            return cursor.rowcount > 0
+        self.session_cache.invalidate_user(user_id)
+        return cursor.rowcount > 0
     
     def verify_password(self, username: str, password: str) -> Optional[Dict[str, Any]]:
         """Verify user password and return user info if valid"""
@@ -368,19 +503,30 @@ class UserDatabase:
         session_id = str(uuid.uuid4())
         expires_at = datetime.now().replace(hour=23, minute=59, second=59).isoformat()  # Expires at end of day
         
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO user_sessions (session_id, user_id, expires_at)
                 VALUES (?, ?, ?)
             ''', (session_id, user_id, expires_at))
             conn.commit()
-        
+
+        # Drop a negative entry in case this ID was probed before
+        self.session_cache.invalidate(session_id)
         return session_id
     
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Get session info"""
-        with sqlite3.connect(self.db_path) as conn:
+        """Get session info (served from the session cache when possible)"""
+        found, session = self.session_cache.get(session_id)
+        if found:
+            return session
+        generation = self.session_cache.generation
+        session = self._load_session(session_id)
+        self.session_cache.put(session_id, session, generation)
+        return session
+
+    def _load_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with get_db_manager().connection(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute('''
@@ -399,15 +545,16 @@ class UserDatabase:
     
     def invalidate_session(self, session_id: str) -> bool:
         """Invalidate a session"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('UPDATE user_sessions SET is_active = FALSE WHERE session_id = ?', (session_id,))
             conn.commit()
-            return cursor.rowcount > 0
+        self.session_cache.invalidate(session_id)
+        return cursor.rowcount > 0
     
     def get_personas(self) -> List[Dict[str, Any]]:
         """Get all available personas"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM personas WHERE is_active = TRUE ORDER BY name')
@@ -415,7 +562,7 @@ class UserDatabase:
     
     def get_interest_areas(self) -> List[Dict[str, Any]]:
         """Get all available interest areas"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM interest_areas WHERE is_active = TRUE ORDER BY name')
@@ -430,7 +577,7 @@ class UserDatabase:
         """Create a new persona"""
         persona_id = str(uuid.uuid4())
         
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO personas (persona_id, name, description, system_message)
@@ -445,7 +592,7 @@ class UserDatabase:
         area_id = str(uuid.uuid4())
         category_ids_json = json.dumps(category_ids or [])
         
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO interest_areas (area_id, name, description, category_ids)
@@ -457,7 +604,7 @@ class UserDatabase:
     
     def update_persona(self, persona_id: str, persona_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Update persona"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -479,7 +626,7 @@ class UserDatabase:
 
     def delete_persona(self, persona_id: str) -> bool:
         """Delete persona (soft delete)"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('UPDATE personas SET is_active = FALSE WHERE persona_id = ?', (persona_id,))
             conn.commit()
@@ -487,7 +634,7 @@ class UserDatabase:
     
     def delete_interest_area(self, area_id: str) -> bool:
         """Delete interest area (soft delete)"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('UPDATE interest_areas SET is_active = FALSE WHERE area_id = ?', (area_id,))
             conn.commit()
@@ -503,7 +650,7 @@ class UserDatabase:
     
     def get_pending_users(self) -> List[Dict[str, Any]]:
         """Get all pending approval users"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM users WHERE status = "pending" ORDER BY created_at DESC')
@@ -526,7 +673,7 @@ class UserDatabase:
     
     def approve_user(self, user_id: str) -> bool:
         """Approve a pending user"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE users 
@@ -534,11 +681,12 @@ class UserDatabase:
                 WHERE user_id = ? AND status = "pending"
             ''', (user_id,))
             conn.commit()
-            return cursor.rowcount > 0
+        self.session_cache.invalidate_user(user_id)
+        return cursor.rowcount > 0
     
     def reject_user(self, user_id: str) -> bool:
         """Reject a pending user"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE users 
@@ -546,11 +694,12 @@ class UserDatabase:
                 WHERE user_id = ? AND status = "pending"
             ''', (user_id,))
             conn.commit()
-            return cursor.rowcount > 0
+        self.session_cache.invalidate_user(user_id)
+        return cursor.rowcount > 0
     
     def get_users_by_status(self, status: str) -> List[Dict[str, Any]]:
         """Get users by status"""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_db_manager().connection(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM users WHERE status = ? ORDER BY created_at DESC', (status,))
@@ -2,13 +2,14 @@
 벡터 메타데이터를 위한 SQLite 데이터베이스 모델
 """
 from sqlmodel import SQLModel, Field, create_engine, Session
-from sqlalchemy import text
+from sqlalchemy import text, func
 from typing import Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
 import json
 import os
 from ..core.config import settings
+from ..db.sqlite_pool import get_db_manager
 
 
 # FileStatus는 schemas.py에서 import
@@ -307,11 +308,12 @@ class VectorMetadataService:
     def reset_database(self) -> bool:
         """메타데이터 데이터베이스를 완전히 초기화합니다."""
         try:
-            # 엔진 연결 해제
+            # 엔진 연결 및 공용 SQLite 풀 연결 해제
             try:
                 self.engine.dispose()
             except Exception:
                 pass
+            get_db_manager().close(self.db_path)
 
             # DB 파일 삭제 (잠금 회피를 위해 재시도)
             if os.path.exists(self.db_path):
@@ -669,6 +671,29 @@ class FileMetadataService:
                 "vectorization_rate": 0.0
             }
     
+    def count_by_category(self) -> Dict[Optional[str], int]:
+        """카테고리별 파일 수 (삭제된 파일 제외)"""
+        try:
+            with Session(self.engine) as session:
+                rows = session.query(FileMetadata.category_id, func.count(FileMetadata.id)).filter(
+                    FileMetadata.status != FileStatus.DELETED
+                ).group_by(FileMetadata.category_id).all()
+                return {row[0]: row[1] for row in rows}
+        except Exception as e:
+            print(f"카테고리별 파일 수 조회 실패: {e}")
+            return {}
+    
+    def list_recent_uploads(self, limit: int = 5) -> list[FileMetadata]:
+        """최근 업로드된 파일 (삭제된 파일 제외)"""
+        try:
+            with Session(self.engine) as session:
+                return session.query(FileMetadata).filter(
+                    FileMetadata.status != FileStatus.DELETED
+                ).order_by(FileMetadata.upload_time.desc()).limit(limit).all()
+        except Exception as e:
+            print(f"최근 업로드 파일 조회 실패: {e}")
+            return []
+    
     def clear_all(self) -> int:
         """데이터 파일은 유지하고 모든 파일 메타데이터 레코드만 삭제합니다."""
         try:
@@ -883,7 +908,7 @@ class ManualPreprocessingService:
                 # 2. users.db에서 전처리 상태 가져오기
                 preprocessing_status_map = {}
                 try:
-                    with sqlite3.connect(self.db_path) as conn:
+                    with get_db_manager().connection(self.db_path) as conn:
                         cursor = conn.cursor()
                         cursor.execute("""
                             SELECT file_id, status, completed_at, processing_time
@@ -970,7 +995,7 @@ class ManualPreprocessingService:
         """전처리 작업 시작"""
         import sqlite3
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_db_manager().connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # 기존 전처리 작업이 있는지 확인
@@ -1011,7 +1036,7 @@ class ManualPreprocessingService:
         """파일의 전처리 데이터 조회 (수정용)"""
         import sqlite3
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_db_manager().connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # 전처리 작업 조회
@@ -1080,7 +1105,7 @@ class ManualPreprocessingService:
         """전처리 데이터 저장"""
         import sqlite3
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_db_manager().connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # 전처리 작업 조회/생성
@@ -0,0 +1,123 @@
+"""
+청킹 제안 토큰 계산 벤치마크 스크립트
+
+같은 문서로 propose_chunks를 두 방식으로 실행해 처리량(토큰/초)을 비교합니다.
+- legacy: 기존 방식. 캐시 없이 문장마다 encode 한 번씩 호출
+- batched: TokenCounter.count_many (텍스트 해시 LRU 캐시 + 스레드별 구간 병렬 인코딩)
+
+입력이 없으면 페이지마다 머리말/꼬리말이 반복되는 합성 문서를 만들어 사용합니다.
+
+사용 예:
+    python app/scripts/benchmark_chunk_proposal.py --pages 500
+    python app/scripts/benchmark_chunk_proposal.py --input manual.md --repeat 3 --splitter regex
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from typing import Dict, Any, List
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.chunking_service import SmartChunkingService, ChunkingRules, TokenCounter
+
+WORDS = (
+    "설비 점검 절차 안전 작업자 보호구 착용 확인 전원 차단 밸브 압력 온도 측정 기록 보고 "
+    "system maintenance valve pressure sensor calibration report procedure manual check "
+    "부품 번호 AB-1234.5 교체 주기 개월 운전 조건 정격 전류 전압 경고 주의 참고"
+).split()
+
+
+def synthetic_document(pages: int, seed: int = 0) -> str:
+    """페이지마다 같은 머리말/꼬리말과 무작위 본문 문단이 있는 문서"""
+    rng = random.Random(seed)
+    lines = []
+    for page in range(1, pages + 1):
+        lines.append("# 설비 운전 및 정비 매뉴얼 (사내 한정 - 무단 배포 금지)")
+        lines.append(f"## {page}. 점검 항목")
+        for _ in range(8):
+            sentences = [
+                " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 24))) + "."
+                for _ in range(rng.randint(3, 6))
+            ]
+            lines.append(" ".join(sentences))
+        lines.append("본 문서는 회사의 자산이며 허가 없이 복제하거나 외부에 공개할 수 없습니다.")
+        lines.append("")
+    return "\n".join(lines)
+
+
+class LegacyTokenCounter(TokenCounter):
+    """기존 방식: 캐시/배치 없이 텍스트마다 encode"""
+
+    def count_many(self, texts):
+        counts = [self._count_uncached(text) if text and text.strip() else 0 for text in texts]
+        self.stats["cache_misses"] += len(texts)
+        return counts
+
+
+def run(mode: str, text: str, rules: ChunkingRules, repeat: int) -> Dict[str, Any]:
+    service = SmartChunkingService()
+    counter = LegacyTokenCounter(cache_size=0) if mode == "legacy" else TokenCounter()
+    service.token_counter = service.text_splitter.token_counter = counter
+
+    seconds: List[float] = []
+    total_tokens = 0
+    chunk_count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proposals = service.propose_chunks(text, rules, use_hierarchical=True)
+        seconds.append(time.perf_counter() - start)
+        total_tokens = sum(p.token_estimate for p in proposals)
+        chunk_count = len(proposals)
+
+    best = min(seconds)
+    return {
+        "mode": mode,
+        "chunks": chunk_count,
+        "tokens": total_tokens,
+        "best_seconds": best,
+        "tokens_per_second": total_tokens / best if best else 0.0,
+        "cache_hits": counter.stats["cache_hits"],
+        "cache_misses": counter.stats["cache_misses"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="청킹 제안 토큰 계산 벤치마크")
+    parser.add_argument("--input", help="텍스트/마크다운 파일 (없으면 합성 문서 사용)")
+    parser.add_argument("--pages", type=int, default=500, help="합성 문서 페이지 수")
+    parser.add_argument("--repeat", type=int, default=1, help="모드별 반복 횟수 (최솟값 기준, 2회 이상이면 batched는 캐시가 데워진 상태)")
+    parser.add_argument("--splitter", default="regex", choices=["kss", "kiwi", "regex", "recursive"])
+    parser.add_argument("--modes", nargs="+", default=["legacy", "batched"], choices=["legacy", "batched"])
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, "r", encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = synthetic_document(args.pages)
+
+    rules = ChunkingRules(sentence_splitter=args.splitter, enable_duplicate_check=False)
+    print(f"📄 문서 {len(text):,}자, 문장 분할기 {args.splitter}, 반복 {args.repeat}회")
+
+    results = []
+    for mode in args.modes:
+        print(f"🚀 {mode} 실행 중...")
+        results.append(run(mode, text, rules, args.repeat))
+
+    print("\n" + "=" * 78)
+    print(f"{'모드':<10}{'청크 수':>8}{'토큰 수':>12}{'최소(초)':>10}{'토큰/초':>14}{'캐시 적중':>12}{'미스':>10}")
+    print("=" * 78)
+    for r in results:
+        print(
+            f"{r['mode']:<10}{r['chunks']:>8}{r['tokens']:>12,}{r['best_seconds']:>10.2f}"
+            f"{r['tokens_per_second']:>14,.0f}{r['cache_hits']:>12,}{r['cache_misses']:>10,}"
+        )
+    if len(results) == 2 and results[0]["tokens_per_second"]:
+        print(f"\n⚡ 처리량 {results[1]['tokens_per_second'] / results[0]['tokens_per_second']:.1f}배")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Docling 변환기 풀 벤치마크 스크립트
+
+같은 PDF 묶음을 두 방식으로 변환해 문서당 지연시간과 처리량을 비교합니다.
+- fresh: 기존 방식. 문서마다 PdfPipelineOptions / DocumentConverter를 새로 만들어 스레드에서 변환
+- pool: DoclingConverterPool. 옵션별로 캐시된 변환기를 워커 프로세스에서 재사용
+- sharded: pool + 큰 PDF를 페이지 구간으로 나눠 워커 전체에서 병렬 변환 (문서를 하나씩 순서대로 처리)
+
+사용 예:
+    python app/scripts/benchmark_docling_pool.py --input ./samples --count 100
+    python app/scripts/benchmark_docling_pool.py --input a.pdf b.pdf --count 20 --workers 4 --modes pool
+    python app/scripts/benchmark_docling_pool.py --input manual.pdf --count 3 --workers 8 --modes pool sharded --shard-pages 20
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+import numpy as np
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.docling_converter_pool import (
+    DoclingConverterPool, ConverterKey, build_converter
+)
+
+try:
+    import docling  # noqa: F401
+    DOCLING_AVAILABLE = True
+except ImportError:
+    DOCLING_AVAILABLE = False
+
+
+def collect_pdfs(inputs: List[str], count: int) -> List[str]:
+    """입력 경로(파일/디렉터리)에서 PDF를 모아 count개가 될 때까지 순환"""
+    pdfs = []
+    for path in inputs:
+        if os.path.isdir(path):
+            pdfs.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path)) if name.lower().endswith(".pdf")
+            )
+        elif path.lower().endswith(".pdf"):
+            pdfs.append(path)
+    if not pdfs:
+        return []
+    return [pdfs[i % len(pdfs)] for i in range(count)]
+
+
+def convert_fresh(file_path: str, key: ConverterKey) -> Dict[str, float]:
+    """기존 process_document와 동일하게 문서마다 변환기를 새로 만들어 변환"""
+    start = time.perf_counter()
+    converter = build_converter(key)
+    build_seconds = time.perf_counter() - start
+    convert_start = time.perf_counter()
+    converter.convert(file_path)
+    return {
+        "converter_build_seconds": build_seconds,
+        "convert_seconds": time.perf_counter() - convert_start,
+    }
+
+
+async def run_fresh(files: List[str], key: ConverterKey, workers: int) -> List[Dict[str, float]]:
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(workers)
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    async def one(path: str) -> Dict[str, float]:
+        async with semaphore:
+            start = time.perf_counter()
+            info = await loop.run_in_executor(executor, convert_fresh, path, key)
+            info["total_seconds"] = time.perf_counter() - start
+            return info
+
+    try:
+        return await asyncio.gather(*[one(path) for path in files])
+    finally:
+        executor.shutdown(wait=True)
+
+
+async def run_pool(pool: DoclingConverterPool, files: List[str], key: ConverterKey, workers: int, sharded: bool = False) -> List[Dict[str, float]]:
+    semaphore = asyncio.Semaphore(1 if sharded else workers)
+
+    async def one(path: str) -> Dict[str, float]:
+        async with semaphore:
+            if sharded:
+                _, info = await pool.convert_sharded(
+                    path, key,
+                    progress_callback=lambda done, total, pages, _: print(f"   📑 {os.path.basename(path)} 페이지 {pages[0]}-{pages[1]} ({done}/{total})")
+                )
+            else:
+                _, info = await pool.convert(path, key)
+            return info
+
+    return await asyncio.gather(*[one(path) for path in files])
+
+
+def summarize(mode: str, infos: List[Dict[str, float]], wall_seconds: float) -> Dict[str, Any]:
+    totals = [info["total_seconds"] for info in infos]
+    # 분할 변환은 convert_seconds가 샤드 합계이므로 가장 오래 걸린 샤드 기준으로 오버헤드 계산
+    overheads = [
+        info["total_seconds"] - (
+            max(shard["convert_seconds"] for shard in info["shards"]) if "shards" in info else info["convert_seconds"]
+        )
+        for info in infos
+    ]
+    return {
+        "mode": mode,
+        "documents": len(infos),
+        "wall_seconds": wall_seconds,
+        "docs_per_minute": len(infos) / wall_seconds * 60 if wall_seconds else 0.0,
+        "p50_seconds": float(np.percentile(totals, 50)),
+        "p95_seconds": float(np.percentile(totals, 95)),
+        "overhead_mean_seconds": float(np.mean(overheads)),
+        "build_seconds": sum(info["converter_build_seconds"] for info in infos),
+    }
+
+
+async def benchmark(mode: str, files: List[str], args) -> Dict[str, Any]:
+    key: ConverterKey = (args.ocr, not args.no_tables, args.images)
+    if mode == "fresh":
+        start = time.perf_counter()
+        infos = await run_fresh(files, key, args.workers)
+        return summarize(mode, infos, time.perf_counter() - start)
+
+    pool = DoclingConverterPool()
+    pool.apply_settings({
+        "use_process_pool": not args.threads,
+        "worker_processes": args.workers,
+        "converter_cache_size": 4,
+        "preload_converters": args.preload,
+        "enable_page_sharding": mode == "sharded",
+        "shard_pages": args.shard_pages,
+        "shard_min_pages": 1,
+    })
+    try:
+        if args.preload:
+            await pool.warm_up()
+        start = time.perf_counter()
+        infos = await run_pool(pool, files, key, args.workers, sharded=mode == "sharded")
+        return summarize(mode, infos, time.perf_counter() - start)
+    finally:
+        pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Docling 변환기 풀 벤치마크")
+    parser.add_argument("--input", nargs="+", required=True, help="PDF 파일 또는 PDF가 들어 있는 디렉터리")
+    parser.add_argument("--count", type=int, default=100, help="변환할 문서 수 (입력 PDF를 순환 사용)")
+    parser.add_argument("--workers", type=int, default=2, help="동시 변환 수 (pool 모드의 워커 프로세스 수)")
+    parser.add_argument("--modes", nargs="+", default=["fresh", "pool"], choices=["fresh", "pool", "sharded"])
+    parser.add_argument("--ocr", action="store_true", help="OCR 활성화")
+    parser.add_argument("--no-tables", action="store_true", help="테이블 구조 분석 비활성화")
+    parser.add_argument("--images", action="store_true", help="이미지 생성 활성화")
+    parser.add_argument("--threads", action="store_true", help="pool 모드를 프로세스 대신 스레드로 실행")
+    parser.add_argument("--preload", action="store_true", help="측정 전에 워커와 변환기를 미리 로드")
+    parser.add_argument("--shard-pages", type=int, default=20, help="sharded 모드의 구간당 페이지 수")
+    args = parser.parse_args()
+
+    if not DOCLING_AVAILABLE:
+        print("❌ Docling이 설치되지 않아 벤치마크를 실행할 수 없습니다.")
+        return
+
+    files = collect_pdfs(args.input, args.count)
+    if not files:
+        print("❌ 입력 경로에서 PDF 파일을 찾지 못했습니다.")
+        return
+
+    results = []
+    for mode in args.modes:
+        print(f"🚀 {mode} - PDF {len(files)}개, 동시 {args.workers}개 변환 중...")
+        result = asyncio.run(benchmark(mode, files, args))
+        results.append(result)
+        print(
+            f"   {result['wall_seconds']:.1f}초, {result['docs_per_minute']:.1f}개/분, "
+            f"문서당 오버헤드 {result['overhead_mean_seconds']:.2f}초"
+        )
+
+    print("\n" + "=" * 84)
+    print(f"{'모드':<8}{'문서 수':>8}{'전체(초)':>10}{'개/분':>10}{'p50(초)':>10}{'p95(초)':>10}{'오버헤드(초)':>14}{'생성(초)':>12}")
+    print("=" * 84)
+    for r in results:
+        print(
+            f"{r['mode']:<8}{r['documents']:>8}{r['wall_seconds']:>10.1f}{r['docs_per_minute']:>10.1f}"
+            f"{r['p50_seconds']:>10.2f}{r['p95_seconds']:>10.2f}{r['overhead_mean_seconds']:>14.2f}{r['build_seconds']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
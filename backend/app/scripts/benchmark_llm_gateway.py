@@ -0,0 +1,156 @@
+"""
+LLM 게이트웨이 부하 테스트 스크립트
+
+지연 시간이 일정한 가짜 LLM(실제 API 호출 없음)으로 동시 채팅 N개를 보내
+Provider별 동시성 한도에 따라 처리량이 거의 선형으로 늘어나는지 확인합니다.
+- blocking: 게이트웨이 도입 전처럼 이벤트 루프에서 동기 SDK 호출 (동시 요청이 한 줄로 처리됨)
+- gateway: LLMGateway.ainvoke (동시성 한도별로 측정)
+
+사용 예:
+    python app/scripts/benchmark_llm_gateway.py --chats 50 --latency 0.5
+    python app/scripts/benchmark_llm_gateway.py --concurrency 1 10 50 --failure-rate 0.05
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+from typing import Any, Dict, List
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.llm_gateway import LLMGateway
+
+PROVIDER = "openai"
+
+
+class RateLimitError(Exception):
+    """가짜 429 오류 (게이트웨이가 이름으로 재시도 대상으로 판별)"""
+    status_code = 429
+
+
+class FakeChatModel:
+    """LangChain 채팅 모델처럼 ainvoke/invoke를 제공하는 지연 시간 고정 스텁"""
+
+    def __init__(self, latency: float, jitter: float, failure_rate: float, seed: int):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+
+    def _delay(self) -> float:
+        self.requests += 1
+        if self.rng.random() < self.failure_rate:
+            raise RateLimitError("rate limited")
+        return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    async def ainvoke(self, messages: Any) -> str:
+        await asyncio.sleep(self._delay())
+        return "응답"
+
+    def invoke(self, messages: Any) -> str:
+        time.sleep(self._delay())
+        return "응답"
+
+
+async def run_blocking(model: FakeChatModel, chats: int) -> int:
+    """이벤트 루프 안에서 동기 호출: 코루틴을 동시에 띄워도 한 번에 하나씩 실행됨"""
+    async def chat(index: int):
+        try:
+            model.invoke([f"질문 {index}"])
+            return True
+        except RateLimitError:
+            return False
+
+    results = await asyncio.gather(*[chat(i) for i in range(chats)])
+    return sum(results)
+
+
+async def run_gateway(gateway: LLMGateway, model: FakeChatModel, chats: int) -> int:
+    async def chat(index: int):
+        try:
+            await gateway.ainvoke(PROVIDER, model, [f"질문 {index}"])
+            return True
+        except Exception:
+            return False
+
+    results = await asyncio.gather(*[chat(i) for i in range(chats)])
+    return sum(results)
+
+
+def benchmark(mode: str, concurrency: int, args) -> Dict[str, Any]:
+    model = FakeChatModel(args.latency, args.jitter, args.failure_rate, args.seed)
+    start = time.perf_counter()
+    if mode == "blocking":
+        succeeded = asyncio.run(run_blocking(model, args.chats))
+        stats: Dict[str, Any] = {}
+    else:
+        gateway = LLMGateway()
+        gateway.apply_settings({
+            "llmMaxConcurrencyPerProvider": concurrency,
+            "llmTimeoutSeconds": max(10.0, args.latency * 10),
+            "llmMaxRetries": args.max_retries,
+            "llmRetryBaseDelay": args.latency / 10,
+        })
+        succeeded = asyncio.run(run_gateway(gateway, model, args.chats))
+        stats = gateway.get_stats()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "elapsed": elapsed,
+        "throughput": succeeded / elapsed if elapsed else 0.0,
+        "succeeded": succeeded,
+        "requests": model.requests,
+        "retries": stats.get("retries", 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM 게이트웨이 부하 테스트 (가짜 Provider)")
+    parser.add_argument("--chats", type=int, default=50, help="동시에 보낼 채팅 수")
+    parser.add_argument("--latency", type=float, default=0.5, help="가짜 LLM 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="지연 시간 편차(초)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="429 오류를 낼 확률")
+    parser.add_argument("--max-retries", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10, 25, 50], help="측정할 Provider 동시성 한도")
+    parser.add_argument("--skip-blocking", action="store_true", help="blocking 기준 측정 생략")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    runs = [] if args.skip_blocking else [("blocking", 1)]
+    runs += [("gateway", level) for level in args.concurrency]
+
+    results: List[Dict[str, Any]] = []
+    for mode, concurrency in runs:
+        print(f"🚀 {mode} (동시성 {concurrency}) - 채팅 {args.chats}개, 지연 {args.latency:.2f}초 측정 중...")
+        result = benchmark(mode, concurrency, args)
+        results.append(result)
+        print(f"   {result['elapsed']:.2f}초, {result['throughput']:.1f} 채팅/초, 성공 {result['succeeded']}/{args.chats}")
+
+    # 동시성 1 게이트웨이 결과를 기준으로 선형 확장 대비 효율 계산
+    baseline = next((r for r in results if r["mode"] == "gateway" and r["concurrency"] == 1), None)
+    ideal_cap = args.chats
+
+    print("\n" + "=" * 78)
+    print(f"{'모드':<10}{'동시성':>8}{'시간(초)':>10}{'채팅/초':>10}{'배율':>8}{'선형 대비':>10}{'요청':>8}{'재시도':>8}")
+    print("=" * 78)
+    for r in results:
+        if baseline and baseline["throughput"]:
+            speedup = r["throughput"] / baseline["throughput"]
+            efficiency = speedup / min(r["concurrency"], ideal_cap)
+            speedup_text, efficiency_text = f"{speedup:.1f}x", f"{efficiency:.0%}"
+        else:
+            speedup_text = efficiency_text = "-"
+        print(
+            f"{r['mode']:<10}{r['concurrency']:>8}{r['elapsed']:>10.2f}{r['throughput']:>10.1f}"
+            f"{speedup_text:>8}{efficiency_text:>10}{r['requests']:>8}{r['retries']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+SQLite 연결 풀 벤치마크 스크립트
+
+채팅 로깅(INSERT)과 관리자 히스토리 조회(페이지 SELECT + COUNT)를 동시에 실행하며
+작업마다 sqlite3.connect()를 새로 여는 기존 방식과 SQLiteConnectionManager 풀 방식의
+쓰기/읽기 QPS를 비교합니다.
+
+사용 예:
+    python app/scripts/benchmark_sqlite_pool.py --seed-rows 50000 --duration 10
+    python app/scripts/benchmark_sqlite_pool.py --writers 8 --readers 16 --modes pool
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, List
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.db.sqlite_pool import SQLiteConnectionManager
+
+CATEGORIES = [f"cat_{i}" for i in range(10)]
+PAGE_SIZE = 20
+
+INSERT_SQL = """
+    INSERT INTO chat_history (session_id, query, response, category, relevance_score, feedback, user_id, flow_id, response_time)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def create_database(db_path: str, seed_rows: int, seed: int):
+    """users.db와 같은 chat_history 스키마를 만들고 기존 기록을 채웁니다."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE chat_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT,
+            query TEXT,
+            response TEXT,
+            category TEXT,
+            relevance_score REAL,
+            feedback TEXT,
+            user_id TEXT,
+            flow_id TEXT,
+            response_time REAL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("CREATE INDEX idx_chat_history_timestamp ON chat_history(timestamp)")
+    base = datetime.now() - timedelta(days=30)
+    rows = [
+        (
+            f"session_{i % 500}", f"질문 {i}", f"답변 {i} " * 20, rng.choice(CATEGORIES),
+            rng.random(), None, f"user_{i % 200}", None, rng.uniform(0.2, 10),
+            (base + timedelta(seconds=i * 30)).strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        for i in range(seed_rows)
+    ]
+    conn.executemany(
+        "INSERT INTO chat_history (session_id, query, response, category, relevance_score, feedback, "
+        "user_id, flow_id, response_time, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+def direct_connection(db_path: str):
+    """기존 방식: 작업마다 새 연결 (PRAGMA 설정 없음)"""
+    return sqlite3.connect(db_path, timeout=30)
+
+
+def log_chat(conn: sqlite3.Connection, rng: random.Random):
+    conn.execute(INSERT_SQL, (
+        f"session_{rng.randrange(500)}", "벤치마크 질문", "벤치마크 답변 " * 20, rng.choice(CATEGORIES),
+        rng.random(), None, f"user_{rng.randrange(200)}", None, rng.uniform(0.2, 10),
+    ))
+
+
+def browse_history(conn: sqlite3.Connection, rng: random.Random):
+    """관리자 히스토리 화면과 같은 필터 + 페이지 조회"""
+    category = rng.choice(CATEGORIES)
+    page = rng.randrange(10)
+    conn.execute("SELECT COUNT(*) FROM chat_history WHERE category LIKE ?", (f"%{category}%",)).fetchone()
+    conn.execute(
+        "SELECT * FROM chat_history WHERE category LIKE ? ORDER BY timestamp DESC LIMIT ? OFFSET ?",
+        (f"%{category}%", PAGE_SIZE, page * PAGE_SIZE),
+    ).fetchall()
+
+
+def run_workload(open_conn: Callable, workers: int, duration: float, op: Callable, seed: int, counter: List[int], errors: List[int]):
+    stop_at = time.perf_counter() + duration
+
+    def worker(index: int):
+        rng = random.Random(seed + index)
+        done = failed = 0
+        while time.perf_counter() < stop_at:
+            try:
+                with open_conn() as conn:
+                    op(conn, rng)
+                done += 1
+            except sqlite3.Error:
+                failed += 1
+        counter.append(done)
+        errors.append(failed)
+
+    return [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+
+
+def benchmark(mode: str, args) -> Dict[str, Any]:
+    work_dir = tempfile.mkdtemp(prefix=f"sqlite_bench_{mode}_")
+    db_path = os.path.join(work_dir, "users.db")
+    manager = SQLiteConnectionManager(pool_size=args.pool_size)
+    try:
+        create_database(db_path, args.seed_rows, args.seed)
+
+        if mode == "pool":
+            open_conn = lambda: manager.connection(db_path)
+        else:
+            # sqlite3.Connection의 with 문은 commit/rollback만 하고 닫지 않으므로 닫기까지 포함
+            class _Direct:
+                def __enter__(self):
+                    self.conn = direct_connection(db_path)
+                    return self.conn.__enter__()
+
+                def __exit__(self, *exc):
+                    try:
+                        return self.conn.__exit__(*exc)
+                    finally:
+                        self.conn.close()
+
+            open_conn = _Direct
+
+        writes: List[int] = []
+        reads: List[int] = []
+        write_errors: List[int] = []
+        read_errors: List[int] = []
+        threads = (
+            run_workload(open_conn, args.writers, args.duration, log_chat, args.seed, writes, write_errors)
+            + run_workload(open_conn, args.readers, args.duration, browse_history, args.seed + 1000, reads, read_errors)
+        )
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        return {
+            "mode": mode,
+            "write_qps": sum(writes) / elapsed,
+            "read_qps": sum(reads) / elapsed,
+            "write_errors": sum(write_errors),
+            "read_errors": sum(read_errors),
+        }
+    finally:
+        manager.close_all()
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite 연결 풀 벤치마크")
+    parser.add_argument("--seed-rows", type=int, default=50_000, help="미리 채울 chat_history 행 수")
+    parser.add_argument("--duration", type=float, default=10.0, help="모드별 측정 시간(초)")
+    parser.add_argument("--writers", type=int, default=4, help="채팅 로깅 스레드 수")
+    parser.add_argument("--readers", type=int, default=8, help="관리자 조회 스레드 수")
+    parser.add_argument("--pool-size", type=int, default=8, help="DB 파일당 풀 크기")
+    parser.add_argument("--modes", nargs="+", default=["direct", "pool"], choices=["direct", "pool"])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="벤치마크 DB 디렉터리를 삭제하지 않음")
+    args = parser.parse_args()
+
+    results = []
+    for mode in args.modes:
+        print(f"🚀 {mode} - 쓰기 {args.writers}개 / 읽기 {args.readers}개 스레드, {args.duration:.0f}초 측정 중...")
+        result = benchmark(mode, args)
+        results.append(result)
+        print(
+            f"   쓰기 {result['write_qps']:.0f} QPS, 읽기 {result['read_qps']:.0f} QPS, "
+            f"오류 {result['write_errors'] + result['read_errors']}건"
+        )
+
+    print("\n" + "=" * 60)
+    print(f"{'모드':<10}{'쓰기 QPS':>12}{'읽기 QPS':>12}{'쓰기 오류':>12}{'읽기 오류':>12}")
+    print("=" * 60)
+    for r in results:
+        print(
+            f"{r['mode']:<10}{r['write_qps']:>12.0f}{r['read_qps']:>12.0f}"
+            f"{r['write_errors']:>12}{r['read_errors']:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+벡터 저장소 백엔드 벤치마크 스크립트
+
+ChromaDB와 프로세스 내장 ANN 저장소(LocalAnnVectorStore)를 같은 무작위 벡터로 채운 뒤
+쿼리 지연시간(p50/p99)과 프로세스 메모리(RSS)를 비교합니다.
+
+사용 예:
+    python app/scripts/benchmark_vector_store.py --sizes 100000 1000000 --dim 384
+    python app/scripts/benchmark_vector_store.py --sizes 100000 --backends local_ann --category-filter
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from typing import Dict, Any, List
+
+import numpy as np
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.vector_stores.base import VectorStore
+from app.services.vector_stores.local_ann_store import LocalAnnVectorStore
+from app.services.vector_stores.chroma_store import ChromaVectorStore
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    import chromadb
+    from chromadb.config import Settings as ChromaSettings
+    CHROMADB_AVAILABLE = True
+except ImportError:
+    CHROMADB_AVAILABLE = False
+
+# ChromaDB add 호출당 최대 항목 수 제한을 넘지 않도록 나눠서 적재
+INSERT_BATCH_SIZE = 5000
+CATEGORY_COUNT = 20
+
+
+def rss_mb() -> float:
+    """현재 프로세스 RSS (MB)"""
+    if not PSUTIL_AVAILABLE:
+        return 0.0
+    return psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024
+
+
+def random_vectors(rng: np.random.Generator, count: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def create_store(backend: str, work_dir: str) -> VectorStore:
+    if backend == "local_ann":
+        return LocalAnnVectorStore(os.path.join(work_dir, "local_ann"))
+
+    client = chromadb.PersistentClient(
+        path=os.path.join(work_dir, "chroma"),
+        settings=ChromaSettings(anonymized_telemetry=False, allow_reset=True)
+    )
+    collection = client.create_collection(name="benchmark", metadata={"hnsw:space": "cosine"})
+    return ChromaVectorStore(collection)
+
+
+def fill_store(store: VectorStore, size: int, dim: int, seed: int) -> float:
+    """무작위 벡터로 저장소를 채우고 소요 시간(초)을 반환합니다."""
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    for offset in range(0, size, INSERT_BATCH_SIZE):
+        count = min(INSERT_BATCH_SIZE, size - offset)
+        vectors = random_vectors(rng, count, dim)
+        ids = [f"bench_{offset + i}" for i in range(count)]
+        metadatas = [
+            {
+                "file_id": f"file_{(offset + i) // 100}",
+                "category_id": f"cat_{(offset + i) % CATEGORY_COUNT}",
+                "chunk_index": (offset + i) % 100,
+            }
+            for i in range(count)
+        ]
+        store.add(ids=ids, documents=[""] * count, metadatas=metadatas, embeddings=vectors.tolist())
+    return time.perf_counter() - start
+
+
+def run_queries(store: VectorStore, queries: np.ndarray, top_k: int, category_filter: bool) -> List[float]:
+    """쿼리별 지연시간(ms) 목록"""
+    latencies = []
+    for i, query in enumerate(queries):
+        where = None
+        if category_filter:
+            where = {"category_id": {"$in": [f"cat_{i % CATEGORY_COUNT}", f"cat_{(i + 1) % CATEGORY_COUNT}"]}}
+        start = time.perf_counter()
+        store.query(query_embedding=query.tolist(), n_results=top_k, where=where)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def benchmark(backend: str, size: int, args) -> Dict[str, Any]:
+    work_dir = tempfile.mkdtemp(prefix=f"vector_bench_{backend}_")
+    try:
+        base_rss = rss_mb()
+        store = create_store(backend, work_dir)
+        insert_seconds = fill_store(store, size, args.dim, args.seed)
+        loaded_rss = rss_mb()
+
+        queries = random_vectors(np.random.default_rng(args.seed + 1), args.queries + args.warmup, args.dim)
+        run_queries(store, queries[:args.warmup], args.top_k, args.category_filter)
+        latencies = run_queries(store, queries[args.warmup:], args.top_k, args.category_filter)
+
+        return {
+            "backend": backend,
+            "size": size,
+            "insert_seconds": insert_seconds,
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "rss_delta_mb": loaded_rss - base_rss,
+            "count": store.count(),
+        }
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벡터 저장소 백엔드 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000], help="저장할 청크 수 목록")
+    parser.add_argument("--dim", type=int, default=384, help="벡터 차원")
+    parser.add_argument("--queries", type=int, default=500, help="측정 쿼리 수")
+    parser.add_argument("--warmup", type=int, default=20, help="워밍업 쿼리 수")
+    parser.add_argument("--top-k", type=int, default=5, help="쿼리당 결과 수")
+    parser.add_argument("--backends", nargs="+", default=["local_ann", "chromadb"], choices=["local_ann", "chromadb"])
+    parser.add_argument("--category-filter", action="store_true", help="category_id 필터를 걸고 측정")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="벤치마크 데이터 디렉터리를 삭제하지 않음")
+    args = parser.parse_args()
+
+    if not PSUTIL_AVAILABLE:
+        print("⚠️ psutil이 설치되지 않아 메모리 측정을 건너뜁니다.")
+
+    backends = list(args.backends)
+    if "chromadb" in backends and not CHROMADB_AVAILABLE:
+        print("⚠️ ChromaDB가 설치되지 않아 chromadb 백엔드를 건너뜁니다.")
+        backends.remove("chromadb")
+
+    results = []
+    for size in args.sizes:
+        for backend in backends:
+            print(f"🚀 {backend} - {size:,}개 청크 ({args.dim}차원) 측정 중...")
+            result = benchmark(backend, size, args)
+            results.append(result)
+            print(
+                f"   적재 {result['insert_seconds']:.1f}초, p50 {result['p50_ms']:.2f}ms, "
+                f"p99 {result['p99_ms']:.2f}ms, 메모리 +{result['rss_delta_mb']:.0f}MB"
+            )
+
+    print("\n" + "=" * 72)
+    print(f"{'백엔드':<12}{'청크 수':>12}{'적재(초)':>12}{'p50(ms)':>10}{'p99(ms)':>10}{'메모리(MB)':>14}")
+    print("=" * 72)
+    for r in results:
+        print(
+            f"{r['backend']:<12}{r['size']:>12,}{r['insert_seconds']:>12.1f}"
+            f"{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['rss_delta_mb']:>14.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
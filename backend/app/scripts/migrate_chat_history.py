@@ -0,0 +1,31 @@
+"""
+chat_history.json을 SQLite 채팅 히스토리 저장소로 마이그레이션하는 스크립트
+
+서버가 처음 채팅 히스토리에 접근할 때도 자동으로 한 번 마이그레이션되며,
+이 스크립트는 서버 기동 전에 미리 옮겨 두고 싶을 때 사용합니다.
+"""
+import os
+import sys
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.chat_history_store import get_chat_history_store
+
+
+def main():
+    store = get_chat_history_store()
+    legacy_exists = os.path.exists(store.legacy_json_path)
+
+    # 초기화 시 스키마 생성과 JSON 마이그레이션이 수행됨
+    total = store.count()
+
+    if legacy_exists:
+        print(f"✅ 마이그레이션 완료: {store.legacy_json_path} → {store.db_path}")
+    else:
+        print(f"ℹ️ 마이그레이션할 JSON 파일이 없습니다: {store.legacy_json_path}")
+    print(f"📊 저장된 메시지 수: {total}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,13 +11,15 @@ import time
 import logging
 import asyncio
 import base64
+import bisect
 from typing import List, Optional, Dict, Any, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 
-from .chunking_service import ChunkProposal, ChunkingRules, QualityWarning, ChunkQualityIssue
+from .chunking_service import ChunkProposal, ChunkingRules, QualityWarning, ChunkQualityIssue, TokenCounter, get_token_counter
 from .settings_service import settings_service
+from .llm_gateway import get_llm_gateway
 from ..core.logger import get_console_logger
 
 logger = get_console_logger()
@@ -173,8 +175,6 @@ EXTRACTED TEXT:
     async def _call_openai(self, model: str, system_prompt: str, user_prompt: str, temperature: float, api_key: str = None, images: Optional[List[str]] = None) -> str:
         """OpenAI API 호출 (멀티모달 지원)"""
         try:
-            from openai import AsyncOpenAI
-            
             # API 키 사용 (모델 프로필에서 전달된 키 우선 사용)
             if not api_key:
                 # 폴백: 기존 설정 방식
@@ -184,7 +184,8 @@ EXTRACTED TEXT:
             if not api_key:
                 raise RuntimeError("OpenAI API 키가 설정되지 않았습니다. 모델 프로필에 API 키를 설정하거나 시스템 설정에서 openai_api_key를 추가하세요.")
             
-            client = AsyncOpenAI(api_key=api_key)
+            gateway = get_llm_gateway()
+            client = gateway.get_async_client("openai", api_key)
             
             # 메시지 구성
             messages = [{"role": "system", "content": system_prompt}]
@@ -218,12 +219,12 @@ EXTRACTED TEXT:
                 # 텍스트만
                 messages.append({"role": "user", "content": user_prompt})
             
-            response = await client.chat.completions.create(
+            response = await gateway.run("openai", lambda: client.chat.completions.create(
                 model=model,
                 temperature=temperature,
                 messages=messages,
                 max_tokens=4000
-            )
+            ), label="OpenAI 청킹")
             
             return response.choices[0].message.content or ""
             
@@ -234,8 +235,6 @@ EXTRACTED TEXT:
     async def _call_anthropic(self, model: str, system_prompt: str, user_prompt: str, temperature: float, api_key: str = None, images: Optional[List[str]] = None) -> str:
         """Anthropic (Claude) API 호출 (멀티모달 지원)"""
         try:
-            import anthropic
-            
             # API 키 사용 (모델 프로필에서 전달된 키 우선 사용)
             if not api_key:
                 # 폴백: 기존 설정 방식
@@ -245,7 +244,8 @@ EXTRACTED TEXT:
             if not api_key:
                 raise RuntimeError("Anthropic API 키가 설정되지 않았습니다. 모델 프로필에 API 키를 설정하거나 시스템 설정에서 anthropic_api_key를 추가하세요.")
             
-            client = anthropic.AsyncAnthropic(api_key=api_key)
+            gateway = get_llm_gateway()
+            client = gateway.get_async_client("anthropic", api_key)
             
             if images and len(images) > 0:
                 # 멀티모달 메시지 구성
@@ -269,7 +269,7 @@ EXTRACTED TEXT:
                     "text": user_prompt
                 })
                 
-                response = await client.messages.create(
+                response = await gateway.run("anthropic", lambda: client.messages.create(
                     model=model,
                     max_tokens=4000,
                     temperature=temperature,
@@ -277,10 +277,10 @@ EXTRACTED TEXT:
                     messages=[
                         {"role": "user", "content": content}
                     ]
-                )
+                ), label="Anthropic 청킹")
             else:
                 # 텍스트만
-                response = await client.messages.create(
+                response = await gateway.run("anthropic", lambda: client.messages.create(
                     model=model,
                     max_tokens=4000,
                     temperature=temperature,
@@ -288,7 +288,7 @@ EXTRACTED TEXT:
                     messages=[
                         {"role": "user", "content": user_prompt}
                     ]
-                )
+                ), label="Anthropic 청킹")
             
             return response.content[0].text
             
@@ -299,8 +299,6 @@ EXTRACTED TEXT:
     async def _call_upstage(self, model: str, system_prompt: str, user_prompt: str, temperature: float, api_key: str = None, images: Optional[List[str]] = None) -> str:
         """Upstage API 호출 (멀티모달 제한적 지원)"""
         try:
-            import httpx
-            
             # 멀티모달 이미지가 있는 경우 경고
             if images and len(images) > 0:
                 self.logger.warning("Upstage Solar 모델은 현재 이미지를 지원하지 않습니다. 텍스트만 처리됩니다.")
@@ -314,7 +312,10 @@ EXTRACTED TEXT:
             if not api_key:
                 raise RuntimeError("Upstage API 키가 설정되지 않았습니다. 모델 프로필에 API 키를 설정하거나 시스템 설정에서 upstage_api_key를 추가하세요.")
             
-            async with httpx.AsyncClient() as client:
+            gateway = get_llm_gateway()
+            client = gateway.get_async_client("http")
+            
+            async def post():
                 response = await client.post(
                     "https://api.upstage.ai/v1/solar/chat/completions",
                     headers={
@@ -331,12 +332,18 @@ EXTRACTED TEXT:
                     },
                     timeout=60.0
                 )
-                
-                if response.status_code != 200:
-                    raise RuntimeError(f"Upstage API HTTP {response.status_code}: {response.text}")
-                
-                data = response.json()
-                return data["choices"][0]["message"]["content"]
+                # 429/5xx는 예외로 올려 게이트웨이가 재시도하도록 함
+                if response.status_code == 429 or response.status_code >= 500:
+                    response.raise_for_status()
+                return response
+            
+            response = await gateway.run("upstage", post, label="Upstage 청킹")
+            
+            if response.status_code != 200:
+                raise RuntimeError(f"Upstage API HTTP {response.status_code}: {response.text}")
+            
+            data = response.json()
+            return data["choices"][0]["message"]["content"]
                 
         except Exception as e:
             self.logger.error(f"Upstage API 호출 실패: {e}")
@@ -382,22 +389,22 @@ EXTRACTED TEXT:
                         self.logger.warning(f"이미지 {i+1} 처리 실패: {img_error}")
                         continue
                 
-                response = await model_instance.generate_content_async(
+                response = await get_llm_gateway().run("google", lambda: model_instance.generate_content_async(
                     content_parts,
                     generation_config=genai.types.GenerationConfig(
                         temperature=temperature,
                         max_output_tokens=8192,  # 더 긴 응답 허용
                     )
-                )
+                ), label="Gemini 청킹")
             else:
                 # 텍스트만
-                response = await model_instance.generate_content_async(
+                response = await get_llm_gateway().run("google", lambda: model_instance.generate_content_async(
                     combined_prompt,
                     generation_config=genai.types.GenerationConfig(
                         temperature=temperature,
                         max_output_tokens=8192,  # 더 긴 응답 허용
                     )
-                )
+                ), label="Gemini 청킹")
             
             # 응답 안전 처리
             if hasattr(response, 'candidates') and response.candidates:
@@ -517,8 +524,10 @@ EXTRACTED TEXT:
             prev_chunk = chunks[i - 1]
             prev_words = prev_chunk.text.split()
             
-            # 대략적인 오버랩 단어 수 계산
-            overlap_words = min(overlap_tokens, len(prev_words) // 2)
+            # 단어별 토큰 누적합으로 뒤에서부터 overlap_tokens 이내인 단어 수 계산 (최대 절반)
+            prefix = TokenCounter.prefix_sums(get_token_counter().count_many(prev_words))
+            fitting_words = len(prev_words) - bisect.bisect_left(prefix, prefix[-1] - overlap_tokens)
+            overlap_words = min(fitting_words, len(prev_words) // 2)
             if overlap_words > 0:
                 overlap_text = " ".join(prev_words[-overlap_words:])
                 
@@ -533,13 +542,10 @@ EXTRACTED TEXT:
     def _convert_to_chunk_proposals(self, ai_chunks: List[AIChunkItem]) -> List[ChunkProposal]:
         """AI 청크를 ChunkProposal로 변환"""
         proposals = []
+        # 토큰 수 계산 (전체 청크를 한 번에)
+        token_estimates = get_token_counter().count_many([ai_chunk.text for ai_chunk in ai_chunks])
         
-        for ai_chunk in ai_chunks:
-            # 토큰 수 계산
-            from .chunking_service import TokenCounter
-            token_counter = TokenCounter()
-            token_estimate = token_counter.count_tokens(ai_chunk.text)
-            
+        for ai_chunk, token_estimate in zip(ai_chunks, token_estimates):
             # 기본 품질 경고 생성
             warnings = []
             if len(ai_chunk.text.strip()) < 10:
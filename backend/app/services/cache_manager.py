@@ -17,6 +17,7 @@ import psutil
 import logging
 
 from ..core.config import settings
+from .embedding_cache import get_embedding_cache
 
 
 @dataclass
@@ -290,11 +291,8 @@ class CacheManager:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
-        # 다양한 용도의 캐시들
-        self.embedding_cache = TTLCache(
-            max_size=5000, 
-            ttl_seconds=settings.CACHE_TTL_SECONDS
-        )
+        # 다양한 용도의 캐시들 (임베딩은 재시작 후에도 유지되는 영구 캐시 사용)
+        self.embedding_cache = get_embedding_cache()
         self.chunk_cache = TTLCache(
             max_size=2000, 
             ttl_seconds=settings.CACHE_TTL_SECONDS
@@ -312,20 +310,19 @@ class CacheManager:
         
         self.logger.info("CacheManager 초기화 완료")
     
-    def cache_embedding(self, text_chunks: List[str], embeddings: List[List[float]]) -> str:
-        """임베딩 결과 캐싱"""
-        cache_key = self._generate_cache_key(text_chunks)
-        success = self.embedding_cache.put(cache_key, embeddings)
-        if success:
-            self.logger.debug(f"임베딩 캐시 저장: {cache_key[:16]}...")
-        return cache_key
-    
-    def get_cached_embedding(self, text_chunks: List[str]) -> Optional[List[List[float]]]:
-        """캐시된 임베딩 조회"""
-        cache_key = self._generate_cache_key(text_chunks)
-        result = self.embedding_cache.get(cache_key)
-        if result:
-            self.logger.debug(f"임베딩 캐시 히트: {cache_key[:16]}...")
+    def cache_embedding(self, embedding_model: str, text_chunks: List[str], embeddings: List[List[float]]) -> int:
+        """임베딩 결과 캐싱 (청크 텍스트 단위로 영구 저장)"""
+        stored = self.embedding_cache.put_many(embedding_model, text_chunks, embeddings)
+        if stored:
+            self.logger.debug(f"임베딩 캐시 저장: {stored}개 ({embedding_model})")
+        return stored
+    
+    def get_cached_embedding(self, embedding_model: str, text_chunks: List[str]) -> Optional[List[List[float]]]:
+        """캐시된 임베딩 조회 (모든 청크가 캐시에 있을 때만 반환)"""
+        result = self.embedding_cache.get_many(embedding_model, text_chunks)
+        if any(embedding is None for embedding in result):
+            return None
+        self.logger.debug(f"임베딩 캐시 히트: {len(text_chunks)}개 ({embedding_model})")
         return result
     
     def cache_chunks(self, file_path: str, chunks: List[str]) -> str:
@@ -360,11 +357,6 @@ class CacheManager:
             self.logger.debug(f"메타데이터 캐시 히트: {file_id}")
         return result
     
-    def _generate_cache_key(self, text_chunks: List[str]) -> str:
-        """텍스트 청크들의 캐시 키 생성"""
-        combined_text = "".join(text_chunks)
-        return hashlib.md5(combined_text.encode('utf-8')).hexdigest()
-    
     def _generate_file_cache_key(self, file_path: str) -> str:
         """파일 기반 캐시 키 생성 (파일 수정 시간 포함)"""
         try:
@@ -394,7 +386,7 @@ class CacheManager:
         """종합 캐시 통계"""
         return {
             "uptime_seconds": time.time() - self.start_time,
-            "embedding_cache": self.embedding_cache.get_stats().__dict__,
+            "embedding_cache": self.embedding_cache.get_stats(),
             "chunk_cache": self.chunk_cache.get_stats().__dict__,
             "metadata_cache": self.metadata_cache.get_stats().__dict__,
             "connection_pool": self.connection_pool.get_pool_stats(),
@@ -0,0 +1,323 @@
+"""
+채팅 히스토리 저장소 (SQLite WAL)
+
+기존 data/chat_history.json은 메시지마다 전체 파일을 읽고 다시 써서 저장 비용이 전체 히스토리 크기에 비례하고,
+동시 요청 시 마지막 쓰기가 앞선 쓰기를 덮어쓰는 문제가 있었습니다.
+- 메시지 한 건 = 한 행 (append-only), (user_id, timestamp) 인덱스
+- 쓰기는 전용 스레드가 큐를 모아 한 트랜잭션으로 커밋 (group commit)
+- 조회는 커서 기반 페이지네이션 (before 커서 = 마지막으로 받은 메시지의 "timestamp|seq")
+- 최초 사용 시 기존 chat_history.json을 한 번 가져옵니다
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import asyncio
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..core.logger import get_console_logger
+
+_clog = get_console_logger()
+
+# 사용자별 최대 보관 메시지 수 (기존 JSON 저장 방식과 동일, 50개 대화)
+MAX_MESSAGES_PER_USER = 100
+# 한 트랜잭션에 묶을 최대 메시지 수
+WRITE_BATCH_SIZE = 256
+
+# 메시지 dict에서 별도 컬럼으로 저장하는 키 (나머지는 extra JSON으로 보관)
+_COLUMN_KEYS = {"seq", "id", "user_id", "role", "message", "timestamp", "category_ids", "sources", "cursor"}
+
+
+class ChatHistoryStore:
+    """append-only SQLite 채팅 히스토리 저장소"""
+
+    def __init__(self, db_path: Optional[str] = None, legacy_json_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(settings.DATA_DIR, "db", "chat_messages.db")
+        self.legacy_json_path = legacy_json_path or os.path.join(settings.DATA_DIR, "chat_history.json")
+
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+        self._queue: "queue.Queue[Tuple[List[Dict[str, Any]], Future]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+
+        self.stats = {"writes": 0, "batches": 0, "trimmed": 0}
+
+    # ------------------------------------------------------------------
+    # 연결 / 스키마
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_initialized(self):
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = self._connect()
+            try:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS chat_messages (
+                        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                        message_id TEXT,
+                        user_id TEXT NOT NULL,
+                        role TEXT NOT NULL,
+                        message TEXT,
+                        timestamp TEXT NOT NULL,
+                        category_ids TEXT,
+                        sources TEXT,
+                        extra TEXT
+                    )
+                """)
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_chat_messages_user_time ON chat_messages(user_id, timestamp)"
+                )
+                conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)")
+                conn.commit()
+                self._migrate_legacy_json(conn)
+            finally:
+                conn.close()
+
+            self._writer = threading.Thread(target=self._writer_loop, name="chat-history-writer", daemon=True)
+            self._writer.start()
+            self._initialized = True
+
+    def _read_conn(self) -> sqlite3.Connection:
+        """스레드별 읽기 연결 (WAL이므로 쓰기와 서로 막지 않음)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------
+    # 마이그레이션
+    # ------------------------------------------------------------------
+
+    def _migrate_legacy_json(self, conn: sqlite3.Connection):
+        """기존 chat_history.json을 한 번만 가져옵니다."""
+        row = conn.execute("SELECT value FROM store_meta WHERE key = 'legacy_json_migrated'").fetchone()
+        if row is not None or not os.path.exists(self.legacy_json_path):
+            return
+
+        try:
+            with open(self.legacy_json_path, "r", encoding="utf-8") as f:
+                all_history = json.load(f)
+        except Exception as e:
+            _clog.warning(f"기존 채팅 히스토리 JSON 로드 실패, 마이그레이션 건너뜀: {e}")
+            return
+
+        rows = []
+        for user_id, messages in (all_history or {}).items():
+            for message in messages or []:
+                rows.append(self._to_row({**message, "user_id": message.get("user_id") or user_id}))
+
+        conn.executemany(
+            "INSERT INTO chat_messages (message_id, user_id, role, message, timestamp, category_ids, sources, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO store_meta (key, value) VALUES ('legacy_json_migrated', ?)",
+            (datetime.now().isoformat(),),
+        )
+        conn.commit()
+
+        # 원본은 지우지 않고 이름만 바꿔 보관
+        try:
+            os.replace(self.legacy_json_path, self.legacy_json_path + ".migrated")
+        except OSError:
+            pass
+        _clog.info(f"📦 채팅 히스토리 마이그레이션 완료: {len(all_history or {})}명, {len(rows)}개 메시지")
+
+    # ------------------------------------------------------------------
+    # 쓰기 (group commit)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _to_row(message: Dict[str, Any]) -> Tuple:
+        extra = {k: v for k, v in message.items() if k not in _COLUMN_KEYS}
+        return (
+            message.get("id"),
+            message["user_id"],
+            message.get("role", "user"),
+            message.get("message", ""),
+            message.get("timestamp") or datetime.now().isoformat(),
+            json.dumps(message.get("category_ids") or [], ensure_ascii=False),
+            json.dumps(message.get("sources") or [], ensure_ascii=False),
+            json.dumps(extra, ensure_ascii=False) if extra else None,
+        )
+
+    def _writer_loop(self):
+        conn = self._connect()
+        while True:
+            # 한 배치의 실패가 쓰기 스레드를 죽이면 이후 모든 append가 영원히 대기하므로 루프 본문 전체를 보호
+            try:
+                batch = self._next_batch()
+                error = self._commit_batch(conn, batch)
+                # 커밋 결과 전달은 DB 트랜잭션 밖에서 (이미 커밋된 행을 롤백하거나 실패로 보고하지 않도록)
+                for _, future in batch:
+                    self._resolve_future(future, error)
+            except Exception as e:
+                _clog.error(f"채팅 히스토리 쓰기 스레드 오류: {e}")
+
+    def _next_batch(self) -> List[Tuple[List[Dict[str, Any]], Future]]:
+        batch = [self._queue.get()]
+        # 대기 중인 쓰기를 모아 한 번에 커밋
+        message_count = len(batch[0][0])
+        while message_count < WRITE_BATCH_SIZE:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            message_count += len(item[0])
+        return batch
+
+    def _commit_batch(self, conn: sqlite3.Connection, batch: List[Tuple[List[Dict[str, Any]], Future]]) -> Optional[Exception]:
+        """배치를 한 트랜잭션으로 커밋합니다. 실패 시 예외 객체를 반환합니다."""
+        try:
+            rows = [self._to_row(message) for messages, _ in batch for message in messages]
+            conn.executemany(
+                "INSERT INTO chat_messages (message_id, user_id, role, message, timestamp, category_ids, sources, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            for user_id in {row[1] for row in rows}:
+                self._trim_user_locked(conn, user_id)
+            conn.commit()
+        except Exception as e:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            _clog.warning(f"채팅 히스토리 저장 실패: {e}")
+            return e
+        self.stats["writes"] += len(rows)
+        self.stats["batches"] += 1
+        return None
+
+    @staticmethod
+    def _resolve_future(future: Future, error: Optional[Exception]):
+        """호출자가 이미 취소한 Future는 건너뜁니다 (취소된 Future에 결과를 설정하면 InvalidStateError)."""
+        if not future.set_running_or_notify_cancel():
+            return
+        if error is None:
+            future.set_result(True)
+        else:
+            future.set_exception(error)
+
+    def _trim_user_locked(self, conn: sqlite3.Connection, user_id: str):
+        """사용자별 보관 한도를 넘는 오래된 메시지 삭제 (인덱스로 경계만 찾으므로 전체 크기와 무관)"""
+        boundary = conn.execute(
+            "SELECT timestamp, seq FROM chat_messages WHERE user_id = ? ORDER BY timestamp DESC, seq DESC LIMIT 1 OFFSET ?",
+            (user_id, MAX_MESSAGES_PER_USER),
+        ).fetchone()
+        if boundary is None:
+            return
+        cursor = conn.execute(
+            "DELETE FROM chat_messages WHERE user_id = ? AND (timestamp < ? OR (timestamp = ? AND seq <= ?))",
+            (user_id, boundary[0], boundary[0], boundary[1]),
+        )
+        self.stats["trimmed"] += cursor.rowcount
+
+    def append(self, messages: List[Dict[str, Any]]) -> Future:
+        """메시지를 쓰기 큐에 넣고 커밋 완료 시 결과가 설정되는 Future를 반환합니다."""
+        self._ensure_initialized()
+        future: Future = Future()
+        if not messages:
+            future.set_result(True)
+            return future
+        self._queue.put((list(messages), future))
+        return future
+
+    async def append_async(self, messages: List[Dict[str, Any]]) -> bool:
+        """메시지를 저장하고 커밋될 때까지 기다립니다."""
+        return await asyncio.wrap_future(self.append(messages))
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _encode_cursor(timestamp: str, seq: int) -> str:
+        return f"{timestamp}|{seq}"
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, int]:
+        timestamp, _, seq = cursor.rpartition("|")
+        return timestamp, int(seq)
+
+    def _row_to_message(self, row: sqlite3.Row) -> Dict[str, Any]:
+        message = json.loads(row["extra"]) if row["extra"] else {}
+        message.update({
+            "id": row["message_id"] or str(row["seq"]),
+            "user_id": row["user_id"],
+            "message": row["message"],
+            "role": row["role"],
+            "timestamp": row["timestamp"],
+            "category_ids": json.loads(row["category_ids"]) if row["category_ids"] else [],
+            "sources": json.loads(row["sources"]) if row["sources"] else [],
+            "cursor": self._encode_cursor(row["timestamp"], row["seq"]),
+        })
+        return message
+
+    def get_page(self, user_id: str, limit: int = 50, before: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """사용자 메시지를 최신 순으로 조회합니다. (메시지 목록, 다음 페이지 커서)를 반환"""
+        self._ensure_initialized()
+        limit = max(1, min(int(limit), MAX_MESSAGES_PER_USER))
+
+        sql = "SELECT * FROM chat_messages WHERE user_id = ?"
+        params: List[Any] = [user_id]
+        if before:
+            timestamp, seq = self._decode_cursor(before)
+            sql += " AND (timestamp < ? OR (timestamp = ? AND seq < ?))"
+            params.extend([timestamp, timestamp, seq])
+        sql += " ORDER BY timestamp DESC, seq DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self._read_conn().execute(sql, params).fetchall()
+        messages = [self._row_to_message(row) for row in rows[:limit]]
+        next_cursor = messages[-1]["cursor"] if len(rows) > limit else None
+        return messages, next_cursor
+
+    async def get_page_async(self, user_id: str, limit: int = 50, before: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        return await asyncio.to_thread(self.get_page, user_id, limit, before)
+
+    def count(self, user_id: Optional[str] = None) -> int:
+        self._ensure_initialized()
+        if user_id:
+            row = self._read_conn().execute("SELECT COUNT(*) FROM chat_messages WHERE user_id = ?", (user_id,)).fetchone()
+        else:
+            row = self._read_conn().execute("SELECT COUNT(*) FROM chat_messages").fetchone()
+        return row[0]
+
+
+# 싱글톤 인스턴스
+_chat_history_store = None
+_chat_history_store_lock = threading.Lock()
+
+
+def get_chat_history_store() -> ChatHistoryStore:
+    """ChatHistoryStore 싱글톤 인스턴스 반환"""
+    global _chat_history_store
+
+    if _chat_history_store is None:
+        with _chat_history_store_lock:
+            if _chat_history_store is None:
+                _chat_history_store = ChatHistoryStore()
+
+    return _chat_history_store
@@ -1,7 +1,8 @@
 import time
 import os
 import json
-from typing import Dict, Any, List
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from ..models.schemas import ChatRequest, ChatResponse
 from ..core.config import settings
 from .file_service import FileService
@@ -9,15 +10,25 @@ from .langflow_service import LangflowService
 from .persona_service import PersonaService
 from .settings_service import settings_service
 from .model_profile_service import model_profile_service
+from .llm_gateway import get_llm_gateway
+from .chat_history_store import get_chat_history_store
+from .retrieval_cache import get_retrieval_cache
+from .semantic_answer_cache import CachedAnswer, answer_scope, get_semantic_answer_cache
+from .context_packer import pack_context
 from ..utils.image_utils import extract_image_path_from_chunk, is_image_chunk, create_vision_image_content
 import openai
 from datetime import datetime
 
+# 백그라운드 히스토리 저장이 이 시간 안에 커밋되지 않으면 유실 가능성을 로그로 남김
+HISTORY_SAVE_TIMEOUT_SECONDS = 30.0
+
 class ChatService:
     def __init__(self):
         self.file_service = FileService()
         self.langflow_service = LangflowService()
         self.persona_service = PersonaService()
+        # 완료 전에 가비지 컬렉션되지 않도록 진행 중인 저장 감시 태스크 보관
+        self._history_save_tasks = set()
     
     async def _get_llm_client(self):
         """현재 모델 설정에 따라 LLM 클라이언트를 반환합니다."""
@@ -36,13 +47,11 @@ class ChatService:
             api_key = llm_config.get("api_key", "")
             
             if provider == "openai" and api_key:
-                import openai
-                client = openai.OpenAI(api_key=api_key)
+                client = get_llm_gateway().get_sync_client("openai", api_key)
                 return client, provider
             elif provider == "anthropic" and api_key:
                 try:
-                    import anthropic
-                    client = anthropic.Anthropic(api_key=api_key)
+                    client = get_llm_gateway().get_sync_client("anthropic", api_key)
                     return client, provider
                 except ImportError:
                     print("Anthropic 패키지가 설치되지 않았습니다. pip install anthropic으로 설치해주세요.")
@@ -57,8 +66,7 @@ class ChatService:
                     return None, None
             elif provider == "groq" and api_key:
                 try:
-                    import groq
-                    client = groq.Groq(api_key=api_key)
+                    client = get_llm_gateway().get_sync_client("groq", api_key)
                     return client, provider
                 except ImportError:
                     print("Groq 패키지가 설치되지 않았습니다. pip install groq로 설치해주세요.")
@@ -111,12 +119,12 @@ class ChatService:
                         # 마지막 메시지 업데이트
                         messages[-1]["content"] = content
                 
-                response = llm_client.chat.completions.create(
+                response = await get_llm_gateway().run_sync(provider, lambda: llm_client.chat.completions.create(
                     model=model,
                     messages=messages,
                     max_tokens=max_tokens,
                     temperature=temperature
-                )
+                ))
                 return response.choices[0].message.content
             
             else:
@@ -152,13 +160,16 @@ class ChatService:
             
             print(f"LLM 호출: {provider} {model} (temp: {temperature})")
             
+            # 동기 SDK 호출은 게이트웨이 스레드 풀에서 실행 (이벤트 루프 비차단)
+            gateway = get_llm_gateway()
+            
             if provider == "openai":
-                response = llm_client.chat.completions.create(
+                response = await gateway.run_sync(provider, lambda: llm_client.chat.completions.create(
                     model=model,
                     messages=messages,
                     max_tokens=max_tokens,
                     temperature=temperature
-                )
+                ))
                 return response.choices[0].message.content
                 
             elif provider == "anthropic":
@@ -172,13 +183,13 @@ class ChatService:
                     else:
                         user_messages.append(msg)
                 
-                response = llm_client.messages.create(
+                response = await gateway.run_sync(provider, lambda: llm_client.messages.create(
                     model=model,
                     max_tokens=max_tokens,
                     temperature=temperature,
                     system=system_message,
                     messages=user_messages
-                )
+                ))
                 return response.content[0].text
                 
             elif provider == "google":
@@ -195,22 +206,22 @@ class ChatService:
                 
                 prompt = "\n\n".join(prompt_parts)
                 
-                response = model_instance.generate_content(
+                response = await gateway.run_sync(provider, lambda: model_instance.generate_content(
                     prompt,
                     generation_config={
                         "temperature": temperature,
                         "max_output_tokens": max_tokens,
                     }
-                )
+                ))
                 return response.text
                 
             elif provider == "groq":
-                response = llm_client.chat.completions.create(
+                response = await gateway.run_sync(provider, lambda: llm_client.chat.completions.create(
                     model=model,
                     messages=messages,
                     max_tokens=max_tokens,
                     temperature=temperature
-                )
+                ))
                 return response.choices[0].message.content
                 
             else:
@@ -221,8 +232,13 @@ class ChatService:
             return f"LLM 호출 중 오류가 발생했습니다: {str(e)}"
     
     async def process_chat(self, request: ChatRequest) -> ChatResponse:
-        """채팅 요청을 처리하고 응답을 생성합니다."""
+        """채팅 요청을 처리하고 응답을 생성합니다.
+        
+        시스템 메시지 구성과 검색은 동시에 실행하고, 채팅 히스토리 저장은 기록 스레드에 넘겨 기다리지 않습니다.
+        디버그 모드에서는 단계별 소요 시간을 응답의 timings에 담습니다.
+        """
         start_time = time.time()
+        timings: Dict[str, float] = {}
         
         try:
             print(f"=== 채팅 요청 처리 시작 ===")
@@ -235,13 +251,9 @@ class ChatService:
             print(f"첨부된 이미지 수: {len(request.images) if request.images else 0}")
             print(f"🎯 요청된 출력 형식: {request.output_format}")
             
-            # 최종 시스템 메시지 구성 (페르소나 + 설정 + 출력 형식 조합)
-            final_system_message = await self._build_system_message(request.system_message, request.persona_id, request.output_format)
-            print(f"최종 시스템 메시지: {final_system_message}")
-            
-            # 채팅 히스토리에 사용자 메시지 저장
+            # 채팅 히스토리에 사용자 메시지 저장 (백그라운드)
             if request.user_id:
-                await self._save_chat_message(
+                self._save_chat_message_in_background(
                     user_id=request.user_id,
                     message=request.message,
                     role="user",
@@ -251,152 +263,113 @@ class ChatService:
             # 기본 검색 Flow ID 확인
             search_flow_id = request.flow_id or await self._get_default_search_flow()
             
-            if search_flow_id:
-                print(f"LangFlow 검색 Flow 사용: {search_flow_id}")
-                # LangFlow 검색 플로우 실행
-                langflow_result = await self.langflow_service.search_with_flow(
-                    request.message,
-                    search_flow_id,
-                    request.category_ids,
-                    top_k=request.top_k  # 요청에서 top_k 설정 사용
+            # 최종 시스템 메시지 구성 (페르소나 + 설정 + 출력 형식 조합)
+            system_message_stage = self._timed(
+                timings, "system_message",
+                self._build_system_message(request.system_message, request.persona_id, request.output_format)
+            )
+            
+            context_report = None
+            query_embedding = None
+            answer_cache_scope = None
+            if get_semantic_answer_cache().enabled and not request.images:
+                # 의미 기반 답변 캐시 (이미지 첨부 시 제외): 범위 키에 최종 시스템 메시지가 필요하므로
+                # 쿼리 임베딩만 시스템 메시지 구성과 동시에 하고, 캐시에 없을 때 검색
+                final_system_message, query_embedding = await asyncio.gather(
+                    system_message_stage,
+                    self._timed(timings, "query_embedding", self._embed_for_answer_cache(request.message))
+                )
+                answer_cache_scope = answer_scope(
+                    request.category_ids, request.persona_id, request.output_format,
+                    final_system_message, search_flow_id
                 )
+                cached_answer = await self._lookup_cached_answer(query_embedding, answer_cache_scope)
+                if cached_answer is not None:
+                    return self._respond_with_cached_answer(request, cached_answer, start_time, timings)
+                relevant_documents, from_flow = await self._timed(
+                    timings, "retrieval", self._retrieve_documents(request, search_flow_id, timings)
+                )
+            else:
+                final_system_message, (relevant_documents, from_flow) = await asyncio.gather(
+                    system_message_stage,
+                    self._timed(timings, "retrieval", self._retrieve_documents(request, search_flow_id, timings))
+                )
+            print(f"최종 시스템 메시지: {final_system_message}")
+            
+            generation_start = time.time()
+            if from_flow and relevant_documents:
+                # 이미지가 포함된 검색 결과가 있는지 확인
+                has_image_chunks = any(doc.get("is_image_chunk", False) for doc in relevant_documents)
                 
-                print(f"LangFlow 결과: {langflow_result}")
+                # LLM에 넘길 컨텍스트는 토큰 예산에 맞춰 정리 (출처/이미지는 원본 검색 결과 기준)
+                prompt_documents, context_report = self._pack_context(relevant_documents)
                 
-                # LangFlow 결과에서 응답과 소스 추출
-                if langflow_result.get("status") == "success":
-                    # 직접 ChromaDB 검색 결과 처리
-                    search_results = langflow_result.get("results", [])
-                    print(f"검색 결과: {len(search_results)}개 발견")
+                # LangFlow를 통해 응답 생성 (Flow 기반 모델 사용)
+                if request.images and len(request.images) > 0:
+                    # 멀티모달 처리: 이미지 + 텍스트
+                    print(f"멀티모달 모드: 이미지 {len(request.images)}개와 텍스트 처리")
+                    response_text = await self.generate_multimodal_response_with_flow(
+                        request.message, 
+                        request.images,
+                        prompt_documents, 
+                        final_system_message,
+                        search_flow_id
+                    )
+                elif has_image_chunks:
+                    # 검색 결과에 이미지가 포함된 경우 텍스트 기반 이미지 참조 처리
+                    print(f"🖼️ 검색 결과에 이미지가 포함되어 텍스트 기반으로 처리합니다.")
+                    enhanced_documents, related_image_paths = self._enhance_context_with_images(prompt_documents)
                     
-                    if search_results:
-                        # 검색 결과 구조 확인을 위한 디버그
-                        print(f"첫 번째 검색 결과 구조: {search_results[0] if search_results else 'None'}")
-                        
-                        # 검색 결과를 문서 형식으로 변환
-                        relevant_documents = []
-                        for i, result in enumerate(search_results):
-                            metadata = result.get("metadata", {})
-                            filename = metadata.get("filename", "") or metadata.get("file_name", "") or metadata.get("source", "")
-                            content = result.get("text", "") or result.get("content", "")
-                            
-                            doc = {
-                                "file_id": metadata.get("file_id", ""),
-                                "filename": filename,
-                                "category_id": metadata.get("category_id", ""),
-                                "category_name": metadata.get("category_name", ""),
-                                "content": content,
-                                "score": result.get("score", 1.0),
-                                "distance": result.get("distance", 1.0),
-                                "metadata": metadata  # 전체 메타데이터 포함 (이미지 정보 포함)
-                            }
-                            
-                            # 이미지 청크 감지 및 메타데이터 추가
-                            if is_image_chunk(content):
-                                image_path = extract_image_path_from_chunk(content)
-                                if image_path:
-                                    doc["image_path"] = image_path
-                                    doc["is_image_chunk"] = True
-                                    print(f"🖼️ 검색 결과에서 이미지 청크 발견: {image_path}")
-                                else:
-                                    doc["is_image_chunk"] = False
-                            else:
-                                doc["is_image_chunk"] = False
-                            
-                            relevant_documents.append(doc)
-                            
-                            print(f"변환된 문서 {i+1}: file_id={doc['file_id']}, filename='{doc['filename']}', score={doc['score']:.3f}, distance={doc['distance']:.3f}, 이미지={doc.get('is_image_chunk', False)}")
-                        
-                        # 점수 순으로 정렬 (높은 점수가 먼저)
-                        relevant_documents.sort(key=lambda x: x['score'], reverse=True)
-                        print(f"점수순 정렬 후 첫 3개 문서:")
-                        for i, doc in enumerate(relevant_documents[:3]):
-                            print(f"  {i+1}위: {doc['filename']} (점수: {doc['score']:.3f})")
-                        
-                        # 이미지가 포함된 검색 결과가 있는지 확인
-                        has_image_chunks = any(doc.get("is_image_chunk", False) for doc in relevant_documents)
-                        
-                        # LangFlow를 통해 응답 생성 (Flow 기반 모델 사용)
-                        if request.images and len(request.images) > 0:
-                            # 멀티모달 처리: 이미지 + 텍스트
-                            print(f"멀티모달 모드: 이미지 {len(request.images)}개와 텍스트 처리")
-                            response_text = await self.generate_multimodal_response_with_flow(
-                                request.message, 
-                                request.images,
-                                relevant_documents, 
-                                final_system_message,
-                                search_flow_id
-                            )
-                        elif has_image_chunks:
-                            # 검색 결과에 이미지가 포함된 경우 텍스트 기반 이미지 참조 처리
-                            print(f"🖼️ 검색 결과에 이미지가 포함되어 텍스트 기반으로 처리합니다.")
-                            enhanced_documents, related_image_paths = self._enhance_context_with_images(relevant_documents)
-                            
-                            response_text = await self.generate_response_with_flow(
-                                request.message, 
-                                enhanced_documents, 
-                                final_system_message,
-                                search_flow_id
-                            )
-                        else:
-                            # 이미지 정보를 포함한 텍스트 처리 (Vision 모델 사용 안 함)
-                            enhanced_documents, related_image_paths = self._enhance_context_with_images(relevant_documents)
-                            
-                            if related_image_paths:
-                                print(f"📷 관련 이미지 {len(related_image_paths)}개 발견, 텍스트로 포함하여 처리")
-                                for img_path in related_image_paths:
-                                    print(f"  - {img_path}")
-                            
-                            response_text = await self.generate_response_with_flow(
-                                request.message, 
-                                enhanced_documents, 
-                                final_system_message,
-                                search_flow_id
-                            )
-                    else:
-                        print("검색 결과가 없습니다.")
-                        response_text = "죄송합니다, 관련 문서를 찾을 수 없습니다."
-                        relevant_documents = []
-                else:
-                    print(f"LangFlow 실행 실패: {langflow_result.get('error', '알 수 없는 오류')}")
-                    # LangFlow 실패 시 기본 검색으로 폴백
-                    relevant_documents = await self.search_documents(
+                    response_text = await self.generate_response_with_flow(
                         request.message, 
-                        request.category_ids,
-                        request.categories
+                        enhanced_documents, 
+                        final_system_message,
+                        search_flow_id,
+                        context_packed=context_report is not None
                     )
+                else:
+                    # 이미지 정보를 포함한 텍스트 처리 (Vision 모델 사용 안 함)
+                    enhanced_documents, related_image_paths = self._enhance_context_with_images(prompt_documents)
+                    
+                    if related_image_paths:
+                        print(f"📷 관련 이미지 {len(related_image_paths)}개 발견, 텍스트로 포함하여 처리")
+                        for img_path in related_image_paths:
+                            print(f"  - {img_path}")
+                    
                     response_text = await self.generate_response_with_flow(
                         request.message, 
-                        relevant_documents, 
+                        enhanced_documents, 
                         final_system_message,
-                        None  # fallback일 때는 기본 flow 사용
+                        search_flow_id,
+                        context_packed=context_report is not None
                     )
+            elif from_flow:
+                print("검색 결과가 없습니다.")
+                response_text = "죄송합니다, 관련 문서를 찾을 수 없습니다."
             else:
-                print("검색 Flow가 설정되지 않았습니다. 기본 검색을 사용합니다.")
-                # 기본 검색 (fallback)
-                relevant_documents = await self.search_documents(
-                    request.message, 
-                    request.category_ids,
-                    request.categories
-                )
+                # 기본 검색 결과로 응답 생성 (LangFlow 검색 실패 또는 검색 Flow 미설정)
+                prompt_documents, context_report = self._pack_context(relevant_documents)
                 response_text = await self.generate_response_with_flow(
                     request.message, 
-                    relevant_documents, 
+                    prompt_documents, 
                     final_system_message,
-                    None  # 기본 flow 사용
+                    None,  # 기본 flow 사용
+                    context_packed=context_report is not None
                 )
+            timings["generation"] = round(time.time() - generation_start, 4)
             
             processing_time = time.time() - start_time
             print(f"처리 시간: {processing_time:.2f}초")
             
+            postprocess_start = time.time()
             # 소스 문서: 파일 단위로 중복 제거(동일 문서는 1개만)
             print(f"중복 제거 전 relevant_documents: {[doc.get('filename', 'NO_NAME') for doc in relevant_documents]}")
             sources_for_response = self._unique_sources(relevant_documents)
             print(f"중복 제거 후 sources_for_response: {[src.get('filename', 'NO_NAME') for src in sources_for_response]}")
 
-            # 채팅 히스토리에 어시스턴트 응답 저장
+            # 채팅 히스토리에 어시스턴트 응답 저장 (백그라운드)
             if request.user_id:
-                await self._save_chat_message(
+                self._save_chat_message_in_background(
                     user_id=request.user_id,
                     message=response_text,
                     role="assistant",
@@ -421,6 +394,21 @@ class ChatService:
                 for img_path in related_images:
                     print(f"  - {img_path}")
             
+            # 벡터 검색 근거가 있는 답변만 답변 캐시에 저장
+            source_chunk_ids = [doc["chunk_id"] for doc in relevant_documents if doc.get("chunk_id")]
+            if query_embedding is not None and source_chunk_ids:
+                get_semantic_answer_cache().store(query_embedding, CachedAnswer(
+                    scope=answer_cache_scope,
+                    query=request.message,
+                    response=response_text,
+                    source_chunk_ids=source_chunk_ids,
+                    sources=sources_for_response,
+                    related_images=related_images,
+                    flow_id=search_flow_id,
+                    collection_version=get_retrieval_cache().version
+                ))
+            timings["postprocess"] = round(time.time() - postprocess_start, 4)
+            
             return ChatResponse(
                 response=response_text,
                 sources=sources_for_response,
@@ -429,7 +417,9 @@ class ChatService:
                 categories=request.categories,
                 flow_id=search_flow_id,
                 user_id=request.user_id,
-                related_images=related_images
+                related_images=related_images,
+                context_packing=context_report,
+                timings=self._debug_timings(timings, start_time)
             )
             
         except Exception as e:
@@ -447,8 +437,312 @@ class ChatService:
                 categories=request.categories or [],
                 flow_id=request.flow_id,
                 user_id=request.user_id,
-                related_images=[]
+                related_images=[],
+                timings=self._debug_timings(timings, start_time)
+            )
+    
+    @staticmethod
+    async def _timed(timings: Dict[str, float], stage: str, awaitable):
+        """awaitable을 실행하며 소요 시간을 timings[stage]에 기록합니다."""
+        stage_start = time.time()
+        try:
+            return await awaitable
+        finally:
+            timings[stage] = round(time.time() - stage_start, 4)
+    
+    @staticmethod
+    def _debug_timings(timings: Dict[str, float], start_time: float) -> Optional[Dict[str, float]]:
+        """디버그 모드일 때만 단계별 소요 시간 반환 (동시 실행 단계가 있어 합계는 total보다 클 수 있음)"""
+        if not settings_service.get_section_settings("system").get("debugMode", False):
+            return None
+        return {**timings, "total": round(time.time() - start_time, 4)}
+    
+    @staticmethod
+    def _record_rerank_timing(timings: Optional[Dict[str, float]], search_result: Dict[str, Any]):
+        """검색 결과의 재정렬 보고서에서 재정렬 소요 시간을 timings["rerank"]에 기록합니다 (retrieval에 포함된 값)."""
+        rerank_report = search_result.get("rerank")
+        if timings is not None and rerank_report and rerank_report.get("applied"):
+            timings["rerank"] = round(rerank_report["elapsed_ms"] / 1000, 4)
+    
+    async def _retrieve_documents(
+        self, request: ChatRequest, search_flow_id: Optional[str], timings: Optional[Dict[str, float]] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """검색 단계. (검색 문서, LangFlow 검색 Flow 결과 여부) 반환 - Flow 실패/미설정 시 기본 검색으로 폴백"""
+        if search_flow_id:
+            print(f"LangFlow 검색 Flow 사용: {search_flow_id}")
+            # LangFlow 검색 플로우 실행
+            langflow_result = await self.langflow_service.search_with_flow(
+                request.message,
+                search_flow_id,
+                request.category_ids,
+                top_k=request.top_k,  # 요청에서 top_k 설정 사용
+                search_mode=request.search_mode,
+                vector_weight=request.vector_weight,
+                lexical_weight=request.lexical_weight
+            )
+            
+            print(f"LangFlow 결과: {langflow_result}")
+            
+            if langflow_result.get("status") == "success":
+                self._record_rerank_timing(timings, langflow_result)
+                # 직접 ChromaDB 검색 결과 처리
+                search_results = langflow_result.get("results", [])
+                print(f"검색 결과: {len(search_results)}개 발견")
+                if search_results:
+                    # 검색 결과 구조 확인을 위한 디버그
+                    print(f"첫 번째 검색 결과 구조: {search_results[0]}")
+                # 검색 결과를 문서 형식으로 변환 (점수순 정렬)
+                return self._search_results_to_documents(search_results), True
+            
+            print(f"LangFlow 실행 실패: {langflow_result.get('error', '알 수 없는 오류')}")
+        else:
+            print("검색 Flow가 설정되지 않았습니다. 기본 검색을 사용합니다.")
+        
+        # LangFlow 실패 시 또는 Flow 미설정 시 기본 검색으로 폴백
+        documents = await self.search_documents(
+            request.message, 
+            request.category_ids,
+            request.categories
+        )
+        return documents, False
+    
+    async def _embed_for_answer_cache(self, query: str) -> Optional[List[float]]:
+        """답변 캐시 조회용 쿼리 임베딩 (검색 캐시에도 남아 이어지는 검색에서 재사용됨)"""
+        from .vector_service import VectorService
+        try:
+            return await VectorService().embed_query(query)
+        except Exception as e:
+            print(f"⚠️ 답변 캐시용 쿼리 임베딩 실패: {e}")
+            return None
+    
+    async def _lookup_cached_answer(self, query_embedding: Optional[List[float]], scope: str) -> Optional[CachedAnswer]:
+        """쿼리 임베딩으로 답변 캐시를 조회하고, 재사용할 답변이 있으면 반환합니다."""
+        if query_embedding is None:
+            return None
+        
+        answer_cache = get_semantic_answer_cache()
+        found = answer_cache.lookup(query_embedding, scope)
+        if found is None:
+            return None
+        
+        entry_id, cached_answer, similarity = found
+        # 저장 이후 컬렉션이 바뀌었으면 근거 청크가 아직 있는지 확인
+        if cached_answer.collection_version != get_retrieval_cache().version:
+            from .vector_service import VectorService
+            if not await VectorService().chunks_exist(cached_answer.source_chunk_ids):
+                print(f"♻️ 답변 캐시 항목의 근거 청크가 삭제되어 폐기: '{cached_answer.query[:50]}'")
+                answer_cache.discard(entry_id)
+                return None
+        
+        answer_cache.record_hit(entry_id)
+        print(f"💾 답변 캐시 적중 (유사도 {similarity:.3f}): '{cached_answer.query[:50]}'")
+        return cached_answer
+    
+    def _respond_with_cached_answer(
+        self, request: ChatRequest, cached_answer: CachedAnswer, start_time: float, timings: Dict[str, float]
+    ) -> ChatResponse:
+        """캐시된 답변으로 응답을 만들고 채팅 히스토리에 저장합니다 (백그라운드)."""
+        if request.user_id:
+            self._save_chat_message_in_background(
+                user_id=request.user_id,
+                message=cached_answer.response,
+                role="assistant",
+                category_ids=request.category_ids,
+                sources=cached_answer.sources
             )
+        
+        return ChatResponse(
+            response=cached_answer.response,
+            sources=cached_answer.sources,
+            confidence=0.7,
+            processing_time=time.time() - start_time,
+            categories=request.categories,
+            flow_id=cached_answer.flow_id,
+            user_id=request.user_id,
+            related_images=cached_answer.related_images,
+            timings=self._debug_timings(timings, start_time)
+        )
+    
+    async def process_chat_stream(self, request: ChatRequest) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        채팅 요청을 스트리밍으로 처리합니다. (이벤트명, 데이터)를 순서대로 생성합니다.
+        - sources: 검색된 참조 문서 (LLM 호출 전)
+        - token: LLM 응답 토큰
+        - done: 신뢰도, 처리 시간, 첫 토큰까지 걸린 시간, 관련 이미지, 전체 응답
+        """
+        start_time = time.time()
+        timings: Dict[str, float] = {}
+        
+        # 채팅 히스토리에 사용자 메시지 저장 (백그라운드)
+        if request.user_id:
+            self._save_chat_message_in_background(
+                user_id=request.user_id,
+                message=request.message,
+                role="user",
+                category_ids=request.category_ids
+            )
+        
+        # 1. 검색 (시스템 메시지 구성과 동시에 실행)
+        search_flow_id = request.flow_id or await self._get_default_search_flow()
+        
+        async def _search() -> List[Dict[str, Any]]:
+            if search_flow_id:
+                langflow_result = await self.langflow_service.search_with_flow(
+                    request.message,
+                    search_flow_id,
+                    request.category_ids,
+                    top_k=request.top_k,
+                    search_mode=request.search_mode,
+                    vector_weight=request.vector_weight,
+                    lexical_weight=request.lexical_weight
+                )
+                if langflow_result.get("status") == "success":
+                    self._record_rerank_timing(timings, langflow_result)
+                    return self._search_results_to_documents(langflow_result.get("results", []))
+                return []
+            return await self.search_documents(
+                request.message,
+                request.category_ids,
+                request.categories
+            )
+        
+        # 최종 시스템 메시지 구성 (페르소나 + 설정 + 출력 형식 조합)
+        final_system_message, relevant_documents = await asyncio.gather(
+            self._timed(
+                timings, "system_message",
+                self._build_system_message(request.system_message, request.persona_id, request.output_format)
+            ),
+            self._timed(timings, "retrieval", _search())
+        )
+        
+        sources_for_response = self._unique_sources(relevant_documents)
+        related_images = self._extract_images_from_context(relevant_documents) if relevant_documents else []
+        prompt_documents, context_report = self._pack_context(relevant_documents)
+        yield "sources", {
+            "sources": sources_for_response,
+            "retrieval_time": time.time() - start_time
+        }
+        
+        # 2. 응답 생성 (토큰 스트리밍)
+        response_parts: List[str] = []
+        first_token_time = None
+        
+        if search_flow_id and not relevant_documents:
+            response_parts.append("죄송합니다, 관련 문서를 찾을 수 없습니다.")
+            yield "token", {"text": response_parts[0]}
+        elif request.images:
+            # 멀티모달 응답은 스트리밍하지 않고 한 번에 전송
+            response_text = await self.generate_multimodal_response_with_flow(
+                request.message,
+                request.images,
+                prompt_documents,
+                final_system_message,
+                search_flow_id
+            )
+            response_parts.append(response_text)
+            first_token_time = time.time() - start_time
+            yield "token", {"text": response_text}
+        else:
+            enhanced_documents, _ = self._enhance_context_with_images(prompt_documents)
+            prompt = self._build_flow_prompt(request.message, enhanced_documents, context_report is not None)
+            flow_id_to_use = search_flow_id or await self._get_default_search_flow()
+            
+            try:
+                if not flow_id_to_use:
+                    raise RuntimeError("Flow ID가 없습니다")
+                async for text in self.langflow_service.stream_flow_with_llm(
+                    flow_id_to_use,
+                    prompt,
+                    final_system_message,
+                    model_config=self._get_chat_model_config()
+                ):
+                    if first_token_time is None:
+                        first_token_time = time.time() - start_time
+                    response_parts.append(text)
+                    yield "token", {"text": text}
+            except Exception as e:
+                print(f"LLM 스트리밍 실패: {e}")
+                # 토큰을 하나도 보내지 못했으면 기존 방식으로 전체 응답 생성
+                if not response_parts:
+                    response_text = await self.generate_response_fallback(request.message, prompt_documents, final_system_message)
+                    response_parts.append(response_text)
+                    first_token_time = time.time() - start_time
+                    yield "token", {"text": response_text}
+                else:
+                    yield "error", {"message": f"응답 생성이 중단되었습니다: {str(e)}"}
+        
+        response_text = "".join(response_parts)
+        processing_time = time.time() - start_time
+        confidence = 0.7 if relevant_documents else 0.3
+        
+        # 채팅 히스토리에 어시스턴트 응답 저장 (백그라운드)
+        if request.user_id:
+            self._save_chat_message_in_background(
+                user_id=request.user_id,
+                message=response_text,
+                role="assistant",
+                category_ids=request.category_ids,
+                sources=sources_for_response
+            )
+        
+        print(f"스트리밍 처리 완료: {processing_time:.2f}초 (첫 토큰 {first_token_time or 0:.2f}초)")
+        yield "done", {
+            "response": response_text,
+            "sources": sources_for_response,
+            "confidence": confidence,
+            "processing_time": processing_time,
+            "time_to_first_token": first_token_time,
+            "categories": request.categories,
+            "flow_id": search_flow_id,
+            "user_id": request.user_id,
+            "related_images": related_images,
+            "context_packing": context_report,
+            "timings": self._debug_timings(timings, start_time)
+        }
+    
+    def _search_results_to_documents(self, search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """벡터 검색 결과를 LLM 컨텍스트용 문서 형식으로 변환하고 점수순으로 정렬합니다."""
+        relevant_documents = []
+        for i, result in enumerate(search_results):
+            metadata = result.get("metadata", {})
+            filename = metadata.get("filename", "") or metadata.get("file_name", "") or metadata.get("source", "")
+            content = result.get("text", "") or result.get("content", "")
+            
+            doc = {
+                "chunk_id": result.get("id", ""),
+                "file_id": metadata.get("file_id", ""),
+                "filename": filename,
+                "category_id": metadata.get("category_id", ""),
+                "category_name": metadata.get("category_name", ""),
+                "content": content,
+                "score": result.get("score", 1.0),
+                "distance": result.get("distance", 1.0),
+                "metadata": metadata  # 전체 메타데이터 포함 (이미지 정보 포함)
+            }
+            
+            # 이미지 청크 감지 및 메타데이터 추가
+            if is_image_chunk(content):
+                image_path = extract_image_path_from_chunk(content)
+                if image_path:
+                    doc["image_path"] = image_path
+                    doc["is_image_chunk"] = True
+                    print(f"🖼️ 검색 결과에서 이미지 청크 발견: {image_path}")
+                else:
+                    doc["is_image_chunk"] = False
+            else:
+                doc["is_image_chunk"] = False
+            
+            relevant_documents.append(doc)
+            
+            print(f"변환된 문서 {i+1}: file_id={doc['file_id']}, filename='{doc['filename']}', score={doc['score']:.3f}, distance={doc['distance']:.3f}, 이미지={doc.get('is_image_chunk', False)}")
+        
+        # 점수 순으로 정렬 (높은 점수가 먼저)
+        relevant_documents.sort(key=lambda x: x['score'], reverse=True)
+        print(f"점수순 정렬 후 첫 3개 문서:")
+        for i, doc in enumerate(relevant_documents[:3]):
+            print(f"  {i+1}위: {doc['filename']} (점수: {doc['score']:.3f})")
+        
+        return relevant_documents
     
     async def execute_langflow_flow(self, flow_id: str, message: str, context: List[Dict[str, Any]] = None) -> str:
         """특정 Langflow Flow를 실행합니다."""
@@ -608,49 +902,46 @@ class ChatService:
             # 실패 시 일반 모델로 폴백
             return await self.generate_response_with_flow(query, context, system_message, None)
     
-    async def generate_response_with_flow(self, query: str, context: List[Dict[str, Any]], system_message: str = None, flow_id: str = None) -> str:
-        """LangFlow를 통해 동적으로 선택된 LLM 모델로 응답을 생성합니다."""
-        try:
-            # 컨텍스트를 더 명확하게 구분하여 프롬프트 생성
-            context_sections = []
-            sources_info = []
+    def _build_flow_prompt(self, query: str, context: List[Dict[str, Any]], context_packed: bool = False) -> str:
+        """검색 문서로 LLM 프롬프트를 구성합니다 (패킹되지 않은 컨텍스트는 8000자 초과 시 문서별 500자로 축소)."""
+        # 컨텍스트를 더 명확하게 구분하여 프롬프트 생성
+        context_sections = []
+        sources_info = []
+        
+        print(f"전달받은 문서 수: {len(context)}")
+        
+        for i, doc in enumerate(context, 1):
+            source_name = doc.get("filename", f"문서{i}")
+            content = doc.get("content", "")
             
-            print(f"=== LangFlow 기반 LLM 응답 생성 시작 ===")
-            print(f"사용 Flow ID: {flow_id}")
-            print(f"전달받은 문서 수: {len(context)}")
+            # 각 문서를 명확히 구분
+            context_sections.append(f"=== 문서 {i}: {source_name} ===\n{content}\n")
+            sources_info.append(f"[{i}] {source_name}")
             
+            print(f"문서 {i}: {source_name} (길이: {len(content)} 글자)")
+        
+        # 모든 문서 내용을 하나의 컨텍스트로 결합
+        context_text = "\n".join(context_sections)
+        sources_text = "\n".join(sources_info) if sources_info else "참고 문서 없음"
+        
+        print(f"=== 최종 컨텍스트 구성 완료 ===")
+        print(f"소스 정보: {sources_text}")
+        print(f"전체 컨텍스트 길이: {len(context_text)} 글자")
+        
+        # 컨텍스트 길이 확인 및 축소 (패킹이 실제로 수행됐으면 토큰 예산으로 이미 조절됨)
+        if not context_packed and len(context_text) > 8000:  # 8000자 제한
+            print(f"컨텍스트 길이 {len(context_text)}자, 축소 필요")
+            # 각 문서를 500자로 제한
+            shortened_sections = []
             for i, doc in enumerate(context, 1):
                 source_name = doc.get("filename", f"문서{i}")
-                content = doc.get("content", "")
-                
-                # 각 문서를 명확히 구분
-                context_sections.append(f"=== 문서 {i}: {source_name} ===\n{content}\n")
-                sources_info.append(f"[{i}] {source_name}")
-                
-                print(f"문서 {i}: {source_name} (길이: {len(content)} 글자)")
-            
-            # 모든 문서 내용을 하나의 컨텍스트로 결합
-            context_text = "\n".join(context_sections)
-            sources_text = "\n".join(sources_info) if sources_info else "참고 문서 없음"
-            
-            print(f"=== 최종 컨텍스트 구성 완료 ===")
-            print(f"소스 정보: {sources_text}")
-            print(f"전체 컨텍스트 길이: {len(context_text)} 글자")
-            
-            # 컨텍스트 길이 확인 및 축소
-            if len(context_text) > 8000:  # 8000자 제한
-                print(f"컨텍스트 길이 {len(context_text)}자, 축소 필요")
-                # 각 문서를 500자로 제한
-                shortened_sections = []
-                for i, doc in enumerate(context, 1):
-                    source_name = doc.get("filename", f"문서{i}")
-                    content = doc.get("content", "")[:500] + ("..." if len(doc.get("content", "")) > 500 else "")
-                    shortened_sections.append(f"=== 문서 {i}: {source_name} ===\n{content}\n")
-                context_text = "\n".join(shortened_sections)
-                print(f"축소 후 길이: {len(context_text)}자")
+                content = doc.get("content", "")[:500] + ("..." if len(doc.get("content", "")) > 500 else "")
+                shortened_sections.append(f"=== 문서 {i}: {source_name} ===\n{content}\n")
+            context_text = "\n".join(shortened_sections)
+            print(f"축소 후 길이: {len(context_text)}자")
 
-            # 기본 프롬프트 구성 (시스템 메시지는 별도 처리)
-            prompt = f"""참고 문서:
+        # 기본 프롬프트 구성 (시스템 메시지는 별도 처리)
+        prompt = f"""참고 문서:
 {sources_text}
 
 내용:
@@ -659,37 +950,78 @@ class ChatService:
 질문: {query}
 
 답변:"""
+        return prompt
+
+    def _context_packing_settings(self) -> Tuple[bool, int]:
+        """(컨텍스트 패킹 사용 여부, 토큰 예산) - 예산은 활성 모델 프로필 값이 있으면 우선"""
+        perf_settings = settings_service.get_section_settings("performance")
+        budget = model_profile_service.get_active_profile_for_chat().get("llm_context_budget")
+        if not isinstance(budget, int) or not 256 <= budget <= 200000:
+            # 검증 이전에 저장된 프로필의 비정상 값은 무시 (너무 작으면 모든 문서가 빠짐)
+            budget = None
+        return perf_settings.get("enableContextPacking", True), budget or perf_settings.get("contextTokenBudget", 3000)
+    
+    def _pack_context(self, documents: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """검색 문서를 토큰 예산에 맞춰 정리합니다. 패킹을 끄면 원본 그대로 반환"""
+        enabled, budget = self._context_packing_settings()
+        if not enabled or not documents:
+            return documents, None
+        try:
+            packed, report = pack_context(documents, budget)
+        except Exception as e:
+            print(f"⚠️ 컨텍스트 패킹 실패, 원본 문서 사용: {e}")
+            return documents, None
+        print(
+            f"📦 컨텍스트 패킹: 문서 {report['documents_in']}→{report['documents_out']}개, "
+            f"토큰 {report['original_tokens']}→{report['packed_tokens']} (절약 {report['saved_tokens']}, 예산 {budget})"
+        )
+        return packed, report
+    
+    def _get_chat_model_config(self) -> Dict[str, Any]:
+        """활성 모델 프로필에서 LangFlow 실행용 model_config를 만듭니다."""
+        # 모델 프로필에서 설정 가져오기 (새로운 방식)
+        model_settings = model_profile_service.get_active_profile_for_chat()
+        
+        # model_settings에서 model_config 생성 (LangFlow 구조에 맞춰)
+        provider = model_settings.get("llm_provider", "openai")
+        
+        # provider별 적절한 API 키 선택
+        api_key = None
+        if provider == "openai":
+            api_key = model_settings.get("llm_api_key")
+        elif provider == "google":
+            api_key = model_settings.get("google_api_key")
+        elif provider == "anthropic":
+            api_key = model_settings.get("anthropic_api_key")
+        
+        model_config = {
+            "llm": {
+                "provider": provider,
+                "model": model_settings.get("llm_model", "gpt-4o-mini"),
+                "temperature": model_settings.get("llm_temperature", 0.7),
+                "max_tokens": model_settings.get("llm_max_tokens", 2000),
+                "top_p": model_settings.get("llm_top_p", 1.0),
+                "api_key": api_key
+            }
+        }
+        return model_config
+
+    async def generate_response_with_flow(
+        self, query: str, context: List[Dict[str, Any]], system_message: str = None, flow_id: str = None,
+        context_packed: bool = False
+    ) -> str:
+        """LangFlow를 통해 동적으로 선택된 LLM 모델로 응답을 생성합니다."""
+        try:
+            print(f"=== LangFlow 기반 LLM 응답 생성 시작 ===")
+            print(f"사용 Flow ID: {flow_id}")
+            prompt = self._build_flow_prompt(query, context, context_packed)
 
             # LangFlow를 통해 LLM 실행
             flow_id_to_use = flow_id or await self._get_default_search_flow()
             if flow_id_to_use:
                 print(f"LangFlow 실행: {flow_id_to_use}")
                 
-                # 모델 프로필에서 설정 가져오기 (새로운 방식)
-                model_settings = model_profile_service.get_active_profile_for_chat()
-                
-                # model_settings에서 model_config 생성 (LangFlow 구조에 맞춰)
-                provider = model_settings.get("llm_provider", "openai")
-                
-                # provider별 적절한 API 키 선택
-                api_key = None
-                if provider == "openai":
-                    api_key = model_settings.get("llm_api_key")
-                elif provider == "google":
-                    api_key = model_settings.get("google_api_key")
-                elif provider == "anthropic":
-                    api_key = model_settings.get("anthropic_api_key")
-                
-                model_config = {
-                    "llm": {
-                        "provider": provider,
-                        "model": model_settings.get("llm_model", "gpt-4o-mini"),
-                        "temperature": model_settings.get("llm_temperature", 0.7),
-                        "max_tokens": model_settings.get("llm_max_tokens", 2000),
-                        "top_p": model_settings.get("llm_top_p", 1.0),
-                        "api_key": api_key
-                    }
-                }
+                model_config = self._get_chat_model_config()
                 
                 langflow_result = await self.langflow_service.execute_flow_with_llm(
                     flow_id_to_use,
@@ -1010,52 +1342,26 @@ class ChatService:
         print(f"=== 중복 제거 완료 ===")
         return result
 
-    async def get_chat_history(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-        """사용자별 채팅 히스토리를 조회합니다."""
+    async def get_chat_history(self, user_id: str, limit: int = 50, before: str = None) -> List[Dict[str, Any]]:
+        """사용자별 채팅 히스토리를 최신 순으로 조회합니다."""
+        history, _ = await self.get_chat_history_page(user_id, limit, before)
+        return history
+
+    async def get_chat_history_page(self, user_id: str, limit: int = 50, before: str = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """사용자별 채팅 히스토리 한 페이지와 다음 페이지 커서를 조회합니다."""
         try:
-            history_file = os.path.join(
-                settings.DATA_DIR, 
-                'chat_history.json'
-            )
-            
-            if not os.path.exists(history_file):
-                return []
-            
-            with open(history_file, 'r', encoding='utf-8') as f:
-                all_history = json.load(f)
-            
-            # 사용자별 히스토리 필터링
-            user_history = all_history.get(user_id, [])
-            
-            # 최신 순으로 정렬하고 limit만큼 반환
-            sorted_history = sorted(user_history, key=lambda x: x.get('timestamp', ''), reverse=True)
-            return sorted_history[:limit]
-            
+            return await get_chat_history_store().get_page_async(user_id, limit, before)
         except Exception as e:
             print(f"채팅 히스토리 조회 오류: {str(e)}")
-            return []
+            return [], None
 
     async def save_chat_history(self, user_id: str, user_message: dict, assistant_message: dict) -> bool:
         """채팅 히스토리를 저장합니다."""
         try:
-            history_file = os.path.join(
-                settings.DATA_DIR, 
-                'chat_history.json'
-            )
-            
-            # 기존 히스토리 로드
-            all_history = {}
-            if os.path.exists(history_file):
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    all_history = json.load(f)
-            
-            # 사용자 히스토리 초기화
-            if user_id not in all_history:
-                all_history[user_id] = []
-            
-            # 사용자 메시지 저장
+            # 사용자 메시지
             user_msg = {
                 "id": user_message.get("id", str(int(time.time() * 1000))),
+                "user_id": user_id,
                 "message": user_message.get("content", ""),
                 "role": "user",
                 "timestamp": user_message.get("timestamp", datetime.now().isoformat()),
@@ -1063,9 +1369,10 @@ class ChatService:
                 "sources": user_message.get("sources", [])
             }
             
-            # 어시스턴트 메시지 저장
+            # 어시스턴트 메시지
             assistant_msg = {
                 "id": assistant_message.get("id", str(int(time.time() * 1000) + 1)),
+                "user_id": user_id,
                 "message": assistant_message.get("content", ""),
                 "role": "assistant",
                 "timestamp": assistant_message.get("timestamp", datetime.now().isoformat()),
@@ -1076,17 +1383,7 @@ class ChatService:
                 "confidence": assistant_message.get("confidence")
             }
             
-            # 히스토리에 추가
-            all_history[user_id].extend([user_msg, assistant_msg])
-            
-            # 최대 100개 메시지로 제한 (50개 대화)
-            if len(all_history[user_id]) > 100:
-                all_history[user_id] = all_history[user_id][-100:]
-            
-            # 파일에 저장
-            os.makedirs(os.path.dirname(history_file), exist_ok=True)
-            with open(history_file, 'w', encoding='utf-8') as f:
-                json.dump(all_history, f, ensure_ascii=False, indent=2)
+            await get_chat_history_store().append_async([user_msg, assistant_msg])
             
             print(f"채팅 히스토리 저장 완료: {user_id}")
             return True
@@ -1095,6 +1392,24 @@ class ChatService:
             print(f"채팅 히스토리 저장 오류: {str(e)}")
             return False
 
+    @staticmethod
+    def _build_chat_message(
+        user_id: str,
+        message: str,
+        role: str,
+        category_ids: List[str] = None,
+        sources: List[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        return {
+            "id": f"{user_id}_{int(time.time() * 1000)}",
+            "user_id": user_id,
+            "message": message,
+            "role": role,
+            "timestamp": datetime.now().isoformat(),
+            "category_ids": category_ids or [],
+            "sources": sources or []
+        }
+    
     async def _save_chat_message(
         self, 
         user_id: str, 
@@ -1105,45 +1420,45 @@ class ChatService:
     ):
         """채팅 메시지를 히스토리에 저장합니다."""
         try:
-            history_file = os.path.join(
-                settings.DATA_DIR, 
-                'chat_history.json'
-            )
-            
-            # 기존 히스토리 로드
-            all_history = {}
-            if os.path.exists(history_file):
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    all_history = json.load(f)
-            
-            # 사용자별 히스토리 초기화
-            if user_id not in all_history:
-                all_history[user_id] = []
-            
-            # 새 메시지 추가
-            chat_message = {
-                "id": f"{user_id}_{int(time.time() * 1000)}",
-                "user_id": user_id,
-                "message": message,
-                "role": role,
-                "timestamp": datetime.now().isoformat(),
-                "category_ids": category_ids or [],
-                "sources": sources or []
-            }
-            
-            all_history[user_id].append(chat_message)
-            
-            # 최대 1000개 메시지 유지
-            if len(all_history[user_id]) > 1000:
-                all_history[user_id] = all_history[user_id][-1000:]
-            
-            # 히스토리 저장
-            with open(history_file, 'w', encoding='utf-8') as f:
-                json.dump(all_history, f, ensure_ascii=False, indent=2)
+            chat_message = self._build_chat_message(user_id, message, role, category_ids, sources)
+            await get_chat_history_store().append_async([chat_message])
                 
         except Exception as e:
             print(f"채팅 메시지 저장 중 오류: {str(e)}")
     
+    def _save_chat_message_in_background(
+        self, 
+        user_id: str, 
+        message: str, 
+        role: str, 
+        category_ids: List[str] = None,
+        sources: List[Dict[str, Any]] = None
+    ):
+        """채팅 메시지를 히스토리 기록 스레드에 넘기고 완료를 기다리지 않습니다.
+
+        실패하거나 HISTORY_SAVE_TIMEOUT_SECONDS 안에 커밋되지 않으면 로그만 남깁니다.
+        """
+        try:
+            chat_message = self._build_chat_message(user_id, message, role, category_ids, sources)
+            future = get_chat_history_store().append([chat_message])
+        except Exception as e:
+            print(f"채팅 메시지 저장 중 오류: {str(e)}")
+            return
+
+        task = asyncio.ensure_future(self._watch_history_save(future, user_id, role))
+        self._history_save_tasks.add(task)
+        task.add_done_callback(self._history_save_tasks.discard)
+    
+    async def _watch_history_save(self, future, user_id: str, role: str):
+        """히스토리 저장 Future를 기다려 실패/미완료를 기록합니다."""
+        try:
+            # shield: 시간 초과로 포기해도 대기 중인 쓰기는 취소하지 않음
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=HISTORY_SAVE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            print(f"⚠️ 채팅 메시지 저장이 {HISTORY_SAVE_TIMEOUT_SECONDS:.0f}초 안에 완료되지 않음 (user={user_id}, role={role})")
+        except Exception as e:
+            print(f"채팅 메시지 저장 중 오류: {str(e)}")
+    
     async def _build_system_message(self, custom_message: str = None, persona_id: str = None, output_format: str = None) -> str:
         """시스템 메시지를 구성합니다: 기본/사용자 지정 메시지 + (선택) 페르소나 메시지 + Chart.js 생성 지시사항 결합."""
         try:
@@ -3,16 +3,22 @@ PRD 방식 사용자 개입형 청킹 서비스
 자동 제안 → 사용자 편집/확정 → 임베딩/저장 파이프라인
 """
 
+import os
 import re
 import uuid
 import json
 import math
-from typing import List, Dict, Any, Optional, Tuple
+import bisect
+import hashlib
+import threading
+from itertools import accumulate
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from enum import Enum
 import logging
-from collections import Counter
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # 콘솔 로거 사용을 위한 import 추가 시도
 try:
@@ -293,10 +299,26 @@ class ChunkProposal:
 
 
 class TokenCounter:
-    """프로덕션 수준 토큰 카운터 - 설정 기반 폴백 제어"""
+    """프로덕션 수준 토큰 카운터 - 설정 기반 폴백 제어
+
+    같은 문장이 분할/병합/오버랩 과정에서 여러 번 세어지므로 텍스트 해시 기준 LRU 캐시를 두고,
+    count_many는 캐시에 없는 텍스트만 모아 스레드별 구간으로 나눠 병렬 인코딩합니다.
+    (tiktoken encode_ordinary는 GIL을 풀고 실행됨. encode_ordinary_batch는 텍스트마다 작업을 하나씩
+    제출해 문장처럼 짧은 텍스트에서는 스케줄링 비용이 인코딩보다 커서 사용하지 않음)
+    """
     
-    def __init__(self):
+    CACHE_MAX_ENTRIES = 50_000
+    # 캐시에 없는 텍스트가 이 수 이상일 때만 스레드로 나눠 인코딩
+    BATCH_MIN_TEXTS = 256
+    
+    def __init__(self, cache_size: int = CACHE_MAX_ENTRIES, batch_threads: Optional[int] = None):
         self._tiktoken_encoder = None
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+        self._batch_threads = batch_threads or min(8, os.cpu_count() or 1)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.stats = {"cache_hits": 0, "cache_misses": 0, "batch_encodes": 0}
         self._init_tiktoken()
     
     def _get_fallback_settings(self) -> Dict[str, Any]:
@@ -339,13 +361,77 @@ class TokenCounter:
     
     def count_tokens(self, text: str) -> int:
         """정확한 토큰 수 계산"""
-        if not text or not text.strip():
-            return 0
+        return self.count_many([text])[0]
+    
+    def count_many(self, texts: Sequence[str]) -> List[int]:
+        """여러 텍스트의 토큰 수를 한 번에 계산 (캐시 적중분 제외, 나머지는 배치 인코딩)"""
+        counts = [0] * len(texts)
+        missing: Dict[bytes, List[int]] = {}
+        
+        with self._cache_lock:
+            for i, text in enumerate(texts):
+                if not text or not text.strip():
+                    continue
+                key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    counts[i] = cached
+                    self.stats["cache_hits"] += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+        
+        if not missing:
+            return counts
+        
+        keys = list(missing)
+        unique_texts = [texts[missing[key][0]] for key in keys]
+        self.stats["cache_misses"] += len(unique_texts)
         
+        if self._tiktoken_encoder and self._batch_threads > 1 and len(unique_texts) >= self.BATCH_MIN_TEXTS:
+            try:
+                computed = self._encode_parallel(unique_texts)
+                self.stats["batch_encodes"] += 1
+            except Exception as e:
+                logger.warning(f"배치 토큰 계산 실패, 개별 계산으로 전환: {e}")
+                computed = [self._count_uncached(text) for text in unique_texts]
+        else:
+            computed = [self._count_uncached(text) for text in unique_texts]
+        
+        with self._cache_lock:
+            for key, count in zip(keys, computed):
+                for i in missing[key]:
+                    counts[i] = count
+                if self._cache_size > 0:
+                    self._cache[key] = count
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        
+        return counts
+    
+    def _encode_parallel(self, texts: List[str]) -> List[int]:
+        """텍스트 목록을 스레드 수만큼 연속 구간으로 나눠 인코딩"""
+        if self._executor is None:
+            with self._cache_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self._batch_threads, thread_name_prefix="token-counter")
+        
+        encoder = self._tiktoken_encoder
+        step = -(-len(texts) // self._batch_threads)
+        slices = [texts[start:start + step] for start in range(0, len(texts), step)]
+        results = self._executor.map(lambda part: [len(encoder.encode_ordinary(text)) for text in part], slices)
+        return [count for part in results for count in part]
+    
+    @staticmethod
+    def prefix_sums(counts: Sequence[int]) -> List[int]:
+        """누적 토큰 수 [0, c0, c0+c1, ...] - 구간 토큰 수 = prefix[j] - prefix[i]"""
+        return list(accumulate(counts, initial=0))
+    
+    def _count_uncached(self, text: str) -> int:
         try:
             if self._tiktoken_encoder:
-                # tiktoken으로 정확한 계산
-                return len(self._tiktoken_encoder.encode(text))
+                # tiktoken으로 정확한 계산 (특수 토큰 문자열도 일반 텍스트로 취급)
+                return len(self._tiktoken_encoder.encode_ordinary(text))
             else:
                 fallback_settings = self._get_fallback_settings()
                 if fallback_settings.get("enable_token_counter_fallback", False):
@@ -371,6 +457,23 @@ class TokenCounter:
                 return 1  # 최소값 반환
 
 
+# 공유 토큰 카운터 (캐시를 청킹 서비스/AI 청킹 전체에서 함께 사용)
+_token_counter = None
+_token_counter_lock = threading.Lock()
+
+
+def get_token_counter() -> TokenCounter:
+    """TokenCounter 싱글톤 인스턴스 반환"""
+    global _token_counter
+
+    if _token_counter is None:
+        with _token_counter_lock:
+            if _token_counter is None:
+                _token_counter = TokenCounter()
+
+    return _token_counter
+
+
 class PDFImageExtractor:
     """PDF 이미지 bbox 추출기 (프로덕션 개선)"""
     
@@ -497,6 +600,7 @@ class SmartTextSplitter:
     def __init__(self):        
         # PDF 이미지 추출기 초기화 (프로덕션 개선)
         self.pdf_image_extractor = PDFImageExtractor()
+        self.token_counter = get_token_counter()
         
         # 헤딩 패턴들 (레벨 포함 - 프로덕션 개선)
         self.heading_patterns = [
@@ -526,7 +630,6 @@ class SmartTextSplitter:
         sentences = []
         lines = text.split('\n')
         sentence_index = 0
-        token_counter = TokenCounter()
         
         # 헤딩 트리 구축용 (프로덕션 개선)
         heading_stack = []  # 현재 헤딩 계층 추적
@@ -560,7 +663,7 @@ class SmartTextSplitter:
                 if line:
                     sentences.append(SentenceInfo(
                         text=line,
-                        tokens=token_counter.count_tokens(line),
+                        tokens=0,  # 아래에서 한 번에 계산
                         is_heading=is_heading,
                         is_list_item=is_list_item,
                         is_table_content=is_table_content,
@@ -585,7 +688,7 @@ class SmartTextSplitter:
                     if sent:
                         sentences.append(SentenceInfo(
                             text=sent,
-                            tokens=token_counter.count_tokens(sent),
+                            tokens=0,
                             is_heading=False,
                             is_list_item=False,
                             is_table_content=False,
@@ -595,6 +698,10 @@ class SmartTextSplitter:
                         ))
                         sentence_index += 1
         
+        # 문장별 토큰 수를 배치로 계산 (반복되는 문장은 캐시 적중)
+        for sentence, tokens in zip(sentences, self.token_counter.count_many([s.text for s in sentences])):
+            sentence.tokens = tokens
+        
         return sentences
     
     def _get_fallback_settings(self) -> Dict[str, Any]:
@@ -970,7 +1077,7 @@ class SmartChunkingService:
     
     def __init__(self):
         self.text_splitter = SmartTextSplitter()
-        self.token_counter = TokenCounter()
+        self.token_counter = get_token_counter()
     
     def _get_fallback_settings(self) -> Dict[str, Any]:
         """폴백 제어 설정 조회"""
@@ -987,7 +1094,7 @@ class SmartChunkingService:
                 "strict_mode": True
             }
     
-    def propose_chunks_hierarchical(self, full_text: str, rules: ChunkingRules, pdf_path: Optional[str] = None) -> List[ChunkProposal]:
+    def propose_chunks_hierarchical(self, full_text: str, rules: ChunkingRules, pdf_path: Optional[str] = None, file_id: Optional[str] = None) -> List[ChunkProposal]:
         """계층적 헤딩 기반 청킹 제안 (프로덕션 개선)"""
         try:
             logger.info(f"계층적 청킹 제안 시작 - 텍스트 길이: {len(full_text)}")
@@ -1017,13 +1124,9 @@ class SmartChunkingService:
                 all_proposals.extend(section_proposals)
                 chunk_order += len(section_proposals)
             
-            # 4. 전체 청크 간 중복 검사
-            duplicate_warnings = self.check_duplicate_chunks(all_proposals)
-            for warning in duplicate_warnings:
-                for proposal in all_proposals[:-1]:
-                    if "연속 청크" in warning.message:
-                        proposal.quality_warnings.append(warning)
-                        break
+            # 4. 전체 청크 간 + 기존 문서와의 중복 검사 (경고는 해당 청크에 추가됨)
+            if rules.enable_duplicate_check:
+                self.check_duplicate_chunks(all_proposals, file_id=file_id)
             
             logger.info(f"계층적 청킹 제안 완료 - {len(all_proposals)}개 청크 생성")
             return all_proposals
@@ -1138,7 +1241,7 @@ class SmartChunkingService:
             image_refs=image_refs
         )
     
-    def propose_chunks(self, full_text: str, rules: ChunkingRules, use_hierarchical: bool = True, pdf_path: Optional[str] = None) -> List[ChunkProposal]:
+    def propose_chunks(self, full_text: str, rules: ChunkingRules, use_hierarchical: bool = True, pdf_path: Optional[str] = None, file_id: Optional[str] = None) -> List[ChunkProposal]:
         """자동 청킹 제안 (PRD 핵심 로직 - 프로덕션 개선)"""
         try:
             logger.info(f"청킹 제안 시작 - 텍스트 길이: {len(full_text)}, 규칙: {asdict(rules)}, 계층적: {use_hierarchical}")
@@ -1146,7 +1249,7 @@ class SmartChunkingService:
             # 헤딩이 있고 계층적 모드를 사용하는 경우
             if use_hierarchical and self._has_headings(full_text):
                 logger.info("계층적 헤딩 기반 청킹 모드 사용")
-                return self.propose_chunks_hierarchical(full_text, rules, pdf_path)
+                return self.propose_chunks_hierarchical(full_text, rules, pdf_path, file_id=file_id)
             
             # 기존 토큰 기반 청킹 모드
             logger.info("토큰 기반 청킹 모드 사용")
@@ -1188,16 +1291,9 @@ class SmartChunkingService:
                 chunk = self._create_chunk_proposal(group, i + 1, rules)
                 proposals.append(chunk)
             
-            # 7. 전체 청크 간 중복 검사
-            duplicate_warnings = self.check_duplicate_chunks(proposals)
-            
-            # 중복 경고를 해당 청크에 추가
-            for warning in duplicate_warnings:
-                # 메시지에서 청크 순서 추출하여 해당 청크에 경고 추가
-                for i, proposal in enumerate(proposals[:-1]):  # 마지막 제외
-                    if f"연속 청크" in warning.message:
-                        proposal.quality_warnings.append(warning)
-                        break
+            # 7. 전체 청크 간 + 기존 문서와의 중복 검사 (경고는 해당 청크에 추가됨)
+            if rules.enable_duplicate_check:
+                self.check_duplicate_chunks(proposals, file_id=file_id)
             
             logger.info(f"청킹 제안 완료 - {len(proposals)}개 청크 생성")
             return proposals
@@ -1414,18 +1510,14 @@ class SmartChunkingService:
         return overlapped_groups
     
     def _extract_overlap_sentences(self, sentences: List[SentenceInfo], target_tokens: int) -> List[SentenceInfo]:
-        """오버랩용 문장들 추출 (뒤에서부터)"""
-        overlap_sentences = []
-        current_tokens = 0
-        
-        for sentence in reversed(sentences):
-            if current_tokens + sentence.tokens <= target_tokens:
-                overlap_sentences.insert(0, sentence)
-                current_tokens += sentence.tokens
-            else:
-                break
+        """오버랩용 문장들 추출 (뒤에서부터 target_tokens를 넘지 않는 만큼)"""
+        if not sentences or target_tokens <= 0:
+            return []
         
-        return overlap_sentences
+        # 누적 토큰 수에서 뒤쪽 구간 합이 target_tokens 이하가 되는 첫 위치를 이진 탐색
+        prefix = TokenCounter.prefix_sums([s.tokens for s in sentences])
+        start = bisect.bisect_left(prefix, prefix[-1] - target_tokens)
+        return sentences[start:]
     
     def _create_group_from_sentences(self, sentences: List[SentenceInfo]) -> Dict[str, Any]:
         """문장 리스트로부터 그룹 생성"""
@@ -1644,16 +1736,34 @@ class SmartChunkingService:
         
         return dot_product / (magnitude1 * magnitude2)
     
-    def check_duplicate_chunks(self, chunks: List[ChunkProposal]) -> List[QualityWarning]:
-        """청크 간 중복 검사 (PRD2: 단어 기반 중복 검사 포함)"""
+    def check_duplicate_chunks(self, chunks: List[ChunkProposal], file_id: Optional[str] = None) -> List[QualityWarning]:
+        """청크 간 중복 검사 (PRD2: 단어 기반 중복 검사 포함)
+
+        MinHash 서명은 전체 청크에 대해 한 번에 계산해 연속 청크 비교와 말뭉치 근접 중복 조회에 함께 사용합니다.
+        경고는 중복으로 판단된 청크(연속 청크 중 뒤쪽 청크)의 quality_warnings에 추가하고 목록으로도 반환합니다.
+        """
         warnings = []
+        if not chunks:
+            return warnings
+        
+        signatures = None
+        try:
+            from .near_duplicate_index import compute_signatures
+            signatures = compute_signatures([chunk.text for chunk in chunks])
+        except Exception as e:
+            logger.warning(f"MinHash 서명 일괄 계산 실패 - 청크 쌍별 유사도 계산 사용: {e}")
         
         for i in range(len(chunks) - 1):
             current_chunk = chunks[i]
             next_chunk = chunks[i + 1]
             
             # 1. 기존 전체 유사도 검사 (정밀 검사)
-            similarity = self._calculate_text_similarity(current_chunk.text, next_chunk.text)
+            if signatures is None:
+                similarity = self._calculate_text_similarity(current_chunk.text, next_chunk.text)
+            elif not current_chunk.text.strip() or not next_chunk.text.strip():
+                similarity = 0.0
+            else:
+                similarity = float((signatures[i] == signatures[i + 1]).mean())
             
             # 2. PRD2: 단어 기반 겹침율 검사 (빠른 검사)
             word_overlap_ratio = self._calculate_word_overlap_ratio(current_chunk.text, next_chunk.text)
@@ -1671,13 +1781,52 @@ class SmartChunkingService:
                     main_score = word_overlap_ratio
                     method = "단어 겹침율"
                 
-                warnings.append(QualityWarning(
+                warning = QualityWarning(
                     issue_type=ChunkQualityIssue.DUPLICATE_CONTENT,
                     severity="warning",
                     message=f"연속 청크 간 높은 중복 감지 ({method}: {main_score:.2f})",
                     suggestion="병합 또는 하나 제거를 고려하세요"
-                ))
+                )
+                next_chunk.quality_warnings.append(warning)
+                warnings.append(warning)
+        
+        # 4. 다른 문서에 이미 저장된 근접 중복 청크 (머리말/면책 문구/반복 표 등)
+        if signatures is not None:
+            warnings.extend(self._check_corpus_duplicates(chunks, signatures, file_id))
+        
+        return warnings
+    
+    def _check_corpus_duplicates(self, chunks: List[ChunkProposal], signatures, file_id: Optional[str]) -> List[QualityWarning]:
+        """MinHash LSH 인덱스에서 다른 문서의 대표 청크와 근접 중복인 청크 확인"""
+        try:
+            from .near_duplicate_index import get_near_duplicate_index
+            duplicate_index = get_near_duplicate_index()
+            if not duplicate_index.enabled:
+                return []
+            matches = duplicate_index.find_duplicates([None] * len(chunks), signatures, exclude_file_id=file_id)
+        except Exception as e:
+            logger.warning(f"말뭉치 근접 중복 조회 실패: {e}")
+            return []
+        
+        warnings = []
+        for chunk, match in zip(chunks, matches):
+            if match is None:
+                continue
+            canonical_id, similarity = match
+            warning = QualityWarning(
+                issue_type=ChunkQualityIssue.DUPLICATE_CONTENT,
+                severity="warning",
+                message=f"다른 문서의 청크와 근접 중복 (유사도: {similarity:.2f}, 대표 청크: {canonical_id})",
+                suggestion=(
+                    "벡터화 시 저장되지 않습니다 (대표 청크로 검색됨)" if duplicate_index.action == "skip"
+                    else "공통 머리말/면책 문구라면 제거를 고려하세요"
+                )
+            )
+            chunk.quality_warnings.append(warning)
+            warnings.append(warning)
         
+        if warnings:
+            logger.info(f"말뭉치 근접 중복 청크 {len(warnings)}개 감지")
         return warnings
     
     def _calculate_word_overlap_ratio(self, text1: str, text2: str) -> float:
@@ -1856,7 +2005,7 @@ class SmartChunkingService:
             
             logger.debug(f"문장 분절: {len(words)}개 단어를 {approx_splits + 1}개 조각으로 분할 (조각당 ~{words_per_split}개 단어)")
             
-            split_sentences = []
+            segment_texts = []
             current_words = []
             
             for i, word in enumerate(words):
@@ -1865,27 +2014,28 @@ class SmartChunkingService:
                 # 조각 완성 조건: 지정된 단어 수에 도달하거나 마지막 단어
                 if (len(current_words) >= words_per_split and i < len(words) - 1) or i == len(words) - 1:
                     segment_text = " ".join(current_words).strip()
-                    
                     if segment_text:
-                        # 새로운 SentenceInfo 생성 (기본 속성 유지)
-                        segment_tokens = self.token_counter.count_tokens(segment_text)
-                        
-                        split_sentence = SentenceInfo(
-                            text=segment_text,
-                            tokens=segment_tokens,
-                            page=sentence.page,
-                            is_heading=sentence.is_heading and len(split_sentences) == 0,  # 첫 조각만 헤딩 유지
-                            is_list_item=sentence.is_list_item,
-                            is_table_content=sentence.is_table_content,
-                            index=sentence.index + len(split_sentences),  # 인덱스 조정
-                            heading_level=sentence.heading_level if len(split_sentences) == 0 else None,
-                            heading_path=sentence.heading_path,
-                            bbox=sentence.bbox,  # bbox는 원본 유지 (근사치)
-                            image_refs=sentence.image_refs if len(split_sentences) == 0 else []  # 첫 조각만 이미지 유지
-                        )
-                        
-                        split_sentences.append(split_sentence)
-                        current_words = []
+                        segment_texts.append(segment_text)
+                    current_words = []
+            
+            split_sentences = []
+            for segment_text, segment_tokens in zip(segment_texts, self.token_counter.count_many(segment_texts)):
+                # 새로운 SentenceInfo 생성 (기본 속성 유지)
+                split_sentence = SentenceInfo(
+                    text=segment_text,
+                    tokens=segment_tokens,
+                    page=sentence.page,
+                    is_heading=sentence.is_heading and len(split_sentences) == 0,  # 첫 조각만 헤딩 유지
+                    is_list_item=sentence.is_list_item,
+                    is_table_content=sentence.is_table_content,
+                    index=sentence.index + len(split_sentences),  # 인덱스 조정
+                    heading_level=sentence.heading_level if len(split_sentences) == 0 else None,
+                    heading_path=sentence.heading_path,
+                    bbox=sentence.bbox,  # bbox는 원본 유지 (근사치)
+                    image_refs=sentence.image_refs if len(split_sentences) == 0 else []  # 첫 조각만 이미지 유지
+                )
+                
+                split_sentences.append(split_sentence)
             
             logger.info(f"문장 강제 분절 완료: 1개 → {len(split_sentences)}개 조각")
             return split_sentences
@@ -0,0 +1,182 @@
+"""
+LLM 컨텍스트 패킹
+
+검색된 문서를 프롬프트에 넣기 전에 토큰 예산에 맞춰 정리합니다.
+- 같은 파일의 이웃 청크(chunk_index 연속)는 하나로 합치고, 청크 간 오버랩 텍스트는 한 번만 남김
+- 같은 파일에서 다른 청크에 그대로 포함된 청크는 제외
+- 검색 순위대로 예산까지 채우고, 넘치는 문서는 문장 경계에서 자르거나 제외
+- 원본 대비 절약한 토큰 수를 보고
+"""
+
+import re
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+from .chunking_service import TokenCounter, get_token_counter
+
+# 프롬프트의 문서 구분 헤더("=== 문서 N: 파일명 ===") 몫
+DOC_OVERHEAD_TOKENS = 12
+# 남은 예산이 이보다 적으면 문서를 자르지 않고 제외
+MIN_TRIM_TOKENS = 64
+# 청크 간 오버랩으로 보는 최소 길이 (글자)
+MIN_OVERLAP_CHARS = 20
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+
+def _chunk_index(doc: Dict[str, Any]) -> Optional[int]:
+    value = (doc.get("metadata") or {}).get("chunk_index")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _overlap_length(previous: str, following: str) -> int:
+    """previous의 끝과 following의 시작이 겹치는 가장 긴 길이 (글자)"""
+    if len(previous) < MIN_OVERLAP_CHARS or len(following) < MIN_OVERLAP_CHARS:
+        return 0
+    probe = following[:MIN_OVERLAP_CHARS]
+    start = max(0, len(previous) - len(following))
+    pos = previous.find(probe, start)
+    while pos != -1:
+        tail = previous[pos:]
+        if following.startswith(tail):
+            return len(tail)
+        pos = previous.find(probe, pos + 1)
+    return 0
+
+
+def _merge_run(run: List[Tuple[int, Dict[str, Any]]]) -> Dict[str, Any]:
+    """chunk_index가 연속된 같은 파일의 청크를 하나로 합칩니다 (run은 chunk_index 순)."""
+    _, best_doc = min(run, key=lambda item: item[0])
+    content = run[0][1].get("content", "")
+    for _, doc in run[1:]:
+        following = doc.get("content", "")
+        overlap = _overlap_length(content, following)
+        content = content + ("" if overlap else "\n") + following[overlap:]
+
+    merged = dict(best_doc)
+    merged["content"] = content
+    merged["score"] = max(doc.get("score", 0.0) for _, doc in run)
+    merged["merged_chunks"] = len(run)
+    return merged
+
+
+def _trim_to_tokens(content: str, max_tokens: int, counter: TokenCounter) -> str:
+    """문장 경계 기준으로 max_tokens 이내 앞부분만 남깁니다 (줄바꿈 등 원문 형식 유지)."""
+    ends = [m.end() for m in _SENTENCE_END_RE.finditer(content)]
+    if not ends or ends[-1] != len(content):
+        ends.append(len(content))
+    starts = [0] + ends[:-1]
+    sums = TokenCounter.prefix_sums(counter.count_many([content[a:b] for a, b in zip(starts, ends)]))
+    keep = bisect_right(sums, max_tokens) - 1
+    if keep <= 0:
+        # 첫 문장부터 예산을 넘으면 글자 수 비율로 자름
+        ratio = max_tokens / max(1, sums[1])
+        return content[:max(1, int(ends[0] * ratio))].rstrip() + "..."
+    if keep == len(ends):
+        return content
+    return content[:ends[keep - 1]].rstrip() + "..."
+
+
+def pack_context(
+    documents: List[Dict[str, Any]],
+    budget_tokens: int,
+    token_counter: Optional[TokenCounter] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    검색 순위순 문서 목록을 토큰 예산에 맞게 정리합니다.
+
+    Returns:
+        (패킹된 문서 목록, 보고서) - 보고서에는 원본/패킹 후 토큰 수와 병합/중복 제거/자름/제외 수가 들어 있음
+    """
+    counter = token_counter or get_token_counter()
+    report = {
+        "budget_tokens": budget_tokens,
+        "documents_in": len(documents),
+        "documents_out": 0,
+        "original_tokens": 0,
+        "packed_tokens": 0,
+        "saved_tokens": 0,
+        "merged": 0,
+        "deduplicated": 0,
+        "trimmed": 0,
+        "dropped": 0,
+    }
+    if not documents:
+        return [], report
+
+    original_counts = counter.count_many([doc.get("content", "") for doc in documents])
+    report["original_tokens"] = sum(original_counts) + DOC_OVERHEAD_TOKENS * len(documents)
+
+    # 1. 파일별로 묶어 이웃 청크 병합 (순위는 문서 목록 순서)
+    groups: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+    units: List[Tuple[int, Dict[str, Any]]] = []
+    for rank, doc in enumerate(documents):
+        file_id = doc.get("file_id")
+        if file_id and _chunk_index(doc) is not None:
+            groups.setdefault(file_id, []).append((rank, doc))
+        else:
+            units.append((rank, doc))
+
+    for members in groups.values():
+        # 같은 청크가 두 번 검색된 경우 하나만 남김
+        by_index: Dict[int, Tuple[int, Dict[str, Any]]] = {}
+        for rank, doc in members:
+            index = _chunk_index(doc)
+            if index in by_index:
+                report["deduplicated"] += 1
+                continue
+            by_index[index] = (rank, doc)
+
+        runs: List[List[Tuple[int, Dict[str, Any]]]] = []
+        for index in sorted(by_index):
+            if runs and index == _chunk_index(runs[-1][-1][1]) + 1:
+                runs[-1].append(by_index[index])
+            else:
+                runs.append([by_index[index]])
+        for run in runs:
+            units.append((min(rank for rank, _ in run), _merge_run(run) if len(run) > 1 else run[0][1]))
+            report["merged"] += len(run) - 1
+
+    units.sort(key=lambda item: item[0])
+
+    # 2. 같은 파일의 다른 문서에 그대로 포함된 문서 제외
+    packed_candidates: List[Dict[str, Any]] = []
+    for _, doc in units:
+        content = doc.get("content", "")
+        file_id = doc.get("file_id")
+        if any(
+            other.get("file_id") == file_id and content and content in other.get("content", "")
+            for other in packed_candidates
+        ):
+            report["deduplicated"] += 1
+            continue
+        packed_candidates.append(doc)
+
+    # 3. 순위대로 예산까지 채우기
+    counts = counter.count_many([doc.get("content", "") for doc in packed_candidates])
+    packed: List[Dict[str, Any]] = []
+    used = 0
+    for doc, tokens in zip(packed_candidates, counts):
+        remaining = budget_tokens - used - DOC_OVERHEAD_TOKENS
+        if tokens <= remaining:
+            packed.append(doc)
+            used += tokens + DOC_OVERHEAD_TOKENS
+            continue
+        # 첫 문서는 예산이 작아도 잘라서라도 포함 (근거가 하나도 없는 프롬프트 방지)
+        if remaining >= MIN_TRIM_TOKENS or (not packed and remaining > 0):
+            trimmed = dict(doc)
+            trimmed["content"] = _trim_to_tokens(doc.get("content", ""), remaining, counter)
+            trimmed_tokens = counter.count_tokens(trimmed["content"])
+            packed.append(trimmed)
+            used += trimmed_tokens + DOC_OVERHEAD_TOKENS
+            report["trimmed"] += 1
+        else:
+            report["dropped"] += 1
+
+    report["documents_out"] = len(packed)
+    report["packed_tokens"] = used
+    report["saved_tokens"] = max(0, report["original_tokens"] - used)
+    return packed, report
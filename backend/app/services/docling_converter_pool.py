@@ -0,0 +1,470 @@
+"""
+Docling DocumentConverter 풀
+
+DoclingService가 문서마다 PdfPipelineOptions / DocumentConverter를 새로 만들면서
+레이아웃·테이블 구조 모델을 매번 다시 로드하던 비용을 없애기 위한 모듈입니다.
+- 변환기는 (ocr_enabled, extract_tables, extract_images) 키별로 LRU 캐시에 보관 (크기 제한)
+- 변환은 전용 프로세스 풀에서 실행 (CPU를 많이 쓰는 변환이 API 이벤트 루프/GIL과 경쟁하지 않음)
+  각 워커 프로세스가 자신의 변환기 캐시를 유지하고, 결과 DoclingDocument는 dict로 직렬화해 돌려받음
+- 프로세스 풀을 쓸 수 없으면 같은 캐시를 쓰는 스레드 모드로 동작
+- 설정(docling 섹션)의 preload_converters가 켜져 있으면 서버 시작 시 기본 변환기를 미리 로드
+- 페이지가 많은 PDF는 페이지 구간(shard)으로 나눠 여러 워커에서 동시에 변환한 뒤
+  페이지 순서대로 DoclingDocument.concatenate()로 합침 (페이지 번호는 원본 기준 유지)
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..core.logger import get_console_logger
+from .settings_service import settings_service
+
+_clog = get_console_logger()
+
+# (ocr_enabled, extract_tables, extract_images)
+ConverterKey = Tuple[bool, bool, bool]
+
+# 문서 업로드 기본 옵션 (DoclingOptions 기본값과 동일)
+DEFAULT_CONVERTER_KEY: ConverterKey = (False, True, True)
+
+
+def converter_key(options: Any) -> ConverterKey:
+    """DoclingOptions에서 변환기 캐시 키 생성"""
+    return (bool(options.ocr_enabled), bool(options.extract_tables), bool(options.extract_images))
+
+
+def build_converter(key: ConverterKey):
+    """키에 맞는 DocumentConverter 생성 후 파이프라인 모델까지 로드"""
+    from docling.document_converter import DocumentConverter, PdfFormatOption
+    from docling.datamodel.base_models import InputFormat
+    from docling.datamodel.pipeline_options import PdfPipelineOptions
+
+    ocr_enabled, extract_tables, extract_images = key
+    try:
+        pipeline_options = PdfPipelineOptions(
+            do_ocr=ocr_enabled,
+            do_table_structure=extract_tables,
+            generate_parsed_pages=True,
+            generate_picture_images=extract_images
+        )
+    except TypeError:
+        # generate_picture_images 옵션이 없는 경우 폴백
+        pipeline_options = PdfPipelineOptions(
+            do_ocr=ocr_enabled,
+            do_table_structure=extract_tables,
+            generate_parsed_pages=True
+        )
+    converter = DocumentConverter(
+        format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)}
+    )
+    # DocumentConverter는 첫 convert() 시점에 모델을 로드하므로 미리 초기화
+    try:
+        converter.initialize_pipeline(InputFormat.PDF)
+    except AttributeError:
+        pass
+    return converter
+
+
+class ConverterCache:
+    """키별 DocumentConverter LRU 캐시 (프로세스 내부용)"""
+
+    def __init__(self, max_size: int = 4):
+        self.max_size = max(1, max_size)
+        self._converters: "OrderedDict[ConverterKey, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_locks: Dict[ConverterKey, threading.Lock] = {}
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "build_seconds": 0.0}
+
+    def get(self, key: ConverterKey) -> Tuple[Any, float]:
+        """(변환기, 이번 호출에서 생성에 걸린 시간)을 반환"""
+        with self._lock:
+            converter = self._converters.get(key)
+            if converter is not None:
+                self._converters.move_to_end(key)
+                self.stats["hits"] += 1
+                return converter, 0.0
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        # 같은 키를 동시에 두 번 만들지 않도록 키별 잠금
+        with build_lock:
+            with self._lock:
+                converter = self._converters.get(key)
+                if converter is not None:
+                    self._converters.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return converter, 0.0
+
+            start = time.perf_counter()
+            converter = build_converter(key)
+            build_seconds = time.perf_counter() - start
+
+            with self._lock:
+                self.stats["misses"] += 1
+                self.stats["build_seconds"] += build_seconds
+                self._converters[key] = converter
+                while len(self._converters) > self.max_size:
+                    self._converters.popitem(last=False)
+                    self.stats["evictions"] += 1
+            return converter, build_seconds
+
+    def keys(self) -> List[ConverterKey]:
+        with self._lock:
+            return list(self._converters.keys())
+
+
+# ----------------------------------------------------------------------
+# 워커 프로세스 함수 (spawn으로 실행되므로 모듈 최상위에 있어야 함)
+# ----------------------------------------------------------------------
+
+_worker_cache: Optional[ConverterCache] = None
+
+
+def _init_worker(cache_size: int, preload_keys: List[ConverterKey], threads_per_worker: int = 0):
+    global _worker_cache
+    if threads_per_worker:
+        # 워커 여러 개가 각자 코어 전체를 쓰지 않도록 docling/torch 스레드 수 제한 (docling import 전에 설정)
+        os.environ.setdefault("OMP_NUM_THREADS", str(threads_per_worker))
+    _worker_cache = ConverterCache(cache_size)
+    for key in preload_keys:
+        try:
+            _worker_cache.get(tuple(key))
+        except Exception as e:
+            print(f"⚠️ Docling 변환기 사전 로드 실패 {key}: {e}")
+
+
+def _run_convert(converter: Any, file_path: str, page_range: Optional[Tuple[int, int]]):
+    if page_range is None:
+        return converter.convert(file_path)
+    return converter.convert(file_path, page_range=page_range)
+
+
+def _convert_in_worker(
+    file_path: str, key: ConverterKey, page_range: Optional[Tuple[int, int]] = None
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    global _worker_cache
+    if _worker_cache is None:
+        _worker_cache = ConverterCache()
+    converter, build_seconds = _worker_cache.get(tuple(key))
+
+    start = time.perf_counter()
+    result = _run_convert(converter, file_path, page_range)
+    convert_seconds = time.perf_counter() - start
+
+    return result.document.export_to_dict(), {
+        "worker_pid": os.getpid(),
+        "converter_cached": build_seconds == 0.0,
+        "converter_build_seconds": build_seconds,
+        "convert_seconds": convert_seconds,
+    }
+
+
+def _ping_worker() -> int:
+    return os.getpid()
+
+
+def count_pdf_pages(file_path: str) -> int:
+    """PDF 페이지 수 (PDF가 아니거나 읽을 수 없으면 0)"""
+    if not file_path.lower().endswith(".pdf"):
+        return 0
+    try:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    except ImportError:
+        pass
+    except Exception:
+        return 0
+    try:
+        import pypdf
+
+        return len(pypdf.PdfReader(file_path).pages)
+    except Exception:
+        return 0
+
+
+def plan_page_shards(page_count: int, shard_pages: int) -> List[Tuple[int, int]]:
+    """1부터 시작하는 (시작, 끝) 페이지 구간 목록 (양 끝 포함)"""
+    shard_pages = max(1, shard_pages)
+    return [(start, min(start + shard_pages - 1, page_count)) for start in range(1, page_count + 1, shard_pages)]
+
+
+# worker_processes=0(자동)일 때 최대 워커 수 (워커 하나가 모델을 수 GB씩 로드)
+AUTO_MAX_WORKERS = 4
+
+# 샤드 진행 콜백: (완료 샤드 수, 전체 샤드 수, 완료된 페이지 구간, 샤드 변환 통계)
+ShardProgressCallback = Callable[[int, int, Tuple[int, int], Dict[str, Any]], Any]
+
+
+class DoclingConverterPool:
+    """워커 프로세스(또는 스레드)에서 캐시된 변환기로 문서를 변환합니다."""
+
+    def __init__(self):
+        self.use_process_pool = True
+        self.worker_processes = 2
+        self.cache_size = 4
+        self.preload = False
+        self.enable_page_sharding = True
+        self.shard_pages = 20
+        self.shard_min_pages = 60
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._local_cache = ConverterCache(self.cache_size)
+        self.stats = {"conversions": 0, "sharded_conversions": 0, "failures": 0, "restarts": 0, "ipc_seconds": 0.0}
+
+    def apply_settings(self, docling_settings: Dict[str, Any]):
+        """docling 설정 섹션의 풀 관련 값 반영 (변경 시 다음 변환부터 새 풀 사용)"""
+        use_process_pool = bool(docling_settings.get("use_process_pool", True))
+        # 0이면 CPU 코어 수만큼, 단 워커마다 레이아웃/TableFormer 모델을 따로 올리므로 AUTO_MAX_WORKERS까지만
+        worker_processes = int(docling_settings.get("worker_processes", 2)) or min(AUTO_MAX_WORKERS, os.cpu_count() or 2)
+        worker_processes = max(1, worker_processes)
+        cache_size = max(1, int(docling_settings.get("converter_cache_size", 4)))
+        self.preload = bool(docling_settings.get("preload_converters", False))
+        self.enable_page_sharding = bool(docling_settings.get("enable_page_sharding", True))
+        self.shard_pages = max(1, int(docling_settings.get("shard_pages", 20)))
+        self.shard_min_pages = max(1, int(docling_settings.get("shard_min_pages", 60)))
+
+        if (use_process_pool, worker_processes, cache_size) != (self.use_process_pool, self.worker_processes, self.cache_size):
+            self.use_process_pool = use_process_pool
+            self.worker_processes = worker_processes
+            self.cache_size = cache_size
+            self._local_cache.max_size = cache_size
+            self._shutdown_executor()
+
+    def _preload_keys(self) -> List[ConverterKey]:
+        return [DEFAULT_CONVERTER_KEY] if self.preload else []
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                if self.use_process_pool:
+                    # fork 후 torch/스레드 상태가 꼬이지 않도록 spawn 사용
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.worker_processes,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=(
+                            self.cache_size,
+                            self._preload_keys(),
+                            max(1, (os.cpu_count() or 1) // self.worker_processes),
+                        ),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.worker_processes, thread_name_prefix="docling"
+                    )
+            return self._executor
+
+    def _shutdown_executor(self):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _convert_local(
+        self, file_path: str, key: ConverterKey, page_range: Optional[Tuple[int, int]] = None
+    ) -> Tuple[Any, Dict[str, Any]]:
+        converter, build_seconds = self._local_cache.get(key)
+        start = time.perf_counter()
+        result = _run_convert(converter, file_path, page_range)
+        return result.document, {
+            "worker_pid": os.getpid(),
+            "converter_cached": build_seconds == 0.0,
+            "converter_build_seconds": build_seconds,
+            "convert_seconds": time.perf_counter() - start,
+        }
+
+    async def _convert_once(
+        self, file_path: str, key: ConverterKey, page_range: Optional[Tuple[int, int]] = None
+    ) -> Tuple[Any, Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        if isinstance(executor, ProcessPoolExecutor):
+            from docling_core.types.doc import DoclingDocument
+
+            doc_dict, info = await loop.run_in_executor(executor, _convert_in_worker, file_path, key, page_range)
+            deserialize_start = time.perf_counter()
+            document = DoclingDocument.model_validate(doc_dict)
+            info["deserialize_seconds"] = time.perf_counter() - deserialize_start
+            return document, info
+        return await loop.run_in_executor(executor, self._convert_local, file_path, key, page_range)
+
+    async def convert(self, file_path: str, key: ConverterKey, timeout: Optional[float] = None) -> Tuple[Any, Dict[str, Any]]:
+        """문서를 변환해 (DoclingDocument, 변환 통계)를 반환합니다."""
+        start = time.perf_counter()
+        try:
+            document, info = await asyncio.wait_for(self._convert_once(file_path, key), timeout=timeout)
+        except BrokenProcessPool:
+            # 워커가 비정상 종료(OOM 등)하면 풀을 다시 만들고 오류를 알림
+            self.stats["failures"] += 1
+            self.stats["restarts"] += 1
+            self._shutdown_executor()
+            raise RuntimeError("Docling 변환 워커 프로세스가 비정상 종료되었습니다.")
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+
+        elapsed = time.perf_counter() - start
+        info["total_seconds"] = elapsed
+        self.stats["conversions"] += 1
+        # 변환 외 오버헤드 (프로세스 간 전달, 직렬화, 변환기 생성 대기 등)
+        self.stats["ipc_seconds"] += max(0.0, elapsed - info["convert_seconds"] - info["converter_build_seconds"])
+        return document, info
+
+    def _can_shard(self, page_count: int) -> bool:
+        if not self.enable_page_sharding or page_count < self.shard_min_pages:
+            return False
+        if page_count <= self.shard_pages:
+            return False
+        try:
+            from docling_core.types.doc import DoclingDocument
+        except ImportError:
+            return False
+        # 부분 결과 병합에 필요 (docling-core 2.x 최신 버전)
+        return hasattr(DoclingDocument, "concatenate")
+
+    async def convert_sharded(
+        self,
+        file_path: str,
+        key: ConverterKey,
+        timeout: Optional[float] = None,
+        progress_callback: Optional[ShardProgressCallback] = None,
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """큰 PDF를 페이지 구간으로 나눠 여러 워커에서 동시에 변환합니다.
+
+        샤딩 조건(페이지 수, 설정)을 만족하지 않으면 convert()와 동일하게 한 번에 변환합니다.
+        """
+        page_count = await asyncio.to_thread(count_pdf_pages, file_path)
+        if not self._can_shard(page_count):
+            return await self.convert(file_path, key, timeout=timeout)
+
+        from docling_core.types.doc import DoclingDocument
+
+        shards = plan_page_shards(page_count, self.shard_pages)
+        _clog.info(f"📑 Docling 페이지 분할 변환: {page_count}페이지 → {len(shards)}개 구간 ({self.shard_pages}페이지씩)")
+
+        start = time.perf_counter()
+        results: Dict[Tuple[int, int], Tuple[Any, Dict[str, Any]]] = {}
+
+        async def run_shard(page_range: Tuple[int, int]):
+            results[page_range] = await self._convert_once(file_path, key, page_range)
+            info = results[page_range][1]
+            _clog.info(
+                f"   ✅ 페이지 {page_range[0]}-{page_range[1]} 변환 완료 "
+                f"({len(results)}/{len(shards)}, {info['convert_seconds']:.1f}초)"
+            )
+            if progress_callback is not None:
+                outcome = progress_callback(len(results), len(shards), page_range, info)
+                if asyncio.iscoroutine(outcome):
+                    await outcome
+
+        tasks = [asyncio.ensure_future(run_shard(page_range)) for page_range in shards]
+        try:
+            await asyncio.wait_for(asyncio.gather(*tasks), timeout=timeout)
+        except BrokenProcessPool:
+            # 남은 샤드가 죽은 풀을 계속 기다리지 않도록 먼저 취소
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.stats["failures"] += 1
+            self.stats["restarts"] += 1
+            self._shutdown_executor()
+            raise RuntimeError("Docling 변환 워커 프로세스가 비정상 종료되었습니다.")
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            self.stats["failures"] += 1
+            raise
+
+        # 페이지 순서대로 병합 (각 부분 문서의 페이지 번호는 원본 번호 그대로)
+        merge_start = time.perf_counter()
+        document = DoclingDocument.concatenate([results[page_range][0] for page_range in shards])
+        merge_seconds = time.perf_counter() - merge_start
+
+        elapsed = time.perf_counter() - start
+        shard_infos = [results[page_range][1] for page_range in shards]
+        convert_seconds = sum(info["convert_seconds"] for info in shard_infos)
+        self.stats["conversions"] += 1
+        self.stats["sharded_conversions"] += 1
+        return document, {
+            "worker_pid": sorted({info["worker_pid"] for info in shard_infos}),
+            "converter_cached": all(info["converter_cached"] for info in shard_infos),
+            "converter_build_seconds": sum(info["converter_build_seconds"] for info in shard_infos),
+            # 샤드 변환 시간 합계 (벽시계 시간은 total_seconds)
+            "convert_seconds": convert_seconds,
+            "merge_seconds": merge_seconds,
+            "total_seconds": elapsed,
+            "page_count": page_count,
+            "shards": [
+                {"pages": list(page_range), "convert_seconds": results[page_range][1]["convert_seconds"]}
+                for page_range in shards
+            ],
+            "parallel_speedup": convert_seconds / elapsed if elapsed else 0.0,
+        }
+
+    def get_local_converter(self, key: ConverterKey = DEFAULT_CONVERTER_KEY):
+        """현재 프로세스에서 직접 쓸 캐시된 변환기 (동기 호출용)"""
+        return self._local_cache.get(key)[0]
+
+    async def warm_up(self):
+        """워커를 미리 띄우고 기본 변환기를 로드합니다. (서버 시작 시)"""
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        if isinstance(executor, ProcessPoolExecutor):
+            # 워커 수만큼 작업을 보내 모든 프로세스가 initializer(사전 로드)를 거치게 함
+            await asyncio.gather(*[
+                loop.run_in_executor(executor, _ping_worker) for _ in range(self.worker_processes)
+            ])
+        else:
+            for key in self._preload_keys():
+                await loop.run_in_executor(executor, self._local_cache.get, key)
+
+    def shutdown(self):
+        self._shutdown_executor()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "mode": "process" if self.use_process_pool else "thread",
+            "worker_processes": self.worker_processes,
+            "converter_cache_size": self.cache_size,
+            "preload": self.preload,
+            "page_sharding": {
+                "enabled": self.enable_page_sharding,
+                "shard_pages": self.shard_pages,
+                "min_pages": self.shard_min_pages,
+            },
+            "local_cache": {**self._local_cache.stats, "keys": self._local_cache.keys()},
+        }
+
+
+# 싱글톤 인스턴스
+_converter_pool = None
+_converter_pool_lock = threading.Lock()
+
+
+def get_docling_converter_pool() -> DoclingConverterPool:
+    """DoclingConverterPool 싱글톤 인스턴스 반환"""
+    global _converter_pool
+
+    if _converter_pool is None:
+        with _converter_pool_lock:
+            if _converter_pool is None:
+                pool = DoclingConverterPool()
+                pool.apply_settings(settings_service.get_section_settings("docling"))
+                settings_service.subscribe(
+                    "docling", lambda section, values: pool.apply_settings(values)
+                )
+                _converter_pool = pool
+
+    return _converter_pool
@@ -21,6 +21,7 @@ except ImportError as e:
 
 from ..models.schemas import DoclingOptions, DoclingResult
 from ..core.config import settings
+from .docling_converter_pool import ShardProgressCallback, converter_key, get_docling_converter_pool
 
 
 class DoclingService:
@@ -34,53 +35,11 @@ class DoclingService:
             print("⚠️ Docling을 사용할 수 없습니다. 기본 문서 처리를 사용합니다.")
     
     def _init_converter(self):
-        """DocumentConverter 초기화 - 최신 Docling API 사용"""
+        """변환기 풀 연결 - 변환기는 옵션별로 풀에서 재사용되므로 여기서 만들지 않음"""
         try:
-            # PDF 파이프라인 옵션 설정 (최신 API)
-            pipeline_options = PdfPipelineOptions(
-                do_ocr=False,  # 기본적으로 OCR 비활성화 (성능 향상)
-                do_table_structure=True,  # 테이블 구조 분석 활성화
-                generate_parsed_pages=True  # 파싱된 페이지 생성
-            )
-            
-            # 테이블 구조 분석 상세 설정
-            try:
-                pipeline_options.table_structure_options.mode = TableFormerMode.ACCURATE
-                pipeline_options.table_structure_options.do_cell_matching = True
-                print("🔧 테이블 구조 분석 고급 옵션 활성화")
-            except AttributeError as e:
-                print(f"⚠️ 일부 테이블 옵션을 사용할 수 없습니다: {e}")
-            
-            # DocumentConverter 생성 (최신 API - PdfFormatOption 사용)
-            try:
-                pdf_format_option = PdfFormatOption(pipeline_options=pipeline_options)
-                self.converter = DocumentConverter(
-                    format_options={
-                        InputFormat.PDF: pdf_format_option
-                    }
-                )
-                print("✅ Docling DocumentConverter 초기화 완료 (고급 설정)")
-                
-            except Exception as format_error:
-                print(f"⚠️ 고급 옵션 초기화 실패, 기본 설정으로 재시도: {format_error}")
-                # 최소한의 옵션으로 재시도
-                try:
-                    basic_options = PdfPipelineOptions(do_ocr=False)
-                    basic_format_option = PdfFormatOption(pipeline_options=basic_options)
-                    self.converter = DocumentConverter(
-                        format_options={
-                            InputFormat.PDF: basic_format_option
-                        }
-                    )
-                    print("✅ Docling DocumentConverter 초기화 완료 (기본 설정)")
-                except Exception as basic_error:
-                    print(f"⚠️ 기본 옵션도 실패, 최소 설정으로 재시도: {basic_error}")
-                    # 완전 기본 DocumentConverter로 폴백
-                    self.converter = DocumentConverter()
-                    print("✅ Docling DocumentConverter 초기화 완료 (최소 설정)")
-            
+            self.converter_pool = get_docling_converter_pool()
         except Exception as e:
-            print(f"❌ Docling DocumentConverter 초기화 실패: {e}")
+            print(f"❌ Docling 변환기 풀 초기화 실패: {e}")
             import traceback
             traceback.print_exc()
             self.is_available = False
@@ -97,7 +56,8 @@ class DoclingService:
     async def process_document(
         self, 
         file_path: str, 
-        options: DoclingOptions
+        options: DoclingOptions,
+        progress_callback: Optional[ShardProgressCallback] = None
     ) -> DoclingResult:
         """
         Docling을 사용하여 문서를 전처리합니다.
@@ -105,6 +65,7 @@ class DoclingService:
         Args:
             file_path: 처리할 파일 경로
             options: Docling 처리 옵션
+            progress_callback: 큰 PDF를 페이지 구간별로 나눠 변환할 때 구간 완료마다 호출
             
         Returns:
             DoclingResult: 처리 결과
@@ -119,54 +80,21 @@ class DoclingService:
         file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
         
         try:
-            # 각 작업에 맞는 새로운 변환기 동적 생성
-            try:
-                # 이미지 추출을 위한 파이프라인 옵션
-                pipeline_options = PdfPipelineOptions(
-                    do_ocr=options.ocr_enabled,
-                    do_table_structure=options.extract_tables,
-                    generate_parsed_pages=True,
-                    generate_picture_images=options.extract_images  # 이미지 생성 옵션 추가
-                )
-                pass
-            except TypeError as e:
-                # generate_picture_images 옵션이 없는 경우 폴백
-                pipeline_options = PdfPipelineOptions(
-                    do_ocr=options.ocr_enabled,
-                    do_table_structure=options.extract_tables,
-                    generate_parsed_pages=True
-                )
-            pdf_format_option = PdfFormatOption(pipeline_options=pipeline_options)
-            job_specific_converter = DocumentConverter(
-                format_options={
-                    InputFormat.PDF: pdf_format_option
-                }
-            )
-            
-            # 문서 변환 실행 (타임아웃 설정과 비동기 처리)
-            loop = asyncio.get_event_loop()
-            
             # 파일 크기에 따른 동적 타임아웃 설정
             dynamic_timeout = max(300, min(1800, file_size / 1024 / 1024 * 60))  # 최소 5분, 최대 30분, MB당 1분
             
-            # 타임아웃을 설정하여 무한 대기 방지
+            # 옵션별로 캐시된 변환기를 사용해 전용 워커에서 변환 (타임아웃으로 무한 대기 방지)
+            # 페이지가 많은 PDF는 페이지 구간별로 나눠 여러 워커에서 병렬 변환
             try:
-                conversion_result = await asyncio.wait_for(
-                    loop.run_in_executor(
-                        None, 
-                        self._convert_document_with_progress, 
-                        file_path,
-                        job_specific_converter # 동적으로 생성된 변환기 사용
-                    ),
-                    timeout=dynamic_timeout
+                docling_doc, conversion_info = await self.converter_pool.convert_sharded(
+                    file_path,
+                    converter_key(options),
+                    timeout=dynamic_timeout,
+                    progress_callback=progress_callback
                 )
-                
             except asyncio.TimeoutError:
                 raise RuntimeError(f"문서 변환이 {dynamic_timeout/60:.1f}분을 초과했습니다. 파일 크기를 줄이거나 다른 형식으로 변환해 주세요.")
             
-            # DoclingDocument 추출
-            docling_doc = conversion_result.document
-            
             # 구조화된 콘텐츠 추출
             content_start_time = time.time()
             # 파일 ID 생성 (파일 경로에서 추출)
@@ -196,7 +124,8 @@ class DoclingService:
                     "page_count": page_count,
                     "table_count": table_count,
                     "image_count": image_count,
-                    "file_size_mb": file_size / 1024 / 1024
+                    "file_size_mb": file_size / 1024 / 1024,
+                    "conversion": conversion_info
                 },
                 tables=structured_content.get("tables", []),
                 images=structured_content.get("images", []),
@@ -247,7 +176,7 @@ class DoclingService:
     
     def _convert_document(self, file_path: str):
         """문서 변환 (기본 동기 실행 - 하위 호환성)"""
-        return self._convert_document_with_progress(file_path)
+        return self._convert_document_with_progress(file_path, self.converter_pool.get_local_converter())
     
     async def _extract_structured_content(
         self, 
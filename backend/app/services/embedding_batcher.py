@@ -0,0 +1,166 @@
+"""
+임베딩 배치 엔진
+
+청크 목록을 제공업체별 토큰 예산 / 항목 수 제한에 맞춰 배치로 묶고,
+설정된 개수만큼 배치를 동시에 처리한 뒤 결과를 원래 순서대로 되돌립니다.
+- OpenAI: 청크당 HTTP 요청 1회 → 배치당 1회
+- HuggingFace: batch_size=1 인코딩 → 배치 인코딩
+- 배치 실패 시 절반씩 나눠 재시도하여 실제로 실패한 항목만 0 벡터로 채움
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from ..core.logger import get_console_logger
+
+_clog = get_console_logger()
+
+# 제공업체별 배치 제한 (요청당 최대 항목 수 / 추정 토큰 합)
+PROVIDER_BATCH_LIMITS: Dict[str, Dict[str, int]] = {
+    "openai": {"max_items": 256, "max_tokens": 250_000},
+    "huggingface": {"max_items": 64, "max_tokens": 32_000},
+}
+DEFAULT_BATCH_LIMITS = {"max_items": 32, "max_tokens": 8_000}
+
+
+@dataclass
+class BatchEmbeddingResult:
+    """배치 임베딩 결과 (입력 순서 유지)"""
+    embeddings: List[List[float]]
+    failed_indices: List[int] = field(default_factory=list)
+    batch_count: int = 0
+    request_count: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def success_count(self) -> int:
+        return len(self.embeddings) - len(self.failed_indices)
+
+
+class EmbeddingBatcher:
+    """토큰 예산 기반 배치 임베딩 엔진"""
+
+    _tiktoken_encoder = None
+    _tiktoken_checked = False
+
+    def __init__(
+        self,
+        embedding_func: Any,
+        max_in_flight: int = 4,
+        max_items: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+    ):
+        self.embedding_func = embedding_func
+        provider = getattr(embedding_func, "model_type", None)
+        limits = PROVIDER_BATCH_LIMITS.get(provider, DEFAULT_BATCH_LIMITS)
+        self.max_items = max_items or limits["max_items"]
+        self.max_tokens = max_tokens or limits["max_tokens"]
+        self.max_in_flight = max(1, max_in_flight)
+
+    @classmethod
+    def _get_encoder(cls):
+        if not cls._tiktoken_checked:
+            cls._tiktoken_checked = True
+            try:
+                import tiktoken
+                cls._tiktoken_encoder = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                cls._tiktoken_encoder = None
+        return cls._tiktoken_encoder
+
+    def estimate_tokens(self, texts: List[str]) -> List[int]:
+        """배치 구성용 토큰 추정 (tiktoken이 없으면 UTF-8 바이트 기반 보수적 추정)"""
+        encoder = self._get_encoder()
+        if encoder is not None:
+            try:
+                return [len(tokens) for tokens in encoder.encode_ordinary_batch(texts)]
+            except Exception:
+                pass
+        return [max(1, len(text.encode("utf-8")) // 3) for text in texts]
+
+    def plan_batches(self, texts: List[str]) -> List[List[int]]:
+        """토큰 예산과 항목 수 제한을 넘지 않도록 인덱스 배치를 구성합니다."""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+
+        for index, tokens in enumerate(self.estimate_tokens(texts)):
+            if current and (len(current) >= self.max_items or current_tokens + tokens > self.max_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+        return batches
+
+    def _dimension(self) -> int:
+        try:
+            return self.embedding_func.get_embedding_dimension()
+        except Exception:
+            return 1536
+
+    async def _embed_indices(
+        self,
+        texts: List[str],
+        indices: List[int],
+        results: List[Optional[List[float]]],
+        failed: List[int],
+        counters: Dict[str, int],
+    ):
+        """배치 하나를 임베딩합니다. 실패하면 반으로 나눠 재시도합니다."""
+        batch_texts = [texts[i] for i in indices]
+        counters["requests"] += 1
+        try:
+            embeddings = await asyncio.to_thread(self.embedding_func.embed, batch_texts, True)
+            if len(embeddings) != len(indices):
+                raise ValueError(f"임베딩 개수 불일치: 요청 {len(indices)}개, 응답 {len(embeddings)}개")
+            for i, embedding in zip(indices, embeddings):
+                results[i] = list(embedding)
+        except Exception as e:
+            if len(indices) == 1:
+                _clog.warning(f"청크 {indices[0]} 임베딩 실패: {e}")
+                failed.append(indices[0])
+                return
+            mid = len(indices) // 2
+            await self._embed_indices(texts, indices[:mid], results, failed, counters)
+            await self._embed_indices(texts, indices[mid:], results, failed, counters)
+
+    async def embed(self, texts: List[str]) -> BatchEmbeddingResult:
+        """모든 텍스트를 배치로 임베딩하고 입력 순서대로 반환합니다."""
+        start = time.perf_counter()
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        failed: List[int] = []
+        counters = {"requests": 0}
+
+        # 빈 텍스트는 임베딩 요청에서 제외하고 실패로 처리
+        stripped = [text.strip() if text else "" for text in texts]
+        embeddable = [i for i, text in enumerate(stripped) if text]
+        failed.extend(i for i, text in enumerate(stripped) if not text)
+
+        planned = self.plan_batches([stripped[i] for i in embeddable])
+        batches = [[embeddable[j] for j in batch] for batch in planned]
+
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        async def run(batch: List[int]):
+            async with semaphore:
+                await self._embed_indices(stripped, batch, results, failed, counters)
+
+        await asyncio.gather(*(run(batch) for batch in batches))
+
+        # 실제로 실패한 항목만 0 벡터로 채움
+        dim = next((len(r) for r in results if r is not None), None) or self._dimension()
+        for i in failed:
+            results[i] = [0.0] * dim
+
+        return BatchEmbeddingResult(
+            embeddings=results,
+            failed_indices=sorted(failed),
+            batch_count=len(batches),
+            request_count=counters["requests"],
+            elapsed_seconds=time.perf_counter() - start,
+        )
@@ -0,0 +1,283 @@
+"""
+영구 임베딩 캐시 (content-addressed)
+
+(임베딩 모델, 정규화 텍스트 해시) 키로 임베딩 벡터를 SQLite에 float32 BLOB으로 저장합니다.
+- 재벡터화 시 변경되지 않은 청크는 OpenAI/HuggingFace 호출 없이 재사용
+- 크기 기반 LRU 제거 (last_access 기준)
+- 적중/미스 카운터
+- 기존 벡터 저장소 임베딩으로 사전 채우기
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.logger import get_console_logger
+from .settings_service import settings_service
+
+_clog = get_console_logger()
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 텍스트 정규화 (NFC + 공백 정리)"""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def text_hash(text: str) -> str:
+    """정규화된 텍스트의 SHA-256 해시"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class PersistentEmbeddingCache:
+    """SQLite 기반 영구 임베딩 캐시"""
+
+    def __init__(self, db_path: Optional[str] = None, max_size_mb: Optional[int] = None):
+        self.db_path = db_path or os.path.join(settings.DATA_DIR, "db", "embedding_cache.db")
+        self._fixed_max_size_mb = max_size_mb
+        self.apply_settings(settings_service.get_section_settings("performance"))
+        # 제거 시 목표 크기 (최대 크기의 90%)
+        self.evict_target_ratio = 0.9
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "prefilled": 0,
+        }
+
+    def apply_settings(self, perf_settings: Dict[str, Any]):
+        """성능 설정의 캐시 사용 여부 / 최대 크기 반영"""
+        self.enabled = perf_settings.get("enableEmbeddingCache", True)
+        max_size_mb = self._fixed_max_size_mb or perf_settings.get("embeddingCacheMaxMB", 512)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+            conn.commit()
+            row = conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()
+            self._total_bytes = int(row[0] or 0)
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """텍스트 목록의 캐시된 임베딩을 조회합니다 (없으면 해당 위치에 None)."""
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        if not self.enabled or not texts:
+            return results
+
+        hashes = [text_hash(t) for t in texts]
+        unique_hashes = list(dict.fromkeys(hashes))
+        found: Dict[str, List[float]] = {}
+
+        with self._lock:
+            try:
+                conn = self._get_conn()
+                # SQLite 변수 개수 제한을 고려해 나눠서 조회
+                for start in range(0, len(unique_hashes), 500):
+                    part = unique_hashes[start:start + 500]
+                    placeholders = ",".join("?" * len(part))
+                    rows = conn.execute(
+                        f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                        [model, *part],
+                    ).fetchall()
+                    for h, blob in rows:
+                        found[h] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+                if found:
+                    now = time.time()
+                    conn.executemany(
+                        "UPDATE embeddings SET last_access = ? WHERE model = ? AND text_hash = ?",
+                        [(now, model, h) for h in found],
+                    )
+                    conn.commit()
+            except Exception as e:
+                _clog.warning(f"임베딩 캐시 조회 실패: {e}")
+                return results
+
+            for i, h in enumerate(hashes):
+                vector = found.get(h)
+                if vector is not None:
+                    results[i] = vector
+                    self.stats["hits"] += 1
+                else:
+                    self.stats["misses"] += 1
+
+        return results
+
+    def put_many(self, model: str, texts: Sequence[str], embeddings: Sequence[Sequence[float]]) -> int:
+        """임베딩을 저장합니다. 0 벡터(임베딩 실패 시 더미값)는 저장하지 않습니다."""
+        if not self.enabled or not texts:
+            return 0
+
+        now = time.time()
+        rows_by_hash = {}
+        for text, embedding in zip(texts, embeddings):
+            if embedding is None:
+                continue
+            vector = np.asarray(embedding, dtype=np.float32)
+            if vector.size == 0 or not np.any(vector):
+                continue
+            h = text_hash(text)
+            rows_by_hash[h] = (model, h, int(vector.size), vector.tobytes(), now, now)
+        rows = list(rows_by_hash.values())
+
+        if not rows:
+            return 0
+
+        with self._lock:
+            try:
+                conn = self._get_conn()
+                # 덮어쓰는 항목의 기존 크기를 빼고 새 크기를 더함
+                for start in range(0, len(rows), 500):
+                    part = rows[start:start + 500]
+                    placeholders = ",".join("?" * len(part))
+                    existing = conn.execute(
+                        f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                        [model, *[r[1] for r in part]],
+                    ).fetchone()[0]
+                    self._total_bytes -= int(existing or 0)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.commit()
+                self._total_bytes += sum(len(r[3]) for r in rows)
+                self.stats["writes"] += len(rows)
+
+                if self._total_bytes > self.max_size_bytes:
+                    self._evict_locked(conn)
+            except Exception as e:
+                _clog.warning(f"임베딩 캐시 저장 실패: {e}")
+                return 0
+
+        return len(rows)
+
+    def _evict_locked(self, conn: sqlite3.Connection):
+        """가장 오래 사용되지 않은 항목부터 목표 크기까지 제거 (락 보유 상태에서 호출)"""
+        target = int(self.max_size_bytes * self.evict_target_ratio)
+        while self._total_bytes > target:
+            rows = conn.execute(
+                "SELECT model, text_hash, LENGTH(vector) FROM embeddings ORDER BY last_access ASC LIMIT 500"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+
+            victims = []
+            for model, h, size in rows:
+                victims.append((model, h))
+                self._total_bytes -= int(size)
+                if self._total_bytes <= target:
+                    break
+
+            conn.executemany("DELETE FROM embeddings WHERE model = ? AND text_hash = ?", victims)
+            self.stats["evictions"] += len(victims)
+        conn.commit()
+
+    def prefill_from_store(self, store: Any, model: str, page_size: int = 1000) -> int:
+        """기존 벡터 저장소의 (document, embedding) 쌍으로 캐시를 채웁니다."""
+        if not self.enabled or store is None:
+            return 0
+
+        total = 0
+        offset = 0
+        while True:
+            page = store.get(limit=page_size, offset=offset, include_embeddings=True)
+            ids = page.get("ids") if page else None
+            if not ids:
+                break
+
+            documents = page.get("documents")
+            embeddings = page.get("embeddings")
+            if documents is None or embeddings is None or len(embeddings) == 0:
+                break
+
+            total += self.put_many(model, list(documents), list(embeddings))
+            offset += len(ids)
+            if len(ids) < page_size:
+                break
+
+        with self._lock:
+            self.stats["prefilled"] += total
+        _clog.info(f"임베딩 캐시 사전 채우기 완료: {total}개 ({model})")
+        return total
+
+    def clear(self, model: Optional[str] = None):
+        """캐시 삭제 (모델 지정 시 해당 모델만)"""
+        with self._lock:
+            conn = self._get_conn()
+            if model:
+                conn.execute("DELETE FROM embeddings WHERE model = ?", (model,))
+            else:
+                conn.execute("DELETE FROM embeddings")
+            conn.commit()
+            row = conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()
+            self._total_bytes = int(row[0] or 0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        with self._lock:
+            try:
+                entry_count = self._get_conn().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            except Exception:
+                entry_count = 0
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "enabled": self.enabled,
+                "entry_count": entry_count,
+                "size_mb": round(self._total_bytes / 1024 / 1024, 2),
+                "max_size_mb": round(self.max_size_bytes / 1024 / 1024, 2),
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            }
+
+
+# 싱글톤 인스턴스
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> PersistentEmbeddingCache:
+    """PersistentEmbeddingCache 싱글톤 인스턴스 반환"""
+    global _embedding_cache
+
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = PersistentEmbeddingCache()
+                settings_service.subscribe(
+                    "performance", lambda section, values: _embedding_cache.apply_settings(values)
+                )
+
+    return _embedding_cache
@@ -0,0 +1,301 @@
+"""
+임베딩 모델 레지스트리
+
+프로세스 전역에서 임베딩 인코더(HuggingFace SentenceTransformer, OpenAI 클라이언트)를
+(provider, model_name, device) 키 단위로 한 번만 로드하여 공유합니다.
+- 스레드 안전한 지연 로딩 (키별 로딩 락)
+- 서버 시작 시 워밍업
+- 임베딩 모델 설정 변경 시 이전 인코더 해제
+- 모델별 로딩 시간 / 메모리 사용량 통계
+"""
+
+import gc
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from ..core.logger import get_console_logger
+from .settings_service import settings_service
+
+_clog = get_console_logger()
+
+RegistryKey = Tuple[str, str, str]
+
+
+@dataclass
+class EncoderEntry:
+    """레지스트리에 등록된 인코더"""
+    encoder: Any
+    provider: str
+    model_name: str
+    device: str
+    load_time_seconds: float = 0.0
+    memory_mb: float = 0.0
+    loaded_at: float = field(default_factory=time.time)
+    use_count: int = 0
+    credential_fingerprint: str = ""
+
+
+def _fingerprint(secret: Optional[str]) -> str:
+    """API 키를 그대로 보관하지 않도록 해시 지문만 남깁니다."""
+    if not secret:
+        return ""
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()[:16]
+
+
+class EmbeddingModelRegistry:
+    """(provider, model_name, device) 별 공유 임베딩 인코더 레지스트리"""
+
+    def __init__(self):
+        self._entries: Dict[RegistryKey, EncoderEntry] = {}
+        self._lock = threading.RLock()
+        self._load_locks: Dict[RegistryKey, threading.Lock] = {}
+        self._active_key: Optional[RegistryKey] = None
+        self._stats = {
+            "hits": 0,
+            "loads": 0,
+            "load_failures": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def resolve_provider(provider: Optional[str], model_name: str) -> str:
+        """설정의 provider 값과 모델 이름으로 실제 인코더 타입을 결정합니다."""
+        if provider in ("openai", "huggingface"):
+            return provider
+        if model_name.startswith("text-embedding-") or "openai" in model_name.lower():
+            return "openai"
+        if "/" in model_name or model_name.startswith("huggingface"):
+            return "huggingface"
+        return "openai"
+
+    @staticmethod
+    def default_device(provider: str) -> str:
+        # HuggingFace 모델은 CPU 전용으로 실행, OpenAI는 원격 API
+        return "cpu" if provider == "huggingface" else "remote"
+
+    def _current_key(self, model_settings: Optional[Dict[str, Any]] = None) -> RegistryKey:
+        if model_settings is None:
+            model_settings = settings_service.get_section_settings("models")
+        model_name = model_settings.get("embedding_model", "text-embedding-ada-002")
+        provider = self.resolve_provider(model_settings.get("embedding_provider", "openai"), model_name)
+        return (provider, model_name, self.default_device(provider))
+
+    def get_encoder(
+        self,
+        provider: str,
+        model_name: str,
+        device: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> Optional[Any]:
+        """공유 인코더를 반환합니다. 없으면 로드 후 등록합니다 (로드 실패 시 None)."""
+        device = device or self.default_device(provider)
+        key: RegistryKey = (provider, model_name, device)
+        fingerprint = _fingerprint(api_key)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.credential_fingerprint == fingerprint:
+                entry.use_count += 1
+                self._stats["hits"] += 1
+                return entry.encoder
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # 같은 키는 한 스레드만 로드하고, 다른 키의 로드는 막지 않음
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.credential_fingerprint == fingerprint:
+                    entry.use_count += 1
+                    self._stats["hits"] += 1
+                    return entry.encoder
+
+            entry = self._load(provider, model_name, device, api_key)
+            if entry is None:
+                with self._lock:
+                    self._stats["load_failures"] += 1
+                return None
+
+            entry.credential_fingerprint = fingerprint
+            entry.use_count = 1
+            with self._lock:
+                self._entries[key] = entry
+                self._stats["loads"] += 1
+            return entry.encoder
+
+    def _load(self, provider: str, model_name: str, device: str, api_key: Optional[str]) -> Optional[EncoderEntry]:
+        if provider == "huggingface":
+            return self._load_huggingface(model_name, device)
+        return self._load_openai(model_name, device, api_key)
+
+    def _load_openai(self, model_name: str, device: str, api_key: Optional[str]) -> Optional[EncoderEntry]:
+        """OpenAI 클라이언트 생성"""
+        if not api_key:
+            print("OpenAI API 키가 설정되지 않았습니다.")
+            return None
+        try:
+            import openai
+        except ImportError:
+            print("OpenAI 패키지가 설치되지 않았습니다.")
+            return None
+
+        start = time.perf_counter()
+        client = openai.OpenAI(api_key=api_key)
+        return EncoderEntry(
+            encoder=client,
+            provider="openai",
+            model_name=model_name,
+            device=device,
+            load_time_seconds=time.perf_counter() - start,
+        )
+
+    def _load_huggingface(self, model_name: str, device: str) -> Optional[EncoderEntry]:
+        """SentenceTransformer 모델 로딩 (프로세스당 키별 1회)"""
+        try:
+            from sentence_transformers import SentenceTransformer
+            import torch
+            import psutil
+        except ImportError as ie:
+            print("sentence-transformers 패키지가 설치되지 않았습니다.")
+            print("pip install sentence-transformers 로 설치해주세요.")
+            print(f"상세 오류: {ie}")
+            return None
+
+        try:
+            if device == "cpu":
+                # GPU 사용 비활성화 - CPU만 사용
+                os.environ["CUDA_VISIBLE_DEVICES"] = ""
+                torch.cuda.is_available = lambda: False
+
+            print(f"허깅페이스 모델 로딩 중: {model_name} ({device})")
+            process = psutil.Process()
+            rss_before = process.memory_info().rss
+            start = time.perf_counter()
+
+            model = SentenceTransformer(
+                model_name,
+                device=device,
+                cache_folder='./model_cache'  # 로컬 캐시 폴더 지정
+            )
+            model = model.to(device)
+
+            load_time = time.perf_counter() - start
+            rss_delta_mb = (process.memory_info().rss - rss_before) / 1024 / 1024
+
+            # 파라미터 크기가 RSS 변화량보다 정확하므로 우선 사용
+            try:
+                param_bytes = sum(p.numel() * p.element_size() for p in model.parameters())
+                memory_mb = param_bytes / 1024 / 1024
+            except Exception:
+                memory_mb = max(0.0, rss_delta_mb)
+
+            print(f"✅ 허깅페이스 모델 로딩 완료: {model_name} ({load_time:.2f}초, {memory_mb:.1f}MB)")
+            return EncoderEntry(
+                encoder=model,
+                provider="huggingface",
+                model_name=model_name,
+                device=device,
+                load_time_seconds=load_time,
+                memory_mb=memory_mb,
+            )
+        except Exception as e:
+            import traceback
+            print(f"허깅페이스 모델 로딩 실패: {e}")
+            print(f"오류 타입: {type(e).__name__}")
+            traceback.print_exc()
+            return None
+
+    def sync_with_settings(self, model_settings: Optional[Dict[str, Any]] = None) -> bool:
+        """현재 임베딩 모델 설정과 다른 인코더를 해제합니다. 변경이 있었으면 True."""
+        key = self._current_key(model_settings)
+        with self._lock:
+            if key == self._active_key:
+                return False
+            previous = self._active_key
+            self._active_key = key
+            stale_keys = [k for k in self._entries if k != key]
+
+        for stale_key in stale_keys:
+            self.evict(stale_key)
+
+        if previous is not None:
+            _clog.info(f"임베딩 모델 변경 감지: {previous[1]} → {key[1]} (해제 {len(stale_keys)}개)")
+        return bool(stale_keys) or previous is not None
+
+    def warm_up(self) -> Optional[Dict[str, Any]]:
+        """현재 설정된 임베딩 모델을 미리 로드합니다 (서버 시작 시 호출)."""
+        model_settings = settings_service.get_section_settings("models")
+        self.sync_with_settings(model_settings)
+        provider, model_name, device = self._current_key(model_settings)
+        api_key = model_settings.get("embedding_api_key", "") if provider == "openai" else None
+
+        encoder = self.get_encoder(provider, model_name, device, api_key=api_key)
+        if encoder is None:
+            _clog.warning(f"임베딩 모델 워밍업 실패: {provider} - {model_name}")
+            return None
+
+        entry_stats = self._entry_stats((provider, model_name, device))
+        _clog.info(
+            f"🔥 임베딩 모델 워밍업 완료: {provider} - {model_name} "
+            f"({entry_stats['load_time_seconds']:.2f}초, {entry_stats['memory_mb']:.1f}MB)"
+        )
+        return entry_stats
+
+    def evict(self, key: RegistryKey) -> bool:
+        """특정 인코더를 레지스트리에서 제거합니다."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._stats["evictions"] += 1
+        del entry
+        gc.collect()
+        return True
+
+    def clear(self):
+        """모든 인코더 해제"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._active_key = None
+            self._stats["evictions"] += count
+        gc.collect()
+
+    def _entry_stats(self, key: RegistryKey) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return {}
+            return {
+                "provider": entry.provider,
+                "model_name": entry.model_name,
+                "device": entry.device,
+                "load_time_seconds": round(entry.load_time_seconds, 4),
+                "memory_mb": round(entry.memory_mb, 2),
+                "loaded_at": entry.loaded_at,
+                "use_count": entry.use_count,
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """레지스트리 통계 (모델별 로딩 시간 / 메모리 포함)"""
+        with self._lock:
+            keys = list(self._entries.keys())
+            stats = dict(self._stats)
+            active = self._active_key
+        return {
+            **stats,
+            "active_model": {"provider": active[0], "model_name": active[1], "device": active[2]} if active else None,
+            "loaded_count": len(keys),
+            "total_memory_mb": round(sum(self._entry_stats(k).get("memory_mb", 0.0) for k in keys), 2),
+            "models": [self._entry_stats(k) for k in keys],
+        }
+
+
+# 싱글톤 인스턴스
+embedding_registry = EmbeddingModelRegistry()
+
+# 임베딩 모델 설정이 바뀌면 이전 인코더 해제
+settings_service.subscribe("models", lambda section, values: embedding_registry.sync_with_settings(values))
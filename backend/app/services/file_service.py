@@ -5,7 +5,7 @@ import aiofiles
 import time
 import logging
 import asyncio
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, List, Optional
 from fastapi import UploadFile, HTTPException
 from datetime import datetime
 
@@ -26,6 +26,14 @@ except ImportError:
     SSE_AVAILABLE = False
     print("SSE 모듈을 찾을 수 없습니다.")
 
+# 업로드 스트리밍 블록 크기 (업로드당 메모리 사용량은 이 크기로 고정)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """업로드 크기가 제한을 넘은 경우"""
+
+
 class FileService:
     """파일 관리 및 벡터화 파이프라인 오케스트레이션을 담당합니다."""
     def __init__(self):
@@ -92,9 +100,20 @@ class FileService:
             await self._update_file_status(file_id, FileStatus.FAILED, error=str(e))
             return {"success": False, "error": str(e)}
 
-    async def start_vectorization(self, file_id: str):
-        """전처리된 파일의 벡터화를 시작합니다."""
+    async def start_vectorization(
+        self,
+        file_id: str,
+        on_checkpoint: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        commit_batch_size: int = 0,
+    ):
+        """전처리된 파일의 벡터화를 시작합니다.
+
+        저장된 청크와 청킹 데이터를 비교해 새로 생기거나 바뀐 청크만 임베딩하고 없어진 청크는 삭제합니다.
+        (중간에 끊긴 작업을 다시 실행해도 이미 저장된 청크는 재사용)
+        벡터화 작업 큐에서 호출할 때는 commit_batch_size개 청크가 저장될 때마다 on_checkpoint로 진행 상황을 넘깁니다.
+        """
         vectorization_start_time = time.time()
+        timings: Dict[str, float] = {}
         self.logger.info(f"🚀 === 벡터화 시작: {file_id} ===")
 
         try:
@@ -145,6 +164,7 @@ class FileService:
                     self.logger.warning(f"SSE 시작 이벤트 전송 실패: {sse_error}")
 
             # SQLite에서 청킹 데이터 로드
+            stage_start = time.time()
             try:
                 from .preprocessing_service import manual_preprocessing_service
                 preprocessing_data = manual_preprocessing_service.get_preprocessing_data(file_id)
@@ -175,6 +195,8 @@ class FileService:
                 await self._update_file_status(file_id, FileStatus.FAILED, error=f"청킹 데이터 로드 실패: {str(e)}")
                 return {"success": False, "error": f"청킹 데이터 로드 실패: {str(e)}"}
 
+            timings["load_chunks"] = time.time() - stage_start
+
             # 벡터화 실행 - 청크 목록을 직접 벡터 서비스에 전달
             self.logger.info(f"청크 임베딩 시작... ({len(text_chunks)}개 청크)")
             vector_metadata = { 
@@ -185,19 +207,31 @@ class FileService:
                 "source": "manual_preprocessing"
             }
             
-            # VectorService의 add_document_chunks 메서드를 직접 호출 (청킹 생략)
-            if self.vector_service.enable_parallel and len(text_chunks) > 10:
-                result = await self.vector_service._add_document_chunks_parallel(file_id, text_chunks, vector_metadata)
-                success = result
-            else:
-                success = await self.vector_service.add_document_chunks(file_id, text_chunks, vector_metadata)
-            
+            # 저장된 청크와 비교해 바뀐 청크만 임베딩 (청킹 생략)
+            stage_start = time.time()
+
+            async def _report_progress(committed: int, total: int):
+                if on_checkpoint is not None:
+                    outcome = on_checkpoint({"committed_chunks": committed, "total_chunks": total})
+                    if asyncio.iscoroutine(outcome):
+                        await outcome
+
+            sync_result = await self.vector_service.sync_document_chunks(
+                file_id, text_chunks, vector_metadata,
+                commit_batch_size=commit_batch_size,
+                on_batch_committed=_report_progress,
+            )
+            success = sync_result.get("success", False)
+            chunk_diff = {key: sync_result.get(key, 0) for key in ("reused", "added", "deleted", "near_duplicates", "skipped_duplicates")}
+            timings["embed_store"] = time.time() - stage_start
+
             if success:
                 result = {"success": True, "chunks_count": len(text_chunks)}
             else:
-                result = {"success": False, "error": "청크 벡터화에 실패했습니다."}
+                result = {"success": False, "error": sync_result.get("error") or "청크 벡터화에 실패했습니다."}
 
             if result.get("success"):
+                stage_start = time.time()
                 self.logger.info(f"🔄 메타데이터 업데이트 시작 - 파일 상태를 COMPLETED로 변경")
                 await self._update_file_status(file_id, FileStatus.COMPLETED, chunks_count=result.get('chunks_count'))
                 
@@ -211,8 +245,13 @@ class FileService:
                 )
                 
                 elapsed = time.time() - vectorization_start_time
+                timings["finalize"] = time.time() - stage_start
                 self.logger.info(f"📋 메타데이터 업데이트 완료 - 청크 수: {result.get('chunks_count', 0)}")
-                self.logger.info(f"✅ 벡터화 성공. 청크 수: {result.get('chunks_count', 0)} (소요 시간: {elapsed:.2f}초)")
+                self.logger.info(
+                    f"✅ 벡터화 성공. 청크 수: {result.get('chunks_count', 0)} "
+                    f"(재사용 {chunk_diff['reused']}, 추가 {chunk_diff['added']}, 삭제 {chunk_diff['deleted']}, "
+                    f"근접 중복 {chunk_diff['near_duplicates']}(저장 제외 {chunk_diff['skipped_duplicates']}), 소요 시간: {elapsed:.2f}초)"
+                )
                 
                 # SSE 이벤트 전송 (벡터화 완료)
                 if SSE_AVAILABLE:
@@ -224,6 +263,7 @@ class FileService:
                             "status": "completed",
                             "vectorized": True,
                             "chunks_count": result.get('chunks_count', 0),
+                            "chunk_diff": chunk_diff,
                             "processing_time": elapsed
                         })
                         self.logger.info(f"📡 SSE 벡터화 완료 이벤트 전송: {file_id}")
@@ -233,7 +273,9 @@ class FileService:
                 return {
                     "success": True,
                     "chunks_count": result.get('chunks_count', 0),
-                    "processing_time": elapsed
+                    "processing_time": elapsed,
+                    "chunk_diff": chunk_diff,
+                    "timings": timings
                 }
             else:
                 self.logger.error(f"❌ 벡터화 실패: {result.get('error')}")
@@ -537,6 +579,26 @@ class FileService:
     def _ensure_data_dir(self):
         os.makedirs(settings.DATA_DIR, exist_ok=True)
 
+    async def _stream_upload_to_temp(self, file: UploadFile, temp_path: str, max_bytes: int):
+        """업로드를 고정 크기 블록으로 임시 파일에 쓰면서 MD5를 계산합니다.
+
+        제한 크기를 넘는 순간 중단하고 UploadTooLargeError를 발생시킵니다. (file_size, file_hash) 반환
+        """
+        import hashlib
+        hasher = hashlib.md5()
+        file_size = 0
+        async with aiofiles.open(temp_path, 'wb') as f:
+            while True:
+                block = await file.read(UPLOAD_CHUNK_SIZE)
+                if not block:
+                    break
+                file_size += len(block)
+                if file_size > max_bytes:
+                    raise UploadTooLargeError()
+                hasher.update(block)
+                await f.write(block)
+        return file_size, hasher.hexdigest()
+
     async def upload_file(self, file: UploadFile, category_id: Optional[str] = None, allow_global_duplicates: bool = False, force_replace: bool = False, convert_to_pdf: bool = False) -> FileUploadResponse:
         try:
             file_extension = os.path.splitext(file.filename)[1].lower()
@@ -551,27 +613,6 @@ class FileService:
             if file.size and file.size > max_file_size_bytes:
                 raise HTTPException(status_code=400, detail=f"파일 크기가 너무 큽니다. 최대 크기: {max_file_size_mb}MB")
             
-            content = await file.read()
-            file_size = len(content)
-            
-            import hashlib
-            file_hash = hashlib.md5(content).hexdigest()
-            
-            # SQLite에서 중복 파일 검사
-            existing_file = self.file_metadata_service.get_file_by_hash(file_hash)
-            if existing_file and (allow_global_duplicates or existing_file.category_id == category_id):
-                if force_replace:
-                    await self.delete_file(existing_file.file_id)
-                else:
-                    raise HTTPException(
-                        status_code=409,
-                        detail={"error": "duplicate_file", "message": "동일한 파일이 이미 존재합니다."}
-                    )
-            
-            file_id = str(uuid.uuid4())
-            saved_filename = f"{file_id}{file_extension}"
-            file_path = os.path.join(self.upload_dir, saved_filename)
-            
             category_name = None
             if category_id:
                 category = await self.category_service.get_category(category_id)
@@ -579,8 +620,34 @@ class FileService:
                     raise HTTPException(status_code=400, detail="존재하지 않는 카테고리입니다.")
                 category_name = category.name
             
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(content)
+            file_id = str(uuid.uuid4())
+            saved_filename = f"{file_id}{file_extension}"
+            file_path = os.path.join(self.upload_dir, saved_filename)
+            temp_path = os.path.join(self.upload_dir, f".{saved_filename}.part")
+            
+            # 전체 내용을 메모리에 올리지 않고 블록 단위로 임시 파일에 저장하며 해시 계산
+            try:
+                try:
+                    file_size, file_hash = await self._stream_upload_to_temp(file, temp_path, max_file_size_bytes)
+                except UploadTooLargeError:
+                    raise HTTPException(status_code=400, detail=f"파일 크기가 너무 큽니다. 최대 크기: {max_file_size_mb}MB")
+                
+                # SQLite에서 중복 파일 검사 (해시 계산이 끝난 뒤 한 번)
+                existing_file = self.file_metadata_service.get_file_by_hash(file_hash)
+                if existing_file and (allow_global_duplicates or existing_file.category_id == category_id):
+                    if force_replace:
+                        await self.delete_file(existing_file.file_id)
+                    else:
+                        raise HTTPException(
+                            status_code=409,
+                            detail={"error": "duplicate_file", "message": "동일한 파일이 이미 존재합니다."}
+                        )
+                
+                # 완성된 파일만 최종 경로에 보이도록 원자적으로 이동
+                os.replace(temp_path, file_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
             
             # PDF 변환 처리 및 변환 정보 저장
             original_extension = None
@@ -876,9 +943,9 @@ class FileService:
                 error_message=None
             )
             
-            # 백그라운드에서 벡터화 시작
-            import asyncio
-            asyncio.create_task(self.start_vectorization(file_id))
+            # 벡터화 작업 큐에 등록
+            from .vectorization_queue import get_vectorization_queue, JOB_KIND_FILE
+            await get_vectorization_queue().enqueue(JOB_KIND_FILE, file_id)
             
             return True
             
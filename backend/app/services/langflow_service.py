@@ -1,8 +1,10 @@
 import os
+import asyncio
 import json
 import time
-from typing import Dict, Any, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from ..core.config import settings
+from .llm_gateway import get_llm_gateway
 from datetime import datetime
 
 class LangflowService:
@@ -13,6 +15,8 @@ class LangflowService:
         self._flow_service = None
         # 파일 서비스 초기화 (순환 import 방지를 위해 지연 로딩)
         self._file_service = None
+        # Flow별 검색 옵션 캐시 (Flow 파일 경로 -> (수정 시각, 옵션))
+        self._search_options_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
         # 예시 Flow 데이터 (실제로는 LangFlow API에서 가져와야 함)
         self.example_flows = [
             {
@@ -651,24 +655,43 @@ class LangflowService:
             # 카테고리별 파일 목록 조회
             files = await self.file_service.list_files(category_id=category_id)
             
-            results = []
+            # 아직 벡터화되지 않은 파일을 모두 작업 큐에 넣고 워커 수만큼 동시에 처리
+            from .vectorization_queue import get_vectorization_queue, JOB_KIND_LANGFLOW, PRIORITY_LOW
+            job_queue = get_vectorization_queue()
+            jobs = []
             for file_info in files:
-                if not file_info.vectorized:  # 아직 벡터화되지 않은 파일만
-                    result = await self.process_file_with_flow(
-                        file_info.file_id, 
-                        vectorization_flow_id,
-                        file_info
-                    )
-                    results.append(result)
+                if not file_info.vectorized:
+                    jobs.append(await job_queue.enqueue(
+                        JOB_KIND_LANGFLOW,
+                        file_info.file_id,
+                        {"flow_id": vectorization_flow_id},
+                        priority=PRIORITY_LOW
+                    ))
             
-            return results
+            results = await asyncio.gather(*[job_queue.wait(job["job_id"]) for job in jobs])
+            return list(results)
             
         except Exception as e:
             print(f"카테고리별 벡터화 중 오류: {str(e)}")
             return []
     
-    async def search_with_flow(self, query: str, search_flow_id: str, category_ids: List[str] = None, top_k: int = 10) -> Dict[str, Any]:
-        """Langflow를 사용하여 RAG 검색을 수행합니다."""
+    async def search_with_flow(
+        self,
+        query: str,
+        search_flow_id: str,
+        category_ids: List[str] = None,
+        top_k: int = 10,
+        search_mode: Optional[str] = None,
+        vector_weight: Optional[float] = None,
+        lexical_weight: Optional[float] = None,
+        rerank: Optional[bool] = None,
+        rerank_candidates: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Langflow를 사용하여 RAG 검색을 수행합니다.
+        
+        재정렬 여부/후보 수는 인자 → Flow 파일의 rerank 설정 → 성능 설정 순으로 결정합니다.
+        """
         try:
             # LangFlow Flow 대신 직접 ChromaDB 검색 사용
             from .vector_service import VectorService
@@ -678,35 +701,38 @@ class LangflowService:
             print(f"카테고리: {category_ids}")
             print(f"검색 결과 수: {top_k}개")
             
+            flow_rerank = (await self.get_flow_search_options(search_flow_id)).get("rerank", {})
+            if rerank is None:
+                rerank = flow_rerank.get("enabled")
+            if rerank_candidates is None:
+                rerank_candidates = flow_rerank.get("candidates")
+            
+            rerank_report: Dict[str, Any] = {}
             vector_service = VectorService()
             search_results = await vector_service.search_similar_chunks(
                 query=query,
                 top_k=top_k,
-                category_ids=category_ids
+                category_ids=category_ids,
+                search_mode=search_mode,
+                vector_weight=vector_weight,
+                lexical_weight=lexical_weight,
+                rerank=rerank,
+                rerank_candidates=rerank_candidates,
+                rerank_report=rerank_report
             )
             
             print(f"검색 결과: {len(search_results)}개 발견")
             
-            if search_results:
-                return {
-                    "status": "success",
-                    "results": search_results,
-                    "flow_id": search_flow_id,
-                    "search_method": "direct_chromadb",
-                    "query": query,
-                    "category_ids": category_ids,
-                    "top_k": top_k
-                }
-            else:
-                return {
-                    "status": "success",
-                    "results": [],
-                    "flow_id": search_flow_id,
-                    "search_method": "direct_chromadb",
-                    "query": query,
-                    "category_ids": category_ids,
-                    "top_k": top_k
-                }
+            return {
+                "status": "success",
+                "results": search_results or [],
+                "flow_id": search_flow_id,
+                "search_method": "direct_chromadb",
+                "query": query,
+                "category_ids": category_ids,
+                "top_k": top_k,
+                "rerank": rerank_report or None
+            }
                 
         except Exception as e:
             print(f"직접 ChromaDB 검색 중 오류: {str(e)}")
@@ -717,89 +743,147 @@ class LangflowService:
                 "response": "검색 중 오류가 발생했습니다."
             }
     
-    async def execute_flow_with_llm(self, flow_id: str, prompt: str, system_message: str = None, model_config: Dict[str, Any] = None) -> Dict[str, Any]:
-        """LangFlow를 통해 LLM 모델을 실행합니다."""
+    async def get_flow_search_options(self, flow_id: str) -> Dict[str, Any]:
+        """
+        Flow 파일의 검색 옵션을 반환합니다. Flow JSON 최상위에 다음 형식으로 지정합니다.
+        
+            "rerank": {"enabled": true, "candidates": 50}
+        
+        candidates가 클수록 재현율은 오르지만 재정렬 지연 시간(p95)도 늘어납니다.
+        Flow 파일이 없거나 설정이 없으면 빈 dict를 반환합니다.
+        """
+        if not flow_id:
+            return {}
+        flow_file_path = os.path.join(settings.BASE_DIR, "langflow", "flows", f"{flow_id.replace('_', ' ').title()}.json")
         try:
-            print(f"LangFlow LLM 실행: {flow_id}")
-            
-            # Flow JSON 파일 로드
-            flow_file_path = os.path.join(settings.BASE_DIR, "langflow", "flows", f"{flow_id.replace('_', ' ').title()}.json")
-            
-            # 파일명 변환 (예: vector_store_search -> Vector Store Search.json)
-            if not os.path.exists(flow_file_path):
-                flow_file_path = os.path.join(settings.BASE_DIR, "langflow", "flows", "Vector Store Search.json")
-            
-            if not os.path.exists(flow_file_path):
-                print(f"Flow 파일을 찾을 수 없습니다: {flow_file_path}")
-                return {
-                    "status": "error",
-                    "error": f"Flow 파일을 찾을 수 없습니다: {flow_id}",
-                    "response": "Flow 설정 파일이 없습니다."
-                }
-            
-            # Flow 파일 로드
-            
-            # Flow JSON에서 LLM 설정 추출
+            mtime = os.path.getmtime(flow_file_path)
+        except OSError:
+            return {}
+        
+        cached = self._search_options_cache.get(flow_file_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        def _load() -> Dict[str, Any]:
             with open(flow_file_path, 'r', encoding='utf-8') as f:
-                flow_data = json.load(f)
-            
-            # LanguageModelComponent 노드 찾기
-            llm_node = None
-            nodes = flow_data.get("data", {}).get("nodes", [])
-            
-            for node in nodes:
-                if "LanguageModelComponent" in node.get("id", ""):
-                    llm_node = node
-                    break
-            
-            if not llm_node:
-                print("LanguageModelComponent 노드를 찾을 수 없습니다")
-                return {
-                    "status": "error", 
-                    "error": "LanguageModelComponent 노드를 찾을 수 없습니다",
-                    "response": "LLM 설정을 찾을 수 없습니다."
+                return json.load(f)
+        
+        options: Dict[str, Any] = {}
+        try:
+            flow_data = await asyncio.to_thread(_load)
+            rerank = flow_data.get("rerank")
+            if isinstance(rerank, dict):
+                candidates = rerank.get("candidates")
+                options["rerank"] = {
+                    "enabled": rerank.get("enabled") if isinstance(rerank.get("enabled"), bool) else None,
+                    "candidates": candidates if isinstance(candidates, int) and 1 <= candidates <= 200 else None,
                 }
-            
-            # LLM 설정 추출
-            llm_data = llm_node.get("data", {})
-            node_data = llm_data.get("node", {})
-            template_data = node_data.get("template", {})
-            
-            api_key = None
-            # 사용자 설정이 있으면 사용자 설정을 완전 우선시
+        except Exception as e:
+            print(f"Flow 검색 옵션 로드 실패 ({flow_id}): {str(e)}")
+        
+        self._search_options_cache[flow_file_path] = (mtime, options)
+        return options
+    
+    def _resolve_flow_llm_settings(self, flow_id: str, model_config: Dict[str, Any] = None) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Flow 파일과 사용자 모델 설정에서 LLM 설정을 결정합니다. (설정, 오류 응답) 반환"""
+        # Flow JSON 파일 로드
+        flow_file_path = os.path.join(settings.BASE_DIR, "langflow", "flows", f"{flow_id.replace('_', ' ').title()}.json")
+        
+        # 파일명 변환 (예: vector_store_search -> Vector Store Search.json)
+        if not os.path.exists(flow_file_path):
+            flow_file_path = os.path.join(settings.BASE_DIR, "langflow", "flows", "Vector Store Search.json")
+        
+        if not os.path.exists(flow_file_path):
+            print(f"Flow 파일을 찾을 수 없습니다: {flow_file_path}")
+            return None, {
+                "status": "error",
+                "error": f"Flow 파일을 찾을 수 없습니다: {flow_id}",
+                "response": "Flow 설정 파일이 없습니다."
+            }
+        
+        # Flow 파일 로드
+        
+        # Flow JSON에서 LLM 설정 추출
+        with open(flow_file_path, 'r', encoding='utf-8') as f:
+            flow_data = json.load(f)
+        
+        # LanguageModelComponent 노드 찾기
+        llm_node = None
+        nodes = flow_data.get("data", {}).get("nodes", [])
+        
+        for node in nodes:
+            if "LanguageModelComponent" in node.get("id", ""):
+                llm_node = node
+                break
+        
+        if not llm_node:
+            print("LanguageModelComponent 노드를 찾을 수 없습니다")
+            return None, {
+                "status": "error", 
+                "error": "LanguageModelComponent 노드를 찾을 수 없습니다",
+                "response": "LLM 설정을 찾을 수 없습니다."
+            }
+        
+        # LLM 설정 추출
+        llm_data = llm_node.get("data", {})
+        node_data = llm_data.get("node", {})
+        template_data = node_data.get("template", {})
+        
+        api_key = None
+        # 사용자 설정이 있으면 사용자 설정을 완전 우선시
+        if model_config and model_config.get("llm", {}).get("model"):
+            provider = model_config["llm"].get("provider", "openai").title()
+            model_name = model_config["llm"]["model"]
+            temperature = model_config["llm"].get("temperature", 0.7)
+            api_key = model_config["llm"].get("api_key")
+            print(f"사용자 설정 사용: {provider} {model_name} (temp: {temperature})")
+        elif template_data:
+            # 사용자 설정이 없으면 Flow 설정 사용
+            # Provider 추출
+            provider_data = template_data.get("provider", {})
+            provider = provider_data.get("value", "OpenAI")
+            
+            # Model Name 추출  
+            model_name_data = template_data.get("model_name", {})
+            model_name = model_name_data.get("value", "gpt-4o-mini")
+            
+            # Temperature 추출
+            temperature_data = template_data.get("temperature", {})
+            temperature = temperature_data.get("value", 0.7)
+            print(f"Flow 설정 사용: {provider} {model_name} (temp: {temperature})")
+        else:
+            # 사용자 설정도 Flow 설정도 없으면 기본값 사용
             if model_config and model_config.get("llm", {}).get("model"):
                 provider = model_config["llm"].get("provider", "openai").title()
                 model_name = model_config["llm"]["model"]
                 temperature = model_config["llm"].get("temperature", 0.7)
                 api_key = model_config["llm"].get("api_key")
-                print(f"사용자 설정 사용: {provider} {model_name} (temp: {temperature})")
-            elif template_data:
-                # 사용자 설정이 없으면 Flow 설정 사용
-                # Provider 추출
-                provider_data = template_data.get("provider", {})
-                provider = provider_data.get("value", "OpenAI")
-                
-                # Model Name 추출  
-                model_name_data = template_data.get("model_name", {})
-                model_name = model_name_data.get("value", "gpt-4o-mini")
-                
-                # Temperature 추출
-                temperature_data = template_data.get("temperature", {})
-                temperature = temperature_data.get("value", 0.7)
-                print(f"Flow 설정 사용: {provider} {model_name} (temp: {temperature})")
+                print(f"사용자 설정 기본값 사용: {provider} {model_name} (temp: {temperature})")
             else:
-                # 사용자 설정도 Flow 설정도 없으면 기본값 사용
-                if model_config and model_config.get("llm", {}).get("model"):
-                    provider = model_config["llm"].get("provider", "openai").title()
-                    model_name = model_config["llm"]["model"]
-                    temperature = model_config["llm"].get("temperature", 0.7)
-                    api_key = model_config["llm"].get("api_key")
-                    print(f"사용자 설정 기본값 사용: {provider} {model_name} (temp: {temperature})")
-                else:
-                    provider = "OpenAI"
-                    model_name = "gpt-4o-mini"
-                    temperature = 0.7
-                    print(f"시스템 기본값 사용: {provider} {model_name} (temp: {temperature})")
+                provider = "OpenAI"
+                model_name = "gpt-4o-mini"
+                temperature = 0.7
+                print(f"시스템 기본값 사용: {provider} {model_name} (temp: {temperature})")
+        
+        return {
+            "provider": provider,
+            "model_name": model_name,
+            "temperature": temperature,
+            "api_key": api_key
+        }, None
+    
+    async def execute_flow_with_llm(self, flow_id: str, prompt: str, system_message: str = None, model_config: Dict[str, Any] = None) -> Dict[str, Any]:
+        """LangFlow를 통해 LLM 모델을 실행합니다."""
+        try:
+            print(f"LangFlow LLM 실행: {flow_id}")
+            
+            llm_settings, error = self._resolve_flow_llm_settings(flow_id, model_config)
+            if error:
+                return error
+            provider = llm_settings["provider"]
+            model_name = llm_settings["model_name"]
+            temperature = llm_settings["temperature"]
+            api_key = llm_settings["api_key"]
             
             print(f"LLM 실행: {provider} {model_name} (temp: {temperature})")
             
@@ -839,37 +923,80 @@ class LangflowService:
                 "response": f"LLM 실행 중 오류가 발생했습니다: {str(e)}"
             }
     
+    def _create_chat_model(self, provider: str, model_name: str, temperature: float, api_key: str = None, streaming: bool = False):
+        """Provider별 LangChain 채팅 모델 (LLM 게이트웨이에 캐시된 인스턴스 재사용)"""
+        return get_llm_gateway().get_chat_model(provider, model_name, temperature, api_key=api_key, streaming=streaming)
+    
+    @staticmethod
+    def _build_llm_messages(provider: str, prompt: str, system_message: str = None) -> List[Tuple[str, str]]:
+        """Provider별 메시지 구성 (Gemini는 시스템 메시지를 프롬프트에 포함)"""
+        if provider.lower() == "google":
+            if system_message:
+                return [("human", f"다음은 시스템 지침입니다:\n{system_message}\n\n사용자 질문:\n{prompt}")]
+            return [("human", prompt)]
+        
+        messages = []
+        if system_message:
+            messages.append(("system", system_message))
+        messages.append(("human", prompt))
+        return messages
+    
+    @staticmethod
+    def _chunk_text(chunk: Any) -> str:
+        """스트리밍 청크에서 텍스트만 추출 (Anthropic/Gemini는 content가 블록 리스트일 수 있음)"""
+        content = getattr(chunk, "content", chunk)
+        if isinstance(content, str):
+            return content
+        if isinstance(content, list):
+            parts = []
+            for block in content:
+                if isinstance(block, str):
+                    parts.append(block)
+                elif isinstance(block, dict) and block.get("type") == "text":
+                    parts.append(block.get("text", ""))
+            return "".join(parts)
+        return ""
+    
+    async def stream_flow_with_llm(self, flow_id: str, prompt: str, system_message: str = None, model_config: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """LangFlow 설정의 LLM으로 응답을 토큰 단위로 스트리밍합니다."""
+        llm_settings, error = self._resolve_flow_llm_settings(flow_id, model_config)
+        if error:
+            raise RuntimeError(error.get("error", "LLM 설정을 찾을 수 없습니다."))
+        
+        provider = llm_settings["provider"]
+        model_name = llm_settings["model_name"]
+        print(f"LLM 스트리밍 실행: {provider} {model_name} (temp: {llm_settings['temperature']})")
+        
+        llm = self._create_chat_model(
+            provider, model_name, llm_settings["temperature"], api_key=llm_settings["api_key"], streaming=True
+        )
+        messages = self._build_llm_messages(provider, prompt, system_message)
+        
+        start_time = time.time()
+        first_token_time = None
+        async for chunk in get_llm_gateway().astream(provider, llm, messages):
+            text = self._chunk_text(chunk)
+            if not text:
+                continue
+            if first_token_time is None:
+                first_token_time = time.time() - start_time
+                print(f"{provider} 첫 토큰 수신 ({first_token_time:.2f}초)")
+            yield text
+        
+        print(f"{provider} 스트리밍 완료 ({time.time() - start_time:.2f}초)")
+    
     async def _execute_google_llm(self, model_name: str, prompt: str, system_message: str = None, temperature: float = 0.1, api_key: str = None) -> str:
         """Google Gemini 모델을 실행합니다."""
         try:
-            # langchain_google_genai 사용
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            from ..core.config import settings
-            
-            # Google API 키 확인
-            final_api_key = api_key or settings.GOOGLE_API_KEY or settings.GEMINI_API_KEY
-            if not final_api_key:
-                raise ValueError("Google API 키가 설정되지 않았습니다. GOOGLE_API_KEY 또는 GEMINI_API_KEY를 설정해주세요.")
-            
-            # ChatGoogleGenerativeAI 인스턴스 생성 - 기본 설정 사용
-            llm = ChatGoogleGenerativeAI(
-                model=model_name,
-                temperature=temperature,
-                google_api_key=final_api_key
-            )
+            llm = self._create_chat_model("google", model_name, temperature, api_key=api_key)
             
-            # 메시지 구성 - Gemini의 경우 system 메시지를 다르게 처리
-            if system_message:
-                # system 메시지를 프롬프트에 직접 포함
-                combined_prompt = f"다음은 시스템 지침입니다:\n{system_message}\n\n사용자 질문:\n{prompt}"
-                messages = [("human", combined_prompt)]
-            else:
-                messages = [("human", prompt)]
+            # 메시지 구성 - Gemini의 경우 system 메시지를 프롬프트에 직접 포함
+            messages = self._build_llm_messages("google", prompt, system_message)
             
             start_time = time.time()
             
-            # LLM 실행
-            response = llm.invoke(messages)
+            # LLM 실행 (이벤트 루프를 막지 않도록 비동기 호출)
+            response = await get_llm_gateway().ainvoke("google", llm, messages)
             
             api_time = time.time() - start_time
             print(f"Gemini 응답 완료 ({api_time:.2f}초)")
@@ -903,28 +1030,11 @@ class LangflowService:
     async def _execute_openai_llm(self, model_name: str, prompt: str, system_message: str = None, temperature: float = 0.1, api_key: str = None) -> str:
         """OpenAI 모델을 실행합니다."""
         try:
-            # OpenAI 모델 실행
-            
-            from langchain_openai import ChatOpenAI
-            from ..core.config import settings
-            
-            final_api_key = api_key or settings.OPENAI_API_KEY
-            if not final_api_key:
-                raise ValueError("OpenAI API 키가 설정되지 않았습니다.")
-            
-            llm = ChatOpenAI(
-                model=model_name,
-                temperature=temperature,
-                openai_api_key=final_api_key
-            )
-            
-            messages = []
-            if system_message:
-                messages.append(("system", system_message))
-            messages.append(("human", prompt))
+            llm = self._create_chat_model("openai", model_name, temperature, api_key=api_key)
+            messages = self._build_llm_messages("openai", prompt, system_message)
             
             start_time = time.time()
-            response = llm.invoke(messages)
+            response = await get_llm_gateway().ainvoke("openai", llm, messages)
             api_time = time.time() - start_time
             print(f"OpenAI 응답 완료 ({api_time:.2f}초)")
             
@@ -937,28 +1047,11 @@ class LangflowService:
     async def _execute_anthropic_llm(self, model_name: str, prompt: str, system_message: str = None, temperature: float = 0.1, api_key: str = None) -> str:
         """Anthropic Claude 모델을 실행합니다."""
         try:
-            # Anthropic Claude 모델 실행
-            
-            from langchain_anthropic import ChatAnthropic
-            from ..core.config import settings
-            
-            final_api_key = api_key or settings.ANTHROPIC_API_KEY
-            if not final_api_key:
-                raise ValueError("Anthropic API 키가 설정되지 않았습니다.")
-            
-            llm = ChatAnthropic(
-                model=model_name,
-                temperature=temperature,
-                anthropic_api_key=final_api_key
-            )
-            
-            messages = []
-            if system_message:
-                messages.append(("system", system_message))
-            messages.append(("human", prompt))
+            llm = self._create_chat_model("anthropic", model_name, temperature, api_key=api_key)
+            messages = self._build_llm_messages("anthropic", prompt, system_message)
             
             start_time = time.time()
-            response = llm.invoke(messages)
+            response = await get_llm_gateway().ainvoke("anthropic", llm, messages)
             api_time = time.time() - start_time
             print(f"Anthropic 응답 완료 ({api_time:.2f}초)")
             
@@ -1165,7 +1258,6 @@ class LangflowService:
             print(f"이미지 수: {len(images)}")
             
             # langchain_google_genai 사용
-            from langchain_google_genai import ChatGoogleGenerativeAI
             from langchain_core.messages import HumanMessage
             from ..core.config import settings
             import base64
@@ -1177,12 +1269,7 @@ class LangflowService:
             
             print(f"Google API 키 확인됨: {final_api_key[:10]}...")
             
-            # ChatGoogleGenerativeAI 인스턴스 생성
-            llm = ChatGoogleGenerativeAI(
-                model=model_name,
-                temperature=temperature,
-                google_api_key=final_api_key
-            )
+            llm = self._create_chat_model("google", model_name, temperature, api_key=final_api_key)
             
             # 멀티모달 메시지 구성
             message_content = []
@@ -1233,7 +1320,7 @@ class LangflowService:
             start_time = time.time()
             
             # LLM 실행
-            response = llm.invoke([message])
+            response = await get_llm_gateway().ainvoke("google", llm, [message])
             
             api_time = time.time() - start_time
             print(f"Gemini 멀티모달 API 호출 완료: {api_time:.2f}초")
@@ -1271,7 +1358,6 @@ class LangflowService:
             print(f"모델: {model_name}")
             print(f"이미지 수: {len(images)}")
             
-            from langchain_openai import ChatOpenAI
             from langchain_core.messages import HumanMessage, SystemMessage
             from ..core.config import settings
             
@@ -1286,11 +1372,7 @@ class LangflowService:
                 model_name = "gpt-4o"
                 print(f"모델을 {model_name}로 변경했습니다.")
             
-            llm = ChatOpenAI(
-                model=model_name,
-                temperature=temperature,
-                openai_api_key=final_api_key
-            )
+            llm = self._create_chat_model("openai", model_name, temperature, api_key=final_api_key)
             
             messages = []
             
@@ -1340,7 +1422,7 @@ class LangflowService:
             start_time = time.time()
             
             # LLM 실행
-            response = llm.invoke(messages)
+            response = await get_llm_gateway().ainvoke("openai", llm, messages)
             
             api_time = time.time() - start_time
             print(f"OpenAI 멀티모달 API 호출 완료: {api_time:.2f}초")
@@ -1366,7 +1448,6 @@ class LangflowService:
             print(f"모델: {model_name}")
             print(f"이미지 수: {len(images)}")
             
-            from langchain_anthropic import ChatAnthropic
             from langchain_core.messages import HumanMessage, SystemMessage
             from ..core.config import settings
             import base64
@@ -1385,11 +1466,7 @@ class LangflowService:
                 model_name = "claude-3-5-sonnet-20241022"
                 print(f"모델을 {model_name}로 변경했습니다.")
             
-            llm = ChatAnthropic(
-                model=model_name,
-                temperature=temperature,
-                anthropic_api_key=final_api_key
-            )
+            llm = self._create_chat_model("anthropic", model_name, temperature, api_key=final_api_key)
             
             messages = []
             
@@ -1443,7 +1520,7 @@ class LangflowService:
             start_time = time.time()
             
             # LLM 실행
-            response = llm.invoke(messages)
+            response = await get_llm_gateway().ainvoke("anthropic", llm, messages)
             
             api_time = time.time() - start_time
             print(f"Anthropic 멀티모달 API 호출 완료: {api_time:.2f}초")
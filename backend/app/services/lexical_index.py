@@ -0,0 +1,329 @@
+"""
+어휘(BM25) 검색 인덱스
+
+벡터 저장소 옆에 SQLite FTS5 인덱스를 두고 청크를 형태소 단위로 색인합니다.
+- Kiwi(kiwipiepy)가 설치되어 있으면 형태소(명사/어근/용언 어간/외국어/숫자)로 색인
+- 없으면 단어 + 한글 음절 bigram으로 색인
+- 부품 번호처럼 하이픈/점이 섞인 토큰(예: "AB-1234.5")은 원문 그대로도 색인
+- 점수는 FTS5 bm25() (값이 작을수록 관련도가 높음)
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..core.config import settings
+from ..core.logger import get_console_logger
+
+_clog = get_console_logger()
+
+# 색인에 사용할 Kiwi 품사 태그 (일반/고유/의존 명사, 수사, 어근, 용언 어간, 외국어, 한자, 숫자)
+_KIWI_TAGS = {"NNG", "NNP", "NNB", "NR", "XR", "VV", "VA", "SL", "SH", "SN"}
+
+_WORD_RE = re.compile(r"\w+")
+_CODE_RE = re.compile(r"[A-Za-z0-9]+(?:[-_./][A-Za-z0-9]+)+")
+_HANGUL_RE = re.compile(r"^[가-힣]+$")
+
+# 쿼리당 최대 토큰 수 (긴 질문이 거대한 OR 쿼리가 되지 않도록)
+MAX_QUERY_TOKENS = 32
+
+
+class KoreanTokenizer:
+    """색인/검색 공용 토크나이저 (Kiwi 우선, 없으면 규칙 기반)"""
+
+    def __init__(self):
+        self._kiwi = None
+        self._kiwi_checked = False
+        self._lock = threading.Lock()
+
+    def _get_kiwi(self):
+        if not self._kiwi_checked:
+            with self._lock:
+                if not self._kiwi_checked:
+                    try:
+                        from kiwipiepy import Kiwi
+                        self._kiwi = Kiwi()
+                        _clog.info("어휘 인덱스: Kiwi 형태소 분석기 사용")
+                    except Exception:
+                        self._kiwi = None
+                        _clog.info("어휘 인덱스: Kiwi 미설치 - 단어/bigram 토큰화 사용")
+                    self._kiwi_checked = True
+        return self._kiwi
+
+    @property
+    def method(self) -> str:
+        return "kiwi" if self._get_kiwi() is not None else "bigram"
+
+    @staticmethod
+    def _code_tokens(text: str) -> List[str]:
+        return [m.lower() for m in _CODE_RE.findall(text)]
+
+    @staticmethod
+    def _fallback_tokens(text: str) -> List[str]:
+        tokens = []
+        for word in _WORD_RE.findall(text.lower()):
+            tokens.append(word)
+            # 조사/어미가 붙은 한글 어절도 매칭되도록 음절 bigram 추가
+            if len(word) > 2 and _HANGUL_RE.match(word):
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        return tokens
+
+    def tokenize_many(self, texts: Sequence[str]) -> List[List[str]]:
+        kiwi = self._get_kiwi()
+        if kiwi is None:
+            return [self._fallback_tokens(t) + self._code_tokens(t) for t in texts]
+
+        results = []
+        try:
+            # Kiwi 인스턴스는 스레드 안전하지 않으므로 직렬화
+            with self._lock:
+                analyzed = list(kiwi.tokenize(list(texts)))
+            for text, tokens in zip(texts, analyzed):
+                forms = [tok.form.lower() for tok in tokens if tok.tag in _KIWI_TAGS]
+                results.append(forms + self._code_tokens(text))
+        except Exception as e:
+            _clog.warning(f"Kiwi 토큰화 실패, 규칙 기반으로 대체: {e}")
+            results = [self._fallback_tokens(t) + self._code_tokens(t) for t in texts]
+        return results
+
+    def tokenize(self, text: str) -> List[str]:
+        return self.tokenize_many([text])[0]
+
+
+class LexicalIndex:
+    """SQLite FTS5 기반 BM25 인덱스"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(settings.DATA_DIR, "db", "lexical_index.db")
+        self.tokenizer = KoreanTokenizer()
+        self.available = True
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chunk_map (
+                    rowid INTEGER PRIMARY KEY,
+                    chunk_id TEXT NOT NULL UNIQUE,
+                    file_id TEXT,
+                    category_id TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chunk_map_file ON chunk_map(file_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chunk_map_category ON chunk_map(category_id)")
+            # 토큰은 공백으로 이어 저장하고, 코드형 토큰이 쪼개지지 않도록 - _ . / 를 토큰 문자로 지정
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+                    tokens,
+                    tokenize = "unicode61 remove_diacritics 0 tokenchars '-_./'"
+                )
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _delete_rowids_locked(self, conn: sqlite3.Connection, rowids: List[int]):
+        for start in range(0, len(rowids), 500):
+            part = rowids[start:start + 500]
+            placeholders = ",".join("?" * len(part))
+            conn.execute(f"DELETE FROM chunks_fts WHERE rowid IN ({placeholders})", part)
+            conn.execute(f"DELETE FROM chunk_map WHERE rowid IN ({placeholders})", part)
+
+    def add_chunks(self, ids: Sequence[str], documents: Sequence[str], metadatas: Sequence[Dict[str, Any]]) -> int:
+        """청크를 색인합니다 (같은 chunk_id가 있으면 교체)."""
+        if not self.available or not ids:
+            return 0
+
+        token_lists = self.tokenizer.tokenize_many([doc or "" for doc in documents])
+
+        with self._lock:
+            try:
+                conn = self._get_conn()
+                existing = []
+                for start in range(0, len(ids), 500):
+                    part = list(ids[start:start + 500])
+                    placeholders = ",".join("?" * len(part))
+                    existing.extend(
+                        row[0] for row in conn.execute(
+                            f"SELECT rowid FROM chunk_map WHERE chunk_id IN ({placeholders})", part
+                        )
+                    )
+                if existing:
+                    self._delete_rowids_locked(conn, existing)
+
+                for chunk_id, tokens, metadata in zip(ids, token_lists, metadatas):
+                    metadata = metadata or {}
+                    cursor = conn.execute(
+                        "INSERT INTO chunk_map (chunk_id, file_id, category_id) VALUES (?, ?, ?)",
+                        (chunk_id, metadata.get("file_id"), metadata.get("category_id")),
+                    )
+                    conn.execute(
+                        "INSERT INTO chunks_fts (rowid, tokens) VALUES (?, ?)",
+                        (cursor.lastrowid, " ".join(tokens)),
+                    )
+                conn.commit()
+                return len(ids)
+            except sqlite3.OperationalError as e:
+                # FTS5가 없는 SQLite 빌드
+                if "fts5" in str(e).lower():
+                    self.available = False
+                _clog.warning(f"어휘 인덱스 색인 실패: {e}")
+                return 0
+            except Exception as e:
+                _clog.warning(f"어휘 인덱스 색인 실패: {e}")
+                return 0
+
+    def delete_chunks(self, ids: Sequence[str]) -> int:
+        """청크 ID 목록을 인덱스에서 제거"""
+        if not self.available or not ids:
+            return 0
+        with self._lock:
+            try:
+                conn = self._get_conn()
+                rowids = []
+                for start in range(0, len(ids), 500):
+                    part = list(ids[start:start + 500])
+                    placeholders = ",".join("?" * len(part))
+                    rowids.extend(
+                        row[0] for row in conn.execute(
+                            f"SELECT rowid FROM chunk_map WHERE chunk_id IN ({placeholders})", part
+                        )
+                    )
+                if rowids:
+                    self._delete_rowids_locked(conn, rowids)
+                    conn.commit()
+                return len(rowids)
+            except Exception as e:
+                _clog.warning(f"어휘 인덱스 삭제 실패: {e}")
+                return 0
+
+    def delete_file(self, file_id: str) -> int:
+        """파일의 모든 청크를 인덱스에서 제거"""
+        if not self.available:
+            return 0
+        with self._lock:
+            try:
+                conn = self._get_conn()
+                rowids = [row[0] for row in conn.execute("SELECT rowid FROM chunk_map WHERE file_id = ?", (file_id,))]
+                if rowids:
+                    self._delete_rowids_locked(conn, rowids)
+                    conn.commit()
+                return len(rowids)
+            except Exception as e:
+                _clog.warning(f"어휘 인덱스 삭제 실패: {e}")
+                return 0
+
+    def clear(self):
+        """인덱스 전체 삭제"""
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute("DELETE FROM chunks_fts")
+            conn.execute("DELETE FROM chunk_map")
+            conn.commit()
+
+    @staticmethod
+    def _build_match_query(tokens: Iterable[str]) -> str:
+        unique = list(dict.fromkeys(t for t in tokens if t))[:MAX_QUERY_TOKENS]
+        return " OR ".join('"' + t.replace('"', '""') + '"' for t in unique)
+
+    def search(self, query: str, top_k: int = 10, category_ids: Optional[List[str]] = None) -> List[Tuple[str, float]]:
+        """BM25 검색. [(chunk_id, bm25 점수)]를 관련도 순으로 반환"""
+        if not self.available or not query:
+            return []
+
+        match_query = self._build_match_query(self.tokenizer.tokenize(query))
+        if not match_query:
+            return []
+
+        sql = (
+            "SELECT m.chunk_id, bm25(chunks_fts) AS score FROM chunks_fts "
+            "JOIN chunk_map m ON m.rowid = chunks_fts.rowid "
+            "WHERE chunks_fts MATCH ?"
+        )
+        params: List[Any] = [match_query]
+        if category_ids:
+            sql += f" AND m.category_id IN ({','.join('?' * len(category_ids))})"
+            params.extend(category_ids)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(top_k)
+
+        with self._lock:
+            try:
+                return [(row[0], float(row[1])) for row in self._get_conn().execute(sql, params)]
+            except Exception as e:
+                _clog.warning(f"어휘 검색 실패: {e}")
+                return []
+
+    def count(self) -> int:
+        with self._lock:
+            try:
+                return self._get_conn().execute("SELECT COUNT(*) FROM chunk_map").fetchone()[0]
+            except Exception:
+                return 0
+
+    def rebuild_from_store(self, store: Any, page_size: int = 1000) -> int:
+        """벡터 저장소의 모든 청크로 인덱스를 다시 만듭니다."""
+        self.clear()
+        total = 0
+        offset = 0
+        while True:
+            page = store.get(limit=page_size, offset=offset)
+            ids = page.get("ids") if page else None
+            if not ids:
+                break
+            total += self.add_chunks(ids, page.get("documents") or [""] * len(ids), page.get("metadatas") or [{}] * len(ids))
+            offset += len(ids)
+            if len(ids) < page_size:
+                break
+        _clog.info(f"어휘 인덱스 재구축 완료: {total}개 청크")
+        return total
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "tokenizer": self.tokenizer.method,
+            "chunk_count": self.count(),
+            "db_path": self.db_path,
+        }
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, List[str]],
+    weights: Optional[Dict[str, float]] = None,
+    k: int = 60,
+) -> List[Tuple[str, float]]:
+    """여러 순위 목록을 RRF로 병합합니다. score = Σ weight / (k + rank)"""
+    weights = weights or {}
+    scores: Dict[str, float] = {}
+    for name, ranked_ids in rankings.items():
+        weight = weights.get(name, 1.0)
+        if weight <= 0:
+            continue
+        for rank, chunk_id in enumerate(ranked_ids, start=1):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+# 싱글톤 인스턴스
+_lexical_index = None
+_lexical_index_lock = threading.Lock()
+
+
+def get_lexical_index() -> LexicalIndex:
+    """LexicalIndex 싱글톤 인스턴스 반환"""
+    global _lexical_index
+
+    if _lexical_index is None:
+        with _lexical_index_lock:
+            if _lexical_index is None:
+                _lexical_index = LexicalIndex()
+
+    return _lexical_index
@@ -0,0 +1,349 @@
+"""
+LLM 호출 게이트웨이
+
+여러 서비스(ChatService, LangflowService, AIChunkingService)가 공유하는 LLM 호출 계층입니다.
+- LangChain 채팅 모델 / SDK 클라이언트를 (provider, model, 온도, API 키)별로 캐시해 재사용
+- 이벤트 루프를 막지 않도록 ainvoke/astream 사용, 동기 SDK 호출은 전용 스레드 풀에서 실행
+- Provider별 동시 호출 수 제한 (asyncio.Semaphore)
+- 호출 타임아웃 및 일시적 오류(429/5xx/연결 오류)에 대한 지수 백오프 + 지터 재시도
+  (스레드 풀에서 도는 동기 호출은 취소할 수 없으므로 SDK 클라이언트 자체 timeout으로 끝내고,
+   게이트웨이 대기 시간 초과는 재시도하지 않음)
+"""
+
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..core.config import settings
+from ..core.logger import get_console_logger
+from .settings_service import settings_service
+
+_clog = get_console_logger()
+
+# 재시도 대상 HTTP 상태 코드 (529: Anthropic overloaded)
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+# 재시도 대상 예외 클래스 이름 일부 (SDK마다 예외 계층이 달라 이름으로 판별)
+_RETRYABLE_NAMES = ("RateLimit", "Timeout", "Connection", "InternalServer", "ServiceUnavailable", "Overloaded", "ResourceExhausted")
+# 동기 호출은 SDK 타임아웃이 먼저 발생하도록 게이트웨이 대기 시간에 여유를 둠
+SYNC_TIMEOUT_GRACE_SECONDS = 5.0
+
+
+class LLMGateway:
+    """Provider별 동시성 제한/타임아웃/재시도를 적용하는 공용 LLM 호출 계층"""
+
+    def __init__(self):
+        self.max_concurrency = 8
+        self.timeout_seconds = 120.0
+        self.max_retries = 2
+        self.retry_base_delay = 0.5
+        self.retry_max_delay = 8.0
+        self.client_cache_size = 32
+
+        self._clients: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._clients_lock = threading.Lock()
+        # provider -> (이벤트 루프, 세마포어). 세마포어는 생성된 루프에서만 사용 가능
+        self._semaphores: Dict[str, Tuple[Any, asyncio.Semaphore]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency * 2, thread_name_prefix="llm-gateway")
+
+        self.stats = {
+            "calls": 0,
+            "failures": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "client_cache_hits": 0,
+            "client_cache_misses": 0,
+            "in_flight": 0,
+        }
+
+    def apply_settings(self, perf_settings: Dict[str, Any]):
+        """성능 설정의 LLM 동시성/타임아웃/재시도 값 반영"""
+        max_concurrency = max(1, int(perf_settings.get("llmMaxConcurrencyPerProvider", 8)))
+        if max_concurrency != self.max_concurrency:
+            self.max_concurrency = max_concurrency
+            # 진행 중인 호출은 기존 세마포어를 그대로 해제하고, 새 호출부터 새 한도를 적용
+            self._semaphores = {}
+        self.timeout_seconds = float(perf_settings.get("llmTimeoutSeconds", 120))
+        self.max_retries = max(0, int(perf_settings.get("llmMaxRetries", 2)))
+        self.retry_base_delay = float(perf_settings.get("llmRetryBaseDelay", 0.5))
+
+    # ------------------------------------------------------------------
+    # 클라이언트 캐시
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _key_fingerprint(api_key: Optional[str]) -> str:
+        """캐시 키에 API 키 원문을 두지 않도록 해시 사용"""
+        return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+    def _get_or_create(self, cache_key: Tuple, factory: Callable[[], Any]) -> Any:
+        with self._clients_lock:
+            client = self._clients.get(cache_key)
+            if client is not None:
+                self._clients.move_to_end(cache_key)
+                self.stats["client_cache_hits"] += 1
+                return client
+
+        client = factory()
+        with self._clients_lock:
+            self._clients[cache_key] = client
+            self._clients.move_to_end(cache_key)
+            self.stats["client_cache_misses"] += 1
+            while len(self._clients) > self.client_cache_size:
+                self._clients.popitem(last=False)
+        return client
+
+    def get_chat_model(self, provider: str, model_name: str, temperature: float, api_key: str = None, streaming: bool = False):
+        """Provider별 LangChain 채팅 모델 (캐시됨)
+
+        재시도는 게이트웨이가 담당하므로 SDK 자체 재시도(max_retries)는 끕니다.
+        """
+        provider = provider.lower()
+        if provider == "google":
+            final_api_key = api_key or settings.GOOGLE_API_KEY or settings.GEMINI_API_KEY
+            if not final_api_key:
+                raise ValueError("Google API 키가 설정되지 않았습니다. GOOGLE_API_KEY 또는 GEMINI_API_KEY를 설정해주세요.")
+
+            def factory():
+                from langchain_google_genai import ChatGoogleGenerativeAI
+                return ChatGoogleGenerativeAI(model=model_name, temperature=temperature, google_api_key=final_api_key, max_retries=0)
+            # Gemini는 streaming 파라미터 없이 astream 지원
+            streaming = False
+        elif provider == "openai":
+            final_api_key = api_key or settings.OPENAI_API_KEY
+            if not final_api_key:
+                raise ValueError("OpenAI API 키가 설정되지 않았습니다.")
+
+            def factory():
+                from langchain_openai import ChatOpenAI
+                return ChatOpenAI(model=model_name, temperature=temperature, openai_api_key=final_api_key, streaming=streaming, max_retries=0)
+        elif provider == "anthropic":
+            final_api_key = api_key or settings.ANTHROPIC_API_KEY
+            if not final_api_key:
+                raise ValueError("Anthropic API 키가 설정되지 않았습니다.")
+
+            def factory():
+                from langchain_anthropic import ChatAnthropic
+                return ChatAnthropic(model=model_name, temperature=temperature, anthropic_api_key=final_api_key, streaming=streaming, max_retries=0)
+        else:
+            raise ValueError(f"지원하지 않는 Provider: {provider}")
+
+        cache_key = ("chat_model", provider, model_name, float(temperature), self._key_fingerprint(final_api_key), streaming)
+        return self._get_or_create(cache_key, factory)
+
+    def get_async_client(self, provider: str, api_key: str = None):
+        """Provider SDK의 비동기 클라이언트 (AsyncOpenAI / AsyncAnthropic / httpx.AsyncClient, 캐시됨)"""
+        provider = provider.lower()
+        if provider == "openai":
+            def factory():
+                from openai import AsyncOpenAI
+                return AsyncOpenAI(api_key=api_key, max_retries=0)
+        elif provider == "anthropic":
+            def factory():
+                import anthropic
+                return anthropic.AsyncAnthropic(api_key=api_key, max_retries=0)
+        elif provider == "http":
+            def factory():
+                import httpx
+                return httpx.AsyncClient(timeout=self.timeout_seconds)
+        else:
+            raise ValueError(f"지원하지 않는 Provider: {provider}")
+
+        return self._get_or_create(("async_client", provider, self._key_fingerprint(api_key)), factory)
+
+    def get_sync_client(self, provider: str, api_key: str):
+        """Provider SDK의 동기 클라이언트 (OpenAI / Anthropic / Groq, 캐시됨). run_sync와 함께 사용
+
+        스레드에서 실행 중인 호출은 취소할 수 없으므로 SDK timeout으로 호출이 스레드 안에서 끝나게 합니다.
+        """
+        provider = provider.lower()
+        timeout = self.timeout_seconds
+        if provider == "openai":
+            def factory():
+                import openai
+                return openai.OpenAI(api_key=api_key, max_retries=0, timeout=timeout)
+        elif provider == "anthropic":
+            def factory():
+                import anthropic
+                return anthropic.Anthropic(api_key=api_key, max_retries=0, timeout=timeout)
+        elif provider == "groq":
+            def factory():
+                import groq
+                return groq.Groq(api_key=api_key, max_retries=0, timeout=timeout)
+        else:
+            raise ValueError(f"지원하지 않는 Provider: {provider}")
+
+        return self._get_or_create(("sync_client", provider, self._key_fingerprint(api_key), timeout), factory)
+
+    # ------------------------------------------------------------------
+    # 동시성 제한 / 재시도
+    # ------------------------------------------------------------------
+
+    def _get_semaphore(self, provider: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        entry = self._semaphores.get(provider)
+        if entry is None or entry[0] is not loop:
+            entry = (loop, asyncio.Semaphore(self.max_concurrency))
+            self._semaphores[provider] = entry
+        return entry[1]
+
+    @staticmethod
+    def _is_retryable(error: BaseException) -> bool:
+        if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+            return True
+        status = getattr(error, "status_code", None)
+        if status is None:
+            status = getattr(getattr(error, "response", None), "status_code", None)
+        if isinstance(status, int):
+            return status in _RETRYABLE_STATUS
+        name = type(error).__name__
+        return any(part in name for part in _RETRYABLE_NAMES)
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """지수 백오프 + full jitter"""
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt)))
+
+    async def run(
+        self,
+        provider: str,
+        call: Callable[[], Awaitable[Any]],
+        timeout: float = None,
+        label: str = None,
+        retry_timeouts: bool = True,
+    ) -> Any:
+        """코루틴 팩토리를 Provider 동시성 제한/타임아웃/재시도 안에서 실행합니다.
+
+        재시도마다 새 코루틴이 필요하므로 코루틴 객체가 아닌 팩토리(call)를 받습니다.
+        retry_timeouts=False면 대기 시간 초과는 재시도하지 않습니다. (취소할 수 없는 호출용)
+        """
+        provider = provider.lower()
+        timeout = timeout or self.timeout_seconds
+        label = label or provider
+        semaphore = self._get_semaphore(provider)
+
+        attempt = 0
+        while True:
+            self.stats["calls"] += 1
+            try:
+                async with semaphore:
+                    self.stats["in_flight"] += 1
+                    try:
+                        return await asyncio.wait_for(call(), timeout=timeout)
+                    finally:
+                        self.stats["in_flight"] -= 1
+            except Exception as e:
+                timed_out = isinstance(e, asyncio.TimeoutError)
+                if timed_out:
+                    self.stats["timeouts"] += 1
+                if (
+                    attempt >= self.max_retries
+                    or not self._is_retryable(e)
+                    or (timed_out and not retry_timeouts)
+                ):
+                    self.stats["failures"] += 1
+                    raise
+                delay = self._backoff_delay(attempt)
+                attempt += 1
+                self.stats["retries"] += 1
+                _clog.warning(f"{label} 호출 재시도 {attempt}/{self.max_retries} ({delay:.2f}초 후): {type(e).__name__}: {e}")
+                await asyncio.sleep(delay)
+
+    async def run_sync(self, provider: str, fn: Callable[[], Any], timeout: float = None, label: str = None) -> Any:
+        """동기 SDK 호출을 게이트웨이 스레드 풀에서 실행합니다 (이벤트 루프 비차단).
+
+        wait_for로는 이미 실행 중인 스레드를 멈출 수 없어, 시간 초과 후 재시도하면 원래 호출이 계속 돌면서
+        같은 요청이 중복 전송됩니다. 그래서 호출 자체는 SDK timeout(get_sync_client)으로 끝내고
+        (SDK 타임아웃 예외는 재시도 대상), 게이트웨이 대기 시간 초과는 재시도하지 않습니다.
+        """
+        loop = asyncio.get_running_loop()
+        timeout = (timeout or self.timeout_seconds) + SYNC_TIMEOUT_GRACE_SECONDS
+        return await self.run(
+            provider,
+            lambda: loop.run_in_executor(self._executor, fn),
+            timeout=timeout,
+            label=label,
+            retry_timeouts=False,
+        )
+
+    async def ainvoke(self, provider: str, llm: Any, messages: Any, timeout: float = None) -> Any:
+        """LangChain 채팅 모델 비동기 호출"""
+        start_time = time.time()
+        response = await self.run(provider, lambda: llm.ainvoke(messages), timeout=timeout, label=f"{provider} LLM")
+        _clog.debug(f"{provider} LLM 호출 완료 ({time.time() - start_time:.2f}초)")
+        return response
+
+    async def astream(self, provider: str, llm: Any, messages: Any) -> AsyncIterator[Any]:
+        """LangChain 채팅 모델 스트리밍 호출 (스트림이 끝날 때까지 동시성 슬롯 점유)
+
+        첫 청크 이전 오류만 재시도하며, 토큰을 보낸 뒤의 오류는 그대로 전달합니다.
+        """
+        provider = provider.lower()
+        semaphore = self._get_semaphore(provider)
+
+        attempt = 0
+        while True:
+            self.stats["calls"] += 1
+            started = False
+            try:
+                async with semaphore:
+                    self.stats["in_flight"] += 1
+                    try:
+                        stream = llm.astream(messages).__aiter__()
+                        first = await asyncio.wait_for(stream.__anext__(), timeout=self.timeout_seconds)
+                        started = True
+                        yield first
+                        async for chunk in stream:
+                            yield chunk
+                    finally:
+                        self.stats["in_flight"] -= 1
+                return
+            except StopAsyncIteration:
+                return
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stats["timeouts"] += 1
+                if started or attempt >= self.max_retries or not self._is_retryable(e):
+                    self.stats["failures"] += 1
+                    raise
+                delay = self._backoff_delay(attempt)
+                attempt += 1
+                self.stats["retries"] += 1
+                _clog.warning(f"{provider} 스트리밍 재시도 {attempt}/{self.max_retries} ({delay:.2f}초 후): {type(e).__name__}: {e}")
+                await asyncio.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._clients_lock:
+            cached_clients = len(self._clients)
+        return {
+            **self.stats,
+            "cached_clients": cached_clients,
+            "max_concurrency_per_provider": self.max_concurrency,
+            "timeout_seconds": self.timeout_seconds,
+            "max_retries": self.max_retries,
+        }
+
+
+# 싱글톤 인스턴스
+_llm_gateway = None
+_llm_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """LLMGateway 싱글톤 인스턴스 반환"""
+    global _llm_gateway
+
+    if _llm_gateway is None:
+        with _llm_gateway_lock:
+            if _llm_gateway is None:
+                gateway = LLMGateway()
+                gateway.apply_settings(settings_service.get_section_settings("performance"))
+                settings_service.subscribe(
+                    "performance", lambda section, values: gateway.apply_settings(values)
+                )
+                _llm_gateway = gateway
+
+    return _llm_gateway
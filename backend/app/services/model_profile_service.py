@@ -81,6 +81,7 @@ class ModelProfileService:
             temperature=request.temperature,
             max_tokens=request.max_tokens,
             top_p=request.top_p,
+            context_token_budget=request.context_token_budget,
             ai_chunking_system_message=request.ai_chunking_system_message,
             is_active=len(self.profiles) == 0,  # 첫 번째 프로필은 자동으로 활성화
             created_at=now,
@@ -165,6 +166,8 @@ JSON Schema:
             profile.max_tokens = request.max_tokens
         if request.top_p is not None:
             profile.top_p = request.top_p
+        if request.context_token_budget is not None:
+            profile.context_token_budget = request.context_token_budget
         if request.ai_chunking_system_message is not None:
             profile.ai_chunking_system_message = request.ai_chunking_system_message
         
@@ -229,7 +232,8 @@ JSON Schema:
             "llm_temperature": active_profile.temperature,
             "llm_max_tokens": active_profile.max_tokens,
             "llm_top_p": active_profile.top_p,
-            "llm_base_url": active_profile.base_url
+            "llm_base_url": active_profile.base_url,
+            "llm_context_budget": active_profile.context_token_budget
         }
 
 # 싱글톤 인스턴스
@@ -0,0 +1,542 @@
+"""
+말뭉치 전체 근접 중복 청크 인덱스 (MinHash LSH)
+
+저장된 모든 청크의 MinHash 서명을 SQLite에 보관하고, LSH 밴드 버킷으로 후보를 찾아
+다른 문서에 거의 같은 청크(머리말/면책 문구/반복 표 등)가 이미 있는지 확인합니다.
+- 서명은 단어 3-gram shingle의 해시를 numpy로 한 번에 순열 변환해 배치 계산
+- 버킷에는 대표(canonical) 청크만 넣으므로 같은 상용구가 수천 문서에 있어도 후보 수가 늘지 않음
+- 조회는 (밴드, 버킷) 인덱스 조회 + 후보 서명 비교라 말뭉치가 커져도 선형 탐색하지 않음
+- 중복 청크는 대표 청크 ID로 연결되며, skip 모드에서 저장을 건너뛴 청크도 연결 정보는 남김
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.logger import get_console_logger
+from .settings_service import settings_service
+
+_clog = get_console_logger()
+
+_WORD_RE = re.compile(r"\w+")
+
+NUM_PERM = 128
+SHINGLE_SIZE = 3
+# (a * h + b) mod p 순열 - h가 32비트, a/b가 32비트 미만이라 uint64 곱셈이 넘치지 않음
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+# 밴드 값 → 버킷 키 다항 해시 계수 (uint64 오버플로는 의도된 mod 2^64 연산)
+_BAND_COEFFS = _rng.randint(1, 1 << 62, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_BAND_SALT = np.uint64(0x9E3779B97F4A7C15)
+
+# 서명 계산 시 한 번에 순열 변환하는 shingle 수 (NUM_PERM * 8바이트 * 이 값 만큼 메모리 사용)
+SIGNATURE_BLOCK_SHINGLES = 8192
+
+DUPLICATE_ACTIONS = ("off", "flag", "skip")
+
+
+@lru_cache(maxsize=32)
+def optimal_bands(threshold: float, num_perm: int = NUM_PERM) -> Tuple[int, int]:
+    """임계값에서 오탐/미탐 확률 합이 최소가 되는 (밴드 수, 밴드당 행 수)"""
+    def integrate(f, a: float, b: float, steps: int = 200) -> float:
+        width = (b - a) / steps
+        return sum(f(a + (i + 0.5) * width) for i in range(steps)) * width
+
+    best, best_error = (num_perm // 8, 8), float("inf")
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            false_positive = integrate(lambda s: 1 - (1 - s ** rows) ** bands, 0.0, threshold)
+            false_negative = integrate(lambda s: (1 - s ** rows) ** bands, threshold, 1.0)
+            error = false_positive + false_negative
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+def _shingle_hashes(text: str) -> List[int]:
+    words = _WORD_RE.findall((text or "").lower())
+    if not words:
+        return []
+    if len(words) < SHINGLE_SIZE:
+        return [zlib.crc32(" ".join(words).encode("utf-8"))]
+    return list({
+        zlib.crc32(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"))
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    })
+
+
+def compute_signatures(texts: Sequence[str]) -> np.ndarray:
+    """텍스트 목록의 MinHash 서명 (len(texts), NUM_PERM) uint32. 단어가 없는 텍스트는 전부 최댓값"""
+    signatures = np.full((len(texts), NUM_PERM), _MAX_HASH, dtype=np.uint64)
+    hashed = [_shingle_hashes(text) for text in texts]
+
+    start = 0
+    while start < len(texts):
+        # shingle 수가 블록 크기를 넘지 않도록 텍스트를 묶어 한 번에 변환
+        end, total = start, 0
+        while end < len(texts) and (end == start or total + len(hashed[end]) <= SIGNATURE_BLOCK_SHINGLES):
+            total += len(hashed[end])
+            end += 1
+
+        members = [i for i in range(start, end) if hashed[i]]
+        if members:
+            values = np.fromiter(
+                (h for i in members for h in hashed[i]), dtype=np.uint64, count=sum(len(hashed[i]) for i in members)
+            )
+            permuted = ((values[:, None] * _PERM_A + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH
+            offsets = np.cumsum([0] + [len(hashed[i]) for i in members[:-1]])
+            signatures[members] = np.minimum.reduceat(permuted, offsets, axis=0)
+        start = end
+
+    return signatures.astype(np.uint32)
+
+
+def signature_similarity(signature: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """서명 간 추정 Jaccard 유사도 (others는 (n, NUM_PERM))"""
+    return (others == signature).mean(axis=1)
+
+
+class NearDuplicateIndex:
+    """SQLite 기반 MinHash LSH 근접 중복 인덱스"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(settings.DATA_DIR, "db", "near_duplicates.db")
+        self.action = "flag"
+        self.threshold = 0.9
+        self.bands, self.rows = optimal_bands(self.threshold)
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._layout_checked = False
+
+    def apply_settings(self, performance_settings: Dict[str, Any]):
+        """performance 설정 섹션의 근접 중복 관련 값 반영 (임계값이 바뀌면 버킷을 다시 만듦)"""
+        action = str(performance_settings.get("nearDuplicateAction", "flag")).lower()
+        self.action = action if action in DUPLICATE_ACTIONS else "flag"
+        threshold = float(performance_settings.get("nearDuplicateThreshold", 0.9))
+        with self._lock:
+            if threshold != self.threshold:
+                self.threshold = threshold
+                self.bands, self.rows = optimal_bands(threshold)
+                self._layout_checked = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.action != "off"
+
+    # ------------------------------------------------------------------
+    # 스키마 / 버킷
+    # ------------------------------------------------------------------
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # canonical_id가 NULL이면 대표 청크, skipped=1이면 벡터 저장소에 저장하지 않은 중복 청크
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chunk_signatures (
+                    chunk_id TEXT PRIMARY KEY,
+                    file_id TEXT NOT NULL,
+                    canonical_id TEXT,
+                    similarity REAL,
+                    skipped INTEGER NOT NULL DEFAULT 0,
+                    signature BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_signatures_file ON chunk_signatures(file_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_signatures_canonical ON chunk_signatures(canonical_id)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS lsh_buckets (
+                    bucket INTEGER NOT NULL,
+                    chunk_id TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_bucket ON lsh_buckets(bucket)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_chunk ON lsh_buckets(chunk_id)")
+            conn.execute("CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.commit()
+            self._conn = conn
+
+        if not self._layout_checked:
+            self._check_layout_locked(self._conn)
+        return self._conn
+
+    def _check_layout_locked(self, conn: sqlite3.Connection):
+        """저장된 밴드 구성이 현재 임계값과 다르면 대표 청크 버킷을 다시 만듦"""
+        layout = f"{NUM_PERM}:{self.bands}x{self.rows}"
+        row = conn.execute("SELECT value FROM index_meta WHERE key = 'layout'").fetchone()
+        if row is None or row[0] != layout:
+            conn.execute("DELETE FROM lsh_buckets")
+            rebuilt = 0
+            cursor = conn.execute("SELECT chunk_id, signature FROM chunk_signatures WHERE canonical_id IS NULL")
+            while True:
+                page = cursor.fetchmany(1000)
+                if not page:
+                    break
+                signatures = np.stack([np.frombuffer(blob, dtype=np.uint32) for _, blob in page])
+                self._insert_buckets_locked(conn, [chunk_id for chunk_id, _ in page], signatures)
+                rebuilt += len(page)
+            conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES ('layout', ?)", (layout,))
+            conn.commit()
+            if row is not None:
+                _clog.info(f"근접 중복 인덱스: 밴드 구성 변경({row[0]} → {layout}) - 대표 청크 {rebuilt}개 버킷 재구성")
+        self._layout_checked = True
+
+    def _bucket_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """서명 → 밴드별 버킷 키 (len(signatures), bands) int64"""
+        used = signatures[:, :self.bands * self.rows].astype(np.uint64).reshape(len(signatures), self.bands, self.rows)
+        keys = (used * _BAND_COEFFS[:self.rows]).sum(axis=2, dtype=np.uint64)
+        keys += np.arange(self.bands, dtype=np.uint64) * _BAND_SALT
+        return keys.view(np.int64)
+
+    def _insert_buckets_locked(self, conn: sqlite3.Connection, chunk_ids: Sequence[str], signatures: np.ndarray):
+        if not len(chunk_ids):
+            return
+        keys = self._bucket_keys(signatures)
+        conn.executemany(
+            "INSERT INTO lsh_buckets (bucket, chunk_id) VALUES (?, ?)",
+            ((int(key), chunk_id) for chunk_id, row in zip(chunk_ids, keys) for key in row),
+        )
+
+    def _delete_rows_locked(self, conn: sqlite3.Connection, chunk_ids: Sequence[str]):
+        for start in range(0, len(chunk_ids), 500):
+            part = list(chunk_ids[start:start + 500])
+            placeholders = ",".join("?" * len(part))
+            conn.execute(f"DELETE FROM lsh_buckets WHERE chunk_id IN ({placeholders})", part)
+            conn.execute(f"DELETE FROM chunk_signatures WHERE chunk_id IN ({placeholders})", part)
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def _find_locked(
+        self,
+        conn: sqlite3.Connection,
+        signatures: np.ndarray,
+        exclude_file_id: Optional[str],
+    ) -> List[Optional[Tuple[str, float]]]:
+        matches: List[Optional[Tuple[str, float]]] = [None] * len(signatures)
+        if not len(signatures):
+            return matches
+
+        keys = self._bucket_keys(signatures)
+        queries_by_key: Dict[int, List[int]] = {}
+        for i, row in enumerate(keys):
+            if signatures[i][0] == _MAX_HASH:
+                continue  # 단어가 없는 청크
+            for key in row:
+                queries_by_key.setdefault(int(key), []).append(i)
+
+        candidates: List[Dict[str, np.ndarray]] = [{} for _ in range(len(signatures))]
+        key_list = list(queries_by_key)
+        for start in range(0, len(key_list), 500):
+            part = key_list[start:start + 500]
+            placeholders = ",".join("?" * len(part))
+            rows = conn.execute(
+                "SELECT b.bucket, s.chunk_id, s.file_id, s.signature FROM lsh_buckets b "
+                f"JOIN chunk_signatures s ON s.chunk_id = b.chunk_id WHERE b.bucket IN ({placeholders})",
+                part,
+            )
+            for bucket, chunk_id, file_id, blob in rows:
+                if exclude_file_id is not None and file_id == exclude_file_id:
+                    continue
+                for i in queries_by_key[bucket]:
+                    if chunk_id not in candidates[i]:
+                        candidates[i][chunk_id] = np.frombuffer(blob, dtype=np.uint32)
+
+        for i, found in enumerate(candidates):
+            if not found:
+                continue
+            ids = list(found)
+            similarities = signature_similarity(signatures[i], np.stack([found[c] for c in ids]))
+            best = int(similarities.argmax())
+            if similarities[best] >= self.threshold:
+                matches[i] = (ids[best], float(similarities[best]))
+        return matches
+
+    def find_duplicates(
+        self,
+        chunk_ids: Sequence[Optional[str]],
+        signatures: np.ndarray,
+        exclude_file_id: Optional[str] = None,
+    ) -> List[Optional[Tuple[str, float]]]:
+        """각 서명과 가장 비슷한 다른 문서의 대표 청크 (canonical_id, 유사도). 없거나 이미 대표인 청크는 None"""
+        with self._lock:
+            try:
+                conn = self._get_conn()
+                matches = self._find_locked(conn, signatures, exclude_file_id)
+                known = [chunk_id for chunk_id in chunk_ids if chunk_id]
+                canonical = set()
+                for start in range(0, len(known), 500):
+                    part = known[start:start + 500]
+                    placeholders = ",".join("?" * len(part))
+                    canonical.update(row[0] for row in conn.execute(
+                        f"SELECT chunk_id FROM chunk_signatures WHERE canonical_id IS NULL AND chunk_id IN ({placeholders})",
+                        part,
+                    ))
+                # 이미 대표로 등록된 청크는 다른 청크가 연결되어 있을 수 있으므로 그대로 유지
+                return [None if chunk_id in canonical else match for chunk_id, match in zip(chunk_ids, matches)]
+            except Exception as e:
+                _clog.warning(f"근접 중복 조회 실패: {e}")
+                return [None] * len(signatures)
+
+    def canonical_map(self, chunk_ids: Sequence[str]) -> Dict[str, str]:
+        """청크 ID → 대표 청크 ID (인덱스에 없거나 대표 자신이면 자기 ID)"""
+        result = {chunk_id: chunk_id for chunk_id in chunk_ids}
+        if not chunk_ids:
+            return result
+        with self._lock:
+            try:
+                conn = self._get_conn()
+                for start in range(0, len(chunk_ids), 500):
+                    part = list(chunk_ids[start:start + 500])
+                    placeholders = ",".join("?" * len(part))
+                    for chunk_id, canonical_id in conn.execute(
+                        f"SELECT chunk_id, canonical_id FROM chunk_signatures "
+                        f"WHERE canonical_id IS NOT NULL AND chunk_id IN ({placeholders})",
+                        part,
+                    ):
+                        result[chunk_id] = canonical_id
+            except Exception as e:
+                _clog.warning(f"대표 청크 조회 실패: {e}")
+        return result
+
+    def get_file_links(self, file_id: str) -> List[Dict[str, Any]]:
+        """파일 청크 중 다른 문서의 대표 청크에 연결된 항목"""
+        with self._lock:
+            conn = self._get_conn()
+            rows = conn.execute(
+                "SELECT s.chunk_id, s.canonical_id, c.file_id, s.similarity, s.skipped FROM chunk_signatures s "
+                "LEFT JOIN chunk_signatures c ON c.chunk_id = s.canonical_id "
+                "WHERE s.file_id = ? AND s.canonical_id IS NOT NULL ORDER BY s.chunk_id",
+                (file_id,),
+            ).fetchall()
+        return [
+            {
+                "chunk_id": chunk_id,
+                "canonical_id": canonical_id,
+                "canonical_file_id": canonical_file_id,
+                "similarity": similarity,
+                "skipped": bool(skipped),
+            }
+            for chunk_id, canonical_id, canonical_file_id, similarity, skipped in rows
+        ]
+
+    # ------------------------------------------------------------------
+    # 등록 / 삭제
+    # ------------------------------------------------------------------
+
+    def _release_locked(self, conn: sqlite3.Connection, file_id: str, removed_ids: Sequence[str]) -> List[str]:
+        """삭제될 대표 청크에 연결된 다른 문서 청크를 정리하고, 다시 벡터화가 필요한 파일 ID를 반환
+
+        저장된 중복 청크가 남아 있으면 가장 먼저 등록된 것을 새 대표로 올리고 나머지를 그쪽에 연결합니다.
+        저장을 건너뛴 청크만 남았으면 연결을 지우고 해당 파일을 다시 벡터화 대상으로 돌려줍니다.
+        """
+        affected_files = set()
+        for start in range(0, len(removed_ids), 500):
+            part = list(removed_ids[start:start + 500])
+            placeholders = ",".join("?" * len(part))
+            members = conn.execute(
+                "SELECT chunk_id, file_id, canonical_id, skipped, signature FROM chunk_signatures "
+                f"WHERE canonical_id IN ({placeholders}) AND file_id != ? ORDER BY created_at, chunk_id",
+                part + [file_id],
+            ).fetchall()
+
+            groups: Dict[str, List[tuple]] = {}
+            for member in members:
+                groups.setdefault(member[2], []).append(member)
+
+            for group in groups.values():
+                stored = [m for m in group if not m[3]]
+                if not stored:
+                    affected_files.update(m[1] for m in group)
+                    self._delete_rows_locked(conn, [m[0] for m in group])
+                    continue
+                new_canonical = stored[0]
+                conn.execute(
+                    "UPDATE chunk_signatures SET canonical_id = NULL, similarity = NULL WHERE chunk_id = ?",
+                    (new_canonical[0],),
+                )
+                self._insert_buckets_locked(conn, [new_canonical[0]], np.frombuffer(new_canonical[4], dtype=np.uint32)[None, :])
+                conn.executemany(
+                    "UPDATE chunk_signatures SET canonical_id = ? WHERE chunk_id = ?",
+                    [(new_canonical[0], m[0]) for m in group if m is not new_canonical],
+                )
+        return sorted(affected_files)
+
+    def register_file(
+        self,
+        file_id: str,
+        chunk_ids: Sequence[str],
+        signatures: np.ndarray,
+        matches: Sequence[Optional[Tuple[str, float]]],
+        skipped: Sequence[bool],
+    ) -> List[str]:
+        """파일의 청크 서명을 현재 목록으로 교체하고, 다시 벡터화가 필요한 다른 파일 ID를 반환
+
+        matches는 find_duplicates 결과입니다. 대표로 등록하려는 청크는 그 사이 다른 문서가 먼저 등록한
+        대표가 있는지 한 번 더 확인해 연결합니다 (이미 저장된 청크이므로 skipped는 그대로 0).
+        """
+        with self._lock:
+            try:
+                conn = self._get_conn()
+                old_ids = [row[0] for row in conn.execute("SELECT chunk_id FROM chunk_signatures WHERE file_id = ?", (file_id,))]
+                created = dict(conn.execute(
+                    "SELECT chunk_id, created_at FROM chunk_signatures WHERE file_id = ?", (file_id,)
+                ).fetchall())
+
+                kept = set(chunk_ids)
+                affected = self._release_locked(conn, file_id, [chunk_id for chunk_id in old_ids if chunk_id not in kept])
+                self._delete_rows_locked(conn, old_ids)
+
+                pending = [i for i, match in enumerate(matches) if match is None and signatures[i][0] != _MAX_HASH]
+                rechecked = self._find_locked(conn, signatures[pending], file_id) if pending else []
+                final = list(matches)
+                for i, match in zip(pending, rechecked):
+                    # 이전부터 대표였던 청크는 유지 (find_duplicates와 같은 규칙)
+                    if match is not None and chunk_ids[i] not in created:
+                        final[i] = match
+
+                now = time.time()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO chunk_signatures "
+                    "(chunk_id, file_id, canonical_id, similarity, skipped, signature, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            chunk_id, file_id,
+                            match[0] if match else None,
+                            match[1] if match else None,
+                            1 if (match and is_skipped) else 0,
+                            signature.tobytes(),
+                            created.get(chunk_id, now),
+                        )
+                        for chunk_id, signature, match, is_skipped in zip(chunk_ids, signatures, final, skipped)
+                    ],
+                )
+                canonical = [i for i, match in enumerate(final) if match is None and signatures[i][0] != _MAX_HASH]
+                self._insert_buckets_locked(conn, [chunk_ids[i] for i in canonical], signatures[canonical])
+                conn.commit()
+                return affected
+            except Exception as e:
+                if self._conn is not None:
+                    self._conn.rollback()
+                _clog.warning(f"근접 중복 인덱스 등록 실패: {e}")
+                return []
+
+    def remove_file(self, file_id: str) -> List[str]:
+        """파일의 서명을 모두 제거하고, 다시 벡터화가 필요한 다른 파일 ID를 반환"""
+        return self.register_file(file_id, [], np.zeros((0, NUM_PERM), dtype=np.uint32), [], [])
+
+    def clear(self):
+        """인덱스 전체 삭제"""
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute("DELETE FROM lsh_buckets")
+            conn.execute("DELETE FROM chunk_signatures")
+            conn.commit()
+
+    def rebuild_from_store(self, store: Any, page_size: int = 1000) -> int:
+        """벡터 저장소의 모든 청크로 인덱스를 다시 만듭니다 (먼저 읽힌 청크가 대표가 됨)."""
+        self.clear()
+        total = 0
+        offset = 0
+        while True:
+            page = store.get(limit=page_size, offset=offset)
+            ids = page.get("ids") if page else None
+            if not ids:
+                break
+            documents = page.get("documents") or [""] * len(ids)
+            metadatas = page.get("metadatas") or [{}] * len(ids)
+            signatures = compute_signatures(documents)
+
+            by_file: Dict[str, List[int]] = {}
+            for i, metadata in enumerate(metadatas):
+                by_file.setdefault((metadata or {}).get("file_id") or "", []).append(i)
+
+            with self._lock:
+                conn = self._get_conn()
+                now = time.time()
+                for file_id, positions in by_file.items():
+                    matches = self._find_locked(conn, signatures[positions], file_id)
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO chunk_signatures "
+                        "(chunk_id, file_id, canonical_id, similarity, skipped, signature, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (ids[i], file_id, match[0] if match else None, match[1] if match else None, 0, signatures[i].tobytes(), now)
+                            for i, match in zip(positions, matches)
+                        ],
+                    )
+                    canonical = [i for i, match in zip(positions, matches) if match is None and signatures[i][0] != _MAX_HASH]
+                    self._insert_buckets_locked(conn, [ids[i] for i in canonical], signatures[canonical])
+                conn.commit()
+
+            total += len(ids)
+            offset += len(ids)
+            if len(ids) < page_size:
+                break
+        _clog.info(f"근접 중복 인덱스 재구축 완료: {total}개 청크")
+        return total
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            try:
+                conn = self._get_conn()
+                total, canonical, linked, skipped = conn.execute(
+                    "SELECT COUNT(*), "
+                    "COALESCE(SUM(canonical_id IS NULL), 0), "
+                    "COALESCE(SUM(canonical_id IS NOT NULL AND skipped = 0), 0), "
+                    "COALESCE(SUM(skipped), 0) FROM chunk_signatures"
+                ).fetchone()
+                buckets = conn.execute("SELECT COUNT(*) FROM lsh_buckets").fetchone()[0]
+            except Exception as e:
+                return {"available": False, "error": str(e), "db_path": self.db_path}
+        return {
+            "available": True,
+            "action": self.action,
+            "threshold": self.threshold,
+            "num_perm": NUM_PERM,
+            "bands": self.bands,
+            "rows_per_band": self.rows,
+            "chunk_count": total,
+            "canonical_count": canonical,
+            "flagged_count": linked,
+            "skipped_count": skipped,
+            "bucket_rows": buckets,
+            "db_path": self.db_path,
+        }
+
+
+# 싱글톤 인스턴스
+_near_duplicate_index = None
+_near_duplicate_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index() -> NearDuplicateIndex:
+    """NearDuplicateIndex 싱글톤 인스턴스 반환"""
+    global _near_duplicate_index
+
+    if _near_duplicate_index is None:
+        with _near_duplicate_index_lock:
+            if _near_duplicate_index is None:
+                index = NearDuplicateIndex()
+                index.apply_settings(settings_service.get_section_settings("performance"))
+                settings_service.subscribe(
+                    "performance", lambda section, values: index.apply_settings(values)
+                )
+                _near_duplicate_index = index
+
+    return _near_duplicate_index
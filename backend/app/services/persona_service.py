@@ -1,5 +1,6 @@
 import os
 import json
+import asyncio
 import uuid
 from datetime import datetime
 from typing import List, Optional, Dict, Any
@@ -75,7 +76,8 @@ class PersonaService:
     async def get_persona(self, persona_id: str) -> Optional[Persona]:
         """특정 페르소나를 조회합니다."""
         try:
-            personas_data = self._load_personas()
+            # 채팅 요청마다 호출되므로 파일 읽기는 이벤트 루프 밖에서 실행
+            personas_data = await asyncio.to_thread(self._load_personas)
             
             for data in personas_data:
                 if data.get("persona_id") == persona_id:
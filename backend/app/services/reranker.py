@@ -0,0 +1,319 @@
+"""
+크로스 인코더 재정렬 (CPU, 선택 사용)
+
+벡터/하이브리드 검색으로 넉넉히 뽑은 후보를 (질문, 청크) 쌍 단위로 다시 점수 매겨 top_k만 남깁니다.
+- 크로스 인코더 모델은 프로세스 전역에서 모델 이름별로 한 번만 로드하여 공유 (CPU 전용)
+- 점수 캐시: (모델, 쿼리 해시, 청크 ID) -> 점수, 컬렉션 버전이 바뀌면 비움
+- 캐시에 없는 쌍만 rerankBatchSize 단위로 배치 추론 (동시 추론은 하나씩 실행해 CPU 스레드 과다 사용 방지)
+- 요청별 보고서(후보 수, 캐시 적중, 추가 지연 시간)와 누적 통계
+"""
+
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .retrieval_cache import get_retrieval_cache, normalize_query
+from .settings_service import settings_service
+
+ScoreKey = Tuple[str, str, str]
+
+# (질문 + 청크) 입력 최대 토큰 수 - 이보다 긴 청크는 뒷부분이 잘림
+MAX_PAIR_TOKENS = 512
+# 모델 로딩 실패 후 다시 시도하기까지 대기 시간 (매 검색마다 로딩을 재시도하지 않도록)
+LOAD_RETRY_SECONDS = 300
+
+
+def query_hash(query: str) -> str:
+    """점수 캐시 키용 정규화 쿼리 해시"""
+    return hashlib.blake2b(normalize_query(query).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _sigmoid(value: float) -> float:
+    # 크로스 인코더 로짓을 다른 검색 점수와 같은 0~1 범위로 변환
+    if value >= 0:
+        return 1.0 / (1.0 + math.exp(-value))
+    exp_value = math.exp(value)
+    return exp_value / (1.0 + exp_value)
+
+
+class CrossEncoderReranker:
+    """공유 크로스 인코더 기반 검색 결과 재정렬기"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, Any] = {}
+        self._model_info: Dict[str, Dict[str, Any]] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._load_failures: Dict[str, float] = {}
+        self._predict_lock = threading.Lock()
+        self._scores: "OrderedDict[ScoreKey, float]" = OrderedDict()
+        self._scores_version = get_retrieval_cache().version
+        self.stats = {
+            "requests": 0,
+            "candidates": 0,
+            "pairs_scored": 0,
+            "batches": 0,
+            "cache_hits": 0,
+            "fallbacks": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+        }
+        self.apply_settings(settings_service.get_section_settings("performance"))
+
+    def apply_settings(self, perf_settings: Dict[str, Any]):
+        """성능 설정의 사용 여부 / 모델 / 후보 수 / 배치 크기 / 캐시 크기 반영"""
+        self.enabled = perf_settings.get("enableRerank", False)
+        self.model_name = perf_settings.get("rerankModel", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
+        self.candidates = int(perf_settings.get("rerankCandidates", 30))
+        self.batch_size = int(perf_settings.get("rerankBatchSize", 16))
+        self.cache_max_entries = int(perf_settings.get("rerankCacheMaxEntries", 20000))
+        with self._lock:
+            # 다른 모델은 더 이상 쓰지 않으므로 해제
+            for name in [name for name in self._models if name != self.model_name]:
+                self._models.pop(name, None)
+                self._model_info.pop(name, None)
+            self._trim_locked()
+
+    # --- 모델 ---
+
+    def get_model(self, model_name: Optional[str] = None) -> Optional[Any]:
+        """크로스 인코더 모델 반환 (최초 호출 시 로드, 실패하면 None)"""
+        model_name = model_name or self.model_name
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is not None:
+                return model
+            load_lock = self._load_locks.setdefault(model_name, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                model = self._models.get(model_name)
+            if model is not None:
+                return model
+            if time.time() - self._load_failures.get(model_name, 0.0) < LOAD_RETRY_SECONDS:
+                return None
+
+            model, info = self._load(model_name)
+            if model is None:
+                self._load_failures[model_name] = time.time()
+                return None
+            with self._lock:
+                self._load_failures.pop(model_name, None)
+                self._models[model_name] = model
+                self._model_info[model_name] = info
+            return model
+
+    def _load(self, model_name: str) -> Tuple[Optional[Any], Dict[str, Any]]:
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as ie:
+            print("sentence-transformers 패키지가 설치되지 않았습니다.")
+            print("pip install sentence-transformers 로 설치해주세요.")
+            print(f"상세 오류: {ie}")
+            return None, {}
+
+        try:
+            # GPU 사용 비활성화 - CPU만 사용
+            os.environ["CUDA_VISIBLE_DEVICES"] = ""
+            print(f"재정렬 모델 로딩 중: {model_name} (cpu)")
+            start = time.perf_counter()
+            model = CrossEncoder(
+                model_name,
+                device="cpu",
+                max_length=MAX_PAIR_TOKENS,
+                cache_folder='./model_cache'  # 임베딩 모델과 같은 로컬 캐시 폴더
+            )
+            load_time = time.perf_counter() - start
+
+            try:
+                memory_mb = sum(p.numel() * p.element_size() for p in model.model.parameters()) / 1024 / 1024
+            except Exception:
+                memory_mb = 0.0
+
+            print(f"✅ 재정렬 모델 로딩 완료: {model_name} ({load_time:.2f}초, {memory_mb:.1f}MB)")
+            return model, {
+                "model_name": model_name,
+                "load_time_seconds": round(load_time, 4),
+                "memory_mb": round(memory_mb, 2),
+                "loaded_at": time.time(),
+            }
+        except Exception as e:
+            print(f"재정렬 모델 로딩 실패: {model_name} - {e}")
+            return None, {}
+
+    def warm_up(self) -> bool:
+        """설정된 재정렬 모델을 미리 로드합니다 (서버 시작 시 호출)."""
+        return self.get_model() is not None
+
+    # --- 점수 캐시 ---
+
+    def _trim_locked(self):
+        while len(self._scores) > self.cache_max_entries:
+            self._scores.popitem(last=False)
+
+    def _sync_version_locked(self):
+        # 컬렉션이 바뀌면 같은 청크 ID라도 본문이 달라질 수 있으므로 점수 캐시를 비움
+        version = get_retrieval_cache().version
+        if version != self._scores_version:
+            self._scores.clear()
+            self._scores_version = version
+
+    def _cached_scores(self, keys: Sequence[ScoreKey]) -> Dict[ScoreKey, float]:
+        with self._lock:
+            self._sync_version_locked()
+            found = {}
+            for key in keys:
+                score = self._scores.get(key)
+                if score is not None:
+                    self._scores.move_to_end(key)
+                    found[key] = score
+            return found
+
+    def _store_scores(self, scores: Dict[ScoreKey, float], version: int):
+        if self.cache_max_entries <= 0:
+            return
+        with self._lock:
+            self._sync_version_locked()
+            # 채점 중에 컬렉션이 바뀌었으면 저장하지 않음
+            if version != self._scores_version:
+                return
+            self._scores.update(scores)
+            self._trim_locked()
+
+    # --- 재정렬 ---
+
+    def _predict(self, model: Any, pairs: List[Tuple[str, str]]) -> List[float]:
+        """(질문, 본문) 쌍을 배치 단위로 채점합니다."""
+        scores: List[float] = []
+        with self._predict_lock:
+            for start in range(0, len(pairs), self.batch_size):
+                batch = pairs[start:start + self.batch_size]
+                raw = model.predict(batch, batch_size=len(batch), show_progress_bar=False)
+                scores.extend(_sigmoid(float(value)) for value in raw)
+        return scores
+
+    def rerank(
+        self,
+        query: str,
+        results: List[Dict[str, Any]],
+        top_k: int,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        검색 결과를 크로스 인코더 점수순으로 다시 정렬해 top_k개를 반환합니다. (CPU 작업이므로 스레드에서 호출)
+
+        각 결과의 score는 재정렬 점수(0~1)로 바뀌고, 원래 값은 retrieval_score / retrieval_rank에 남습니다.
+        모델을 쓸 수 없으면 원래 순서 그대로 top_k개를 반환합니다.
+
+        Returns:
+            (재정렬된 결과, 보고서)
+        """
+        start = time.perf_counter()
+        model_name = self.model_name
+        report = {
+            "model": model_name,
+            "candidates": len(results),
+            "returned": 0,
+            "cache_hits": 0,
+            "scored": 0,
+            "elapsed_ms": 0.0,
+            "applied": False,
+        }
+        if not results:
+            return [], report
+
+        model = self.get_model(model_name)
+        if model is None:
+            self.stats["fallbacks"] += 1
+            report["returned"] = min(top_k, len(results))
+            report["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            return results[:top_k], report
+
+        version = get_retrieval_cache().version
+        hashed_query = query_hash(query)
+        keys = [(model_name, hashed_query, result.get("id", "")) for result in results]
+        scores = self._cached_scores(keys)
+        report["cache_hits"] = len(scores)
+
+        missing = [
+            (key, result) for key, result in zip(keys, results)
+            if key not in scores
+        ]
+        if missing:
+            pairs = [(query, result.get("content") or result.get("text") or "") for _, result in missing]
+            try:
+                new_scores = dict(zip((key for key, _ in missing), self._predict(model, pairs)))
+            except Exception as e:
+                print(f"⚠️ 재정렬 추론 실패: {e}")
+                self.stats["fallbacks"] += 1
+                report["returned"] = min(top_k, len(results))
+                report["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+                return results[:top_k], report
+            # 청크 ID가 없는 결과는 캐시하지 않음
+            self._store_scores({key: score for key, score in new_scores.items() if key[2]}, version)
+            scores.update(new_scores)
+            report["scored"] = len(missing)
+
+        ranked = []
+        for rank, (key, result) in enumerate(zip(keys, results), start=1):
+            result["retrieval_score"] = result.get("score", result.get("similarity"))
+            result["retrieval_rank"] = rank
+            result["score"] = scores[key]
+            ranked.append(result)
+        ranked.sort(key=lambda item: item["score"], reverse=True)
+        ranked = ranked[:top_k]
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        report.update(returned=len(ranked), elapsed_ms=round(elapsed_ms, 2), applied=True)
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["candidates"] += len(results)
+            self.stats["pairs_scored"] += report["scored"]
+            self.stats["batches"] += math.ceil(report["scored"] / self.batch_size)
+            self.stats["cache_hits"] += report["cache_hits"]
+            self.stats["total_ms"] += elapsed_ms
+            self.stats["max_ms"] = max(self.stats["max_ms"], elapsed_ms)
+        return ranked, report
+
+    def clear(self):
+        with self._lock:
+            self._scores.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["cache_hits"] + self.stats["pairs_scored"]
+            return {
+                **self.stats,
+                "enabled": self.enabled,
+                "model_name": self.model_name,
+                "candidates_per_query": self.candidates,
+                "batch_size": self.batch_size,
+                "cache_entries": len(self._scores),
+                "cache_max_entries": self.cache_max_entries,
+                "cache_hit_rate": self.stats["cache_hits"] / lookups if lookups else 0.0,
+                "average_ms": self.stats["total_ms"] / self.stats["requests"] if self.stats["requests"] else 0.0,
+                "models": list(self._model_info.values()),
+            }
+
+
+# 싱글톤 인스턴스
+_reranker = None
+_reranker_lock = threading.Lock()
+
+
+def get_reranker() -> CrossEncoderReranker:
+    """CrossEncoderReranker 싱글톤 인스턴스 반환"""
+    global _reranker
+
+    if _reranker is None:
+        with _reranker_lock:
+            if _reranker is None:
+                _reranker = CrossEncoderReranker()
+                settings_service.subscribe(
+                    "performance", lambda section, values: _reranker.apply_settings(values)
+                )
+
+    return _reranker
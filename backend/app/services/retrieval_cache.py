@@ -0,0 +1,166 @@
+"""
+검색 요청 캐시 (메모리 LRU 2단계)
+
+같은 질문이 반복되는 채팅 트래픽에서 쿼리 임베딩과 벡터 검색을 다시 하지 않도록 합니다.
+- 1단계: (임베딩 모델, 정규화 쿼리) -> 쿼리 벡터
+- 2단계: (쿼리 벡터 해시, top_k, 카테고리, 컬렉션 버전) -> [(청크 ID, 거리)]
+- 컬렉션 버전은 벡터 저장소에 추가/삭제가 있을 때마다 올라가며, 이전 버전의 검색 결과는 더 이상 조회되지 않음
+- 단계별 적중/미스 카운터
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .embedding_cache import normalize_text
+from .settings_service import settings_service
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키용 쿼리 정규화 (NFC + 공백 정리 + 대소문자 무시)"""
+    return normalize_text(query).casefold()
+
+
+def vector_hash(vector: Sequence[float]) -> str:
+    """쿼리 벡터의 float32 바이트 해시"""
+    return hashlib.blake2b(np.asarray(vector, dtype=np.float32).tobytes(), digest_size=16).hexdigest()
+
+
+class RetrievalCache:
+    """쿼리 벡터 / 검색 결과 2단계 LRU 캐시"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vectors: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._results: "OrderedDict[Hashable, List[Tuple[str, float]]]" = OrderedDict()
+        self.version = 0
+        self.stats = {
+            "vector_hits": 0,
+            "vector_misses": 0,
+            "result_hits": 0,
+            "result_misses": 0,
+            "invalidations": 0,
+        }
+        self.apply_settings(settings_service.get_section_settings("performance"))
+
+    def apply_settings(self, perf_settings: Dict[str, Any]):
+        """성능 설정의 캐시 사용 여부 / 최대 항목 수 반영"""
+        self.enabled = perf_settings.get("enableRetrievalCache", True)
+        self.max_entries = int(perf_settings.get("retrievalCacheMaxEntries", 2000))
+        with self._lock:
+            if not self.enabled:
+                self._vectors.clear()
+                self._results.clear()
+            self._trim_locked()
+
+    def _trim_locked(self):
+        while len(self._vectors) > self.max_entries:
+            self._vectors.popitem(last=False)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    # --- 1단계: 쿼리 벡터 ---
+
+    def get_query_vector(self, model: str, query: str) -> Optional[List[float]]:
+        if not self.enabled:
+            return None
+        key = (model, normalize_query(query))
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is None:
+                self.stats["vector_misses"] += 1
+                return None
+            self._vectors.move_to_end(key)
+            self.stats["vector_hits"] += 1
+            return vector
+
+    def put_query_vector(self, model: str, query: str, vector: Sequence[float]):
+        """쿼리 벡터 저장. 0 벡터(임베딩 실패 시 더미값)는 저장하지 않습니다."""
+        if not self.enabled or vector is None or not np.any(np.asarray(vector, dtype=np.float32)):
+            return
+        key = (model, normalize_query(query))
+        with self._lock:
+            self._vectors[key] = list(vector)
+            self._vectors.move_to_end(key)
+            self._trim_locked()
+
+    # --- 2단계: 검색 결과 ---
+
+    def result_key(self, vector: Sequence[float], top_k: int, category_ids: Optional[Sequence[str]]) -> Hashable:
+        """현재 컬렉션 버전 기준 검색 결과 키 (검색 시작 시점에 만들어 두어야 도중 변경이 반영됨)"""
+        categories = tuple(sorted(set(category_ids))) if category_ids else ()
+        return (vector_hash(vector), int(top_k), categories, self.version)
+
+    def get_results(self, key: Hashable) -> Optional[List[Tuple[str, float]]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            hits = self._results.get(key)
+            if hits is None:
+                self.stats["result_misses"] += 1
+                return None
+            self._results.move_to_end(key)
+            self.stats["result_hits"] += 1
+            return list(hits)
+
+    def put_results(self, key: Hashable, hits: Sequence[Tuple[str, float]]):
+        if not self.enabled:
+            return
+        with self._lock:
+            # 검색 중에 컬렉션이 바뀌었으면 저장하지 않음
+            if key[-1] != self.version:
+                return
+            self._results[key] = list(hits)
+            self._results.move_to_end(key)
+            self._trim_locked()
+
+    def invalidate_results(self):
+        """컬렉션 변경 시 호출. 버전을 올리고 이전 검색 결과를 비웁니다."""
+        with self._lock:
+            self.version += 1
+            self._results.clear()
+            self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._vectors.clear()
+            self._results.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            vector_lookups = self.stats["vector_hits"] + self.stats["vector_misses"]
+            result_lookups = self.stats["result_hits"] + self.stats["result_misses"]
+            return {
+                **self.stats,
+                "enabled": self.enabled,
+                "collection_version": self.version,
+                "vector_entries": len(self._vectors),
+                "result_entries": len(self._results),
+                "max_entries": self.max_entries,
+                "vector_hit_rate": self.stats["vector_hits"] / vector_lookups if vector_lookups else 0.0,
+                "result_hit_rate": self.stats["result_hits"] / result_lookups if result_lookups else 0.0,
+            }
+
+
+# 싱글톤 인스턴스
+_retrieval_cache = None
+_retrieval_cache_lock = threading.Lock()
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """RetrievalCache 싱글톤 인스턴스 반환"""
+    global _retrieval_cache
+
+    if _retrieval_cache is None:
+        with _retrieval_cache_lock:
+            if _retrieval_cache is None:
+                _retrieval_cache = RetrievalCache()
+                settings_service.subscribe(
+                    "performance", lambda section, values: _retrieval_cache.apply_settings(values)
+                )
+
+    return _retrieval_cache
@@ -0,0 +1,220 @@
+"""
+의미 기반 답변 캐시 (메모리, 선택 사용)
+
+표현만 다른 같은 질문(FAQ 성격 트래픽)에 LLM 호출 없이 이전 답변을 재사용합니다.
+- 항목: (쿼리 임베딩, 범위 키, 근거 청크 ID, 답변/출처/관련 이미지)
+- 범위 키: 카테고리 ID, 페르소나 ID, 출력 형식, 최종 시스템 메시지, Flow ID가 모두 같아야 비교 대상
+  (페르소나/출력 형식 지시문이 수정되면 자연히 다른 범위가 됨)
+- 코사인 유사도가 임계값 이상인 가장 가까운 항목을 반환하고, 근거 청크가 아직 있는지는 호출 측에서 확인
+- TTL 만료 + 최대 항목 수 기준 LRU 제거
+- 조회/적중 카운터 (대시보드 표시용)
+"""
+
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .settings_service import settings_service
+
+
+def answer_scope(
+    category_ids: Optional[Sequence[str]],
+    persona_id: Optional[str],
+    output_format: Optional[str],
+    system_message: Optional[str] = None,
+    flow_id: Optional[str] = None,
+) -> str:
+    """답변에 영향을 주는 요청 조건을 하나의 키로 만듭니다."""
+    parts = [
+        ",".join(sorted(set(category_ids or []))),
+        persona_id or "",
+        output_format or "",
+        system_message or "",
+        flow_id or "",
+    ]
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedAnswer:
+    """캐시된 답변"""
+    scope: str
+    query: str
+    response: str
+    source_chunk_ids: List[str]
+    sources: List[Dict[str, Any]]
+    related_images: List[str]
+    flow_id: Optional[str] = None
+    # 저장 시점의 검색 캐시 컬렉션 버전 (같으면 근거 청크 확인 생략)
+    collection_version: int = -1
+    created_at: float = field(default_factory=time.time)
+    hit_count: int = 0
+
+
+class SemanticAnswerCache:
+    """쿼리 임베딩 유사도 기반 답변 캐시"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, CachedAnswer]" = OrderedDict()
+        # 항목별 정규화 임베딩 (항목 ID -> 벡터), 범위별 검색 행렬은 변경 시 다시 만듦
+        self._vectors: Dict[int, np.ndarray] = {}
+        self._matrices: Dict[str, tuple] = {}
+        self._ids = itertools.count(1)
+        self.stats = {
+            "lookups": 0,
+            "hits": 0,
+            "stale_sources": 0,
+            "expired": 0,
+            "evictions": 0,
+            "stores": 0,
+        }
+        self.apply_settings(settings_service.get_section_settings("performance"))
+
+    def apply_settings(self, perf_settings: Dict[str, Any]):
+        """성능 설정의 사용 여부 / 임계값 / TTL / 최대 항목 수 반영"""
+        self.enabled = perf_settings.get("enableSemanticAnswerCache", False)
+        self.threshold = float(perf_settings.get("semanticCacheThreshold", 0.95))
+        self.ttl_seconds = float(perf_settings.get("semanticCacheTtlSeconds", 3600))
+        self.max_entries = int(perf_settings.get("semanticCacheMaxEntries", 1000))
+        with self._lock:
+            if not self.enabled:
+                self._clear_locked()
+            self._evict_locked()
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> Optional[np.ndarray]:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(array))
+        if array.size == 0 or norm == 0.0:
+            return None
+        return array / norm
+
+    def _remove_locked(self, entry_id: int):
+        entry = self._entries.pop(entry_id, None)
+        self._vectors.pop(entry_id, None)
+        if entry is not None:
+            self._matrices.pop(entry.scope, None)
+
+    def _clear_locked(self):
+        self._entries.clear()
+        self._vectors.clear()
+        self._matrices.clear()
+
+    def _evict_locked(self):
+        """만료 항목 제거 후 최대 항목 수를 넘으면 오래 사용하지 않은 항목부터 제거"""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [entry_id for entry_id, entry in self._entries.items() if entry.created_at < cutoff]
+        for entry_id in expired:
+            self._remove_locked(entry_id)
+        self.stats["expired"] += len(expired)
+
+        while len(self._entries) > self.max_entries:
+            self._remove_locked(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+    def _scope_matrix_locked(self, scope: str):
+        cached = self._matrices.get(scope)
+        if cached is None:
+            ids = [entry_id for entry_id, entry in self._entries.items() if entry.scope == scope]
+            matrix = np.stack([self._vectors[entry_id] for entry_id in ids]) if ids else None
+            cached = (ids, matrix)
+            self._matrices[scope] = cached
+        return cached
+
+    def lookup(self, embedding: Sequence[float], scope: str) -> Optional[Tuple[int, CachedAnswer, float]]:
+        """같은 범위에서 가장 유사한 답변을 찾습니다. (항목 ID, 답변, 유사도) 또는 None"""
+        if not self.enabled:
+            return None
+        query_vector = self._normalize(embedding)
+        if query_vector is None:
+            return None
+
+        with self._lock:
+            self.stats["lookups"] += 1
+            self._evict_locked()
+            ids, matrix = self._scope_matrix_locked(scope)
+            if matrix is None or matrix.shape[1] != query_vector.shape[0]:
+                return None
+
+            scores = matrix @ query_vector
+            best = int(np.argmax(scores))
+            similarity = float(scores[best])
+            if similarity < self.threshold:
+                return None
+
+            entry_id = ids[best]
+            self._entries.move_to_end(entry_id)
+            return entry_id, self._entries[entry_id], similarity
+
+    def record_hit(self, entry_id: int):
+        """근거 청크 확인까지 통과해 재사용된 경우 호출"""
+        with self._lock:
+            self.stats["hits"] += 1
+            entry = self._entries.get(entry_id)
+            if entry is not None:
+                entry.hit_count += 1
+
+    def discard(self, entry_id: int):
+        """근거 청크가 삭제된 항목 제거"""
+        with self._lock:
+            self._remove_locked(entry_id)
+            self.stats["stale_sources"] += 1
+
+    def store(self, embedding: Sequence[float], answer: CachedAnswer) -> bool:
+        if not self.enabled:
+            return False
+        vector = self._normalize(embedding)
+        if vector is None:
+            return False
+
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = answer
+            self._vectors[entry_id] = vector
+            self._matrices.pop(answer.scope, None)
+            self.stats["stores"] += 1
+            self._evict_locked()
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._clear_locked()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "enabled": self.enabled,
+                "entry_count": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": self.stats["hits"] / self.stats["lookups"] if self.stats["lookups"] else 0.0,
+            }
+
+
+# 싱글톤 인스턴스
+_semantic_answer_cache = None
+_semantic_answer_cache_lock = threading.Lock()
+
+
+def get_semantic_answer_cache() -> SemanticAnswerCache:
+    """SemanticAnswerCache 싱글톤 인스턴스 반환"""
+    global _semantic_answer_cache
+
+    if _semantic_answer_cache is None:
+        with _semantic_answer_cache_lock:
+            if _semantic_answer_cache is None:
+                _semantic_answer_cache = SemanticAnswerCache()
+                settings_service.subscribe(
+                    "performance", lambda section, values: _semantic_answer_cache.apply_settings(values)
+                )
+
+    return _semantic_answer_cache
@@ -7,11 +7,17 @@
 - 성능 설정  
 - Docling 설정
 - Unstructured 설정
+
+설정은 메모리 스냅샷으로 보관하며, 설정 파일의 mtime/크기나 프로세스 내 버전이 바뀔 때만 다시 읽습니다.
+저장은 임시 파일 + rename으로 원자적으로 수행하고, 섹션별 변경 구독(subscribe)을 지원합니다.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import copy
 import json
 import os
+import tempfile
+import threading
 import psutil
 from pathlib import Path
 from ..core.config import settings as config_settings
@@ -29,6 +35,15 @@ class SettingsService:
         # 설정 파일 경로들
         self.settings_file = self.data_dir / "unified_settings.json"
         
+        # 설정 스냅샷 캐시 (파일 시그니처 또는 버전이 바뀔 때만 다시 읽음)
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_signature: Optional[Tuple[int, int]] = None
+        self._snapshot_version = -1
+        self._version = 0
+        self._snapshot_lock = threading.RLock()
+        self._write_lock = threading.RLock()
+        self._subscribers: Dict[str, List[Callable[[str, Dict[str, Any]], None]]] = {}
+        
         # 기본 설정 정의
         self._default_settings = {
             "system": {
@@ -115,6 +130,35 @@ class SettingsService:
                 "enableParallelProcessing": True,
                 "enableStreamingChunks": True,
                 "enableSmartCaching": True,
+                "enableEmbeddingCache": True,
+                "embeddingCacheMaxMB": 512,
+                "searchMode": "vector",  # vector, lexical, hybrid (BM25 + 벡터 RRF 병합, 어휘 인덱스 재구성 후 사용)
+                "hybridVectorWeight": 1.0,
+                "hybridLexicalWeight": 1.0,
+                "rrfK": 60,
+                "enableRetrievalCache": True,  # 쿼리 임베딩 / 벡터 검색 결과 캐시
+                "retrievalCacheMaxEntries": 2000,
+                "enableSemanticAnswerCache": False,  # 비슷한 질문에 이전 답변 재사용 (LLM 호출 생략)
+                "semanticCacheThreshold": 0.95,  # 쿼리 임베딩 코사인 유사도
+                "semanticCacheTtlSeconds": 3600,
+                "semanticCacheMaxEntries": 1000,
+                "enableContextPacking": True,  # 검색 문서 병합/중복 제거 후 토큰 예산 내로 정리
+                "contextTokenBudget": 3000,  # 모델 프로필에 값이 있으면 프로필 우선
+                "enableRerank": False,  # 크로스 인코더 재정렬 (검색 Flow 설정의 rerank가 있으면 Flow 우선)
+                "rerankModel": "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1",  # 다국어 CPU용 크로스 인코더
+                "rerankCandidates": 30,  # 재정렬 전에 검색할 후보 수
+                "rerankBatchSize": 16,
+                "rerankCacheMaxEntries": 20000,  # (쿼리, 청크) 점수 캐시
+                "llmMaxConcurrencyPerProvider": 8,  # Provider별 동시 LLM 호출 수
+                "llmTimeoutSeconds": 120,
+                "llmMaxRetries": 2,  # 429/5xx/연결 오류 재시도 횟수
+                "llmRetryBaseDelay": 0.5,
+                "vectorizationWorkers": 4,  # 벡터화 작업 큐 동시 처리 수
+                "vectorizationMaxAttempts": 3,
+                "vectorizationRetryBaseDelay": 5.0,  # 재시도 대기 (초, 시도마다 2배)
+                "vectorizationCommitBatchSize": 64,  # 체크포인트 간격 (청크 수)
+                "nearDuplicateAction": "flag",  # off, flag(연결만 기록), skip(대표 청크가 있으면 저장 제외)
+                "nearDuplicateThreshold": 0.9,  # MinHash 추정 Jaccard 유사도
                 "enableBatchProcessing": False,
                 "maxMemoryUsageMB": 2048,
                 "maxCpuUsagePercent": 80,
@@ -146,6 +190,13 @@ class SettingsService:
                 "ocr_enabled": False,
                 "output_format": "markdown",
                 "processing_timeout": 300,
+                "use_process_pool": True,  # 변환을 전용 워커 프로세스에서 실행
+                "worker_processes": 2,  # 0 = CPU 코어 수 (최대 4)
+                "converter_cache_size": 4,  # 옵션 조합별로 보관할 변환기 수 (워커당)
+                "preload_converters": False,  # 서버 시작 시 기본 변환기 미리 로드
+                "enable_page_sharding": True,  # 큰 PDF를 페이지 구간으로 나눠 병렬 변환
+                "shard_pages": 20,
+                "shard_min_pages": 60,  # 이 페이지 수 이상인 PDF만 분할
             },
             "unstructured": {
                 "enabled": True,
@@ -162,26 +213,116 @@ class SettingsService:
             }
         }
     
-    def load_settings(self) -> Dict[str, Any]:
-        """모든 설정 로드"""
+    # --- 설정 스냅샷 (파일 mtime / 프로세스 내 버전으로 무효화) ---
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.settings_file)
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+    
+    def _read_settings_file(self) -> Dict[str, Any]:
+        """설정 파일을 읽어 기본 설정과 병합한 새 딕셔너리를 반환"""
+        merged_settings = copy.deepcopy(self._default_settings)
         try:
             if self.settings_file.exists():
                 with open(self.settings_file, 'r', encoding='utf-8') as f:
                     saved_settings = json.load(f)
-                    # 기본 설정과 병합 (새로운 설정이 추가되었을 경우 대비)
-                    merged_settings = self._deep_merge(self._default_settings.copy(), saved_settings)
-                    return merged_settings
-            else:
-                return self._default_settings.copy()
+                # 기본 설정과 병합 (새로운 설정이 추가되었을 경우 대비)
+                self._deep_merge(merged_settings, saved_settings)
         except Exception as e:
             _clog.error(f"설정 로드 중 오류: {str(e)}")
-            return self._default_settings.copy()
+        return merged_settings
+    
+    def _get_snapshot(self) -> Dict[str, Any]:
+        """현재 설정 스냅샷 (내부 전용, 수정 금지). 파일이 바뀐 경우에만 다시 읽음"""
+        signature = self._file_signature()
+        snapshot = self._snapshot
+        if snapshot is not None and signature == self._snapshot_signature and self._snapshot_version == self._version:
+            return snapshot
+        
+        with self._snapshot_lock:
+            if self._snapshot is None or signature != self._snapshot_signature or self._snapshot_version != self._version:
+                previous = self._snapshot
+                self._snapshot = self._read_settings_file()
+                self._snapshot_signature = signature
+                self._snapshot_version = self._version
+                changed = self._changed_sections(previous, self._snapshot) if previous is not None else []
+            else:
+                changed = []
+            snapshot = self._snapshot
+        
+        self._notify_subscribers(changed, snapshot)
+        return snapshot
+    
+    def _install_snapshot(self, new_snapshot: Dict[str, Any]):
+        """저장 직후 새 스냅샷을 바로 반영하고 버전을 올립니다."""
+        with self._snapshot_lock:
+            previous = self._snapshot
+            self._version += 1
+            self._snapshot = new_snapshot
+            self._snapshot_signature = self._file_signature()
+            self._snapshot_version = self._version
+            changed = self._changed_sections(previous, new_snapshot) if previous is not None else list(new_snapshot.keys())
+        
+        self._notify_subscribers(changed, new_snapshot)
+    
+    @staticmethod
+    def _changed_sections(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+        return [section for section in set(old) | set(new) if old.get(section) != new.get(section)]
+    
+    @property
+    def version(self) -> int:
+        """프로세스 내 설정 버전 (저장할 때마다 증가)"""
+        return self._version
+    
+    # --- 변경 구독 ---
+    def subscribe(self, section: str, callback: Callable[[str, Dict[str, Any]], None]) -> Callable[[str, Dict[str, Any]], None]:
+        """섹션 설정이 바뀌면 callback(section, 새 섹션 설정)을 호출하도록 등록합니다."""
+        with self._snapshot_lock:
+            self._subscribers.setdefault(section, []).append(callback)
+        return callback
+    
+    def unsubscribe(self, section: str, callback: Callable[[str, Dict[str, Any]], None]):
+        with self._snapshot_lock:
+            callbacks = self._subscribers.get(section, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+    
+    def _notify_subscribers(self, sections: List[str], snapshot: Dict[str, Any]):
+        for section in sections:
+            for callback in list(self._subscribers.get(section, [])):
+                try:
+                    callback(section, copy.deepcopy(snapshot.get(section, {})))
+                except Exception as e:
+                    _clog.warning(f"설정 변경 알림 실패 ({section}): {e}")
+    
+    # --- 조회 / 저장 ---
+    def load_settings(self) -> Dict[str, Any]:
+        """모든 설정 로드 (스냅샷 복사본)"""
+        return copy.deepcopy(self._get_snapshot())
     
     def save_settings(self, settings: Dict[str, Any]) -> bool:
-        """모든 설정 저장"""
+        """모든 설정 저장 (임시 파일에 쓴 뒤 rename으로 교체)"""
         try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, ensure_ascii=False, indent=2)
+            self.settings_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=str(self.settings_file.parent), prefix=".unified_settings.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(settings, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.settings_file)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            
+            new_snapshot = copy.deepcopy(self._default_settings)
+            self._deep_merge(new_snapshot, copy.deepcopy(settings))
+            self._install_snapshot(new_snapshot)
             
             _clog.info(f"설정 저장 완료: {self.settings_file}")
             return True
@@ -190,19 +331,26 @@ class SettingsService:
             return False
     
     def get_section_settings(self, section: str) -> Dict[str, Any]:
-        """특정 섹션의 설정만 조회"""
-        all_settings = self.load_settings()
-        return all_settings.get(section, {})
+        """특정 섹션의 설정만 조회 (복사본)"""
+        return copy.deepcopy(self._get_snapshot().get(section, {}))
+    
+    def get_setting(self, section: str, key: str, default: Any = None) -> Any:
+        """단일 설정값 조회 (핫 패스용, 섹션 전체를 복사하지 않음)"""
+        value = self._get_snapshot().get(section, {}).get(key, default)
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
     
     def update_section_settings(self, section: str, new_settings: Dict[str, Any]) -> bool:
         """특정 섹션의 설정만 업데이트"""
         try:
-            all_settings = self.load_settings()
-            if section not in all_settings:
-                all_settings[section] = {}
-            
-            all_settings[section].update(new_settings)
-            return self.save_settings(all_settings)
+            with self._write_lock:
+                all_settings = self.load_settings()
+                if section not in all_settings:
+                    all_settings[section] = {}
+                
+                all_settings[section].update(new_settings)
+                return self.save_settings(all_settings)
         except Exception as e:
             _clog.error(f"섹션 설정 업데이트 중 오류: {str(e)}")
             return False
@@ -210,11 +358,12 @@ class SettingsService:
     def reset_section_settings(self, section: str) -> bool:
         """특정 섹션을 기본값으로 초기화"""
         try:
-            all_settings = self.load_settings()
-            if section in self._default_settings:
-                all_settings[section] = self._default_settings[section].copy()
-                return self.save_settings(all_settings)
-            return False
+            with self._write_lock:
+                all_settings = self.load_settings()
+                if section in self._default_settings:
+                    all_settings[section] = copy.deepcopy(self._default_settings[section])
+                    return self.save_settings(all_settings)
+                return False
         except Exception as e:
             _clog.error(f"섹션 설정 초기화 중 오류: {str(e)}")
             return False
@@ -222,7 +371,8 @@ class SettingsService:
     def reset_all_settings(self) -> bool:
         """모든 설정을 기본값으로 초기화"""
         try:
-            return self.save_settings(self._default_settings.copy())
+            with self._write_lock:
+                return self.save_settings(copy.deepcopy(self._default_settings))
         except Exception as e:
             _clog.error(f"전체 설정 초기화 중 오류: {str(e)}")
             return False
@@ -687,6 +837,95 @@ class SettingsService:
             if not isinstance(value, int) or value < 512 or value > 16384:
                 return False, "최대 메모리 사용량은 512MB 이상 16384MB 이하여야 합니다."
         
+        if "llmMaxConcurrencyPerProvider" in settings:
+            value = settings["llmMaxConcurrencyPerProvider"]
+            if not isinstance(value, int) or value < 1 or value > 100:
+                return False, "Provider별 동시 LLM 호출 수는 1 이상 100 이하여야 합니다."
+        
+        if "llmTimeoutSeconds" in settings:
+            value = settings["llmTimeoutSeconds"]
+            if not isinstance(value, (int, float)) or value < 5 or value > 600:
+                return False, "LLM 호출 타임아웃은 5초 이상 600초 이하여야 합니다."
+        
+        if "llmMaxRetries" in settings:
+            value = settings["llmMaxRetries"]
+            if not isinstance(value, int) or value < 0 or value > 10:
+                return False, "LLM 재시도 횟수는 0 이상 10 이하여야 합니다."
+        
+        if "vectorizationWorkers" in settings:
+            value = settings["vectorizationWorkers"]
+            if not isinstance(value, int) or value < 1 or value > 32:
+                return False, "벡터화 작업 동시 처리 수는 1 이상 32 이하여야 합니다."
+        
+        if "vectorizationMaxAttempts" in settings:
+            value = settings["vectorizationMaxAttempts"]
+            if not isinstance(value, int) or value < 1 or value > 10:
+                return False, "벡터화 작업 최대 시도 횟수는 1 이상 10 이하여야 합니다."
+        
+        if "vectorizationRetryBaseDelay" in settings:
+            value = settings["vectorizationRetryBaseDelay"]
+            if not isinstance(value, (int, float)) or value < 0 or value > 600:
+                return False, "벡터화 작업 재시도 대기 시간은 0초 이상 600초 이하여야 합니다."
+        
+        if "vectorizationCommitBatchSize" in settings:
+            value = settings["vectorizationCommitBatchSize"]
+            if not isinstance(value, int) or value < 1 or value > 10000:
+                return False, "벡터화 체크포인트 간격은 1 이상 10000 이하여야 합니다."
+        
+        if "retrievalCacheMaxEntries" in settings:
+            value = settings["retrievalCacheMaxEntries"]
+            if not isinstance(value, int) or value < 0 or value > 100000:
+                return False, "검색 캐시 최대 항목 수는 0 이상 100000 이하여야 합니다."
+        
+        if "semanticCacheThreshold" in settings:
+            value = settings["semanticCacheThreshold"]
+            if not isinstance(value, (int, float)) or value < 0.8 or value > 1.0:
+                return False, "답변 캐시 유사도 임계값은 0.8 이상 1.0 이하여야 합니다."
+        
+        if "semanticCacheTtlSeconds" in settings:
+            value = settings["semanticCacheTtlSeconds"]
+            if not isinstance(value, (int, float)) or value < 60 or value > 604800:
+                return False, "답변 캐시 유효 시간은 60초 이상 604800초 이하여야 합니다."
+        
+        if "semanticCacheMaxEntries" in settings:
+            value = settings["semanticCacheMaxEntries"]
+            if not isinstance(value, int) or value < 1 or value > 100000:
+                return False, "답변 캐시 최대 항목 수는 1 이상 100000 이하여야 합니다."
+        
+        if "contextTokenBudget" in settings:
+            value = settings["contextTokenBudget"]
+            if not isinstance(value, int) or value < 256 or value > 200000:
+                return False, "컨텍스트 토큰 예산은 256 이상 200000 이하여야 합니다."
+        
+        if "rerankModel" in settings:
+            value = settings["rerankModel"]
+            if not isinstance(value, str) or not value.strip():
+                return False, "재정렬 모델 이름을 입력해야 합니다."
+        
+        if "rerankCandidates" in settings:
+            value = settings["rerankCandidates"]
+            if not isinstance(value, int) or value < 1 or value > 200:
+                return False, "재정렬 후보 수는 1 이상 200 이하여야 합니다."
+        
+        if "rerankBatchSize" in settings:
+            value = settings["rerankBatchSize"]
+            if not isinstance(value, int) or value < 1 or value > 256:
+                return False, "재정렬 배치 크기는 1 이상 256 이하여야 합니다."
+        
+        if "rerankCacheMaxEntries" in settings:
+            value = settings["rerankCacheMaxEntries"]
+            if not isinstance(value, int) or value < 0 or value > 1000000:
+                return False, "재정렬 점수 캐시 최대 항목 수는 0 이상 1000000 이하여야 합니다."
+        
+        if "nearDuplicateAction" in settings:
+            if settings["nearDuplicateAction"] not in ("off", "flag", "skip"):
+                return False, "근접 중복 처리 방식은 off, flag, skip 중 하나여야 합니다."
+        
+        if "nearDuplicateThreshold" in settings:
+            value = settings["nearDuplicateThreshold"]
+            if not isinstance(value, (int, float)) or value < 0.5 or value > 1.0:
+                return False, "근접 중복 임계값은 0.5 이상 1.0 이하여야 합니다."
+        
         return True, "유효한 설정입니다."
     
     def _validate_model_settings(self, settings: Dict[str, Any]) -> tuple[bool, str]:
@@ -705,6 +944,21 @@ class SettingsService:
             if not isinstance(timeout, int) or timeout < 30 or timeout > 1800:
                 return False, "처리 타임아웃은 30초 이상 1800초 이하여야 합니다."
         
+        if "worker_processes" in settings:
+            value = settings["worker_processes"]
+            if not isinstance(value, int) or value < 0 or value > 64:
+                return False, "Docling 워커 프로세스 수는 0(CPU 코어 수, 최대 4) 이상 64 이하여야 합니다."
+        
+        if "converter_cache_size" in settings:
+            value = settings["converter_cache_size"]
+            if not isinstance(value, int) or value < 1 or value > 8:
+                return False, "Docling 변환기 캐시 크기는 1 이상 8 이하여야 합니다."
+        
+        if "shard_pages" in settings:
+            value = settings["shard_pages"]
+            if not isinstance(value, int) or value < 1 or value > 500:
+                return False, "Docling 분할 변환 페이지 수는 1 이상 500 이하여야 합니다."
+        
         return True, "유효한 설정입니다."
     
     def _validate_unstructured_settings(self, settings: Dict[str, Any]) -> tuple[bool, str]:
@@ -0,0 +1,313 @@
+"""
+대시보드 통계 롤업
+
+chat_history 전체를 읽는 대신, 새로 추가된 행만 일별 집계 테이블에 누적합니다.
+- stats_daily: (일자, 차원, 키)별 질문 수 / 관련도 합계 / 응답 시간 합계 / 좋아요·싫어요 수
+  차원: all(전체), category, flow, user
+- stats_response_time_hist: 일자별 응답 시간 히스토그램
+- stats_rollup_state: 마지막으로 집계한 chat_history.id (high-water mark)
+
+채팅 로깅 직후와 대시보드 조회 직전에 compact()가 high-water mark 이후의 행만 반영하므로
+대시보드 응답 시간은 누적 히스토리 크기와 무관합니다.
+"""
+
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..core.config import settings
+from ..core.logger import get_console_logger
+from ..db.sqlite_pool import get_db_manager
+
+_clog = get_console_logger()
+
+# 응답 시간 히스토그램 상한 경계(초). 마지막 버킷은 그 이상 전부
+RESPONSE_TIME_BUCKETS = [0.5, 1, 2, 3, 5, 10, 20, 30, 60]
+COMPACT_BATCH_SIZE = 5000
+
+_ROW_COLUMNS = "id, timestamp, category, relevance_score, feedback, user_id, flow_id, response_time"
+
+
+def _bucket_index(response_time: float) -> int:
+    for index, upper in enumerate(RESPONSE_TIME_BUCKETS):
+        if response_time < upper:
+            return index
+    return len(RESPONSE_TIME_BUCKETS)
+
+
+def bucket_label(index: int) -> str:
+    if index == 0:
+        return f"<{RESPONSE_TIME_BUCKETS[0]}s"
+    if index >= len(RESPONSE_TIME_BUCKETS):
+        return f">={RESPONSE_TIME_BUCKETS[-1]}s"
+    return f"{RESPONSE_TIME_BUCKETS[index - 1]}-{RESPONSE_TIME_BUCKETS[index]}s"
+
+
+class StatsRollupService:
+    """chat_history 증분 집계 서비스"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(settings.DATA_DIR, "db", "users.db")
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """users.db 풀 연결 (row_factory=Row, 반납 시 초기화됨)"""
+        with get_db_manager().connection(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            if not self._schema_ready:
+                self._ensure_schema(conn)
+                self._schema_ready = True
+            yield conn
+
+    @staticmethod
+    def _ensure_schema(conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS stats_daily (
+                day TEXT NOT NULL,
+                dimension TEXT NOT NULL,
+                key TEXT NOT NULL,
+                questions INTEGER NOT NULL DEFAULT 0,
+                relevance_sum REAL NOT NULL DEFAULT 0,
+                relevance_count INTEGER NOT NULL DEFAULT 0,
+                response_time_sum REAL NOT NULL DEFAULT 0,
+                response_time_count INTEGER NOT NULL DEFAULT 0,
+                likes INTEGER NOT NULL DEFAULT 0,
+                dislikes INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, dimension, key)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_stats_daily_dimension ON stats_daily(dimension, day)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS stats_response_time_hist (
+                day TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, bucket)
+            )
+        """)
+        conn.execute("CREATE TABLE IF NOT EXISTS stats_rollup_state (key TEXT PRIMARY KEY, value TEXT)")
+        conn.commit()
+
+    @staticmethod
+    def _chat_history_exists(conn: sqlite3.Connection) -> bool:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='chat_history'"
+        ).fetchone() is not None
+
+    @staticmethod
+    def _get_high_water_mark(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM stats_rollup_state WHERE key = 'high_water_mark'").fetchone()
+        return int(row[0]) if row else 0
+
+    # ------------------------------------------------------------------
+    # 집계
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _aggregate(rows: Iterable[sqlite3.Row], sign: int = 1) -> Tuple[Dict[Tuple, List[float]], Dict[Tuple, int]]:
+        """행 목록을 (day, dimension, key)별 누적값과 히스토그램 증분으로 변환"""
+        daily: Dict[Tuple, List[float]] = defaultdict(lambda: [0, 0.0, 0, 0.0, 0, 0, 0])
+        hist: Dict[Tuple, int] = defaultdict(int)
+
+        for row in rows:
+            day = str(row["timestamp"] or "")[:10]
+            keys = [("all", "")]
+            if row["category"]:
+                keys.extend(("category", c) for c in str(row["category"]).split(",") if c)
+            if row["flow_id"]:
+                keys.append(("flow", row["flow_id"]))
+            if row["user_id"]:
+                keys.append(("user", row["user_id"]))
+
+            relevance = row["relevance_score"]
+            response_time = row["response_time"]
+            feedback = row["feedback"]
+            for dimension, key in keys:
+                values = daily[(day, dimension, key)]
+                values[0] += sign
+                if relevance is not None:
+                    values[1] += sign * relevance
+                    values[2] += sign
+                if response_time is not None:
+                    values[3] += sign * response_time
+                    values[4] += sign
+                if feedback == "like":
+                    values[5] += sign
+                elif feedback == "dislike":
+                    values[6] += sign
+
+            if response_time is not None:
+                hist[(day, _bucket_index(response_time))] += sign
+
+        return daily, hist
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, daily: Dict[Tuple, List[float]], hist: Dict[Tuple, int]):
+        conn.executemany(
+            """
+            INSERT INTO stats_daily (day, dimension, key, questions, relevance_sum, relevance_count,
+                                     response_time_sum, response_time_count, likes, dislikes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(day, dimension, key) DO UPDATE SET
+                questions = questions + excluded.questions,
+                relevance_sum = relevance_sum + excluded.relevance_sum,
+                relevance_count = relevance_count + excluded.relevance_count,
+                response_time_sum = response_time_sum + excluded.response_time_sum,
+                response_time_count = response_time_count + excluded.response_time_count,
+                likes = likes + excluded.likes,
+                dislikes = dislikes + excluded.dislikes
+            """,
+            [(*key, *values) for key, values in daily.items()],
+        )
+        conn.executemany(
+            """
+            INSERT INTO stats_response_time_hist (day, bucket, count) VALUES (?, ?, ?)
+            ON CONFLICT(day, bucket) DO UPDATE SET count = count + excluded.count
+            """,
+            [(*key, count) for key, count in hist.items()],
+        )
+
+    def compact(self) -> int:
+        """high-water mark 이후 chat_history 행을 롤업에 반영하고 반영한 행 수를 반환합니다."""
+        if not os.path.exists(self.db_path):
+            return 0
+
+        with self._lock, self._connect() as conn:
+            try:
+                if not self._chat_history_exists(conn):
+                    return 0
+
+                total = 0
+                high_water_mark = self._get_high_water_mark(conn)
+                while True:
+                    rows = conn.execute(
+                        f"SELECT {_ROW_COLUMNS} FROM chat_history WHERE id > ? ORDER BY id LIMIT ?",
+                        (high_water_mark, COMPACT_BATCH_SIZE),
+                    ).fetchall()
+                    if not rows:
+                        break
+
+                    daily, hist = self._aggregate(rows)
+                    high_water_mark = rows[-1]["id"]
+                    # 집계와 high-water mark를 한 트랜잭션으로 커밋해 중복/누락 방지
+                    self._apply(conn, daily, hist)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO stats_rollup_state (key, value) VALUES ('high_water_mark', ?)",
+                        (str(high_water_mark),),
+                    )
+                    conn.commit()
+                    total += len(rows)
+                    if len(rows) < COMPACT_BATCH_SIZE:
+                        break
+
+                if total:
+                    _clog.debug(f"통계 롤업 반영: {total}개 행 (high-water mark {high_water_mark})")
+                return total
+            except Exception as e:
+                conn.rollback()
+                _clog.warning(f"통계 롤업 실패: {e}")
+                return 0
+
+    def remove_rows(self, history_ids: List[int]):
+        """삭제될 chat_history 행의 기여분을 롤업에서 뺍니다. (행 삭제 전에 호출)"""
+        if not history_ids or not os.path.exists(self.db_path):
+            return
+
+        with self._lock, self._connect() as conn:
+            try:
+                high_water_mark = self._get_high_water_mark(conn)
+                ids = [i for i in history_ids if i <= high_water_mark]
+                if not ids:
+                    return
+                placeholders = ",".join("?" * len(ids))
+                rows = conn.execute(f"SELECT {_ROW_COLUMNS} FROM chat_history WHERE id IN ({placeholders})", ids).fetchall()
+                daily, hist = self._aggregate(rows, sign=-1)
+                self._apply(conn, daily, hist)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                _clog.warning(f"통계 롤업 차감 실패: {e}")
+
+    def reset(self):
+        """롤업 전체 초기화 (다음 compact()에서 처음부터 다시 집계)"""
+        if not os.path.exists(self.db_path):
+            return
+
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM stats_daily")
+            conn.execute("DELETE FROM stats_response_time_hist")
+            conn.execute("DELETE FROM stats_rollup_state")
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def count_questions(self, start_day: Optional[str] = None, end_day: Optional[str] = None) -> int:
+        """[start_day, end_day) 구간의 전체 질문 수"""
+        sql = "SELECT COALESCE(SUM(questions), 0) FROM stats_daily WHERE dimension = 'all'"
+        params: List[Any] = []
+        if start_day:
+            sql += " AND day >= ?"
+            params.append(start_day)
+        if end_day:
+            sql += " AND day < ?"
+            params.append(end_day)
+        with self._connect() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+
+    def get_totals(self, dimension: str = "all") -> Dict[str, Dict[str, Any]]:
+        """차원별 키의 전체 기간 누적값"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT key, SUM(questions) AS questions, SUM(relevance_sum) AS relevance_sum,
+                       SUM(relevance_count) AS relevance_count, SUM(response_time_sum) AS response_time_sum,
+                       SUM(response_time_count) AS response_time_count, SUM(likes) AS likes, SUM(dislikes) AS dislikes
+                FROM stats_daily WHERE dimension = ? GROUP BY key
+                """,
+                (dimension,),
+            ).fetchall()
+            return {row["key"]: dict(row) for row in rows if row["questions"]}
+
+    def get_response_time_histogram(self, start_day: Optional[str] = None) -> Dict[str, int]:
+        sql = "SELECT bucket, SUM(count) FROM stats_response_time_hist"
+        params: List[Any] = []
+        if start_day:
+            sql += " WHERE day >= ?"
+            params.append(start_day)
+        sql += " GROUP BY bucket ORDER BY bucket"
+        with self._connect() as conn:
+            counts = {bucket: count for bucket, count in conn.execute(sql, params)}
+        return {bucket_label(i): counts.get(i, 0) for i in range(len(RESPONSE_TIME_BUCKETS) + 1)}
+
+    def get_recent_queries(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """최근 질문 (PK 역순 조회이므로 히스토리 크기와 무관)"""
+        with self._connect() as conn:
+            if not self._chat_history_exists(conn):
+                return []
+            rows = conn.execute(
+                "SELECT query, timestamp FROM chat_history ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+            return [{"query": row["query"], "timestamp": row["timestamp"]} for row in rows]
+
+
+# 싱글톤 인스턴스
+_stats_rollup = None
+_stats_rollup_lock = threading.Lock()
+
+
+def get_stats_rollup() -> StatsRollupService:
+    """StatsRollupService 싱글톤 인스턴스 반환"""
+    global _stats_rollup
+
+    if _stats_rollup is None:
+        with _stats_rollup_lock:
+            if _stats_rollup is None:
+                _stats_rollup = StatsRollupService()
+
+    return _stats_rollup
@@ -3,11 +3,13 @@ import os
 import json
 import asyncio
 import time
+import hashlib
 import threading
 import re
 import sys
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Tuple, Union, Callable
 
 # 윈도우 환경에서 유니코드 출력 지원
 if sys.platform == "win32":
@@ -24,6 +26,15 @@ if sys.platform == "win32":
 import numpy as np
 from ..core.config import settings
 from .settings_service import settings_service
+from .embedding_registry import embedding_registry
+from .embedding_cache import get_embedding_cache
+from .embedding_batcher import EmbeddingBatcher
+from .vector_stores import VectorStore, resolve_backend, get_local_ann_store
+from .vector_stores.chroma_store import ChromaVectorStore
+from .lexical_index import get_lexical_index, reciprocal_rank_fusion
+from .near_duplicate_index import compute_signatures, get_near_duplicate_index
+from .retrieval_cache import get_retrieval_cache
+from .reranker import get_reranker
 from ..models.schemas import DoclingOptions
 from ..models.vector_models import VectorMetadata, VectorMetadataService
 
@@ -52,10 +63,6 @@ class EmbeddingFunction:
         self.embedding_model = embedding_model or model_settings.get("embedding_model", "text-embedding-ada-002")
         self.embedding_provider = model_settings.get("embedding_provider", "openai")
         
-        self._openai_client = None
-        self._hf_model = None
-        self._hf_tokenizer = None
-        
         print(f"🔧 임베딩 설정 로드: {self.embedding_provider} - {self.embedding_model}")
         
         # 설정에 따른 모델 타입 결정
@@ -108,87 +115,62 @@ class EmbeddingFunction:
         else:
             return 1536  # 기본값
     
+    # 인코더는 호출마다 레지스트리에서 찾고 보관하지 않음
+    # (보관하면 모델 변경으로 레지스트리에서 해제해도 메모리가 풀리지 않음)
     def _get_openai_client(self):
-        """OpenAI 클라이언트 초기화"""
-        if self._openai_client is None:
-            try:
-                import openai
-                # 설정에서 API 키 가져오기
-                model_settings = settings_service.get_section_settings("models")
-                api_key = model_settings.get("embedding_api_key", "")
-                
-                if not api_key:
-                    print("OpenAI API 키가 설정되지 않았습니다.")
-                    return None
-                
-                self._openai_client = openai.OpenAI(api_key=api_key)
-            except ImportError:
-                print("OpenAI 패키지가 설치되지 않았습니다.")
-                return None
-        
-        return self._openai_client
+        """OpenAI 클라이언트 (프로세스 전역 레지스트리에서 공유)"""
+        model_settings = settings_service.get_section_settings("models")
+        api_key = model_settings.get("embedding_api_key", "")
+        return embedding_registry.get_encoder("openai", self.embedding_model, api_key=api_key)
     
     def _get_huggingface_model(self):
-        """HuggingFace 모델 초기화"""
-        if self._hf_model is None or self._hf_tokenizer is None:
-            try:
-                from sentence_transformers import SentenceTransformer
-                import torch
-                import traceback
-                import os
-                
-                # GPU 사용 비활성화 - CPU만 사용
-                os.environ["CUDA_VISIBLE_DEVICES"] = ""
-                torch.cuda.is_available = lambda: False
-                
-                print(f"허깅페이스 모델 로딩 중: {self.embedding_model}")
-                print(f"PyTorch 버전: {torch.__version__}")
-                print(f"CPU 전용 모드로 실행")
-                
-                # CPU만 사용하도록 명시적 설정
-                self._hf_model = SentenceTransformer(
-                    self.embedding_model, 
-                    device='cpu',
-                    cache_folder='./model_cache'  # 로컬 캐시 폴더 지정
-                )
-                
-                # 모델을 명시적으로 CPU로 이동
-                self._hf_model = self._hf_model.to('cpu')
-                    
-                print(f"✅ 허깅페이스 모델 로딩 완료 (CPU 모드): {self.embedding_model}")
-                
-            except ImportError as ie:
-                print("sentence-transformers 패키지가 설치되지 않았습니다.")
-                print("pip install sentence-transformers 로 설치해주세요.")
-                print(f"상세 오류: {ie}")
-                return None
-            except Exception as e:
-                print(f"허깅페이스 모델 로딩 실패: {e}")
-                print(f"오류 타입: {type(e).__name__}")
-                print("전체 스택 트레이스:")
-                traceback.print_exc()
-                return None
-        
-        return self._hf_model
+        """HuggingFace 모델 (프로세스 전역 레지스트리에서 공유, 최초 1회만 로딩)"""
+        return embedding_registry.get_encoder("huggingface", self.embedding_model, device='cpu')
     
     def __call__(self, input):
         """ChromaDB에서 호출되는 임베딩 함수 (ChromaDB v0.4.16+ 호환)"""
         # ChromaDB 0.4.16+ 버전은 정확히 (self, input) 시그니처만 허용
+        return self.embed(input, raise_errors=False)
+    
+    def embed(self, input, raise_errors: bool = False):
+        """텍스트 목록 임베딩 (raise_errors=True면 실패 시 더미 벡터 대신 예외 발생)"""
         if not input:
             return []
         
+        texts = list(input)
+        
+        # 영구 임베딩 캐시 조회 - 변경되지 않은 텍스트는 재임베딩하지 않음
+        cache = get_embedding_cache()
+        embeddings = cache.get_many(self.embedding_model, texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if not missing:
+            return embeddings
+        
+        missing_texts = [texts[i] for i in missing]
         if self.model_type == "huggingface":
-            return self._create_huggingface_embeddings(input)
+            created = self._create_huggingface_embeddings(missing_texts, raise_errors)
         else:
-            return self._create_openai_embeddings(input)
+            created = self._create_openai_embeddings(missing_texts, raise_errors)
+        
+        for i, embedding in zip(missing, created):
+            embeddings[i] = embedding
+        
+        # 더미(0) 벡터는 캐시에서 자동 제외됨
+        cache.put_many(self.embedding_model, missing_texts, created)
+        return embeddings
+    
+    def _dummy_embeddings(self, input_texts):
+        dim = self.get_embedding_dimension()
+        return [[0.0] * dim for _ in input_texts]
     
-    def _create_openai_embeddings(self, input_texts):
+    def _create_openai_embeddings(self, input_texts, raise_errors: bool = False):
         """OpenAI 임베딩 생성"""
         client = self._get_openai_client()
         if not client:
+            if raise_errors:
+                raise RuntimeError("OpenAI 클라이언트를 사용할 수 없습니다.")
             print("OpenAI 클라이언트를 사용할 수 없어 더미 임베딩을 반환합니다.")
-            dim = self.get_embedding_dimension()
-            return [[0.0] * dim for _ in input_texts]
+            return self._dummy_embeddings(input_texts)
         
         try:
             # OpenAI 임베딩 API 호출
@@ -197,31 +179,30 @@ class EmbeddingFunction:
                 input=input_texts
             )
             
-            # 임베딩 벡터 추출
-            embeddings = []
-            for item in response.data:
-                embeddings.append(item.embedding)
-            
-            return embeddings
+            # 임베딩 벡터 추출 (입력 순서 보장)
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
             
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"OpenAI 임베딩 생성 실패: {e}")
             # 실패 시 더미 임베딩 반환
-            dim = self.get_embedding_dimension()
-            return [[0.0] * dim for _ in input_texts]
+            return self._dummy_embeddings(input_texts)
     
-    def _create_huggingface_embeddings(self, input_texts):
+    def _create_huggingface_embeddings(self, input_texts, raise_errors: bool = False):
         """HuggingFace 로컬 임베딩 생성"""
         model = self._get_huggingface_model()
         if not model:
+            if raise_errors:
+                raise RuntimeError("허깅페이스 모델을 사용할 수 없습니다.")
             print("허깅페이스 모델을 사용할 수 없어 더미 임베딩을 반환합니다.")
-            dim = self.get_embedding_dimension()
-            return [[0.0] * dim for _ in input_texts]
+            return self._dummy_embeddings(input_texts)
         
         try:
             # CPU에서 임베딩 생성 (텐서 변환 비활성화)
             embeddings = model.encode(
                 input_texts, 
+                batch_size=max(1, min(len(input_texts), 64)),
                 convert_to_tensor=False,
                 convert_to_numpy=True,
                 device='cpu',
@@ -236,14 +217,14 @@ class EmbeddingFunction:
             if len(embeddings) > 0 and not isinstance(embeddings[0], list):
                 embeddings = [embeddings]
             
-            print(f"✅ 허깅페이스 로컬 임베딩 생성 완료 - {len(input_texts)}개 텍스트, 차원: {len(embeddings[0]) if embeddings else 0}")
             return embeddings
             
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"허깅페이스 임베딩 생성 실패: {e}")
             # 실패 시 더미 임베딩 반환
-            dim = self.get_embedding_dimension()
-            return [[0.0] * dim for _ in input_texts]
+            return self._dummy_embeddings(input_texts)
 
 async def _create_embedding_function() -> Union[EmbeddingFunction, None]:
     """임베딩 함수 생성"""
@@ -252,17 +233,50 @@ async def _create_embedding_function() -> Union[EmbeddingFunction, None]:
         model_settings = settings_service.get_section_settings("models")
         embedding_model = model_settings.get("embedding_model", "text-embedding-ada-002")
         
+        # 임베딩 모델 설정이 바뀌었으면 이전 인코더 해제
+        embedding_registry.sync_with_settings(model_settings)
+        
         return EmbeddingFunction(embedding_model)
     except Exception as e:
         print(f"임베딩 함수 생성 실패: {e}")
         return None
 
+def chunk_content_hash(text: str) -> str:
+    """청크 내용 해시 (청크 ID와 재벡터화 시 변경 비교에 사용)"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def content_chunk_ids(file_id: str, chunks: List[str]) -> List[str]:
+    """내용 해시 기반 청크 ID. 같은 내용이 여러 번 나오면 두 번째부터 _1, _2 ... 를 붙임"""
+    seen: Dict[str, int] = {}
+    ids = []
+    for chunk in chunks:
+        digest = chunk_content_hash(chunk)[:16]
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        ids.append(f"{file_id}_chunk_{digest}" if occurrence == 0 else f"{file_id}_chunk_{digest}_{occurrence}")
+    return ids
+
+
+@dataclass
+class CollectionSession:
+    """차원 검사를 마친 ChromaDB 컬렉션 연결 (임베딩 모델 변경/컬렉션 초기화 시 무효화)"""
+    client: Any
+    collection: Any
+    store: ChromaVectorStore
+    embedding_key: Tuple[str, str]
+    dimension: Optional[int]
+    validated_at: float
+    check_seconds: float
+
 # --- Main Vector Service ---
 class VectorService:
     _instance = None
     _initialized = False
     _client = None
     _collection = None
+    _store: Optional[VectorStore] = None
+    _collection_session: Optional[CollectionSession] = None
     _lock = threading.Lock()
 
     def __new__(cls):
@@ -281,22 +295,21 @@ class VectorService:
             # 디렉토리는 필요할 때만 생성하도록 변경 (자동 생성 제거)
             self.metadata_service = VectorMetadataService()
             
-            # 병렬 처리 설정 (성능 설정에서 가져옴)
-            from .settings_service import settings_service
-            perf_settings = settings_service.get_section_settings("performance")
-            self.enable_parallel = perf_settings.get("enableParallelProcessing", True)
-            self.max_concurrent_embeddings = perf_settings.get("maxConcurrentEmbeddings", 5)
-            self.max_concurrent_chunks = perf_settings.get("maxConcurrentChunks", 20)
-            self.batch_size = perf_settings.get("batchSize", 10)
-            self.embedding_pool_size = perf_settings.get("embeddingPoolSize", 3)
+            # 벡터 저장소 백엔드 (VECTOR_DB_TYPE: chromadb | faiss/local)
+            self.backend = resolve_backend(settings.VECTOR_DB_TYPE)
+            
+            # 병렬 처리 설정 (성능 설정에서 가져오고, 설정 변경 시 갱신)
+            self._apply_performance_settings("performance", settings_service.get_section_settings("performance"))
+            settings_service.subscribe("performance", self._apply_performance_settings)
             
             # 병렬 처리용 세마포어
             self.embedding_semaphore = asyncio.Semaphore(self.max_concurrent_embeddings)
             self.chunk_semaphore = asyncio.Semaphore(self.max_concurrent_chunks)
             
-            # 임베딩 함수 풀
+            # 임베딩 함수 풀 (임베딩 모델 설정이 바뀌면 비움)
             self.embedding_pool = []
             self._embedding_pool_lock = threading.Lock()
+            settings_service.subscribe("models", self._reset_embedding_pool)
             
             # 성능 통계
             self.stats = {
@@ -304,12 +317,27 @@ class VectorService:
                 "total_embeddings_created": 0,
                 "average_embedding_time": 0.0,
                 "parallel_operations": 0,
-                "sequential_operations": 0
+                "sequential_operations": 0,
+                "embedding_batches": 0,
+                "embedding_failures": 0,
+                "chunks_reused": 0,
+                "near_duplicates_flagged": 0,
+                "near_duplicates_skipped": 0,
+                "collection_session_hits": 0,
+                "collection_checks": 0
             }
             
             print(f"✅ Vector 서비스 초기화 완료 - 병렬 처리: {self.enable_parallel}")
             VectorService._initialized = True
 
+    def _apply_performance_settings(self, section: str, perf_settings: Dict[str, Any]):
+        """성능 설정 반영 (settings_service 변경 구독)"""
+        self.enable_parallel = perf_settings.get("enableParallelProcessing", True)
+        self.max_concurrent_embeddings = perf_settings.get("maxConcurrentEmbeddings", 5)
+        self.max_concurrent_chunks = perf_settings.get("maxConcurrentChunks", 20)
+        self.batch_size = perf_settings.get("batchSize", 10)
+        self.embedding_pool_size = perf_settings.get("embeddingPoolSize", 3)
+
     # --- 핵심적인 새 파이프라인 함수 ---
     async def chunk_and_embed_text(
         self, 
@@ -355,7 +383,8 @@ class VectorService:
                     text_content, 
                     rules, 
                     use_hierarchical=True, 
-                    pdf_path=pdf_path
+                    pdf_path=pdf_path,
+                    file_id=file_id
                 )
                 
                 if not chunk_proposals:
@@ -640,8 +669,18 @@ class VectorService:
         if not CHROMADB_AVAILABLE or not self._client:
             return False
         
+        # 차원 검사를 마친 연결이 있으면 그대로 재사용 (컬렉션 조회/차원 확인 왕복 생략)
+        embedding_key = self._current_embedding_key()
+        session = self._collection_session
+        if session is not None and session.client is self._client and session.embedding_key == embedding_key:
+            self._collection = session.collection
+            self.stats["collection_session_hits"] += 1
+            return True
+        
         try:
             collection_name = "langflow"
+            check_start = time.perf_counter()
+            self.stats["collection_checks"] += 1
             
             # 현재 임베딩 함수 생성
             embedding_function = await _create_embedding_function()
@@ -663,6 +702,7 @@ class VectorService:
                     print("📊 기존 컬렉션에 벡터 데이터가 없음")
                     # 임베딩 함수 적용하고 진행
                     self._collection._embedding_function = embedding_function
+                    self._save_collection_session(embedding_key, None, check_start)
                     return True
                 
                 print(f"📊 기존 컬렉션 차원: {existing_dimension}차원")
@@ -675,7 +715,8 @@ class VectorService:
                 
                 # 차원이 일치하면 임베딩 함수 적용하고 진행
                 self._collection._embedding_function = embedding_function
-                print(f"✅ ChromaDB 컬렉션 연결 완료 (차원: {existing_dimension})")
+                self._save_collection_session(embedding_key, existing_dimension, check_start)
+                print(f"✅ ChromaDB 컬렉션 연결 완료 (차원: {existing_dimension}, 검사 {self._collection_session.check_seconds * 1000:.1f}ms)")
                 return True
                 
             except Exception as get_error:
@@ -688,6 +729,7 @@ class VectorService:
                     name=collection_name,
                     embedding_function=embedding_function
                 )
+                self._save_collection_session(embedding_key, None, check_start)
                 print(f"✅ 새 ChromaDB 컬렉션 '{collection_name}' 생성 완료 (차원: {current_dimension})")
                 return True
             
@@ -695,27 +737,109 @@ class VectorService:
             print(f"ChromaDB 컬렉션 연결 실패: {e}")
             return False
 
+    @staticmethod
+    def _current_embedding_key() -> Tuple[str, str]:
+        model_settings = settings_service.get_section_settings("models")
+        return (
+            model_settings.get("embedding_provider", "openai"),
+            model_settings.get("embedding_model", "text-embedding-ada-002")
+        )
 
-    async def add_document_chunks(self, file_id: str, chunks: List[str], metadata: Dict[str, Any]) -> bool:
-        """문서 청크들을 ChromaDB에 추가합니다."""
-        print(f"📝 벡터화 모드: {len(chunks)}개 청크 추가 시작")
+    def _save_collection_session(self, embedding_key: Tuple[str, str], dimension: Optional[int], check_start: float):
+        self._collection_session = CollectionSession(
+            client=self._client,
+            collection=self._collection,
+            store=ChromaVectorStore(self._collection),
+            embedding_key=embedding_key,
+            dimension=dimension,
+            validated_at=time.time(),
+            check_seconds=time.perf_counter() - check_start
+        )
+
+    def invalidate_collection_session(self, reason: str = ""):
+        """캐시된 컬렉션 연결을 버립니다 (컬렉션 삭제/초기화 후 호출)."""
+        if self._collection_session is not None:
+            print(f"🔄 ChromaDB 컬렉션 세션 무효화{f': {reason}' if reason else ''}")
+        self._collection_session = None
+        self._collection = None
+        self._store = None
+        get_retrieval_cache().invalidate_results()
+
+    def get_collection_session_info(self) -> Dict[str, Any]:
+        """현재 컬렉션 세션 상태 (차원 검사 소요 시간 포함)"""
+        session = self._collection_session
+        info = {
+            "active": session is not None,
+            "hits": self.stats["collection_session_hits"],
+            "checks": self.stats["collection_checks"]
+        }
+        if session is not None:
+            info.update({
+                "embedding_provider": session.embedding_key[0],
+                "embedding_model": session.embedding_key[1],
+                "dimension": session.dimension,
+                "validated_at": datetime.fromtimestamp(session.validated_at).isoformat(),
+                "check_ms": round(session.check_seconds * 1000, 2)
+            })
+        return info
+
+
+    async def _connect_store(self, create_if_missing: bool = False) -> bool:
+        """설정된 벡터 저장소 백엔드에 연결하고 self._store를 준비합니다."""
+        if self.backend == "local_ann":
+            return await self._connect_local_store()
         
-        if not chunks or not CHROMADB_AVAILABLE:
+        if not CHROMADB_AVAILABLE:
             return False
         
         await self._ensure_client()
         if not self._client:
             return False
         
+        if not await self._connect_to_chromadb(create_if_missing=create_if_missing):
+            return False
+        
+        self._store = self._collection_session.store
+        return True
+    
+    async def _connect_local_store(self) -> bool:
+        """프로세스 내장 ANN 저장소 연결 (차원 불일치 검사 포함)"""
+        try:
+            embedding_function = await _create_embedding_function()
+            if not embedding_function:
+                print("임베딩 함수 생성 실패")
+                return False
+            
+            store = await asyncio.to_thread(get_local_ann_store, settings.VECTOR_DB_PATH)
+            existing_dimension = store.dimension()
+            current_dimension = embedding_function.get_embedding_dimension()
+            if existing_dimension is not None and existing_dimension != current_dimension:
+                print(f"❌ 차원 불일치: 기존 저장소({existing_dimension}차원) vs 현재 임베딩({current_dimension}차원)")
+                return False
+            
+            store.set_embedding_function(embedding_function)
+            self._store = store
+            return True
+        except Exception as e:
+            print(f"로컬 벡터 저장소 연결 실패: {e}")
+            return False
+
+    async def add_document_chunks(self, file_id: str, chunks: List[str], metadata: Dict[str, Any]) -> bool:
+        """문서 청크들을 ChromaDB에 추가합니다."""
+        print(f"📝 벡터화 모드: {len(chunks)}개 청크 추가 시작")
+        
+        if not chunks:
+            return False
+        
         # 벡터화 전 차원 불일치 검사
-        if not await self._connect_to_chromadb(create_if_missing=True):
+        if not await self._connect_store(create_if_missing=True):
             print("❌ 벡터화 실패: 임베딩 모델 차원이 기존 컬렉션과 일치하지 않습니다.")
             print("💡 관리자 페이지에서 임베딩 모델 설정을 확인하거나 벡터 데이터를 재생성해주세요.")
             return False
         
         try:
-            # 청크별로 고유 ID 생성
-            chunk_ids = [f"{file_id}_chunk_{i}" for i in range(len(chunks))]
+            # 청크별로 고유 ID 생성 (내용 해시 기반)
+            chunk_ids = content_chunk_ids(file_id, chunks)
             
             # 각 청크에 메타데이터 추가 (이미지 연결 정보 포함)
             chunk_metadatas = []
@@ -771,12 +895,15 @@ class VectorService:
                 for key, value in metadata.items():
                     print(f"     {key}: {value} ({type(value).__name__})")
             
-            # ChromaDB에 추가
-            self._collection.add(
+            # 벡터 저장소에 추가
+            self._store.add(
+                ids=chunk_ids,
                 documents=chunks,
-                metadatas=chunk_metadatas,
-                ids=chunk_ids
+                metadatas=chunk_metadatas
             )
+            get_retrieval_cache().invalidate_results()
+            await self._index_lexical(chunk_ids, chunks, chunk_metadatas)
+            await self._register_near_duplicates(file_id, chunk_ids, chunks)
             
             # 통계 업데이트
             self.stats["total_chunks_processed"] += len(chunks)
@@ -798,7 +925,7 @@ class VectorService:
         """PRD2: 헤딩 헤더를 포함한 청크 임베딩 (검색 품질 개선)"""
         print(f"📝 헤더 포함 벡터화 모드: {len(chunk_proposals)}개 청크 처리 시작")
         
-        if not chunk_proposals or not CHROMADB_AVAILABLE:
+        if not chunk_proposals:
             return False
         
         # 설정에서 헤딩 헤더 기능 활성화 여부 확인
@@ -809,19 +936,12 @@ class VectorService:
         except:
             enable_heading_headers = True  # 기본값: 활성화
         
-        await self._ensure_client()
-        if not self._client:
-            return False
-        
         # 벡터화 전 차원 불일치 검사
-        if not await self._connect_to_chromadb(create_if_missing=True):
+        if not await self._connect_store(create_if_missing=True):
             print("❌ 벡터화 실패: 임베딩 모델 차원이 기존 컬렉션과 일치하지 않습니다.")
             return False
         
         try:
-            # 청크별로 고유 ID 생성
-            chunk_ids = [f"{file_id}_chunk_{chunk.order}" for chunk in chunk_proposals]
-            
             # 헤딩 헤더를 포함한 텍스트 생성
             enhanced_texts = []
             chunk_metadatas = []
@@ -881,12 +1001,18 @@ class VectorService:
                 cleaned_metadata = self._clean_metadata_for_chromadb(chunk_metadata)
                 chunk_metadatas.append(cleaned_metadata)
             
-            # ChromaDB에 추가
-            self._collection.add(
+            # 청크별로 고유 ID 생성 (저장되는 텍스트의 내용 해시 기반)
+            chunk_ids = content_chunk_ids(file_id, enhanced_texts)
+            
+            # 벡터 저장소에 추가
+            self._store.add(
                 ids=chunk_ids,
                 documents=enhanced_texts,
                 metadatas=chunk_metadatas
             )
+            get_retrieval_cache().invalidate_results()
+            await self._index_lexical(chunk_ids, enhanced_texts, chunk_metadatas)
+            await self._register_near_duplicates(file_id, chunk_ids, enhanced_texts)
             
             # 성능 통계 업데이트
             if hasattr(self, '_performance_stats'):
@@ -983,19 +1109,219 @@ class VectorService:
         except Exception:
             return 0.0
 
-    async def search_similar_chunks(self, query: str, top_k: int = 5, category_ids: List[str] = None) -> List[Dict[str, Any]]:
-        """유사한 청크를 검색합니다."""
-        print(f"🔍 검색 모드: 쿼리 '{query[:50]}...' (top_k={top_k})")
+    async def _index_lexical(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]):
+        """어휘(BM25) 인덱스에 청크 색인 (실패해도 벡터화는 계속)"""
+        try:
+            await asyncio.to_thread(get_lexical_index().add_chunks, ids, documents, metadatas)
+        except Exception as e:
+            print(f"⚠️ 어휘 인덱스 색인 실패: {e}")
+
+    async def _delete_lexical(self, ids: List[str]):
+        """어휘(BM25) 인덱스에서 청크 제거 (실패해도 벡터화는 계속)"""
+        try:
+            await asyncio.to_thread(get_lexical_index().delete_chunks, ids)
+        except Exception as e:
+            print(f"⚠️ 어휘 인덱스 삭제 실패: {e}")
+
+    async def _register_near_duplicates(self, file_id: str, ids: List[str], documents: List[str]):
+        """일괄 추가 경로에서 저장한 청크를 근접 중복 인덱스에 등록 (중복은 표시만 함)"""
+        duplicate_index = get_near_duplicate_index()
+        if not duplicate_index.enabled or not ids:
+            return
+        try:
+            signatures = await asyncio.to_thread(compute_signatures, documents)
+            matches = await asyncio.to_thread(duplicate_index.find_duplicates, ids, signatures, file_id)
+            affected = await asyncio.to_thread(
+                duplicate_index.register_file, file_id, ids, signatures, matches, [False] * len(ids)
+            )
+            await self._requeue_released_duplicates(affected)
+        except Exception as e:
+            print(f"⚠️ 근접 중복 인덱스 등록 실패 (벡터 저장은 완료됨): {e}")
+    
+    async def _requeue_released_duplicates(self, file_ids: List[str]):
+        """대표 청크가 사라져 저장을 건너뛴 중복 청크가 남은 파일을 다시 벡터화 대기열에 넣음"""
+        if not file_ids:
+            return
+        try:
+            from .vectorization_queue import get_vectorization_queue, JOB_KIND_FILE, PRIORITY_LOW
+            job_queue = get_vectorization_queue()
+            for file_id in file_ids:
+                await job_queue.enqueue(JOB_KIND_FILE, file_id, priority=PRIORITY_LOW)
+            print(f"🔁 대표 청크 삭제로 건너뛴 중복 청크를 다시 저장하도록 {len(file_ids)}개 파일 재벡터화 등록")
+        except Exception as e:
+            print(f"⚠️ 중복 청크 파일 재벡터화 등록 실패: {file_ids} - {e}")
+    
+    async def rebuild_near_duplicate_index(self) -> int:
+        """기존 벡터 저장소의 청크로 근접 중복 인덱스를 다시 만듭니다."""
+        if not await self._connect_store(create_if_missing=False):
+            return 0
+        return await asyncio.to_thread(get_near_duplicate_index().rebuild_from_store, self._store)
+    
+    async def rebuild_lexical_index(self) -> int:
+        """벡터 저장소의 기존 청크로 어휘 인덱스를 재구축합니다."""
+        if not await self._connect_store(create_if_missing=False):
+            return 0
+        return await asyncio.to_thread(get_lexical_index().rebuild_from_store, self._store)
+
+    async def search_similar_chunks(
+        self,
+        query: str,
+        top_k: int = 5,
+        category_ids: List[str] = None,
+        search_mode: Optional[str] = None,
+        vector_weight: Optional[float] = None,
+        lexical_weight: Optional[float] = None,
+        rerank: Optional[bool] = None,
+        rerank_candidates: Optional[int] = None,
+        rerank_report: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        유사한 청크를 검색합니다.
         
-        if not query or not CHROMADB_AVAILABLE:
-            return []
+        search_mode: "vector" | "lexical" | "hybrid" (기본값: 성능 설정의 searchMode)
+        hybrid 모드에서는 벡터/BM25 순위를 RRF로 병합하며, 가중치로 각 순위의 비중을 조절합니다.
+        rerank: 크로스 인코더 재정렬 사용 여부 (기본값: 성능 설정의 enableRerank).
+        재정렬 시 rerank_candidates개(기본값: rerankCandidates)를 검색해 다시 점수 매긴 뒤 top_k개를 반환하며,
+        rerank_report를 넘기면 재정렬 보고서(추가 지연 시간 elapsed_ms 포함)를 채워 줍니다.
+        """
+        perf_settings = settings_service.get_section_settings("performance")
+        search_mode = (search_mode or perf_settings.get("searchMode", "vector")).lower()
+        print(f"🔍 검색 모드({search_mode}): 쿼리 '{query[:50]}...' (top_k={top_k})")
         
-        await self._ensure_client()
-        if not self._client:
+        if not query:
             return []
         
+        reranker = get_reranker()
+        use_rerank = reranker.enabled if rerank is None else rerank
+        candidate_k = max(top_k, rerank_candidates or reranker.candidates) if use_rerank else top_k
+        
+        # 근접 중복으로 표시만 된 청크(flag)는 대표 청크와 함께 나올 수 있으므로 넉넉히 검색 후 하나만 남김
+        fetch_k = candidate_k * 2 if get_near_duplicate_index().action == "flag" else candidate_k
+        
+        if search_mode in ("hybrid", "lexical"):
+            results = await self._search_hybrid(
+                query,
+                fetch_k,
+                category_ids,
+                vector_weight=0.0 if search_mode == "lexical" else (
+                    vector_weight if vector_weight is not None else perf_settings.get("hybridVectorWeight", 1.0)
+                ),
+                lexical_weight=lexical_weight if lexical_weight is not None else perf_settings.get("hybridLexicalWeight", 1.0),
+                rrf_k=perf_settings.get("rrfK", 60)
+            )
+        else:
+            results = await self._search_vector(query, fetch_k, category_ids)
+        
+        if fetch_k != candidate_k:
+            results = await self._collapse_near_duplicates(results)
+        
+        if use_rerank:
+            results, report = await asyncio.to_thread(reranker.rerank, query, results[:candidate_k], top_k)
+            if report["applied"]:
+                print(
+                    f"🎯 재정렬: 후보 {report['candidates']}개 → {report['returned']}개 "
+                    f"({report['elapsed_ms']:.1f}ms, 점수 캐시 적중 {report['cache_hits']}개)"
+                )
+            if rerank_report is not None:
+                rerank_report.update(report)
+        return results[:top_k]
+    
+    async def _collapse_near_duplicates(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """같은 대표 청크에 연결된 검색 결과는 순위가 가장 높은 하나만 남깁니다."""
+        if len(results) < 2:
+            return results
+        try:
+            canonical = await asyncio.to_thread(get_near_duplicate_index().canonical_map, [r["id"] for r in results])
+        except Exception as e:
+            print(f"⚠️ 근접 중복 결과 병합 실패: {e}")
+            return results
+        
+        seen = set()
+        collapsed = []
+        for result in results:
+            key = canonical.get(result["id"], result["id"])
+            if key in seen:
+                continue
+            seen.add(key)
+            collapsed.append(result)
+        return collapsed
+    
+    async def _search_hybrid(
+        self,
+        query: str,
+        top_k: int,
+        category_ids: Optional[List[str]],
+        vector_weight: float,
+        lexical_weight: float,
+        rrf_k: int = 60
+    ) -> List[Dict[str, Any]]:
+        """벡터 검색과 BM25 검색 결과를 RRF로 병합합니다."""
+        # 병합 전 후보를 넉넉히 가져옴
+        candidate_k = max(top_k * 4, 20)
+        
+        lexical_task = asyncio.to_thread(get_lexical_index().search, query, candidate_k, category_ids)
+        if vector_weight > 0:
+            vector_results, lexical_hits = await asyncio.gather(
+                self._search_vector(query, candidate_k, category_ids),
+                lexical_task
+            )
+        else:
+            vector_results, lexical_hits = [], await lexical_task
+        
+        if not lexical_hits:
+            return vector_results[:top_k]
+        
+        vector_by_id = {r["id"]: r for r in vector_results}
+        fused = reciprocal_rank_fusion(
+            {
+                "vector": [r["id"] for r in vector_results],
+                "lexical": [chunk_id for chunk_id, _ in lexical_hits]
+            },
+            weights={"vector": vector_weight, "lexical": lexical_weight},
+            k=rrf_k
+        )[:top_k]
+        
+        # 어휘 검색에서만 나온 청크는 저장소에서 본문/메타데이터 조회
+        missing_ids = [chunk_id for chunk_id, _ in fused if chunk_id not in vector_by_id]
+        if missing_ids and await self._connect_store(create_if_missing=False):
+            try:
+                data = self._store.get(ids=missing_ids)
+                for chunk_id, document, metadata in zip(data["ids"], data["documents"], data["metadatas"]):
+                    vector_by_id[chunk_id] = self._format_search_result(chunk_id, document, metadata or {}, None)
+            except Exception as e:
+                print(f"⚠️ 어휘 검색 결과 조회 실패: {e}")
+        
+        lexical_rank = {chunk_id: rank for rank, (chunk_id, _) in enumerate(lexical_hits, start=1)}
+        vector_rank = {r["id"]: rank for rank, r in enumerate(vector_results, start=1)}
+        
+        results = []
+        for chunk_id, score in fused:
+            result = vector_by_id.get(chunk_id)
+            if result is None:
+                continue
+            result["score"] = score
+            result["vector_rank"] = vector_rank.get(chunk_id)
+            result["lexical_rank"] = lexical_rank.get(chunk_id)
+            results.append(result)
+        return results
+    
+    @staticmethod
+    def _format_search_result(chunk_id: str, document: str, metadata: Dict[str, Any], distance: Optional[float]) -> Dict[str, Any]:
+        return {
+            "id": chunk_id,
+            "content": document,
+            "metadata": metadata,
+            "similarity": 1 - distance if distance is not None else 0.0,
+            "has_images": metadata.get("has_images", False),
+            "related_images": metadata.get("related_images", []),
+            "image_count": metadata.get("image_count", 0)
+        }
+    
+    async def _search_vector(self, query: str, top_k: int, category_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """벡터 유사도 검색"""
+        
         # 검색 전 차원 불일치 검사
-        if not await self._connect_to_chromadb(create_if_missing=False):
+        if not await self._connect_store(create_if_missing=False):
             print("❌ 검색 실패: 임베딩 모델 차원이 기존 컬렉션과 일치하지 않거나 컬렉션이 존재하지 않습니다.")
             return []
         
@@ -1005,42 +1331,105 @@ class VectorService:
             if category_ids:
                 where_clause = {"category_id": {"$in": category_ids}}
             
-            # 유사도 검색 실행
-            results = self._collection.query(
-                query_texts=[query],
-                n_results=top_k,
-                where=where_clause,
-                include=["documents", "metadatas", "distances"]
-            )
+            cache = get_retrieval_cache()
+            query_embedding = await self.embed_query(query) if cache.enabled else None
+            if query_embedding is None:
+                results = self._store.query(query_text=query, n_results=top_k, where=where_clause)
+            else:
+                # 같은 쿼리 벡터/조건의 검색 결과가 현재 컬렉션 버전에 있으면 벡터 검색 생략
+                result_key = cache.result_key(query_embedding, top_k, category_ids)
+                cached_hits = cache.get_results(result_key)
+                if cached_hits is not None:
+                    results = self._load_cached_hits(cached_hits)
+                    if results is not None:
+                        return results
+                
+                results = self._store.query(query_embedding=query_embedding, n_results=top_k, where=where_clause)
+                cache.put_results(result_key, [(result["id"], result["distance"]) for result in results or []])
             
-            if not results or not results['documents'] or not results['documents'][0]:
+            if not results:
                 return []
             
             # 결과를 딕셔너리 리스트로 변환 (이미지 정보 포함)
-            similar_chunks = []
-            for i in range(len(results['documents'][0])):
-                metadata = results['metadatas'][0][i] if i < len(results['metadatas'][0]) else {}
-                
-                chunk_data = {
-                    "content": results['documents'][0][i],
-                    "metadata": metadata,
-                    "similarity": 1 - results['distances'][0][i] if i < len(results['distances'][0]) else 0.0,
-                    "has_images": metadata.get("has_images", False),
-                    "related_images": metadata.get("related_images", []),
-                    "image_count": metadata.get("image_count", 0)
-                }
-                similar_chunks.append(chunk_data)
-            
-            return similar_chunks
+            return [
+                self._format_search_result(result["id"], result["document"], result["metadata"], result["distance"])
+                for result in results
+            ]
             
         except Exception as e:
             print(f"❌ 유사도 검색 실패: {e}")
             return []
     
+    async def embed_query(self, query: str) -> Optional[List[float]]:
+        """쿼리 임베딩 (검색 캐시에 있으면 임베딩 호출 생략)"""
+        embedding_func = await self._get_embedding_function()
+        if embedding_func is None:
+            return None
+        
+        cache = get_retrieval_cache()
+        vector = cache.get_query_vector(embedding_func.embedding_model, query)
+        if vector is not None:
+            return vector
+        
+        vectors = await asyncio.to_thread(embedding_func.embed, [query])
+        if not vectors:
+            return None
+        cache.put_query_vector(embedding_func.embedding_model, query, vectors[0])
+        return list(vectors[0])
+    
+    async def chunks_exist(self, chunk_ids: List[str]) -> bool:
+        """청크 ID가 모두 벡터 저장소에 남아 있는지 확인합니다."""
+        if not chunk_ids:
+            return True
+        if not await self._connect_store(create_if_missing=False):
+            return False
+        data = await asyncio.to_thread(self._store.get, ids=list(chunk_ids))
+        return set(data["ids"]) >= set(chunk_ids)
+    
+    def _load_cached_hits(self, hits: List[Tuple[str, float]]) -> Optional[List[Dict[str, Any]]]:
+        """캐시된 (청크 ID, 거리) 목록을 저장소에서 본문/메타데이터로 채웁니다. 빠진 청크가 있으면 None"""
+        if not hits:
+            return []
+        data = self._store.get(ids=[chunk_id for chunk_id, _ in hits])
+        found = {
+            chunk_id: (document, metadata)
+            for chunk_id, document, metadata in zip(data["ids"], data["documents"], data["metadatas"])
+        }
+        if len(found) < len(hits):
+            return None
+        return [
+            self._format_search_result(chunk_id, found[chunk_id][0] or "", found[chunk_id][1] or {}, distance)
+            for chunk_id, distance in hits
+        ]
+    
     async def get_status(self) -> Dict[str, Any]:
         """
         Provides a standardized status report for the ChromaDB connection and data.
         """
+        if self.backend == "local_ann":
+            try:
+                store = await asyncio.to_thread(get_local_ann_store, settings.VECTOR_DB_PATH)
+                store_stats = store.stats()
+                return {
+                    "connected": True,
+                    "backend": self.backend,
+                    "total_vectors": store_stats["count"],
+                    "collection_count": 1,
+                    "collections": ["langflow"],
+                    "dimension": store_stats["dimension"],
+                    "store": store_stats,
+                    "error": None
+                }
+            except Exception as e:
+                return {
+                    "connected": False,
+                    "backend": self.backend,
+                    "total_vectors": 0,
+                    "collection_count": 0,
+                    "collections": [],
+                    "error": f"로컬 벡터 저장소 상태 조회 실패: {str(e)}"
+                }
+        
         # ChromaDB 패키지 가용성 먼저 확인
         if not CHROMADB_AVAILABLE:
             return {
@@ -1088,6 +1477,8 @@ class VectorService:
 
             return {
                 "connected": True,
+                "backend": self.backend,
+                "collection_session": self.get_collection_session_info(),
                 "total_vectors": total_vectors,
                 "collection_count": len(collections),
                 "collections": collection_names,
@@ -1105,35 +1496,28 @@ class VectorService:
             }
     
     async def delete_document_vectors(self, file_id: str) -> bool:
-        """특정 파일의 모든 벡터 데이터를 ChromaDB에서 삭제합니다."""
-        if not CHROMADB_AVAILABLE:
+        """특정 파일의 모든 벡터 데이터를 벡터 저장소에서 삭제합니다."""
+        if self.backend == "chromadb" and not CHROMADB_AVAILABLE:
             print("ChromaDB 패키지가 설치되지 않아 벡터 삭제를 건너뜁니다.")
             return True
         
-        await self._ensure_client()
-        if not self._client:
-            print("ChromaDB 클라이언트가 초기화되지 않아 벡터 삭제를 건너뜁니다.")
-            return True
-        
         try:
-            # 컬렉션 가져오기
-            if not await self._connect_to_chromadb(create_if_missing=False):
-                print("ChromaDB 컬렉션이 없어 벡터 삭제를 건너뜁니다.")
+            # 저장소 연결
+            if not await self._connect_store(create_if_missing=False):
+                print("벡터 저장소가 없어 벡터 삭제를 건너뜁니다.")
                 return True
             
             # 파일 ID로 필터링하여 해당 문서의 모든 벡터 삭제
-            # ChromaDB에서 where 조건으로 file_id가 일치하는 데이터를 찾아 삭제
             try:
-                # 먼저 해당 file_id의 데이터가 있는지 확인
-                existing_data = self._collection.get(
-                    where={"file_id": file_id},
-                    include=["metadatas"]
+                deleted_count = self._store.delete(where={"file_id": file_id})
+                get_retrieval_cache().invalidate_results()
+                await asyncio.to_thread(get_lexical_index().delete_file, file_id)
+                await self._requeue_released_duplicates(
+                    await asyncio.to_thread(get_near_duplicate_index().remove_file, file_id)
                 )
                 
-                if existing_data and existing_data['ids']:
-                    # 존재하는 데이터의 ID들을 모두 삭제
-                    self._collection.delete(ids=existing_data['ids'])
-                    print(f"✅ 파일 {file_id}의 벡터 데이터 {len(existing_data['ids'])}개 삭제 완료")
+                if deleted_count:
+                    print(f"✅ 파일 {file_id}의 벡터 데이터 {deleted_count}개 삭제 완료")
                 else:
                     print(f"파일 {file_id}의 벡터 데이터가 존재하지 않습니다.")
                 
@@ -1152,74 +1536,41 @@ class VectorService:
     
     async def get_document_chunks(self, file_id: str) -> List[Dict[str, Any]]:
         """특정 파일의 모든 청크를 조회합니다."""
-        if not CHROMADB_AVAILABLE:
-            return []
-        
-        await self._ensure_client()
-        if not self._client:
-            return []
-        
         try:
-            if not await self._connect_to_chromadb(create_if_missing=False):
+            if not await self._connect_store(create_if_missing=False):
                 return []
             
             # 파일 ID로 필터링하여 해당 문서의 모든 청크 조회
-            results = self._collection.get(
-                where={"file_id": file_id},
-                include=["documents", "metadatas", "distances"]
-            )
-            
-            if not results or not results['ids']:
-                return []
-            
-            # 결과를 딕셔너리 리스트로 변환
-            chunks = []
-            for i in range(len(results['ids'])):
-                chunk_data = {
-                    "id": results['ids'][i],
-                    "content": results['documents'][i] if i < len(results['documents']) else "",
-                    "metadata": results['metadatas'][i] if i < len(results['metadatas']) else {}
-                }
-                chunks.append(chunk_data)
-            
-            return chunks
+            return self._store.get_by_file(file_id)
             
         except Exception as e:
             print(f"❌ 문서 청크 조회 실패: {e}")
             return []
 
     async def clear_all_data(self) -> bool:
-        """ChromaDB의 모든 벡터 데이터를 삭제합니다 (데이터베이스 구조는 유지)"""
-        if not CHROMADB_AVAILABLE:
+        """벡터 저장소의 모든 벡터 데이터를 삭제합니다 (데이터베이스 구조는 유지)"""
+        if self.backend == "chromadb" and not CHROMADB_AVAILABLE:
             print("ChromaDB 패키지가 설치되지 않아 데이터 클리어를 건너뜁니다.")
             return True
         
-        await self._ensure_client()
-        if not self._client:
-            print("ChromaDB 클라이언트가 초기화되지 않아 데이터 클리어를 건너뜁니다.")
-            return True
-        
         try:
-            # 기존 컬렉션 연결
-            if not await self._connect_to_chromadb(create_if_missing=False):
-                print("ChromaDB 컬렉션이 없어 데이터 클리어를 건너뜁니다.")
+            # 기존 저장소 연결
+            if not await self._connect_store(create_if_missing=False):
+                print("벡터 저장소가 없어 데이터 클리어를 건너뜁니다.")
                 return True
             
-            if self._collection:
-                # 컬렉션의 모든 데이터 가져오기
-                try:
-                    all_data = self._collection.get(include=["metadatas"])
-                    
-                    if all_data and all_data['ids']:
-                        # 모든 벡터 데이터 삭제
-                        self._collection.delete(ids=all_data['ids'])
-                        print(f"✅ ChromaDB에서 {len(all_data['ids'])}개의 벡터 데이터 삭제 완료")
-                    else:
-                        print("삭제할 벡터 데이터가 없습니다.")
-                        
-                except Exception as delete_error:
-                    print(f"벡터 데이터 삭제 중 오류: {delete_error}")
-                    return False
+            try:
+                deleted_count = self._store.clear()
+                get_retrieval_cache().invalidate_results()
+                await asyncio.to_thread(get_lexical_index().clear)
+                await asyncio.to_thread(get_near_duplicate_index().clear)
+                if deleted_count:
+                    print(f"✅ 벡터 저장소에서 {deleted_count}개의 벡터 데이터 삭제 완료")
+                else:
+                    print("삭제할 벡터 데이터가 없습니다.")
+            except Exception as delete_error:
+                print(f"벡터 데이터 삭제 중 오류: {delete_error}")
+                return False
             
             # 메타데이터 서비스에서도 모든 데이터 삭제
             try:
@@ -1237,9 +1588,36 @@ class VectorService:
             print(f"❌ 전체 데이터 클리어 실패: {e}")
             return False
     
+    async def prefill_embedding_cache(self) -> int:
+        """기존 벡터 저장소의 임베딩으로 영구 임베딩 캐시를 채웁니다."""
+        # 차원이 현재 임베딩 모델과 일치할 때만 (다른 모델의 벡터로 채우지 않도록)
+        if not await self._connect_store(create_if_missing=False):
+            return 0
+        
+        model_settings = settings_service.get_section_settings("models")
+        embedding_model = model_settings.get("embedding_model", "text-embedding-ada-002")
+        return await asyncio.to_thread(
+            get_embedding_cache().prefill_from_store, self._store, embedding_model
+        )
+    
+    def _reset_embedding_pool(self, section: str, model_settings: Dict[str, Any]):
+        """임베딩 모델/제공자가 바뀌면 이전 모델로 만든 풀의 임베딩 함수를 버립니다. (settings_service 변경 구독)"""
+        embedding_model = model_settings.get("embedding_model", "text-embedding-ada-002")
+        embedding_provider = model_settings.get("embedding_provider", "openai")
+        with self._embedding_pool_lock:
+            if all(
+                func.embedding_model == embedding_model and func.embedding_provider == embedding_provider
+                for func in self.embedding_pool
+            ):
+                return
+            self.embedding_pool.clear()
+        print(f"🔄 임베딩 모델 변경으로 임베딩 함수 풀 초기화: {embedding_model}")
+    
     # --- 병렬 처리 메서드들 ---
     async def _get_embedding_function(self):
         """임베딩 함수 풀에서 함수 가져오기 (연결 풀링)"""
+        # 구독 콜백을 놓친 경우에도 이전 모델의 함수를 쓰지 않도록 현재 설정과 비교
+        self._reset_embedding_pool("models", settings_service.get_section_settings("models"))
         with self._embedding_pool_lock:
             if len(self.embedding_pool) < self.embedding_pool_size:
                 # 새 임베딩 함수 생성
@@ -1251,177 +1629,305 @@ class VectorService:
                 # 기존 함수 재사용 (라운드 로빈)
                 return self.embedding_pool[len(self.embedding_pool) % self.embedding_pool_size]
     
-    async def _create_single_embedding(self, embedding_func, chunk: str) -> List[float]:
-        """단일 청크 임베딩 생성"""
-        try:
-            # 텍스트 정규화
-            normalized_chunk = chunk.strip()
-            if not normalized_chunk:
-                # 임베딩 함수에서 차원 가져오기
-                embedding_func = await _create_embedding_function()
-                dim = embedding_func.get_embedding_dimension() if embedding_func else 1536
-                return [0.0] * dim
-            
-            # 임베딩 생성 (비동기) - ChromaDB 0.4.16+ 호환
-            embeddings = await asyncio.to_thread(embedding_func, [normalized_chunk])
-            if embeddings:
-                return embeddings[0]
+    def _build_chunk_metadata(self, file_id: str, index: int, chunk: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """배치 임베딩 경로의 청크 메타데이터 (ChromaDB 호환 형태로 정리)"""
+        # 기본 메타데이터만 생성 (ChromaDB 호환성을 위해)
+        chunk_metadata = {
+            "file_id": file_id,
+            "filename": metadata.get("filename", "Unknown"),
+            "category_id": metadata.get("category_id"),
+            "category_name": metadata.get("category_name"),
+            "preprocessing_method": metadata.get("preprocessing_method", "basic"),
+            "chunk_index": index,
+            "chunk_length": len(chunk)
+        }
+        
+        # 이미지 정보 추가 (페이지 기반 필터링, 병렬 처리용)
+        file_has_images = metadata.get("image_count", 0) > 0
+        file_images = metadata.get("images", [])
+        
+        if file_has_images and file_images:
+            # 청크의 페이지 번호 추출 (chunk_metadata에서 가져오거나 추론)
+            chunk_page = chunk_metadata.get("page", 0)
+            
+            # 같은 페이지에 있는 이미지만 필터링
+            page_images = [img for img in file_images if img.get("page", 0) == chunk_page]
+            
+            # 페이지에 이미지가 있는 경우에만 메타데이터 추가
+            if page_images:
+                chunk_metadata["has_images"] = True
+                chunk_metadata["chunk_image_count"] = len(page_images)
+                # 해당 페이지의 이미지만 JSON으로 저장
+                chunk_metadata["file_images_json"] = json.dumps(page_images, ensure_ascii=False)
             else:
-                dim = embedding_func.get_embedding_dimension() if hasattr(embedding_func, 'get_embedding_dimension') else 1536
-                return [0.0] * dim
+                chunk_metadata["has_images"] = False
+                chunk_metadata["chunk_image_count"] = 0
             
-        except Exception as e:
-            print(f"단일 임베딩 생성 실패: {e}")
-            # 에러 시에도 적절한 차원 반환
-            try:
-                dim = embedding_func.get_embedding_dimension() if hasattr(embedding_func, 'get_embedding_dimension') else 1536
-            except:
-                dim = 1536
-            return [0.0] * dim
-    
+            # 전체 파일 통계는 유지
+            chunk_metadata["file_image_count"] = metadata.get("image_count", 0)
+        else:
+            chunk_metadata["has_images"] = False
+            chunk_metadata["file_image_count"] = 0
+        
+        # ChromaDB 호환성을 위한 메타데이터 정리 (None 값 제거)
+        return self._clean_metadata_for_chromadb(chunk_metadata)
+
+    async def _embed_and_store(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        commit_batch_size: int = 0,
+        on_batch_committed: Optional[Callable[[int], Any]] = None,
+    ) -> bool:
+        """청크를 배치 임베딩해 벡터 저장소/어휘 인덱스에 저장합니다.
+
+        commit_batch_size가 0보다 크면 그 개수씩 임베딩 → 저장을 반복하고, 저장이 끝날 때마다
+        on_batch_committed(지금까지 저장한 청크 수)를 호출합니다. (벡터화 작업 체크포인트용)
+        """
+        embedding_func = await self._get_embedding_function()
+        if not embedding_func:
+            print(f"임베딩 함수 생성 실패")
+            return False
+        
+        # 토큰 예산 기반 배치 임베딩 (동시 처리 배치 수 = maxConcurrentEmbeddings)
+        batcher = EmbeddingBatcher(embedding_func, max_in_flight=self.max_concurrent_embeddings)
+        window = commit_batch_size if commit_batch_size > 0 else len(documents)
+
+        for window_start in range(0, len(documents), window):
+            window_end = window_start + window
+            window_documents = documents[window_start:window_end]
+            batch_result = await batcher.embed(window_documents)
+
+            if batch_result.success_count == 0:
+                print(f"❌ 배치 임베딩 실패 - 유효한 임베딩 없음")
+                return False
+
+            print(
+                f"✅ 배치 임베딩 완료 - {batch_result.success_count}/{len(window_documents)}개 성공, "
+                f"배치 {batch_result.batch_count}개 (요청 {batch_result.request_count}회), "
+                f"{batch_result.elapsed_seconds:.2f}초"
+            )
+            if batch_result.failed_indices:
+                failed = [window_start + i for i in batch_result.failed_indices]
+                print(f"⚠️ 임베딩 실패 청크 {len(failed)}개는 0 벡터로 저장: {failed[:10]}")
+
+            # 벡터 저장소에 일괄 추가
+            print(f"🔄 벡터 저장소({self.backend})에 {len(window_documents)}개 청크 저장 시작")
+            self._store.add(
+                ids=ids[window_start:window_end],
+                documents=window_documents,
+                metadatas=metadatas[window_start:window_end],
+                embeddings=batch_result.embeddings
+            )
+            get_retrieval_cache().invalidate_results()
+            await self._index_lexical(
+                ids[window_start:window_end], window_documents, metadatas[window_start:window_end]
+            )
+
+            self.stats["total_chunks_processed"] += len(window_documents)
+            self.stats["total_embeddings_created"] += batch_result.success_count
+            self.stats["embedding_batches"] += batch_result.batch_count
+            self.stats["embedding_failures"] += len(batch_result.failed_indices)
+
+            if on_batch_committed is not None:
+                outcome = on_batch_committed(window_start + len(window_documents))
+                if asyncio.iscoroutine(outcome):
+                    await outcome
+        return True
+
     async def _add_document_chunks_parallel(self, file_id: str, chunks: List[str], metadata: Dict[str, Any]) -> bool:
-        """병렬로 문서 청크들을 처리하고 ChromaDB에 추가합니다."""
-        if not chunks or not CHROMADB_AVAILABLE:
+        """배치 임베딩으로 문서 청크들을 처리하고 벡터 저장소에 추가합니다."""
+        if not chunks:
             return False
         
-        await self._ensure_client()
-        if not self._client:
+        if not await self._connect_store(create_if_missing=True):
             return False
         
-        if not await self._connect_to_chromadb(create_if_missing=True):
+        try:
+            start_time = time.time()
+            print(f"🚀 배치 임베딩 시작 - {len(chunks)}개 청크")
+            
+            chunk_ids = content_chunk_ids(file_id, chunks)
+            chunk_metadatas = [self._build_chunk_metadata(file_id, i, chunk, metadata) for i, chunk in enumerate(chunks)]
+            if not await self._embed_and_store(chunk_ids, chunks, chunk_metadatas):
+                return False
+            await self._register_near_duplicates(file_id, chunk_ids, chunks)
+
+            # 저장 후 실제 개수 확인
+            collection_count = self._store.count()
+            print(f"✅ 벡터 저장소 저장 완료 - {len(chunks)}개 청크 저장")
+            print(f"📊 현재 컬렉션 총 벡터 수: {collection_count}개")
+            
+            processing_time = time.time() - start_time
+            self.stats["parallel_operations"] += 1
+            
+            print(f"✅ 배치 처리 완료 - {len(chunks)}개 청크, {processing_time:.2f}초")
+            return True
+            
+        except Exception as e:
+            print(f"❌ 배치 청크 추가 실패: {e}")
             return False
+
+    async def sync_document_chunks(
+        self,
+        file_id: str,
+        chunks: List[str],
+        metadata: Dict[str, Any],
+        commit_batch_size: int = 0,
+        on_batch_committed: Optional[Callable[[int, int], Any]] = None,
+    ) -> Dict[str, Any]:
+        """저장된 파일 청크와 새 청크 목록을 비교해 새로 생기거나 바뀐 청크만 임베딩합니다.
+
+        - 내용이 같은 청크는 기존 임베딩을 재사용 (순서가 바뀌어 메타데이터만 달라졌으면 기존 벡터로 다시 저장)
+        - 새 청크 목록에 없는 기존 청크는 삭제
+        - 이전 실행이 중간에 끊겼어도 이미 저장된 청크는 재사용되므로 그대로 이어서 처리됩니다
+        - 다른 문서의 대표 청크와 근접 중복인 청크는 연결만 기록하고, nearDuplicateAction이 skip이면 저장하지 않음
+        on_batch_committed(저장 완료 청크 수, 전체 청크 수)는 재사용분 반영 후와 임베딩 배치 저장마다 호출됩니다.
+        """
+        if not chunks:
+            return {"success": False, "error": "저장할 청크가 없습니다."}
+        
+        if not await self._connect_store(create_if_missing=True):
+            return {"success": False, "error": "벡터 저장소에 연결할 수 없습니다."}
         
         try:
             start_time = time.time()
-            print(f"🚀 병렬 처리 시작 - {len(chunks)}개 청크")
+            chunk_ids = content_chunk_ids(file_id, chunks)
+            chunk_metadatas = [self._build_chunk_metadata(file_id, i, chunk, metadata) for i, chunk in enumerate(chunks)]
+            
+            # 다른 문서의 대표 청크와 거의 같은 청크 확인 (skip 모드면 저장 대상에서 제외)
+            duplicate_index = get_near_duplicate_index()
+            all_ids, signatures, matches = chunk_ids, None, []
+            skipped_flags = [False] * len(chunks)
+            if duplicate_index.enabled:
+                signatures = await asyncio.to_thread(compute_signatures, chunks)
+                matches = await asyncio.to_thread(duplicate_index.find_duplicates, chunk_ids, signatures, file_id)
+                if duplicate_index.action == "skip":
+                    skipped_flags = [match is not None for match in matches]
+                    keep = [i for i, skipped in enumerate(skipped_flags) if not skipped]
+                    chunks = [chunks[i] for i in keep]
+                    chunk_ids = [chunk_ids[i] for i in keep]
+                    chunk_metadatas = [chunk_metadatas[i] for i in keep]
+            near_duplicates = sum(1 for match in matches if match is not None)
+            skipped_count = sum(skipped_flags)
+            if near_duplicates:
+                print(
+                    f"🪞 근접 중복 청크 {near_duplicates}개 감지 "
+                    f"({'저장 제외' if skipped_count else '표시 후 저장'}, 임계값 {duplicate_index.threshold})"
+                )
             
-            # 배치 단위로 청크 처리
-            batch_size = self.batch_size
-            all_chunk_data = []
+            existing = await asyncio.to_thread(self._store.get, where={"file_id": file_id})
+            # 내용 해시 → 기존 청크 위치 (기존 순번 ID로 저장된 청크도 내용이 같으면 재사용)
+            existing_by_hash: Dict[str, List[int]] = {}
+            for pos, document in enumerate(existing["documents"]):
+                existing_by_hash.setdefault(chunk_content_hash(document or ""), []).append(pos)
             
-            for batch_start in range(0, len(chunks), batch_size):
-                batch_end = min(batch_start + batch_size, len(chunks))
-                batch_chunks = chunks[batch_start:batch_end]
-                
-                # 병렬 임베딩 생성
-                async with self.embedding_semaphore:
-                    embedding_func = await self._get_embedding_function()
-                    if not embedding_func:
-                        print(f"임베딩 함수 생성 실패")
-                        continue
-                    
-                    # 배치 내 각 청크에 대해 병렬로 임베딩 생성
-                    embedding_tasks = []
-                    for chunk in batch_chunks:
-                        task = asyncio.create_task(self._create_single_embedding(embedding_func, chunk))
-                        embedding_tasks.append(task)
-                    
-                    # 모든 임베딩 완료 대기
-                    embeddings = await asyncio.gather(*embedding_tasks, return_exceptions=True)
-                    
-                    # 결과 수집
-                    for i, (chunk, embedding) in enumerate(zip(batch_chunks, embeddings)):
-                        if isinstance(embedding, Exception):
-                            print(f"청크 {batch_start + i} 임베딩 실패: {embedding}")
-                            # 실패 시 임베딩 함수에서 차원 가져오기
-                            dim = embedding_func.get_embedding_dimension() if hasattr(embedding_func, 'get_embedding_dimension') else 1536
-                            embedding = [0.0] * dim
-                        else:
-                            # 임베딩 값 검증
-                            if not embedding or len(embedding) == 0:
-                                print(f"⚠️ 청크 {batch_start + i} 임베딩이 비어있음, 기본값 사용")
-                                dim = embedding_func.get_embedding_dimension() if hasattr(embedding_func, 'get_embedding_dimension') else 1536
-                                embedding = [0.0] * dim
-                            elif not isinstance(embedding, list) or not isinstance(embedding[0], (int, float)):
-                                print(f"⚠️ 청크 {batch_start + i} 임베딩 형식 오류: {type(embedding)}, 기본값 사용")
-                                dim = embedding_func.get_embedding_dimension() if hasattr(embedding_func, 'get_embedding_dimension') else 1536
-                                embedding = [0.0] * dim
-                            else:
-                                print(f"✅ 청크 {batch_start + i} 임베딩 생성 성공 (차원: {len(embedding)})")
-                        
-                        chunk_id = f"{file_id}_chunk_{batch_start + i}"
-                        # 기본 메타데이터만 생성 (ChromaDB 호환성을 위해)
-                        chunk_metadata = {
-                            "file_id": file_id,
-                            "filename": metadata.get("filename", "Unknown"),
-                            "category_id": metadata.get("category_id"),
-                            "category_name": metadata.get("category_name"),
-                            "preprocessing_method": metadata.get("preprocessing_method", "basic"),
-                            "chunk_index": batch_start + i,
-                            "chunk_length": len(chunk)
-                        }
-                        
-                        # 이미지 정보 추가 (페이지 기반 필터링, 병렬 처리용)
-                        file_has_images = metadata.get("image_count", 0) > 0
-                        file_images = metadata.get("images", [])
-                        
-                        if file_has_images and file_images:
-                            # 청크의 페이지 번호 추출 (chunk_metadata에서 가져오거나 추론)
-                            chunk_page = chunk_metadata.get("page", 0)
-                            
-                            # 같은 페이지에 있는 이미지만 필터링
-                            page_images = []
-                            for img in file_images:
-                                img_page = img.get("page", 0)
-                                if img_page == chunk_page:
-                                    page_images.append(img)
-                            
-                            # 페이지에 이미지가 있는 경우에만 메타데이터 추가
-                            if page_images:
-                                chunk_metadata["has_images"] = True
-                                chunk_metadata["chunk_image_count"] = len(page_images)
-                                # 해당 페이지의 이미지만 JSON으로 저장
-                                import json
-                                chunk_metadata["file_images_json"] = json.dumps(page_images, ensure_ascii=False)
-                            else:
-                                chunk_metadata["has_images"] = False
-                                chunk_metadata["chunk_image_count"] = 0
-                            
-                            # 전체 파일 통계는 유지
-                            chunk_metadata["file_image_count"] = metadata.get("image_count", 0)
-                        else:
-                            chunk_metadata["has_images"] = False
-                            chunk_metadata["file_image_count"] = 0
-                        
-                        # ChromaDB 호환성을 위한 메타데이터 정리 (None 값 제거)
-                        cleaned_metadata = self._clean_metadata_for_chromadb(chunk_metadata)
-                        
-                        all_chunk_data.append({
-                            "id": chunk_id,
-                            "document": chunk,
-                            "metadata": cleaned_metadata,
-                            "embedding": embedding
-                        })
+            unchanged = 0
+            relocated: List[Tuple[int, int]] = []  # (새 위치, 기존 위치)
+            to_embed: List[int] = []
+            for i, chunk in enumerate(chunks):
+                candidates = existing_by_hash.get(chunk_content_hash(chunk))
+                if not candidates:
+                    to_embed.append(i)
+                    continue
+                # 같은 ID가 있으면 그것을 우선 사용
+                pos = next((p for p in candidates if existing["ids"][p] == chunk_ids[i]), candidates[0])
+                candidates.remove(pos)
+                if existing["ids"][pos] == chunk_ids[i] and (existing["metadatas"][pos] or {}) == chunk_metadatas[i]:
+                    unchanged += 1
+                else:
+                    relocated.append((i, pos))
+            
+            # 어느 새 청크와도 내용이 맞지 않은 기존 청크 = 삭제 대상
+            removed = sum(len(positions) for positions in existing_by_hash.values())
+            
+            # 1. 내용이 같은 청크는 기존 임베딩으로 새 ID/메타데이터에 저장
+            if relocated:
+                old_ids = [existing["ids"][pos] for _, pos in relocated]
+                stored = await asyncio.to_thread(self._store.get, ids=old_ids, include_embeddings=True)
+                embedding_by_id = dict(zip(stored["ids"], stored.get("embeddings") or []))
+                # 임베딩을 읽지 못한 청크는 새로 임베딩
+                to_embed = sorted(to_embed + [i for i, pos in relocated if existing["ids"][pos] not in embedding_by_id])
+                relocated = [(i, pos) for i, pos in relocated if existing["ids"][pos] in embedding_by_id]
+                ids = [chunk_ids[i] for i, _ in relocated]
+                documents = [chunks[i] for i, _ in relocated]
+                metadatas = [chunk_metadatas[i] for i, _ in relocated]
+                self._store.add(
+                    ids=ids,
+                    documents=documents,
+                    metadatas=metadatas,
+                    embeddings=[list(embedding_by_id[existing["ids"][pos]]) for _, pos in relocated]
+                )
+                get_retrieval_cache().invalidate_results()
+                await self._index_lexical(ids, documents, metadatas)
+            
+            reused = unchanged + len(relocated)
+            print(
+                f"🧮 청크 비교 - 전체 {len(chunks)}개: 재사용 {reused}개 "
+                f"(메타데이터 갱신 {len(relocated)}개), 신규/변경 {len(to_embed)}개, 삭제 {removed}개"
+            )
             
-            # ChromaDB에 일괄 추가
-            if all_chunk_data:
-                print(f"🔄 ChromaDB에 {len(all_chunk_data)}개 청크 저장 시작")
-                self._collection.add(
-                    documents=[d["document"] for d in all_chunk_data],
-                    metadatas=[d["metadata"] for d in all_chunk_data],
-                    ids=[d["id"] for d in all_chunk_data],
-                    embeddings=[d["embedding"] for d in all_chunk_data]
+            async def report(embedded: int):
+                if on_batch_committed is not None:
+                    outcome = on_batch_committed(reused + embedded, len(chunks))
+                    if asyncio.iscoroutine(outcome):
+                        await outcome
+            
+            await report(0)
+            
+            # 2. 새로 생기거나 바뀐 청크만 임베딩
+            if to_embed:
+                success = await self._embed_and_store(
+                    [chunk_ids[i] for i in to_embed],
+                    [chunks[i] for i in to_embed],
+                    [chunk_metadatas[i] for i in to_embed],
+                    commit_batch_size=commit_batch_size,
+                    on_batch_committed=report,
                 )
-                
-                # 저장 후 실제 개수 확인
-                collection_count = self._collection.count()
-                print(f"✅ ChromaDB 저장 완료 - {len(all_chunk_data)}개 청크 저장")
-                print(f"📊 현재 컬렉션 총 벡터 수: {collection_count}개")
-                
-                processing_time = time.time() - start_time
-                self.stats["total_chunks_processed"] += len(chunks)
-                self.stats["total_embeddings_created"] += len(all_chunk_data)
-                self.stats["parallel_operations"] += 1
-                
-                print(f"✅ 병렬 처리 완료 - {len(all_chunk_data)}개 청크, {processing_time:.2f}초")
-                return True
-            else:
-                print(f"❌ 병렬 처리 실패 - 유효한 청크 데이터 없음")
-                return False
+                if not success:
+                    return {"success": False, "error": "청크 임베딩에 실패했습니다."}
+            
+            # 3. 새 목록에 없는 기존 청크와 ID가 바뀐 청크의 이전 ID 삭제
+            #    (추가가 끝난 뒤에 삭제해 중간에 끊겨도 청크가 사라지지 않음)
+            kept_ids = set(chunk_ids)
+            deleted_ids = [chunk_id for chunk_id in existing["ids"] if chunk_id not in kept_ids]
+            if deleted_ids:
+                await asyncio.to_thread(self._store.delete, ids=deleted_ids)
+                get_retrieval_cache().invalidate_results()
+                await self._delete_lexical(deleted_ids)
+            
+            if signatures is not None:
+                affected = await asyncio.to_thread(
+                    duplicate_index.register_file, file_id, all_ids, signatures, matches, skipped_flags
+                )
+                await self._requeue_released_duplicates(affected)
+            
+            self.stats["parallel_operations"] += 1
+            self.stats["chunks_reused"] += reused
+            self.stats["near_duplicates_flagged"] += near_duplicates - skipped_count
+            self.stats["near_duplicates_skipped"] += skipped_count
+            
+            processing_time = time.time() - start_time
+            print(
+                f"✅ 청크 동기화 완료 - 재사용 {reused}개, 추가 {len(to_embed)}개, 삭제 {removed}개, "
+                f"{processing_time:.2f}초"
+            )
+            return {
+                "success": True,
+                "chunks_count": len(chunks),
+                "reused": reused,
+                "added": len(to_embed),
+                "deleted": removed,
+                "metadata_updated": len(relocated),
+                "near_duplicates": near_duplicates,
+                "skipped_duplicates": skipped_count,
+                "processing_time": processing_time,
+            }
             
         except Exception as e:
-            print(f"❌ 병렬 청크 추가 실패: {e}")
-            return False
+            print(f"❌ 청크 동기화 실패: {e}")
+            return {"success": False, "error": str(e)}
     
     def get_performance_stats(self) -> Dict[str, Any]:
         """성능 통계 반환"""
@@ -1429,6 +1935,11 @@ class VectorService:
         return {
             **self.stats,
             "embedding_pool_size": len(self.embedding_pool),
+            "embedding_registry": embedding_registry.get_stats(),
+            "embedding_cache": get_embedding_cache().get_stats(),
+            "retrieval_cache": get_retrieval_cache().get_stats(),
+            "reranker": get_reranker().get_stats(),
+            "collection_session": self.get_collection_session_info(),
             "parallel_ratio": self.stats["parallel_operations"] / max(1, total_ops),
             "average_chunks_per_operation": self.stats["total_chunks_processed"] / max(1, total_ops)
         }
@@ -1445,11 +1956,7 @@ class VectorService:
                     pass
             
             # 컬렉션 정리
-            if hasattr(self, '_collection') and self._collection:
-                try:
-                    self._collection = None
-                except:
-                    pass
+            self.invalidate_collection_session("리소스 정리")
             
             # 임베딩 풀 정리
             if hasattr(self, 'embedding_pool'):
@@ -1466,9 +1973,13 @@ class VectorService:
         file_id: str,
         metadata: Dict[str, Any],
         enable_docling: bool = True,
-        docling_options: Optional[DoclingOptions] = None
+        docling_options: Optional[DoclingOptions] = None,
+        progress_callback: Optional[Callable[[int, int, Tuple[int, int], Dict[str, Any]], Any]] = None
     ) -> Dict[str, Any]:
-        """Docling 통합 벡터화 파이프라인 - 이미지 메타데이터 포함"""
+        """Docling 통합 벡터화 파이프라인 - 이미지 메타데이터 포함
+
+        progress_callback은 큰 PDF를 페이지 구간별로 변환할 때 구간 완료마다 호출됩니다.
+        """
         print(f"🚀 Docling 통합 벡터화 파이프라인 시작: {file_path}")
         start_time = time.time()
         
@@ -1480,7 +1991,9 @@ class VectorService:
                 
                 if docling_service.is_available:
                     print("📄 Docling 문서 처리 시작...")
-                    docling_result = await docling_service.process_document(file_path, docling_options)
+                    docling_result = await docling_service.process_document(
+                        file_path, docling_options, progress_callback=progress_callback
+                    )
                     
                     if docling_result.success:
                         print(f"✅ Docling 처리 성공 - 이미지: {len(docling_result.images)}개, 테이블: {len(docling_result.tables)}개")
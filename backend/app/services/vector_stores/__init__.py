@@ -0,0 +1,57 @@
+"""
+벡터 저장소 백엔드
+
+VECTOR_DB_TYPE 설정에 따라 백엔드를 선택합니다.
+- "chromadb" / "chroma": ChromaDB PersistentClient 컬렉션 (기본값)
+- "faiss" / "local" / "hnsw": 프로세스 내장 ANN 저장소 (VECTOR_DB_PATH)
+"""
+
+import threading
+from typing import Optional
+
+from .base import VectorStore, matches_where
+
+CHROMA_BACKENDS = ("chromadb", "chroma")
+LOCAL_ANN_BACKENDS = ("faiss", "local", "hnsw", "local_ann")
+
+_local_stores = {}
+_local_stores_lock = threading.Lock()
+
+
+def resolve_backend(vector_db_type: Optional[str]) -> str:
+    """VECTOR_DB_TYPE 값을 백엔드 이름으로 정규화합니다."""
+    value = (vector_db_type or "chromadb").lower()
+    if value in LOCAL_ANN_BACKENDS:
+        return "local_ann"
+    return "chromadb"
+
+
+def get_local_ann_store(path: str) -> VectorStore:
+    """경로별 LocalAnnVectorStore 싱글톤 반환"""
+    from .local_ann_store import LocalAnnVectorStore
+
+    with _local_stores_lock:
+        store = _local_stores.get(path)
+        if store is None:
+            store = LocalAnnVectorStore(path)
+            _local_stores[path] = store
+        return store
+
+
+def flush_local_ann_stores():
+    """열려 있는 로컬 ANN 저장소의 미저장 인덱스 변경을 디스크에 씁니다."""
+    with _local_stores_lock:
+        stores = list(_local_stores.values())
+    for store in stores:
+        store.flush()
+
+
+__all__ = [
+    "VectorStore",
+    "matches_where",
+    "resolve_backend",
+    "get_local_ann_store",
+    "flush_local_ann_stores",
+    "CHROMA_BACKENDS",
+    "LOCAL_ANN_BACKENDS",
+]
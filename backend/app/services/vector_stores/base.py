@@ -0,0 +1,115 @@
+"""
+벡터 저장소 공통 인터페이스
+
+VectorService는 이 인터페이스만 사용하며, 실제 백엔드는 VECTOR_DB_TYPE 설정으로 선택됩니다.
+- add / query / delete(필터) / count / get / get_by_file
+- where 필터는 ChromaDB 문법의 부분집합을 지원합니다:
+  {"key": value}, {"key": {"$eq"|"$ne"|"$in"|"$nin": ...}}, {"$and": [...]}, {"$or": [...]}
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+
+class VectorStore(ABC):
+    """벡터 저장소 백엔드 추상 클래스"""
+
+    backend_name: str = "base"
+
+    def __init__(self):
+        # 문서만 전달된 경우 임베딩을 생성할 함수 (EmbeddingFunction)
+        self.embedding_function = None
+
+    def set_embedding_function(self, embedding_function: Any):
+        self.embedding_function = embedding_function
+
+    @abstractmethod
+    def add(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: Optional[List[List[float]]] = None,
+    ) -> None:
+        """청크 추가 (같은 ID가 있으면 덮어씀)"""
+
+    @abstractmethod
+    def query(
+        self,
+        query_text: Optional[str] = None,
+        query_embedding: Optional[List[float]] = None,
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """유사도 검색. [{"id", "document", "metadata", "distance"}] 를 거리 오름차순으로 반환"""
+
+    @abstractmethod
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        include_embeddings: bool = False,
+    ) -> Dict[str, List[Any]]:
+        """조회. {"ids", "documents", "metadatas"[, "embeddings"]} 형태로 반환"""
+
+    @abstractmethod
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None) -> int:
+        """ID 목록 또는 필터로 삭제하고 삭제된 개수를 반환"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """저장된 청크 수"""
+
+    @abstractmethod
+    def dimension(self) -> Optional[int]:
+        """저장된 벡터 차원 (비어 있으면 None)"""
+
+    def get_by_file(self, file_id: str) -> List[Dict[str, Any]]:
+        """특정 파일의 모든 청크 조회"""
+        data = self.get(where={"file_id": file_id})
+        return [
+            {"id": chunk_id, "content": document or "", "metadata": metadata or {}}
+            for chunk_id, document, metadata in zip(data["ids"], data["documents"], data["metadatas"])
+        ]
+
+    def clear(self) -> int:
+        """모든 청크 삭제"""
+        ids = self.get()["ids"]
+        return self.delete(ids=ids) if ids else 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend_name, "count": self.count(), "dimension": self.dimension()}
+
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """ChromaDB where 필터 부분집합을 메타데이터에 적용합니다."""
+    if not where:
+        return True
+
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, sub) for sub in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(matches_where(metadata, sub) for sub in condition):
+                return False
+            continue
+
+        value = metadata.get(key)
+        if isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op == "$eq" and value != operand:
+                    return False
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$nin" and value in operand:
+                    return False
+        elif value != condition:
+            return False
+
+    return True
@@ -0,0 +1,123 @@
+"""
+ChromaDB 벡터 저장소 백엔드 (기존 "langflow" 컬렉션 래퍼)
+"""
+
+from typing import Any, Dict, List, Optional
+
+from .base import VectorStore
+
+
+class ChromaVectorStore(VectorStore):
+    """ChromaDB 컬렉션을 VectorStore 인터페이스로 감싼 백엔드"""
+
+    backend_name = "chromadb"
+
+    def __init__(self, collection: Any):
+        super().__init__()
+        self.collection = collection
+
+    def set_embedding_function(self, embedding_function: Any):
+        super().set_embedding_function(embedding_function)
+        # 문서만 전달된 add/query는 ChromaDB가 이 함수로 임베딩
+        self.collection._embedding_function = embedding_function
+
+    def add(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: Optional[List[List[float]]] = None,
+    ) -> None:
+        # collection.add()는 같은 ID가 있으면 무시하므로 upsert로 덮어씀 (upsert가 없는 구버전은 add)
+        write = getattr(self.collection, "upsert", None) or self.collection.add
+        if embeddings is not None:
+            write(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+        else:
+            write(ids=ids, documents=documents, metadatas=metadatas)
+
+    def query(
+        self,
+        query_text: Optional[str] = None,
+        query_embedding: Optional[List[float]] = None,
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        kwargs: Dict[str, Any] = {
+            "n_results": n_results,
+            "where": where,
+            "include": ["documents", "metadatas", "distances"],
+        }
+        if query_embedding is not None:
+            kwargs["query_embeddings"] = [query_embedding]
+        else:
+            kwargs["query_texts"] = [query_text]
+
+        results = self.collection.query(**kwargs)
+        if not results or not results.get("ids") or not results["ids"][0]:
+            return []
+
+        ids = results["ids"][0]
+        documents = (results.get("documents") or [[]])[0]
+        metadatas = (results.get("metadatas") or [[]])[0]
+        distances = (results.get("distances") or [[]])[0]
+        return [
+            {
+                "id": chunk_id,
+                "document": documents[i] if i < len(documents) else "",
+                "metadata": (metadatas[i] if i < len(metadatas) else None) or {},
+                "distance": distances[i] if i < len(distances) else 1.0,
+            }
+            for i, chunk_id in enumerate(ids)
+        ]
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        include_embeddings: bool = False,
+    ) -> Dict[str, List[Any]]:
+        include = ["documents", "metadatas"]
+        if include_embeddings:
+            include.append("embeddings")
+
+        kwargs: Dict[str, Any] = {"include": include}
+        if ids is not None:
+            kwargs["ids"] = ids
+        if where:
+            kwargs["where"] = where
+        if limit is not None:
+            kwargs["limit"] = limit
+            kwargs["offset"] = offset
+
+        data = self.collection.get(**kwargs) or {}
+        result = {
+            "ids": list(data.get("ids") or []),
+            "documents": list(data.get("documents") or []),
+            "metadatas": list(data.get("metadatas") or []),
+        }
+        if include_embeddings:
+            embeddings = data.get("embeddings")
+            result["embeddings"] = list(embeddings) if embeddings is not None else []
+        return result
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None) -> int:
+        if ids is None:
+            if not where:
+                return 0
+            ids = self.get(where=where)["ids"]
+        if not ids:
+            return 0
+        self.collection.delete(ids=ids)
+        return len(ids)
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def dimension(self) -> Optional[int]:
+        existing_data = self.collection.get(limit=1, include=["embeddings"])
+        embeddings_data = existing_data.get("embeddings") if existing_data else None
+        if embeddings_data is None or len(embeddings_data) == 0:
+            return None
+        return len(embeddings_data[0])
@@ -0,0 +1,617 @@
+"""
+프로세스 내장 ANN 벡터 저장소 (VECTOR_DB_TYPE="faiss" / "local")
+
+- vectors.f32: 정규화된 float32 벡터를 담는 메모리 매핑 파일 (행 번호 = 벡터 위치)
+- metadata.db: 청크 ID / 문서 / 메타데이터 사이드카 테이블 (file_id, category_id 인덱스)
+- hnsw.bin: hnswlib(chroma-hnswlib) 인덱스. 없으면 numpy 전수 탐색으로 동작
+  쓰기마다 전체 그래프를 저장하지 않고 일정 쓰기 횟수/시간마다, 압축·종료 시에 저장합니다.
+  저장 이후의 변경은 다음에 열 때 metadata.db / 벡터 파일 기준으로 따라잡습니다.
+- 삭제는 톰스톤 처리 후 톰스톤이 많아지면 자동 압축
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ...core.logger import get_console_logger
+from .base import VectorStore, matches_where
+
+_clog = get_console_logger()
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+# 인덱싱된 사이드카 컬럼 (이 키들에 대한 필터는 SQL로 처리)
+_INDEXED_KEYS = ("file_id", "category_id")
+
+
+class LocalAnnVectorStore(VectorStore):
+    """메모리 매핑 벡터 파일 + SQLite 사이드카 + HNSW 인덱스 기반 백엔드"""
+
+    backend_name = "local_ann"
+
+    INITIAL_CAPACITY = 1024
+    # 필터 후보가 이 수 이하이면 인덱스 대신 후보만 정확하게 전수 탐색
+    BRUTE_FORCE_THRESHOLD = 50_000
+    # 전수 탐색 시 한 번에 읽는 행 수
+    SCAN_BLOCK_ROWS = 65_536
+    # 인덱스 저장 주기 (쓰기 호출 수 / 마지막 저장 후 경과 시간 중 먼저 도달하는 쪽)
+    INDEX_SAVE_EVERY_WRITES = 50
+    INDEX_SAVE_INTERVAL_SECONDS = 60.0
+
+    def __init__(self, path: str, hnsw_m: int = 16, hnsw_ef_construction: int = 200):
+        super().__init__()
+        self.path = os.path.abspath(path)
+        self.vectors_file = os.path.join(self.path, "vectors.f32")
+        self.meta_db_file = os.path.join(self.path, "metadata.db")
+        self.index_file = os.path.join(self.path, "hnsw.bin")
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._dim: Optional[int] = None
+        self._next_row = 0
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._live = np.zeros(0, dtype=bool)
+        self._index = None
+        self._index_dirty_writes = 0
+        self._index_saved_at = time.monotonic()
+
+        os.makedirs(self.path, exist_ok=True)
+        self._open()
+
+    # --- 저장소 열기 / 파일 관리 ---
+    def _open(self):
+        conn = sqlite3.connect(self.meta_db_file, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                row INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                file_id TEXT,
+                category_id TEXT,
+                document TEXT,
+                metadata TEXT,
+                deleted INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_file_id ON chunks(file_id, deleted)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_category_id ON chunks(category_id, deleted)")
+        conn.execute("CREATE TABLE IF NOT EXISTS store_info (key TEXT PRIMARY KEY, value TEXT)")
+        conn.commit()
+        self._conn = conn
+
+        info = dict(conn.execute("SELECT key, value FROM store_info").fetchall())
+        self._dim = int(info["dim"]) if info.get("dim") else None
+        self._next_row = int(info.get("next_row", 0))
+
+        if self._dim is None:
+            return
+
+        file_rows = os.path.getsize(self.vectors_file) // (self._dim * 4) if os.path.exists(self.vectors_file) else 0
+        self._open_vectors(max(self.INITIAL_CAPACITY, self._next_row, file_rows))
+
+        self._live = np.zeros(self._capacity, dtype=bool)
+        live_rows = [row for (row,) in conn.execute("SELECT row FROM chunks WHERE deleted = 0")]
+        if live_rows:
+            self._live[np.asarray(live_rows, dtype=np.int64)] = True
+
+        self._load_index()
+
+    def _open_vectors(self, capacity: int):
+        """벡터 파일을 capacity 행 크기로 맞추고 메모리 매핑합니다."""
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+
+        needed_bytes = capacity * self._dim * 4
+        mode = "r+b" if os.path.exists(self.vectors_file) else "w+b"
+        with open(self.vectors_file, mode) as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < needed_bytes:
+                f.truncate(needed_bytes)
+
+        self._vectors = np.memmap(self.vectors_file, dtype=np.float32, mode="r+", shape=(capacity, self._dim))
+        self._capacity = capacity
+
+    def _ensure_capacity(self, rows_needed: int):
+        if rows_needed <= self._capacity:
+            return
+        new_capacity = max(self._capacity * 2, self.INITIAL_CAPACITY)
+        while new_capacity < rows_needed:
+            new_capacity *= 2
+
+        self._open_vectors(new_capacity)
+        live = np.zeros(new_capacity, dtype=bool)
+        live[:len(self._live)] = self._live
+        self._live = live
+        if self._index is not None:
+            self._index.resize_index(new_capacity)
+
+    def _save_info(self):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO store_info (key, value) VALUES (?, ?)",
+            [("dim", str(self._dim) if self._dim else ""), ("next_row", str(self._next_row))],
+        )
+
+    # --- HNSW 인덱스 ---
+    def _new_index(self, capacity: int):
+        index = hnswlib.Index(space="ip", dim=self._dim)
+        index.init_index(max_elements=capacity, ef_construction=self.hnsw_ef_construction, M=self.hnsw_m)
+        return index
+
+    def _load_index(self):
+        if not HNSWLIB_AVAILABLE or self._dim is None:
+            self._index = None
+            return
+
+        if os.path.exists(self.index_file):
+            try:
+                index = hnswlib.Index(space="ip", dim=self._dim)
+                index.load_index(self.index_file, max_elements=self._capacity)
+                if index.get_current_count() <= self._next_row:
+                    self._index = index
+                    self._catch_up_index(index.get_current_count())
+                    return
+                _clog.warning("HNSW 인덱스가 벡터 파일과 일치하지 않아 재구성합니다.")
+            except Exception as e:
+                _clog.warning(f"HNSW 인덱스 로드 실패, 재구성합니다: {e}")
+
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        """벡터 파일로부터 HNSW 인덱스를 다시 만듭니다."""
+        if not HNSWLIB_AVAILABLE or self._dim is None:
+            self._index = None
+            return
+
+        index = self._new_index(self._capacity)
+        for start in range(0, self._next_row, self.SCAN_BLOCK_ROWS):
+            end = min(start + self.SCAN_BLOCK_ROWS, self._next_row)
+            index.add_items(np.asarray(self._vectors[start:end]), np.arange(start, end))
+        for row in np.flatnonzero(~self._live[:self._next_row]):
+            index.mark_deleted(int(row))
+        self._index = index
+        self._save_index()
+
+    def _catch_up_index(self, indexed_rows: int):
+        """마지막 저장 이후의 추가/삭제를 메타데이터 기준으로 인덱스에 반영합니다."""
+        if indexed_rows < self._next_row:
+            for start in range(indexed_rows, self._next_row, self.SCAN_BLOCK_ROWS):
+                end = min(start + self.SCAN_BLOCK_ROWS, self._next_row)
+                self._index.add_items(np.asarray(self._vectors[start:end]), np.arange(start, end))
+            _clog.info(f"HNSW 인덱스에 저장되지 않은 벡터 {self._next_row - indexed_rows}개 반영")
+            self._index_dirty_writes += 1
+        for row in np.flatnonzero(~self._live[:self._next_row]):
+            try:
+                self._index.mark_deleted(int(row))
+            except RuntimeError:
+                # 이미 삭제 표시된 행
+                pass
+
+    def _save_index(self):
+        if self._index is not None:
+            self._index.save_index(self.index_file)
+        self._index_dirty_writes = 0
+        self._index_saved_at = time.monotonic()
+
+    def _mark_index_dirty(self):
+        """인덱스 변경을 기록하고 저장 주기에 도달했을 때만 저장합니다."""
+        if self._index is None:
+            return
+        self._index_dirty_writes += 1
+        if (
+            self._index_dirty_writes >= self.INDEX_SAVE_EVERY_WRITES
+            or time.monotonic() - self._index_saved_at >= self.INDEX_SAVE_INTERVAL_SECONDS
+        ):
+            self._save_index()
+
+    def flush(self):
+        """저장되지 않은 인덱스 변경을 디스크에 씁니다. (서버 종료 시 호출)"""
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            if self._index_dirty_writes:
+                self._save_index()
+
+    # --- 내부 유틸 ---
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        if self.embedding_function is None:
+            raise RuntimeError("임베딩이 전달되지 않았고 임베딩 함수도 설정되지 않았습니다.")
+        return np.asarray(self.embedding_function(texts), dtype=np.float32)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).astype(np.float32)
+
+    def _where_to_sql(self, where: Dict[str, Any]) -> Optional[Tuple[str, List[Any]]]:
+        """인덱싱된 키만 쓰는 필터를 SQL로 변환합니다 (불가능하면 None)."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        for key, condition in where.items():
+            if key in ("$and", "$or"):
+                subs = [self._where_to_sql(sub) for sub in condition]
+                if any(sub is None for sub in subs):
+                    return None
+                joiner = " AND " if key == "$and" else " OR "
+                clauses.append("(" + joiner.join(sub[0] for sub in subs) + ")")
+                params.extend(p for sub in subs for p in sub[1])
+                continue
+
+            if key not in _INDEXED_KEYS:
+                return None
+
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, operand in condition.items():
+                if op == "$eq":
+                    clauses.append(f"{key} = ?")
+                    params.append(operand)
+                elif op == "$ne":
+                    clauses.append(f"({key} IS NULL OR {key} != ?)")
+                    params.append(operand)
+                elif op in ("$in", "$nin"):
+                    values = list(operand)
+                    if not values:
+                        clauses.append("0" if op == "$in" else "1")
+                        continue
+                    placeholders = ",".join("?" * len(values))
+                    negate = "NOT " if op == "$nin" else ""
+                    clauses.append(f"{key} {negate}IN ({placeholders})")
+                    params.extend(values)
+                else:
+                    return None
+
+        return (" AND ".join(clauses) or "1"), params
+
+    def _select_rows(self, where: Optional[Dict[str, Any]]) -> List[int]:
+        """필터에 맞는 살아있는 행 번호 목록"""
+        if not where:
+            return [row for (row,) in self._conn.execute("SELECT row FROM chunks WHERE deleted = 0 ORDER BY row")]
+
+        translated = self._where_to_sql(where)
+        if translated is not None:
+            sql, params = translated
+            return [
+                row for (row,) in self._conn.execute(
+                    f"SELECT row FROM chunks WHERE deleted = 0 AND ({sql}) ORDER BY row", params
+                )
+            ]
+
+        # 인덱싱되지 않은 키는 메타데이터를 읽어 파이썬에서 필터링
+        return [
+            row for row, metadata in self._conn.execute(
+                "SELECT row, metadata FROM chunks WHERE deleted = 0 ORDER BY row"
+            )
+            if matches_where(json.loads(metadata or "{}"), where)
+        ]
+
+    def _fetch_rows(self, rows: List[int]) -> Dict[int, Tuple[str, str, Dict[str, Any]]]:
+        found: Dict[int, Tuple[str, str, Dict[str, Any]]] = {}
+        for start in range(0, len(rows), 500):
+            part = rows[start:start + 500]
+            placeholders = ",".join("?" * len(part))
+            for row, chunk_id, document, metadata in self._conn.execute(
+                f"SELECT row, id, document, metadata FROM chunks WHERE row IN ({placeholders})", part
+            ):
+                found[row] = (chunk_id, document, json.loads(metadata or "{}"))
+        return found
+
+    def _rows_for_ids(self, ids: List[str]) -> List[int]:
+        rows: List[int] = []
+        for start in range(0, len(ids), 500):
+            part = ids[start:start + 500]
+            placeholders = ",".join("?" * len(part))
+            rows.extend(
+                row for (row,) in self._conn.execute(
+                    f"SELECT row FROM chunks WHERE deleted = 0 AND id IN ({placeholders})", part
+                )
+            )
+        return rows
+
+    def _tombstone(self, rows: List[int]):
+        if not rows:
+            return
+        self._conn.executemany("UPDATE chunks SET deleted = 1 WHERE row = ?", [(row,) for row in rows])
+        self._live[np.asarray(rows, dtype=np.int64)] = False
+        if self._index is not None:
+            for row in rows:
+                try:
+                    self._index.mark_deleted(int(row))
+                except RuntimeError:
+                    pass
+
+    # --- VectorStore 인터페이스 ---
+    def add(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: Optional[List[List[float]]] = None,
+    ) -> None:
+        if not ids:
+            return
+
+        vectors = np.asarray(embeddings, dtype=np.float32) if embeddings is not None else self._embed(documents)
+        if vectors.ndim != 2 or vectors.shape[0] != len(ids):
+            raise ValueError(f"임베딩 개수 불일치: ID {len(ids)}개, 벡터 {vectors.shape}")
+        vectors = self._normalize(vectors)
+
+        with self._lock:
+            if self._dim is None:
+                self._dim = int(vectors.shape[1])
+                self._capacity = 0
+                self._open_vectors(self.INITIAL_CAPACITY)
+                self._live = np.zeros(self._capacity, dtype=bool)
+                if HNSWLIB_AVAILABLE:
+                    self._index = self._new_index(self._capacity)
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"차원 불일치: 저장소 {self._dim}차원, 입력 {vectors.shape[1]}차원")
+
+            # 같은 ID가 있으면 기존 행을 톰스톤 처리 (upsert)
+            self._tombstone(self._rows_for_ids(ids))
+            self._conn.executemany("DELETE FROM chunks WHERE id = ? AND deleted = 1", [(i,) for i in ids])
+
+            start_row = self._next_row
+            self._ensure_capacity(start_row + len(ids))
+            rows = np.arange(start_row, start_row + len(ids))
+            self._vectors[start_row:start_row + len(ids)] = vectors
+            self._vectors.flush()
+
+            self._conn.executemany(
+                "INSERT INTO chunks (row, id, file_id, category_id, document, metadata, deleted) VALUES (?, ?, ?, ?, ?, ?, 0)",
+                [
+                    (
+                        int(row),
+                        chunk_id,
+                        (metadata or {}).get("file_id"),
+                        (metadata or {}).get("category_id"),
+                        document,
+                        json.dumps(metadata or {}, ensure_ascii=False),
+                    )
+                    for row, chunk_id, document, metadata in zip(rows, ids, documents, metadatas)
+                ],
+            )
+            self._next_row = start_row + len(ids)
+            self._live[rows] = True
+            self._save_info()
+            self._conn.commit()
+
+            if self._index is not None:
+                self._index.add_items(vectors, rows)
+                self._mark_index_dirty()
+
+    def query(
+        self,
+        query_text: Optional[str] = None,
+        query_embedding: Optional[List[float]] = None,
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        if query_embedding is None:
+            query_vector = self._embed([query_text])
+        else:
+            query_vector = np.asarray([query_embedding], dtype=np.float32)
+        query_vector = self._normalize(query_vector)[0]
+
+        with self._lock:
+            if self._dim is None or self._vectors is None:
+                return []
+            if query_vector.shape[0] != self._dim:
+                raise ValueError(f"차원 불일치: 저장소 {self._dim}차원, 쿼리 {query_vector.shape[0]}차원")
+
+            live_count = int(self._live.sum())
+            if live_count == 0:
+                return []
+            k = min(n_results, live_count)
+
+            if where:
+                candidate_rows = self._select_rows(where)
+                if not candidate_rows:
+                    return []
+                if self._index is None or len(candidate_rows) <= self.BRUTE_FORCE_THRESHOLD:
+                    hits = self._exact_search(query_vector, np.asarray(candidate_rows, dtype=np.int64), k)
+                else:
+                    hits = self._index_search(query_vector, min(k, len(candidate_rows)), set(candidate_rows))
+            elif self._index is not None:
+                hits = self._index_search(query_vector, k, None)
+            else:
+                hits = self._scan_search(query_vector, k)
+
+            found = self._fetch_rows([row for row, _ in hits])
+
+        return [
+            {"id": found[row][0], "document": found[row][1], "metadata": found[row][2], "distance": distance}
+            for row, distance in hits
+            if row in found
+        ]
+
+    def _exact_search(self, query_vector: np.ndarray, rows: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        scores = np.asarray(self._vectors[rows]) @ query_vector
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(rows[i]), float(1.0 - scores[i])) for i in top]
+
+    def _scan_search(self, query_vector: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """인덱스 없이 블록 단위 전수 탐색"""
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, self._next_row, self.SCAN_BLOCK_ROWS):
+            end = min(start + self.SCAN_BLOCK_ROWS, self._next_row)
+            scores = np.asarray(self._vectors[start:end]) @ query_vector
+            scores[~self._live[start:end]] = -np.inf
+            best_rows = np.concatenate([best_rows, np.arange(start, end)])
+            best_scores = np.concatenate([best_scores, scores])
+            if len(best_scores) > k:
+                keep = np.argpartition(-best_scores, k - 1)[:k]
+                best_rows, best_scores = best_rows[keep], best_scores[keep]
+
+        order = np.argsort(-best_scores)
+        return [
+            (int(best_rows[i]), float(1.0 - best_scores[i]))
+            for i in order
+            if np.isfinite(best_scores[i])
+        ]
+
+    def _index_search(self, query_vector: np.ndarray, k: int, allowed: Optional[set]) -> List[Tuple[int, float]]:
+        self._index.set_ef(max(64, k * 2))
+        if allowed is None:
+            labels, distances = self._index.knn_query(query_vector, k=k)
+            return [(int(label), float(dist)) for label, dist in zip(labels[0], distances[0])]
+
+        try:
+            labels, distances = self._index.knn_query(query_vector, k=k, filter=lambda label: label in allowed)
+            return [(int(label), float(dist)) for label, dist in zip(labels[0], distances[0])]
+        except TypeError:
+            # filter 인자를 지원하지 않는 hnswlib 버전: 넉넉히 가져와 후처리
+            fetch = min(int(self._live.sum()), k * 10)
+            labels, distances = self._index.knn_query(query_vector, k=fetch)
+            hits = [(int(label), float(dist)) for label, dist in zip(labels[0], distances[0]) if int(label) in allowed]
+            return hits[:k]
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        include_embeddings: bool = False,
+    ) -> Dict[str, List[Any]]:
+        with self._lock:
+            if ids is not None:
+                rows = sorted(self._rows_for_ids(ids))
+                if where:
+                    allowed = set(self._select_rows(where))
+                    rows = [row for row in rows if row in allowed]
+            else:
+                rows = self._select_rows(where)
+
+            if limit is not None:
+                rows = rows[offset:offset + limit]
+
+            found = self._fetch_rows(rows)
+            ordered = [row for row in rows if row in found]
+            result: Dict[str, List[Any]] = {
+                "ids": [found[row][0] for row in ordered],
+                "documents": [found[row][1] for row in ordered],
+                "metadatas": [found[row][2] for row in ordered],
+            }
+            if include_embeddings:
+                result["embeddings"] = (
+                    np.asarray(self._vectors[np.asarray(ordered, dtype=np.int64)]).tolist() if ordered else []
+                )
+            return result
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None) -> int:
+        with self._lock:
+            if ids is None and not where:
+                return 0
+            rows = self._select_rows(where) if where else []
+            if ids is not None:
+                id_rows = self._rows_for_ids(ids)
+                rows = id_rows if not where else sorted(set(rows) & set(id_rows))
+
+            self._tombstone(rows)
+            self._conn.commit()
+            if rows:
+                self._mark_index_dirty()
+
+            # 톰스톤이 살아있는 행보다 많아지면 압축
+            dead = self._next_row - int(self._live.sum())
+            if dead > 1000 and dead > int(self._live.sum()):
+                self.compact()
+            return len(rows)
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._live.sum()) if self._dim is not None else 0
+
+    def dimension(self) -> Optional[int]:
+        with self._lock:
+            return self._dim if self.count() > 0 else None
+
+    def clear(self) -> int:
+        """모든 데이터를 삭제하고 차원 정보까지 초기화합니다."""
+        with self._lock:
+            removed = self.count()
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.execute("DELETE FROM store_info")
+            self._conn.commit()
+            self._vectors = None
+            self._index = None
+            for path in (self.vectors_file, self.index_file):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._dim = None
+            self._next_row = 0
+            self._capacity = 0
+            self._live = np.zeros(0, dtype=bool)
+            self._index_dirty_writes = 0
+            return removed
+
+    def compact(self):
+        """톰스톤 행을 제거하고 벡터 파일 / 인덱스를 다시 만듭니다."""
+        with self._lock:
+            if self._dim is None:
+                return
+            live_rows = np.flatnonzero(self._live[:self._next_row])
+            live_vectors = np.asarray(self._vectors[live_rows]) if len(live_rows) else np.empty((0, self._dim), np.float32)
+
+            # 행 번호가 바뀌므로 중간에 중단되어도 예전 인덱스를 다시 쓰지 않도록 먼저 제거
+            self._index = None
+            if os.path.exists(self.index_file):
+                os.remove(self.index_file)
+
+            self._conn.execute("DELETE FROM chunks WHERE deleted = 1")
+            # 행 번호 재배치 (충돌 방지를 위해 음수로 먼저 이동)
+            self._conn.execute("UPDATE chunks SET row = -row - 1")
+            self._conn.executemany(
+                "UPDATE chunks SET row = ? WHERE row = ?",
+                [(new_row, -int(old_row) - 1) for new_row, old_row in enumerate(live_rows)],
+            )
+
+            self._vectors = None
+            os.remove(self.vectors_file)
+            self._next_row = len(live_rows)
+            self._capacity = 0
+            self._open_vectors(max(self.INITIAL_CAPACITY, self._next_row))
+            if self._next_row:
+                self._vectors[:self._next_row] = live_vectors
+                self._vectors.flush()
+            self._live = np.zeros(self._capacity, dtype=bool)
+            self._live[:self._next_row] = True
+
+            self._save_info()
+            self._conn.commit()
+            self._rebuild_index()
+            _clog.info(f"로컬 ANN 저장소 압축 완료: {self._next_row}개 벡터 유지")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            vector_bytes = os.path.getsize(self.vectors_file) if os.path.exists(self.vectors_file) else 0
+            index_bytes = os.path.getsize(self.index_file) if os.path.exists(self.index_file) else 0
+            return {
+                "backend": self.backend_name,
+                "path": self.path,
+                "count": self.count(),
+                "dimension": self._dim,
+                "tombstones": self._next_row - int(self._live.sum()) if self._dim is not None else 0,
+                "index": "hnsw" if self._index is not None else "exact_scan",
+                "index_unsaved_writes": self._index_dirty_writes,
+                "vector_file_mb": round(vector_bytes / 1024 / 1024, 2),
+                "index_file_mb": round(index_bytes / 1024 / 1024, 2),
+            }
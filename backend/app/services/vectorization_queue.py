@@ -0,0 +1,699 @@
+"""
+벡터화 작업 큐 (SQLite)
+
+API 핸들러가 asyncio.create_task()로 벡터화를 띄우면 서버 재시작 시 진행 중이던 작업이 사라지고
+파일이 VECTORIZING 상태로 남았고, 카테고리 일괄 벡터화는 파일을 하나씩 순서대로 처리했습니다.
+- 작업은 data/db/vectorization_jobs.db에 저장 (파일당 활성 작업 1개, 같은 파일을 다시 요청하면 기존 작업 재사용)
+- performance.vectorizationWorkers 개수의 워커가 우선순위 → 등록 순으로 작업을 가져가 동시에 처리
+- 실패하면 지수 백오프(vectorizationRetryBaseDelay × 2^(시도-1))로 vectorizationMaxAttempts회까지 재시도
+- 청크 벡터화(kind="file")는 vectorizationCommitBatchSize개 청크를 저장할 때마다 체크포인트를 남기고,
+  재시작 후에는 이미 저장된 청크를 재사용해 나머지만 처리 (청크 ID가 내용 해시 기반)
+- 서버 시작 시 running 상태로 남은 작업과 작업 없이 VECTORIZING에 멈춘 파일을 다시 큐에 넣음
+- 대기열 길이, 단계별 소요 시간, 처리량은 get_stats()로 조회
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..core.logger import get_console_logger
+from ..db.sqlite_pool import get_db_manager
+from .settings_service import settings_service
+
+_clog = get_console_logger()
+
+# 작업 종류
+JOB_KIND_FILE = "file"          # 전처리(청킹)된 파일 → FileService.start_vectorization
+JOB_KIND_DOCLING = "docling"    # 원본 파일 → VectorService.vectorize_with_docling_pipeline
+JOB_KIND_LANGFLOW = "langflow"  # LangflowService.process_file_with_flow
+
+# 우선순위 (클수록 먼저 처리)
+PRIORITY_HIGH = 10    # 응답을 기다리는 요청
+PRIORITY_NORMAL = 0   # 단일 파일 백그라운드 처리
+PRIORITY_LOW = -10    # 일괄 처리
+
+FINAL_STATUSES = ("completed", "failed")
+
+# 새 작업이 없을 때 대기열을 다시 확인하는 간격 (백오프 대기 중인 작업도 이 간격으로 확인)
+POLL_INTERVAL_SECONDS = 1.0
+# 완료/실패 작업 보관 기간
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+# 처리량 계산 구간
+THROUGHPUT_WINDOW_SECONDS = 300
+# 단계별 소요 시간 평균에 사용할 최근 완료 작업 수
+TIMING_SAMPLE_SIZE = 200
+
+JobHandler = Callable[["VectorizationJobQueue", Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class VectorizationJobQueue:
+    """SQLite에 저장되는 벡터화 작업 큐와 워커 풀"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(settings.DATA_DIR, "db", "vectorization_jobs.db")
+        self.db = get_db_manager()
+
+        self.workers = 4
+        self.max_attempts = 3
+        self.retry_base_delay = 5.0
+        self.commit_batch_size = 64
+
+        self._handlers: Dict[str, JobHandler] = {
+            JOB_KIND_FILE: _run_file_job,
+            JOB_KIND_DOCLING: _run_docling_job,
+            JOB_KIND_LANGFLOW: _run_langflow_job,
+        }
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker_tasks: Dict[int, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._running_jobs: Dict[str, Dict[str, Any]] = {}
+        self._started = False
+
+        self.stats = {"enqueued": 0, "deduplicated": 0, "completed": 0, "failed": 0, "retried": 0, "recovered": 0}
+
+    def apply_settings(self, performance_settings: Dict[str, Any]):
+        """performance 설정 섹션의 큐 관련 값 반영 (워커 수는 실행 중에도 바로 조정)"""
+        self.workers = max(1, int(performance_settings.get("vectorizationWorkers", 4)))
+        self.max_attempts = max(1, int(performance_settings.get("vectorizationMaxAttempts", 3)))
+        self.retry_base_delay = max(0.0, float(performance_settings.get("vectorizationRetryBaseDelay", 5.0)))
+        self.commit_batch_size = max(1, int(performance_settings.get("vectorizationCommitBatchSize", 64)))
+
+        loop = self._loop
+        if self._started and loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._resize_workers)
+
+    # ------------------------------------------------------------------
+    # 스키마
+    # ------------------------------------------------------------------
+
+    def _ensure_initialized(self):
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            with self.db.connection(self.db_path) as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS vectorization_jobs (
+                        job_id TEXT PRIMARY KEY,
+                        kind TEXT NOT NULL,
+                        file_id TEXT NOT NULL,
+                        payload TEXT,
+                        priority INTEGER NOT NULL DEFAULT 0,
+                        status TEXT NOT NULL,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        max_attempts INTEGER NOT NULL,
+                        available_at REAL NOT NULL,
+                        created_at REAL NOT NULL,
+                        started_at REAL,
+                        finished_at REAL,
+                        checkpoint TEXT,
+                        timings TEXT,
+                        chunks_count INTEGER,
+                        result TEXT,
+                        last_error TEXT
+                    )
+                """)
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_vectorization_jobs_ready "
+                    "ON vectorization_jobs(status, priority DESC, available_at)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_vectorization_jobs_finished "
+                    "ON vectorization_jobs(status, finished_at)"
+                )
+                # 파일당 활성 작업은 하나만 (같은 파일의 벡터를 두 작업이 동시에 쓰지 않도록)
+                conn.execute(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS idx_vectorization_jobs_active "
+                    "ON vectorization_jobs(file_id) WHERE status IN ('queued', 'running')"
+                )
+            self._initialized = True
+
+    async def _run_db(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        def task(conn: sqlite3.Connection):
+            self._ensure_initialized()
+            conn.row_factory = sqlite3.Row
+            return fn(conn)
+        return await self.db.run(self.db_path, task)
+
+    @staticmethod
+    def _row_to_job(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        for key in ("payload", "checkpoint", "timings", "result"):
+            job[key] = json.loads(job[key]) if job.get(key) else None
+        return job
+
+    # ------------------------------------------------------------------
+    # 작업 등록 / 대기
+    # ------------------------------------------------------------------
+
+    async def enqueue(
+        self,
+        kind: str,
+        file_id: str,
+        payload: Optional[Dict[str, Any]] = None,
+        priority: int = PRIORITY_NORMAL,
+    ) -> Dict[str, Any]:
+        """작업을 등록합니다.
+
+        같은 파일의 작업이 이미 대기 중이면 종류/옵션을 새 요청으로 바꾸고 우선순위를 높여 재사용하고,
+        실행 중이면 그 작업을 그대로 돌려줍니다. (반환 dict의 deduplicated=True)
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"알 수 없는 벡터화 작업 종류: {kind}")
+        payload_json = json.dumps(payload or {}, ensure_ascii=False, default=str)
+        max_attempts = self.max_attempts
+
+        def insert(conn: sqlite3.Connection):
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM vectorization_jobs WHERE file_id = ? AND status IN ('queued', 'running')",
+                (file_id,),
+            ).fetchone()
+            if row is not None:
+                if row["status"] == "queued":
+                    conn.execute(
+                        "UPDATE vectorization_jobs SET kind = ?, payload = ?, priority = MAX(priority, ?) WHERE job_id = ?",
+                        (kind, payload_json, priority, row["job_id"]),
+                    )
+                    row = conn.execute("SELECT * FROM vectorization_jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+                return row, True
+
+            now = time.time()
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO vectorization_jobs (job_id, kind, file_id, payload, priority, status, attempts, "
+                "max_attempts, available_at, created_at) VALUES (?, ?, ?, ?, ?, 'queued', 0, ?, ?, ?)",
+                (job_id, kind, file_id, payload_json, priority, max_attempts, now, now),
+            )
+            return conn.execute("SELECT * FROM vectorization_jobs WHERE job_id = ?", (job_id,)).fetchone(), False
+
+        row, deduplicated = await self._run_db(insert)
+        job = self._row_to_job(row)
+        job["deduplicated"] = deduplicated
+        self.stats["deduplicated" if deduplicated else "enqueued"] += 1
+
+        await self.start()
+        self._wakeup.set()
+        return job
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """작업이 끝날 때까지 기다려 결과를 반환합니다. (재시도 중에는 계속 대기)"""
+        future = asyncio.get_running_loop().create_future()
+        # 먼저 등록한 뒤 DB를 확인해야 그 사이에 끝난 작업을 놓치지 않음
+        self._waiters.setdefault(job_id, []).append(future)
+        try:
+            job = await self.get_job(job_id)
+            if job is None:
+                return {"success": False, "error": f"벡터화 작업을 찾을 수 없습니다: {job_id}"}
+            if job["status"] in FINAL_STATUSES:
+                return self._job_result(job)
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        finally:
+            waiters = self._waiters.get(job_id)
+            if waiters and future in waiters:
+                waiters.remove(future)
+                if not waiters:
+                    self._waiters.pop(job_id, None)
+
+    async def submit_and_wait(
+        self,
+        kind: str,
+        file_id: str,
+        payload: Optional[Dict[str, Any]] = None,
+        priority: int = PRIORITY_HIGH,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        job = await self.enqueue(kind, file_id, payload, priority)
+        result = await self.wait(job["job_id"], timeout=timeout)
+        return {**result, "job_id": job["job_id"]}
+
+    @staticmethod
+    def _job_result(job: Dict[str, Any]) -> Dict[str, Any]:
+        if job.get("result"):
+            return job["result"]
+        return {"success": job["status"] == "completed", "error": job.get("last_error")}
+
+    def _resolve_waiters(self, job_id: str, result: Dict[str, Any]):
+        for future in self._waiters.pop(job_id, []):
+            if not future.done():
+                future.set_result(result)
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = await self._run_db(
+            lambda conn: conn.execute("SELECT * FROM vectorization_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        )
+        return self._row_to_job(row)
+
+    async def save_checkpoint(self, job_id: str, checkpoint: Dict[str, Any]):
+        """커밋된 임베딩 배치까지의 진행 상황 저장"""
+        checkpoint_json = json.dumps(checkpoint, ensure_ascii=False)
+        await self._run_db(lambda conn: conn.execute(
+            "UPDATE vectorization_jobs SET checkpoint = ? WHERE job_id = ?", (checkpoint_json, job_id)
+        ))
+        running = self._running_jobs.get(job_id)
+        if running is not None:
+            running["checkpoint"] = checkpoint
+
+    # ------------------------------------------------------------------
+    # 워커
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """워커를 시작합니다. (처음 호출될 때 중단된 작업을 복구)"""
+        if self._started:
+            return
+        self._started = True
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        try:
+            await self.recover()
+        except Exception as e:
+            _clog.warning(f"⚠️ 벡터화 작업 복구 실패: {e}")
+        self._resize_workers()
+        _clog.info(f"🧵 벡터화 작업 큐 시작 - 워커 {self.workers}개")
+
+    def _resize_workers(self):
+        for index in range(self.workers):
+            task = self._worker_tasks.get(index)
+            if task is None or task.done():
+                self._worker_tasks[index] = asyncio.ensure_future(self._worker_loop(index))
+        # 줄어든 워커는 진행 중인 작업을 마친 뒤 _worker_loop에서 스스로 종료
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self):
+        """워커를 멈추고 실행 중이던 작업을 대기 상태로 돌려 다음 시작 때 이어서 처리합니다."""
+        if not self._started:
+            return
+        self._started = False
+        # 취소되면 _run_job이 실행 목록에서 지우므로 먼저 기록
+        running_ids = list(self._running_jobs.keys())
+        tasks = list(self._worker_tasks.values())
+        self._worker_tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if running_ids:
+            placeholders = ",".join("?" for _ in running_ids)
+            await self._run_db(lambda conn: conn.execute(
+                f"UPDATE vectorization_jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), available_at = ? "
+                f"WHERE status = 'running' AND job_id IN ({placeholders})",
+                (time.time(), *running_ids),
+            ))
+        _clog.info(f"🛑 벡터화 작업 큐 중지 - 중단된 작업 {len(running_ids)}개는 다음 시작 때 재개")
+
+    async def _worker_loop(self, index: int):
+        while self._started and index < self.workers:
+            try:
+                job = await self._run_db(self._claim_next)
+            except Exception as e:
+                _clog.warning(f"⚠️ 벡터화 작업 조회 실패: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 상태 갱신 실패(database is locked 등)로 워커가 끝나면 풀이 영구히 줄어듦
+                _clog.exception(f"⚠️ 벡터화 작업 상태 저장 실패 - {job['file_id']}: {e}")
+
+    def _claim_next(self, conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT job_id FROM vectorization_jobs WHERE status = 'queued' AND available_at <= ? "
+            "ORDER BY priority DESC, created_at LIMIT 1",
+            (now,),
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE vectorization_jobs SET status = 'running', attempts = attempts + 1, started_at = ? WHERE job_id = ?",
+            (now, row["job_id"]),
+        )
+        return self._row_to_job(
+            conn.execute("SELECT * FROM vectorization_jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+        )
+
+    async def _run_job(self, job: Dict[str, Any]):
+        job_id = job["job_id"]
+        self._running_jobs[job_id] = job
+        start = time.perf_counter()
+        _clog.info(
+            f"▶️ 벡터화 작업 시작 - {job['kind']} {job['file_id']} "
+            f"(시도 {job['attempts']}/{job['max_attempts']}, 우선순위 {job['priority']})"
+        )
+        try:
+            result = await self._handlers[job["kind"]](self, job)
+        except asyncio.CancelledError:
+            # 서버 종료: stop()이 대기 상태로 되돌림
+            raise
+        except Exception as e:
+            _clog.exception(f"💥 벡터화 작업 오류 - {job['file_id']}: {e}")
+            result = {"success": False, "error": str(e)}
+        finally:
+            self._running_jobs.pop(job_id, None)
+
+        elapsed = time.perf_counter() - start
+        result = dict(result or {})
+        timings = {**(result.get("timings") or {}), "total": elapsed}
+        success = bool(result.get("success"))
+        retryable = result.pop("retryable", True)
+
+        if not success and retryable and job["attempts"] < job["max_attempts"]:
+            delay = self.retry_base_delay * (2 ** (job["attempts"] - 1))
+            self.stats["retried"] += 1
+            _clog.warning(
+                f"🔁 벡터화 작업 재시도 예약 - {job['file_id']} {delay:.0f}초 후 "
+                f"(시도 {job['attempts']}/{job['max_attempts']}): {result.get('error')}"
+            )
+            await self._run_db(lambda conn: conn.execute(
+                "UPDATE vectorization_jobs SET status = 'queued', available_at = ?, last_error = ? WHERE job_id = ?",
+                (time.time() + delay, result.get("error"), job_id),
+            ))
+            return
+
+        status = "completed" if success else "failed"
+        self.stats[status] += 1
+        result_json = json.dumps(result, ensure_ascii=False, default=str)
+        await self._run_db(lambda conn: conn.execute(
+            "UPDATE vectorization_jobs SET status = ?, finished_at = ?, timings = ?, chunks_count = ?, "
+            "result = ?, last_error = ? WHERE job_id = ?",
+            (
+                status, time.time(), json.dumps(timings), result.get("chunks_count"),
+                result_json, None if success else result.get("error"), job_id,
+            ),
+        ))
+        if success:
+            _clog.info(f"✅ 벡터화 작업 완료 - {job['file_id']} ({elapsed:.1f}초)")
+        else:
+            _clog.error(f"❌ 벡터화 작업 실패 - {job['file_id']}: {result.get('error')}")
+        self._resolve_waiters(job_id, json.loads(result_json))
+
+    # ------------------------------------------------------------------
+    # 복구
+    # ------------------------------------------------------------------
+
+    async def recover(self) -> Dict[str, int]:
+        """재시작 전에 실행 중이던 작업과 VECTORIZING에 멈춘 파일을 다시 큐에 넣습니다."""
+        now = time.time()
+
+        def requeue(conn: sqlite3.Connection) -> int:
+            # 중단은 실패가 아니므로 시도 횟수를 되돌림
+            cursor = conn.execute(
+                "UPDATE vectorization_jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), available_at = ? "
+                "WHERE status = 'running'",
+                (now,),
+            )
+            conn.execute(
+                "DELETE FROM vectorization_jobs WHERE status IN ('completed', 'failed') AND finished_at < ?",
+                (now - JOB_RETENTION_SECONDS,),
+            )
+            return cursor.rowcount
+
+        requeued = await self._run_db(requeue)
+
+        orphaned = 0
+        try:
+            from . import get_file_service
+            from ..models.schemas import FileStatus
+
+            active = await self._run_db(lambda conn: {
+                row["file_id"] for row in conn.execute(
+                    "SELECT file_id FROM vectorization_jobs WHERE status IN ('queued', 'running')"
+                ).fetchall()
+            })
+            file_service = get_file_service()
+            files = await asyncio.to_thread(
+                file_service.file_metadata_service.list_files, status=FileStatus.VECTORIZING
+            )
+            for file_metadata in files:
+                if file_metadata.file_id not in active:
+                    kind, payload = await self._recovery_job_spec(file_metadata)
+                    await self._run_db(lambda conn, file_id=file_metadata.file_id, kind=kind, payload=payload: conn.execute(
+                        "INSERT OR IGNORE INTO vectorization_jobs (job_id, kind, file_id, payload, priority, status, "
+                        "attempts, max_attempts, available_at, created_at) VALUES (?, ?, ?, ?, ?, 'queued', 0, ?, ?, ?)",
+                        (uuid.uuid4().hex, kind, file_id, payload, PRIORITY_NORMAL, self.max_attempts, now, now),
+                    ))
+                    orphaned += 1
+        except Exception as e:
+            _clog.warning(f"⚠️ VECTORIZING 상태 파일 복구 실패: {e}")
+
+        self.stats["recovered"] += requeued + orphaned
+        if requeued or orphaned:
+            _clog.info(f"♻️ 벡터화 작업 복구 - 중단된 작업 {requeued}개, VECTORIZING 파일 {orphaned}개 재등록")
+        return {"requeued_jobs": requeued, "orphaned_files": orphaned}
+
+    async def _recovery_job_spec(self, file_metadata) -> tuple:
+        """VECTORIZING에 멈춘 파일을 다시 등록할 작업 종류와 payload(JSON)를 정합니다.
+
+        마지막 작업 기록이 있으면 그 종류/옵션을 그대로 쓰고, 없으면 청킹 데이터 유무로 판단합니다.
+        (Docling 파이프라인으로 들어온 파일은 청킹 데이터가 없어 kind="file"로는 항상 실패)
+        """
+        file_id = file_metadata.file_id
+        row = await self._run_db(lambda conn: conn.execute(
+            "SELECT kind, payload FROM vectorization_jobs WHERE file_id = ? ORDER BY created_at DESC LIMIT 1",
+            (file_id,),
+        ).fetchone())
+        if row is not None:
+            return row["kind"], row["payload"] or "{}"
+
+        from .preprocessing_service import manual_preprocessing_service
+
+        data = await asyncio.to_thread(manual_preprocessing_service.get_preprocessing_data, file_id)
+        if data and data.get("annotations"):
+            return JOB_KIND_FILE, "{}"
+
+        metadata = {
+            "filename": file_metadata.filename,
+            "category_id": file_metadata.category_id,
+            "category_name": file_metadata.category_name,
+            "upload_time": file_metadata.upload_time.isoformat() if file_metadata.upload_time else None,
+            "file_size": file_metadata.file_size,
+        }
+        return JOB_KIND_DOCLING, json.dumps({"metadata": metadata}, ensure_ascii=False, default=str)
+
+    # ------------------------------------------------------------------
+    # 통계
+    # ------------------------------------------------------------------
+
+    async def get_stats(self) -> Dict[str, Any]:
+        now = time.time()
+
+        def collect(conn: sqlite3.Connection) -> Dict[str, Any]:
+            by_status = {
+                row["status"]: row["count"] for row in conn.execute(
+                    "SELECT status, COUNT(*) AS count FROM vectorization_jobs GROUP BY status"
+                ).fetchall()
+            }
+            ready = conn.execute(
+                "SELECT COUNT(*), MIN(created_at) FROM vectorization_jobs WHERE status = 'queued' AND available_at <= ?",
+                (now,),
+            ).fetchone()
+            recent = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(chunks_count), 0) FROM vectorization_jobs "
+                "WHERE status = 'completed' AND finished_at >= ?",
+                (now - THROUGHPUT_WINDOW_SECONDS,),
+            ).fetchone()
+            timing_rows = conn.execute(
+                "SELECT timings FROM vectorization_jobs WHERE status = 'completed' AND timings IS NOT NULL "
+                "ORDER BY finished_at DESC LIMIT ?",
+                (TIMING_SAMPLE_SIZE,),
+            ).fetchall()
+            failures = conn.execute(
+                "SELECT job_id, kind, file_id, attempts, last_error, finished_at FROM vectorization_jobs "
+                "WHERE status = 'failed' ORDER BY finished_at DESC LIMIT 10"
+            ).fetchall()
+            return {
+                "by_status": by_status,
+                "ready": ready[0],
+                "oldest_ready_created_at": ready[1],
+                "recent_jobs": recent[0],
+                "recent_chunks": recent[1],
+                "timings": [json.loads(row["timings"]) for row in timing_rows],
+                "failures": [dict(row) for row in failures],
+            }
+
+        data = await self._run_db(collect)
+
+        stage_totals: Dict[str, List[float]] = {}
+        for timings in data["timings"]:
+            for stage, seconds in timings.items():
+                stage_totals.setdefault(stage, []).append(seconds)
+
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "active_workers": len(self._running_jobs),
+            "max_attempts": self.max_attempts,
+            "retry_base_delay": self.retry_base_delay,
+            "commit_batch_size": self.commit_batch_size,
+            "queue_depth": data["by_status"].get("queued", 0),
+            "ready_depth": data["ready"],
+            "oldest_ready_wait_seconds": now - data["oldest_ready_created_at"] if data["oldest_ready_created_at"] else 0.0,
+            "jobs_by_status": data["by_status"],
+            "stage_timings": {
+                stage: {"avg_seconds": sum(values) / len(values), "max_seconds": max(values), "samples": len(values)}
+                for stage, values in stage_totals.items()
+            },
+            "throughput": {
+                "window_seconds": THROUGHPUT_WINDOW_SECONDS,
+                "jobs_per_minute": data["recent_jobs"] / THROUGHPUT_WINDOW_SECONDS * 60,
+                "chunks_per_second": data["recent_chunks"] / THROUGHPUT_WINDOW_SECONDS,
+            },
+            "running": [
+                {
+                    "job_id": job["job_id"],
+                    "kind": job["kind"],
+                    "file_id": job["file_id"],
+                    "attempts": job["attempts"],
+                    "running_seconds": now - job["started_at"] if job.get("started_at") else 0.0,
+                    "checkpoint": job.get("checkpoint"),
+                }
+                for job in list(self._running_jobs.values())
+            ],
+            "recent_failures": data["failures"],
+        }
+
+
+# ----------------------------------------------------------------------
+# 작업 종류별 처리 함수
+# ----------------------------------------------------------------------
+
+async def _run_file_job(queue: VectorizationJobQueue, job: Dict[str, Any]) -> Dict[str, Any]:
+    """청킹된 파일 벡터화 (커밋된 배치마다 체크포인트 저장)"""
+    from . import get_file_service
+    from ..models.schemas import FileStatus
+
+    file_service = get_file_service()
+    file_id = job["file_id"]
+    if job["attempts"] > 1:
+        # 이전 시도가 파일을 FAILED로 바꿨으면 청킹 데이터가 있을 때만 다시 시도
+        file_info = await file_service.get_file_info(file_id)
+        if file_info and file_info.status == FileStatus.FAILED:
+            from .preprocessing_service import manual_preprocessing_service
+
+            data = manual_preprocessing_service.get_preprocessing_data(file_id)
+            if not data or not data.get("annotations"):
+                return {"success": False, "error": "청킹 데이터가 없습니다.", "retryable": False}
+            await file_service._update_file_status(file_id, FileStatus.PREPROCESSED)
+
+    return await file_service.start_vectorization(
+        file_id,
+        on_checkpoint=lambda checkpoint: queue.save_checkpoint(job["job_id"], checkpoint),
+        commit_batch_size=queue.commit_batch_size,
+    )
+
+
+async def _run_docling_job(queue: VectorizationJobQueue, job: Dict[str, Any]) -> Dict[str, Any]:
+    """원본 파일 Docling 통합 벡터화 후 파일 벡터화 상태 반영"""
+    from . import get_file_service
+    from ..models.schemas import DoclingOptions
+
+    file_service = get_file_service()
+    file_id = job["file_id"]
+    payload = job.get("payload") or {}
+    file_info = await file_service.get_file_info(file_id)
+    if not file_info:
+        return {"success": False, "error": "파일을 찾을 수 없습니다.", "retryable": False}
+
+    def report_shard(done: int, total: int, pages: Tuple[int, int], info: Dict[str, Any]):
+        # 페이지 구간 변환 진행 상황을 작업 체크포인트로 남김 (get_stats()의 running 항목에 표시)
+        return queue.save_checkpoint(job["job_id"], {
+            "stage": "docling_convert",
+            "converted_shards": done,
+            "total_shards": total,
+            "last_pages": list(pages),
+        })
+
+    options = payload.get("docling_options")
+    result = await file_service.vector_service.vectorize_with_docling_pipeline(
+        file_path=file_info.file_path,
+        file_id=file_id,
+        metadata=payload.get("metadata") or {},
+        enable_docling=payload.get("enable_docling", True),
+        docling_options=DoclingOptions(**options) if options else None,
+        progress_callback=report_shard,
+    )
+
+    if result.get("success"):
+        await file_service.update_file_vectorization_status(
+            file_id=file_id,
+            vectorized=True,
+            error_message=None,
+            chunk_count=result["chunks_count"]
+        )
+    else:
+        await file_service.update_file_vectorization_status(
+            file_id=file_id,
+            vectorized=False,
+            error_message=result.get("error", "벡터화 실패"),
+            chunk_count=0
+        )
+    return result
+
+
+_langflow_service = None
+
+
+async def _run_langflow_job(queue: VectorizationJobQueue, job: Dict[str, Any]) -> Dict[str, Any]:
+    """Langflow Flow로 파일 처리"""
+    global _langflow_service
+    from . import get_file_service
+
+    if _langflow_service is None:
+        from .langflow_service import LangflowService
+        _langflow_service = LangflowService()
+
+    file_id = job["file_id"]
+    flow_id = (job.get("payload") or {}).get("flow_id")
+    file_info = await get_file_service().get_file_info(file_id)
+    if not file_info:
+        return {"file_id": file_id, "status": "error", "success": False, "error": "파일을 찾을 수 없습니다.", "retryable": False}
+
+    result = await _langflow_service.process_file_with_flow(file_id, flow_id, file_info)
+    return {**result, "success": result.get("status") == "completed"}
+
+
+# 싱글톤 인스턴스
+_vectorization_queue = None
+_vectorization_queue_lock = threading.Lock()
+
+
+def get_vectorization_queue() -> VectorizationJobQueue:
+    """VectorizationJobQueue 싱글톤 인스턴스 반환"""
+    global _vectorization_queue
+
+    if _vectorization_queue is None:
+        with _vectorization_queue_lock:
+            if _vectorization_queue is None:
+                job_queue = VectorizationJobQueue()
+                job_queue.apply_settings(settings_service.get_section_settings("performance"))
+                settings_service.subscribe(
+                    "performance", lambda section, values: job_queue.apply_settings(values)
+                )
+                _vectorization_queue = job_queue
+
+    return _vectorization_queue
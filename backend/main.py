@@ -136,6 +136,41 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"❌ unstructured 라이브러리 로딩 중 예상치 못한 오류: {e}")
     
+    # 임베딩 모델 워밍업 (첫 검색 요청에서 모델 로딩 지연 방지)
+    try:
+        import asyncio
+        from app.services.embedding_registry import embedding_registry
+        await asyncio.to_thread(embedding_registry.warm_up)
+    except Exception as e:
+        print(f"⚠️ 임베딩 모델 워밍업 중 오류: {e}")
+    
+    # 재정렬 모델 워밍업 (성능 설정에서 enableRerank를 켠 경우만)
+    try:
+        import asyncio
+        from app.services.reranker import get_reranker
+        reranker = get_reranker()
+        if reranker.enabled:
+            await asyncio.to_thread(reranker.warm_up)
+    except Exception as e:
+        print(f"⚠️ 재정렬 모델 워밍업 중 오류: {e}")
+    
+    # Docling 변환기 사전 로드 (설정에서 preload_converters를 켠 경우만)
+    try:
+        from app.services.docling_converter_pool import get_docling_converter_pool
+        docling_pool = get_docling_converter_pool()
+        if docling_pool.preload:
+            await docling_pool.warm_up()
+            print("✅ Docling 변환기 사전 로드 완료")
+    except Exception as e:
+        print(f"⚠️ Docling 변환기 사전 로드 중 오류: {e}")
+    
+    # 벡터화 작업 큐 워커 시작 (재시작 전에 중단된 작업 재개)
+    try:
+        from app.services.vectorization_queue import get_vectorization_queue
+        await get_vectorization_queue().start()
+    except Exception as e:
+        print(f"⚠️ 벡터화 작업 큐 시작 중 오류: {e}")
+    
     # 서버 시작 완료 로그
     _log.info("🚀 API 서버 초기화 완료", extra={"event": "server_start", "version": settings.VERSION})
     
@@ -143,6 +178,21 @@ async def lifespan(app: FastAPI):
     
     # 서버 종료 시 정리 작업
     _log.info("🛑 API 서버 종료 중...", extra={"event": "server_shutdown"})
+    try:
+        from app.services.vectorization_queue import get_vectorization_queue
+        await get_vectorization_queue().stop()
+    except Exception:
+        pass
+    try:
+        from app.services.docling_converter_pool import get_docling_converter_pool
+        get_docling_converter_pool().shutdown()
+    except Exception:
+        pass
+    try:
+        from app.services.vector_stores import flush_local_ann_stores
+        flush_local_ann_stores()
+    except Exception:
+        pass
 
 # FastAPI 애플리케이션 생성
 app = FastAPI(
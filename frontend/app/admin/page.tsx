@@ -119,6 +119,12 @@ interface DashboardData {
     vector_performance: {
       total_vectors: number;
     };
+    answer_cache?: {
+      enabled: boolean;
+      lookups: number;
+      hits: number;
+      hit_rate: number;
+    };
   };
   categories: {
     categories: Array<{
@@ -580,7 +586,13 @@ export default function AdminDashboard() {
           icon={MessageSquare}
           title="오늘 질문"
           value={dashboardData?.usage.daily_questions.today || 0}
-          description="오늘 발생한 질문 수"
+          description={
+            dashboardData?.performance.answer_cache?.enabled
+              ? `답변 캐시 적중률 ${Math.round(
+                  (dashboardData.performance.answer_cache.hit_rate || 0) * 100
+                )}%`
+              : "오늘 발생한 질문 수"
+          }
           colorClass="text-purple-500"
         />
         <StatCard